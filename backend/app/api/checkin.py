@@ -5,8 +5,6 @@ from sqlalchemy import select
 from typing import List
 from uuid import UUID
 from datetime import datetime, timezone
-import csv
-import io
 
 from app.db.session import get_db
 from app.api.deps import get_current_user
@@ -15,9 +13,13 @@ from app.schemas.checkin import (
     CheckInSummary,
     CheckInCreate,
     CheckInResponse,
-    CheckInExportRow
+    CheckInExportRow,
+    CheckInReplayRequest,
+    CheckInReplayResponse
 )
 from app.crud import checkin as checkin_crud
+from app.services.checkin_replay import replay_checkin_operations
+from app.services.season_export import checkin_csv
 from app.models.outing import Outing
 
 router = APIRouter()
@@ -64,6 +66,9 @@ async def check_in_participants(
     """
     Check in one or more participants for an outing
     Requires authentication (admin or outing leader)
+
+    Idempotent: participants already checked in are left as they are. The response
+    includes the outing's full check-in summary, so no follow-up GET is needed.
     """
     # Verify outing exists
     result = await db.execute(select(Outing).filter(Outing.id == outing_id))
@@ -86,7 +91,37 @@ async def check_in_participants(
         message=f"Successfully checked in {len(checkins)} participant(s)",
         checked_in_count=len(checkins),
         participant_ids=[c.participant_id for c in checkins],
-        checked_in_at=checkins[0].checked_in_at if checkins else datetime.now(timezone.utc).replace(tzinfo=None)
+        checked_in_at=checkins[0].checked_in_at if checkins else datetime.now(timezone.utc).replace(tzinfo=None),
+        summary=await checkin_crud.get_checkin_summary(db, outing_id)
+    )
+
+
+@router.post("/{outing_id}/checkin/replay", response_model=CheckInReplayResponse)
+async def replay_checkin_queue(
+    outing_id: UUID,
+    replay: CheckInReplayRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Apply check-ins and undos queued while offline, in one round trip
+    Requires authentication (admin or outing leader)
+
+    Operations are applied in occurred_at order, last writer wins per participant.
+    Each one is reported as applied, stale (a newer change already applies), rejected
+    (not on this outing's roster) or duplicate (its idempotency key was seen before),
+    so a batch can safely be resent. Includes the outing's check-in summary afterwards.
+    """
+    results = await replay_checkin_operations(
+        db,
+        outing_id,
+        replay.operations,
+        checked_in_by=current_user.full_name or current_user.email
+    )
+    return CheckInReplayResponse(
+        results=results,
+        applied_count=sum(1 for r in results if r.status == "applied"),
+        summary=await checkin_crud.get_checkin_summary(db, outing_id)
     )
 
 
@@ -151,41 +186,11 @@ async def export_checkin_data(
             detail="Outing not found"
         )
     
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow([
-        "Participant Name",
-        "Type",
-        "Family",
-        "Patrol",
-        "Troop",
-        "Checked In",
-        "Check-in Time",
-        "Checked In By"
-    ])
-    
-    # Write participant data
-    for participant in summary.participants:
-        writer.writerow([
-            participant.name,
-            participant.member_type,
-            participant.family_name,
-            participant.patrol_name or "",
-            participant.troop_number or "",
-            "Yes" if participant.is_checked_in else "No",
-            participant.checked_in_at.strftime("%Y-%m-%d %H:%M:%S") if participant.checked_in_at else "",
-            participant.checked_in_by or ""
-        ])
-    
     # Prepare response
-    output.seek(0)
     filename = f"checkin_{summary.outing_name.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.csv"
     
     return StreamingResponse(
-        iter([output.getvalue()]),
+        iter([checkin_csv(summary)]),
         media_type="text/csv",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
@@ -7,6 +7,7 @@ from app.core.authentik import get_authentik_client
 from app.core.config import settings
 from app.db.session import get_db
 from app.models.user import User
+from app.services.token_cache import verified_tokens, attach_cached_user
 
 security = HTTPBearer(auto_error=False)
 
@@ -34,6 +35,11 @@ async def get_current_user(
             detail="Not authenticated"
         )
 
+    # Tokens verified recently resolve straight to their user
+    cached_user = verified_tokens.get(token)
+    if cached_user is not None:
+        return await attach_cached_user(db, cached_user)
+
     try:
         authentik = get_authentik_client()
         token_data = await authentik.verify_token(token)
@@ -124,6 +130,7 @@ async def get_current_user(
                 detail="User account is inactive"
             )
 
+        verified_tokens.put(token, user, exp=(token_data.get("claims") or {}).get("exp"))
         return user
 
     except HTTPException:
@@ -5,8 +5,6 @@ from fastapi import APIRouter, Request, Depends, HTTPException, status
 from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-import httpx
-from httpx import AsyncClient
 import uuid
 from uuid import UUID
 from urllib.parse import urlparse, urlunparse
@@ -25,8 +23,8 @@ router = APIRouter()
 
 
 def get_http_client():
-    """Factory for httpx.AsyncClient to allow mocking in tests"""
-    return httpx.AsyncClient()
+    """Shared pooled Authentik HTTP client (async context manager); patched in tests"""
+    return get_authentik_client().http_session()
 
 
 @router.get("/login")
@@ -36,7 +34,7 @@ async def login(request: Request):
     # Fetch discovery document to get authorization endpoint
     async with get_http_client() as client:
         try:
-            resp = await client.get(authentik.openid_config_url, timeout=10)
+            resp = await client.get(authentik.openid_config_url)
             resp.raise_for_status()
             discovery = resp.json()
         except Exception as e:
@@ -106,7 +104,7 @@ async def callback(code: Optional[str] = None, state: Optional[str] = None, requ
     # Get token endpoint from discovery
     async with get_http_client() as client:
         try:
-            resp = await client.get(authentik.openid_config_url, timeout=10)
+            resp = await client.get(authentik.openid_config_url)
             resp.raise_for_status()
             discovery = resp.json()
         except Exception:
@@ -128,7 +126,7 @@ async def callback(code: Optional[str] = None, state: Optional[str] = None, requ
     }
 
     async with get_http_client() as client:
-        token_resp = await client.post(token_endpoint, data=data, timeout=10)
+        token_resp = await client.post(token_endpoint, data=data)
         if token_resp.status_code != 200:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Token exchange failed")
         token_json = token_resp.json()
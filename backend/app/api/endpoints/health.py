@@ -1,9 +1,15 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Depends, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
+from app.api.deps import get_current_admin_user
+from app.core.authentik import get_authentik_client
 from app.db.session import AsyncSessionLocal
 from app.models import User, Outing
+from app.services.change_log_prune import retention_stats
+from app.services.handout_cache import get_handout_cache
+from app.services.pdf_render import render_stats
 import logging
 
 router = APIRouter()
@@ -90,3 +96,23 @@ async def readiness_check():
     ready = db_status == "ok" and tables_present
     status_code = status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
     return JSONResponse(content={"status": "ready" if ready else "not ready"}, status_code=status_code)
+
+
+@router.get("/health/authentik-pool", tags=["health"])
+async def authentik_pool_stats(current_user: User = Depends(get_current_admin_user)):
+    """Usage statistics for the shared Authentik HTTP client (admin only)."""
+    return get_authentik_client().http_pool_stats()
+
+
+@router.get("/health/change-log-retention", tags=["health"])
+async def change_log_retention_stats(current_user: User = Depends(get_current_admin_user)):
+    """Rows and partitions pruned by the change_log retention task (admin only)."""
+    return retention_stats()
+
+
+@router.get("/health/pdf-render", tags=["health"])
+async def pdf_render_stats(current_user: User = Depends(get_current_admin_user)):
+    """Queue and timing statistics for the PDF rendering pool, plus handout cache usage (admin only)."""
+    # Cache stats stat every cached file
+    cache_stats = await run_in_threadpool(get_handout_cache().stats)
+    return {**render_stats(), "handout_cache": cache_stats}
@@ -1,154 +1,206 @@
 """Offline data endpoints for bulk & incremental data synchronization."""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Optional
 from uuid import UUID
 
 from app.db.session import get_db
 from app.api.deps import get_current_user
 from app.models.user import User
-from app.crud import outing as crud_outing
-from app.crud import signup as crud_signup
-from app.schemas.outing import OutingResponse
-from app.schemas.signup import SignupResponse, ParticipantResponse
-from app.schemas.auth import UserResponse
 from app.schemas.change_log import ChangeLogDeltaResponse, ChangeLogEntry
+from app.schemas.offline import OfflineDataResponse
+from app.utils.pagination import encode_cursor, decode_cursor
 from app.models.change_log import ChangeLog
-from app.services.change_log import get_deltas
+from app.services.change_log import (
+    get_compacted_deltas,
+    get_deltas,
+    get_latest_checkpoint,
+    get_seq_for_id,
+    may_be_pruned_after,
+)
+from app.services.change_payloads import load_change_payloads
+from app.services.change_stream import broker, change_event, sse_events
+from app.services.offline_snapshot import (
+    NDJSON_MEDIA_TYPE,
+    accepts_gzip,
+    build_snapshot,
+    etag_matches,
+    gzip_body,
+    gzip_stream,
+    ndjson_records,
+    snapshot_entity_types,
+    snapshot_etag,
+    snapshot_version,
+)
 
 router = APIRouter()
 
 
-@router.get("/data")
+def _snapshot_headers(etag: str, gzipped: bool) -> dict:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept-Encoding, Authorization"}
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+    return headers
+
+
+@router.get("/data", response_model=OfflineDataResponse)
 async def get_bulk_offline_data(
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get all offline data in a single request.
     Returns user info, all outings, and all rosters.
-    This endpoint is optimized for offline sync to reduce request count.
+    This endpoint is optimized for offline sync to reduce request count: the
+    snapshot takes a fixed number of queries however many outings there are.
+
+    Responses carry a strong ETag; send it back in If-None-Match to get an empty
+    304 when nothing changed. Gzip-encoded when the client accepts it.
     """
-    # 1. Get user data for offline admin detection
-    user_data = UserResponse(
-        id=current_user.id,
-        email=current_user.email,
-        full_name=current_user.full_name,
-        role=current_user.role,
-        is_initial_admin=current_user.is_initial_admin,
-        phone=current_user.phone,
-        emergency_contact_name=current_user.emergency_contact_name,
-        emergency_contact_phone=current_user.emergency_contact_phone,
-        youth_protection_expiration=current_user.youth_protection_expiration
-    )
-    
-    # 2. Get all outings
-    outings = await crud_outing.get_outings(db, skip=0, limit=100)
-    outing_responses = [OutingResponse.model_validate(outing) for outing in outings]
-    
-    # 3. Get all rosters (only for admin users)
-    rosters: Dict[str, List[SignupResponse]] = {}
-    
-    if current_user.role == "admin":
-        for outing in outings:
-            signups = await crud_signup.get_outing_signups(db, outing.id)
-            
-            # Convert to response format
-            signup_responses = []
-            for signup in signups:
-                participant_responses = []
-                for participant in signup.participants:
-                    # Get dietary preferences and allergies from family member relationships
-                    dietary_prefs = [dp.preference for dp in participant.family_member.dietary_preferences] if participant.family_member else []
-                    allergies = [a.allergy for a in participant.family_member.allergies] if participant.family_member else []
-                    
-                    participant_responses.append(ParticipantResponse(
-                        id=participant.id,
-                        name=participant.name,
-                        age=participant.age,
-                        participant_type=participant.participant_type,
-                        is_adult=participant.is_adult,
-                        gender=participant.gender,
-                        troop_number=participant.troop_number,
-                        patrol_name=participant.patrol_name,
-                        has_youth_protection=participant.has_youth_protection,
-                        vehicle_capacity=participant.vehicle_capacity,
-                        dietary_restrictions=dietary_prefs,
-                        allergies=allergies,
-                        medical_notes=participant.medical_notes,
-                        created_at=participant.created_at
-                    ))
-                
-                signup_responses.append(SignupResponse(
-                    id=signup.id,
-                    outing_id=signup.outing_id,
-                    family_contact_name=signup.family_contact_name,
-                    family_contact_email=signup.family_contact_email,
-                    family_contact_phone=signup.family_contact_phone,
-                    participants=participant_responses,
-                    participant_count=signup.participant_count,
-                    scout_count=signup.scout_count,
-                    adult_count=signup.adult_count,
-                    created_at=signup.created_at
-                ))
-            
-            rosters[str(outing.id)] = signup_responses
-    
-    return {
-        "user": user_data,
-        "outings": outing_responses,
-        "rosters": rosters,
-        "last_updated": datetime.utcnow().isoformat()
-    }
+    gzipped = accepts_gzip(request.headers.get("accept-encoding"))
+    version = await snapshot_version(db, current_user)
+    etag = snapshot_etag(current_user, version, "json+gzip" if gzipped else "json")
+    headers = _snapshot_headers(etag, gzipped)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        headers.pop("Content-Encoding", None)
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    snapshot = await build_snapshot(db, current_user, version)
+    # Serialize once in pydantic-core rather than re-walking the models through jsonable_encoder
+    body = snapshot.model_dump_json().encode()
+    if gzipped:
+        body = gzip_body(body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/data/stream")
+async def stream_bulk_offline_data(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream the offline snapshot as newline-delimited JSON (application/x-ndjson).
+
+    Same content and ETag / If-None-Match handling as /data, sent as one record per
+    line ("user", "outing", "roster", then "end") so clients can apply records as
+    they arrive on slow connections: each batch of records goes out as soon as its
+    query returns. A stream without the "end" record is incomplete.
+    """
+    gzipped = accepts_gzip(request.headers.get("accept-encoding"))
+    version = await snapshot_version(db, current_user)
+    etag = snapshot_etag(current_user, version, "ndjson+gzip" if gzipped else "ndjson")
+    headers = _snapshot_headers(etag, gzipped)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        headers.pop("Content-Encoding", None)
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    records = ndjson_records(db, current_user, version)
+    if gzipped:
+        records = gzip_stream(records)
+    return StreamingResponse(records, media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+
+async def _legacy_cursor_seq(db: AsyncSession, cursor: str) -> Optional[int]:
+    """Resolve a UUID cursor issued before sequence cursors existed"""
+    try:
+        change_id = UUID(cursor)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return await get_seq_for_id(db, change_id)
+
+
+async def _cursor_seq(db: AsyncSession, cursor: str) -> Optional[int]:
+    """Sequence number a cursor points at; None if its entry no longer exists"""
+    try:
+        return int(decode_cursor(cursor, 1)[0])
+    except ValueError:
+        return await _legacy_cursor_seq(db, cursor)
+
+
+async def _checkpoint_seq(db: AsyncSession, after_seq: int) -> Optional[int]:
+    """Seq of the latest checkpoint if the cursor is older than it"""
+    checkpoint = await get_latest_checkpoint(db)
+    return checkpoint.seq if checkpoint is not None and checkpoint.seq > after_seq else None
+
+
+def _visible_entity_types(current_user: User, entity_types: Optional[str]) -> Optional[set[str]]:
+    """Entity types a caller may see: any requested by an admin, the public ones otherwise"""
+    public_types = snapshot_entity_types(current_user)
+    if public_types is not None:
+        # Non-admin: the public types, as in the offline snapshot
+        return set(public_types)
+    if entity_types:
+        return {t.strip() for t in entity_types.split(',') if t.strip()}
+    return None
 
 
 @router.get("/deltas", response_model=ChangeLogDeltaResponse)
 async def get_change_deltas(
     since: Optional[str] = Query(None, description="ISO8601 timestamp; ignored if cursor provided"),
-    cursor: Optional[str] = Query(None, description="UUID cursor of last item received"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor (next_cursor of the previous page)"),
     limit: int = Query(200, ge=1, le=500, description="Max change log entries"),
     entity_types: Optional[str] = Query(None, description="Comma-separated list of entity types to restrict (admin only)"),
+    include_payloads: bool = Query(False, description="Inline each entity's current state (one query per entity type)"),
+    compact: bool = Query(False, description="Only the latest entry per entity; deletes are kept as tombstones"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Incremental change log entries with keyset pagination & basic permission scoping.
 
     Non-admin users receive only public entity types (outing, place); admin receives all.
+    With include_payloads, each entry carries the entity's current serialized state
+    (null once deleted), so clients need no follow-up request per changed entity.
+
+    With compact, intermediate versions are skipped: catching up costs one entry per
+    entity touched rather than one per write. A cursor older than the retention
+    horizon is always answered compacted, from the latest checkpoint plus the tail
+    after it (the response says so in `compacted`).
     """
-    cursor_uuid: Optional[UUID] = None
-    if cursor:
-        try:
-            cursor_uuid = UUID(cursor)
-        except ValueError:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor UUID")
+    after_seq = await _cursor_seq(db, cursor) if cursor else None
 
     since_dt: Optional[datetime] = None
-    if since and not cursor_uuid:
+    if since and not cursor:
         try:
             since_dt = datetime.fromisoformat(since.replace("Z", ""))
         except ValueError:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid 'since' timestamp format")
-    elif not cursor_uuid:
+    elif not cursor:
         since_dt = datetime.utcnow() - timedelta(hours=24)
 
-    # Determine allowed types
-    requested_types = None
-    if entity_types and current_user.role == "admin":
-        requested_types = {t.strip() for t in entity_types.split(',') if t.strip()}
+    requested_types = _visible_entity_types(current_user, entity_types)
 
-    if current_user.role != "admin":
-        # Non-admin: restrict fixed public list
-        requested_types = {"outing", "place"}
-
-    rows_all = await get_deltas(db, since=since_dt, cursor_id=cursor_uuid, limit=limit + 1, entity_types=requested_types)
+    if cursor and after_seq is None:
+        # Cursor entry no longer exists (pruned); client should resync from a snapshot
+        rows_all = []
+    elif compact:
+        checkpoint_seq = await _checkpoint_seq(db, after_seq) if after_seq is not None else None
+        rows_all = await get_compacted_deltas(
+            db, since=since_dt, after_seq=after_seq, limit=limit + 1,
+            entity_types=requested_types, checkpoint_seq=checkpoint_seq,
+        )
+    else:
+        rows_all = await get_deltas(db, since=since_dt, after_seq=after_seq, limit=limit + 1, entity_types=requested_types)
+        # A gap right after the cursor may mean its rows were pruned
+        if after_seq is not None and (not rows_all or rows_all[0].seq > after_seq + 1):
+            checkpoint_seq = await _checkpoint_seq(db, after_seq)
+            if checkpoint_seq is not None and await may_be_pruned_after(db, after_seq):
+                compact = True
+                rows_all = await get_compacted_deltas(
+                    db, after_seq=after_seq, limit=limit + 1,
+                    entity_types=requested_types, checkpoint_seq=checkpoint_seq,
+                )
 
     has_more = len(rows_all) > limit
     page_rows = rows_all[:limit]
-    next_cursor = str(page_rows[-1].id) if has_more else None
+    next_cursor = encode_cursor(page_rows[-1].seq) if has_more else None
     latest_ts = page_rows[-1].created_at if page_rows else datetime.utcnow()
 
+    payloads = await load_change_payloads(db, page_rows) if include_payloads else {}
     items = [
         ChangeLogEntry(
             id=row.id,
@@ -158,6 +210,7 @@ async def get_change_deltas(
             version=row.version,
             payload_hash=row.payload_hash,
             created_at=row.created_at,
+            payload=payloads.get((row.entity_type, row.entity_id)),
         )
         for row in page_rows
     ]
@@ -167,4 +220,50 @@ async def get_change_deltas(
         has_more=has_more,
         next_cursor=next_cursor,
         latest_timestamp=latest_ts,
+        compacted=compact,
+    )
+
+
+STREAM_REPLAY_LIMIT = 500
+
+
+@router.get("/deltas/stream")
+async def stream_change_deltas(
+    request: Request,
+    entity_types: Optional[str] = Query(None, description="Comma-separated list of entity types to restrict (admin only)"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Live change log entries as Server-Sent Events, scoped like /deltas.
+
+    Each "change" event carries one entry; its id is a /deltas cursor. A reconnect
+    with Last-Event-ID replays what was missed first. A "resync" event (the client
+    fell too far behind, or missed more than can be replayed) carries the cursor to
+    catch up from with /deltas before reconnecting; the stream ends after it.
+    """
+    requested_types = _visible_entity_types(current_user, entity_types)
+    # Subscribe before reading the replay so nothing committed in between is lost
+    subscription = broker.subscribe(requested_types)
+    replay, after_seq = [], None
+    try:
+        last_event_id = request.headers.get("last-event-id")
+        if last_event_id:
+            after_seq = await _cursor_seq(db, last_event_id)
+            rows = []
+            if after_seq is not None:
+                rows = await get_deltas(db, after_seq=after_seq, limit=STREAM_REPLAY_LIMIT + 1, entity_types=requested_types)
+            if after_seq is None or len(rows) > STREAM_REPLAY_LIMIT:
+                subscription.overflowed = True
+            else:
+                replay = [change_event(row) for row in rows]
+        # Don't hold a pooled connection for the life of the stream
+        await db.commit()
+    except BaseException:
+        broker.unsubscribe(subscription)
+        raise
+
+    return StreamingResponse(
+        sse_events(subscription, replay, after_seq),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
@@ -1,36 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
+from datetime import date
+from email.utils import format_datetime
+from typing import Optional
 
 from app.api.deps import get_current_admin_user, get_current_outing_admin_user
 from app.db.session import get_db
 from app.models.user import User
+from app.models.signup import Signup
 from app.schemas.outing import OutingCreate, OutingUpdate, OutingResponse, OutingListResponse, OutingUpdateResponse, OutingUpdateEmailDraft
 from app.utils.outing_email import diff_outing, generate_outing_update_email
 from app.crud import outing as crud_outing
-from app.crud import signup as crud_signup
+from app.services.handout_cache import get_handout_cache, handout_digest, not_modified_since
+from app.services.offline_snapshot import etag_matches
+from app.services.outing_capacity import build_outing_response
+from app.services.signup_roster import build_signup_responses, fetch_roster_rows
+from app.utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter()
 
 
 @router.get("/available", response_model=OutingListResponse)
 async def get_available_outings(
+    cursor: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous page"),
+    limit: int = Query(100, ge=1, le=200),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Get all outings with available spots (public endpoint).
-    No authentication required.
+    Get upcoming outings with available spots (public endpoint).
+    No authentication required. Results are ordered by date and paginated by cursor.
+    `total` is counted for the first page only (null once a cursor is passed).
     """
-    outings = await crud_outing.get_available_outings(db)
-    
-    # Convert to response format with computed fields and allowed_troop_ids
-    outing_responses = []
-    for outing in outings:
-        outing_dict = {k: getattr(outing, k) for k in OutingResponse.model_fields.keys() if hasattr(outing, k)}
-        outing_dict['allowed_troop_ids'] = [troop.id for troop in outing.allowed_troops]
-        outing_responses.append(OutingResponse.model_validate(outing_dict))
-    
-    return OutingListResponse(outings=outing_responses, total=len(outing_responses))
+    after = None
+    if cursor:
+        try:
+            after_date, after_id = decode_cursor(cursor, 2)
+            after = (date.fromisoformat(after_date), UUID(after_id))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+
+    # Fetch one extra row to know whether another page exists
+    outings = await crud_outing.get_available_outings(db, after=after, limit=limit + 1)
+    has_more = len(outings) > limit
+    outings = outings[:limit]
+    if cursor:
+        # Every later page would repeat the same count; clients keep the first page's
+        total = None
+    elif not has_more:
+        total = len(outings)
+    else:
+        total = await crud_outing.get_available_outing_count(db)
+
+    # Convert to response format using the materialized capacity counters
+    outing_responses = [build_outing_response(outing) for outing in outings]
+    next_cursor = encode_cursor(outings[-1].outing_date, outings[-1].id) if has_more else None
+
+    return OutingListResponse(outings=outing_responses, total=total, next_cursor=next_cursor)
 
 
 @router.get("", response_model=OutingListResponse)
@@ -46,12 +77,8 @@ async def get_all_outings(
     outings = await crud_outing.get_outings(db, skip=skip, limit=limit)
     total = await crud_outing.get_outing_count(db)
     
-    # Convert to response format with computed fields and allowed_troop_ids
-    outing_responses = []
-    for outing in outings:
-        outing_dict = {k: getattr(outing, k) for k in OutingResponse.model_fields.keys() if hasattr(outing, k)}
-        outing_dict['allowed_troop_ids'] = [troop.id for troop in outing.allowed_troops]
-        outing_responses.append(OutingResponse.model_validate(outing_dict))
+    # Convert to response format using the materialized capacity counters
+    outing_responses = [build_outing_response(outing) for outing in outings]
     
     return OutingListResponse(outings=outing_responses, total=total)
 
@@ -218,48 +245,9 @@ async def get_outing_signups(
             detail="Outing not found"
         )
     
-    signups = await crud_signup.get_outing_signups(db, outing_id)
-    
-    # Convert to response format
-    from app.schemas.signup import SignupResponse, ParticipantResponse
-    
-    signup_responses = []
-    for signup in signups:
-        participant_responses = []
-        for participant in signup.participants:
-            # Get dietary preferences and allergies from family member relationships
-            dietary_prefs = [dp.preference for dp in participant.family_member.dietary_preferences] if participant.family_member else []
-            allergies = [a.allergy for a in participant.family_member.allergies] if participant.family_member else []
-            
-            participant_responses.append(ParticipantResponse(
-                id=participant.id,
-                name=participant.name,
-                age=participant.age,
-                participant_type=participant.participant_type,
-                is_adult=participant.is_adult,
-                gender=participant.gender,
-                troop_number=participant.troop_number,
-                patrol_name=participant.patrol_name,
-                has_youth_protection=participant.has_youth_protection,
-                vehicle_capacity=participant.vehicle_capacity,
-                dietary_restrictions=dietary_prefs,
-                allergies=allergies,
-                medical_notes=participant.medical_notes,
-                created_at=participant.created_at
-            ))
-        
-        signup_responses.append(SignupResponse(
-            id=signup.id,
-            outing_id=signup.outing_id,
-            family_contact_name=signup.family_contact_name,
-            family_contact_email=signup.family_contact_email,
-            family_contact_phone=signup.family_contact_phone,
-            participants=participant_responses,
-            participant_count=signup.participant_count,
-            scout_count=signup.scout_count,
-            adult_count=signup.adult_count,
-            created_at=signup.created_at
-        ))
+    signup_responses = build_signup_responses(
+        await fetch_roster_rows(db, Signup.outing_id == outing_id)
+    )
     
     from app.schemas.signup import SignupListResponse
     return SignupListResponse(signups=signup_responses, total=len(signup_responses))
@@ -268,14 +256,19 @@ async def get_outing_signups(
 @router.get("/{outing_id}/handout")
 async def get_outing_handout(
     outing_id: UUID,
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
     """
     Generate a PDF handout for the outing (public endpoint).
+    Rendered on the shared PDF pool; 503 with Retry-After when it is saturated.
+
+    Renders are cached by content, so repeat downloads stream the stored file. The
+    ETag is the content hash: If-None-Match (or If-Modified-Since) gets a 304.
     """
-    from fastapi import Response
-    from app.services.pdf_generator import pdf_generator
-    
+    from app.services.pdf_generator import handout_pdf_outing, handout_pdf_packing_lists, pdf_generator
+    from app.services.pdf_render import render_pdf
+
     # Get outing with all details
     db_outing = await crud_outing.get_outing_with_details(db, outing_id)
     if not db_outing:
@@ -283,14 +276,36 @@ async def get_outing_handout(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Outing not found"
         )
-    
-    # Generate PDF
-    pdf_bytes = pdf_generator.generate_outing_handout(db_outing, db_outing.packing_lists)
-    
-    return Response(
-        content=pdf_bytes,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f"attachment; filename=outing_handout_{db_outing.id}.pdf"
-        }
-    )
\ No newline at end of file
+
+    digest = handout_digest(db_outing)
+    headers = {
+        "ETag": f'"{digest}"',
+        "Cache-Control": "public, no-cache",
+        "Content-Disposition": f"attachment; filename=outing_handout_{db_outing.id}.pdf",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    cache = get_handout_cache()
+    cached = await run_in_threadpool(cache.open, db_outing.id, digest)
+    if cached is None:
+        # Generate PDF off the event loop
+        # The render thread gets plain data, never the session's ORM objects
+        pdf_bytes = await render_pdf(
+            pdf_generator.generate_outing_handout,
+            handout_pdf_outing(db_outing),
+            handout_pdf_packing_lists(db_outing.packing_lists),
+        )
+        await run_in_threadpool(cache.store, db_outing.id, digest, pdf_bytes)
+        cached = await run_in_threadpool(cache.open, db_outing.id, digest)
+        if cached is None:
+            # Caching disabled or the file was evicted already
+            return Response(content=pdf_bytes, media_type="application/pdf", headers=headers)
+
+    headers["Last-Modified"] = format_datetime(cached.last_modified, usegmt=True)
+    if not if_none_match and not_modified_since(request.headers.get("if-modified-since"), cached.last_modified):
+        cached.handle.close()
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    headers["Content-Length"] = str(cached.size)
+    return StreamingResponse(cached.chunks(), media_type="application/pdf", headers=headers)
@@ -552,7 +552,7 @@ async def get_preview_suggestions(
     `RequirementSuggestion` and `MeritBadgeSuggestion` types where each
     suggestion includes the full requirement / merit badge object.
     """
-    from app.utils.suggestions import extract_keywords_from_text, calculate_match_score
+    from app.utils.suggestions import extract_keywords_from_text, calculate_match_score, outing_keyword_forms
     from app.schemas.requirement import (
         RequirementSuggestion,
         MeritBadgeSuggestion,
@@ -561,6 +561,7 @@ async def get_preview_suggestions(
     # Extract keywords from provided text
     text = f"{request.name} {request.description or ''}".strip()
     keywords = extract_keywords_from_text(text)
+    outing_forms = outing_keyword_forms(keywords)
 
     # Fetch matching ORM objects
     requirements = await crud_requirement.search_rank_requirements_by_keywords(db, keywords)
@@ -571,7 +572,7 @@ async def get_preview_suggestions(
     for req in requirements:
         req_keywords = req.keywords or []
         # Use prompt-based scoring: requirement_keywords, outing_keywords
-        match_score, matched_keywords = calculate_match_score(req_keywords, keywords)
+        match_score, matched_keywords = calculate_match_score(req_keywords, keywords, outing_forms)
         if match_score < min_score:
             continue
         requirement_suggestions.append(
@@ -589,7 +590,7 @@ async def get_preview_suggestions(
     for badge in merit_badges:
         badge_keywords = badge.keywords or []
         # Use prompt-based scoring: badge_keywords, outing_keywords
-        match_score, matched_keywords = calculate_match_score(badge_keywords, keywords)
+        match_score, matched_keywords = calculate_match_score(badge_keywords, keywords, outing_forms)
         if match_score < min_score:
             continue
         merit_badge_suggestions.append(
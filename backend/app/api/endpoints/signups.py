@@ -1,24 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select
 from uuid import UUID
-from datetime import date
+from datetime import date, datetime
+from typing import Optional
 from pydantic import BaseModel, EmailStr
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
+from app.core.config import settings
 from app.db.session import get_db
 from app.models.user import User
 from app.models.family import FamilyMember
 from app.models.signup import Signup
 from app.models.participant import Participant
-from app.schemas.signup import SignupCreate, SignupUpdate, SignupResponse, ParticipantResponse, SignupListResponse
+from app.models.waitlist import WaitlistEntry
+from app.schemas.signup import (
+    SignupCreate, SignupUpdate, SignupResponse, SignupListResponse,
+    WaitlistEntryResponse, WaitlistListResponse,
+)
 from app.crud import signup as crud_signup
 from app.crud import outing as crud_outing
+from app.crud import family as crud_family
+from app.crud import waitlist as crud_waitlist
 from app.api.deps import get_current_user, get_current_admin_user
 from app.utils.pdf_generator import generate_outing_roster_pdf
+from app.services.pdf_render import render_pdf
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.services.outing_capacity import count_outing_roster
+from app.services.signup_admission import (
+    admit_signup, check_capacity_change, check_waitlist_empty, check_youth_protection,
+)
+from app.services.waitlist import enqueue_signup, process_waitlist
+from app.services.season_export import stream_outing_archive
+from app.services.signup_roster import (
+    build_signup_responses, fetch_roster_rows, roster_pdf_outing, roster_pdf_signups, signup_rows,
+)
 
 router = APIRouter()
 limiter = Limiter(key_func=get_remote_address)
@@ -61,327 +79,67 @@ async def create_signup(
     - If female youth present, at least 1 female adult leader required
     - Adults must have youth protection training for overnight outings
     """
-    # Verify outing exists and has available spots
-    # Fetch outing with minimal eager loads to ensure current FK state
-    from app.models.outing import Outing
-    result_outing = await db.execute(
-        select(Outing)
-        .options(
-            selectinload(Outing.allowed_troops),
-            selectinload(Outing.signups).selectinload(Signup.participants)
-        )
-        .where(Outing.id == signup.outing_id)
-    )
-    db_outing = result_outing.scalar_one_or_none()
+    # Verify outing exists and lock its row so concurrent signups are admitted one at a time;
+    # the lock is held until create_signup commits (or the request rolls back)
+    db_outing = await crud_outing.get_outing_for_update(db, signup.outing_id)
     if not db_outing:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Outing not found"
         )
 
-    # Enforce troop restriction if outing is locked to a troop (legacy single-troop restriction)
-    if db_outing.restricted_troop_id is not None:
-        from app.models.troop import Troop
-        # Strictly validate that the restricted troop ID still exists
-        troop_result = await db.execute(
-            select(Troop).where(Troop.id == db_outing.restricted_troop_id)
-        )
-        restricted_troop = troop_result.scalar_one_or_none()
-        if restricted_troop is None:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Restricted troop not found for outing")
-    
-    # Check allowed troops (new multi-troop restriction)
-    allowed_troop_ids = {troop.id for troop in db_outing.allowed_troops}
-    
-    # Check if signups are closed
-    if db_outing.are_signups_closed:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Signups are closed for this outing"
-        )
-    
-    # Load family members to validate and check capacity
-    family_members = []
-    for family_member_id in signup.family_member_ids:
-        result = await db.execute(
-            select(FamilyMember).where(FamilyMember.id == family_member_id)
-        )
-        family_member = result.scalar_one_or_none()
-        if not family_member:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Family member with ID {family_member_id} not found"
-            )
-        
-        # Security check: Ensure family member belongs to current user
-        if family_member.user_id != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"You do not have permission to sign up family member {family_member.name}"
-            )
-            
-        # Troop restriction validation (legacy single-troop restriction)
-        if db_outing.restricted_troop_id:
-            # Prefer relational troop_id match, fallback to troop_number match
-            if not (
-                (family_member.troop_id and family_member.troop_id == db_outing.restricted_troop_id) or
-                (family_member.troop_number and restricted_troop and family_member.troop_number == restricted_troop.number)
-            ):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=(
-                        f"Family member '{family_member.name}' is not part of restricted troop "
-                        f"{restricted_troop.number if restricted_troop else 'unknown'}."
-                    )
-                )
-        
-        # New multi-troop validation: Check if scout's troop is allowed (only for scouts with troop_id)
-        if family_member.member_type == 'scout' and family_member.troop_id and allowed_troop_ids:
-            if family_member.troop_id not in allowed_troop_ids:
-                # Get troop numbers for error message
-                from app.models.troop import Troop
-                allowed_troops_result = await db.execute(
-                    select(Troop).where(Troop.id.in_(allowed_troop_ids))
-                )
-                allowed_troops = allowed_troops_result.scalars().all()
-                allowed_numbers = ", ".join([t.number for t in allowed_troops])
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Scout '{family_member.name}' cannot sign up for this outing. "
-                           f"This outing is only open to troops: {allowed_numbers}."
-                )
-
-        family_members.append(family_member)
-    
-    # Check if outing has enough spots
-    total_participants = len(family_members)
-    
-    if db_outing.capacity_type == 'vehicle':
-        # Calculate vehicle capacity being added by adults in this signup
-        new_vehicle_capacity = sum(
-            fm.vehicle_capacity if fm.vehicle_capacity else 0
-            for fm in family_members
-            if fm.member_type == 'adult'
-        )
-        
-        # Calculate available spots after adding the new vehicle capacity
-        projected_available_spots = db_outing.available_spots + new_vehicle_capacity - total_participants
-        
-        if projected_available_spots < 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Not enough available spots. Current capacity: {db_outing.total_vehicle_capacity} seats, "
-                       f"current participants: {db_outing.signup_count}. Your signup adds {new_vehicle_capacity} seats "
-                       f"but requires {total_participants} spots, resulting in {abs(projected_available_spots)} over capacity."
-            )
-    else:
-        # Fixed capacity - simple check
-        if db_outing.available_spots < total_participants:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Not enough available spots. Only {db_outing.available_spots} spots remaining."
-            )
-    
-    # Get all existing signups to check total adult count across all signups
-    existing_signups = await crud_signup.get_outing_signups(db, signup.outing_id)
-    
-    # Count adults and youth by gender across all signups (existing + new)
-    total_adults = sum(1 for s in existing_signups for p in s.participants if p.is_adult)
-    total_female_adults = sum(1 for s in existing_signups for p in s.participants if p.is_adult and p.gender == 'female')
-    total_female_youth = sum(1 for s in existing_signups for p in s.participants if not p.is_adult and p.gender == 'female')
-    
-    # Add counts from new signup
-    new_adults = [fm for fm in family_members if fm.member_type == 'adult']
-    new_female_adults = [fm for fm in new_adults if fm.gender == 'female']
-    new_youth = [fm for fm in family_members if fm.member_type == 'scout']
-    new_female_youth = [fm for fm in new_youth if fm.gender == 'female']
-    
-    total_adults += len(new_adults)
-    total_female_adults += len(new_female_adults)
-    total_female_youth += len(new_female_youth)
-    
-    # Collect warnings for Scouting America requirements
-    warnings = []
-    
-    # Scouting America Two-Deep Leadership: Minimum 2 adults required
-    if total_adults < 2:
-        warnings.append(
-            f"⚠️ Scouting America requires at least 2 adults on every outing. Currently {total_adults} adult(s) signed up. "
-            "Please ensure at least 2 adults are registered before the outing."
-        )
-    
-    # Scouting America Gender-Specific Leadership: If female youth present, require female adult leader
-    if total_female_youth > 0 and total_female_adults < 1:
-        warnings.append(
-            "⚠️ Scouting America requires at least one female adult leader when female youth are present. "
-            "Please ensure a female adult is registered before the outing."
-        )
-    
-    # Validate adult youth protection requirements
-    # Youth protection must be valid through the END of the outing
-    outing_end_date = db_outing.end_date if db_outing.end_date else db_outing.outing_date
-    
-    for adult in new_adults:
-        # Check if adult has youth protection training
-        if not adult.has_youth_protection:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Adult '{adult.name}' must have valid SAFE Youth Training (Youth Protection) certificate to sign up for outings. "
-                       "Please complete the training at my.scouting.org before signing up."
-            )
-        
-        # Check if youth protection will be valid through the end of the outing
-        if adult.youth_protection_expiration:
-            if adult.youth_protection_expiration < outing_end_date:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Adult '{adult.name}' has SAFE Youth Training that expires {adult.youth_protection_expiration}, "
-                           f"but must be valid through the outing end date ({outing_end_date}). "
-                           "Please renew the training at my.scouting.org before signing up."
-                )
-    
-    # Additional validation for overnight outings
-    if db_outing.is_overnight:
-        if new_adults:
-            # Check if at least one adult has youth protection training
-            has_trained_adult = any(a.has_youth_protection for a in new_adults)
-            if not has_trained_adult:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="At least one adult must have Scouting America youth protection training for overnight outings"
-                )
-    
-    # Create the signup
-    try:
-        db_signup = await crud_signup.create_signup(db, signup)
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
-    
-    # Convert to response format
-    participant_responses = []
-    for participant in db_signup.participants:
-        # Get dietary restrictions from family member
-        dietary_restrictions = [dp.preference for dp in participant.family_member.dietary_preferences] if participant.family_member else []
-        
-        # Get allergies from family member
-        allergies = [a.allergy for a in participant.family_member.allergies] if participant.family_member else []
-        
-        participant_responses.append(ParticipantResponse(
-            id=participant.id,
-            name=participant.name,
-            age=participant.age,
-            participant_type=participant.participant_type,
-            is_adult=participant.is_adult,
-            gender=participant.gender,
-            troop_number=participant.troop_number,
-            patrol_name=participant.patrol_name,
-            has_youth_protection=participant.has_youth_protection,
-            vehicle_capacity=participant.vehicle_capacity,
-            dietary_restrictions=dietary_restrictions,
-            allergies=allergies,
-            medical_notes=participant.medical_notes,
-            created_at=participant.created_at
-        ))
-    
-    return SignupResponse(
-        id=db_signup.id,
-        outing_id=db_signup.outing_id,
-        family_contact_name=db_signup.family_contact_name,
-        family_contact_email=db_signup.family_contact_email,
-        family_contact_phone=db_signup.family_contact_phone,
-        participants=participant_responses,
-        participant_count=db_signup.participant_count,
-        scout_count=db_signup.scout_count,
-        adult_count=db_signup.adult_count,
-        created_at=db_signup.created_at,
-        warnings=warnings
-    )
+    # Spots freed while families are waiting belong to the head of the waitlist
+    await check_waitlist_empty(db, db_outing)
+    db_signup, warnings = await admit_signup(db, db_outing, signup, current_user)
+    return build_signup_responses(signup_rows(db_signup), warnings)[0]
 
 
 @router.get("", response_model=SignupListResponse)
 async def list_signups(
-    outing_id: UUID = None,
-    skip: int = 0,
-    limit: int = 100,
+    outing_id: Optional[UUID] = None,
+    cursor: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous page"),
+    skip: int = Query(0, ge=0, description="Offset pagination; ignored when cursor is given"),
+    limit: int = Query(100, ge=1, le=500),
+    estimate_total: bool = Query(False, description="Return a fast estimate of the total instead of an exact count"),
     current_user: User = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    List all signups (admin only).
-    Optionally filter by outing_id.
+    List all signups (admin only), newest first.
+    Optionally filter by outing_id. Page with the returned next_cursor.
     """
-    query = select(Signup).options(
-        selectinload(Signup.participants)
-        .selectinload(Participant.family_member)
-        .selectinload(FamilyMember.dietary_preferences)
-    ).options(
-        selectinload(Signup.participants)
-        .selectinload(Participant.family_member)
-        .selectinload(FamilyMember.allergies)
-    ).order_by(Signup.created_at.desc())
-    
-    if outing_id:
-        query = query.where(Signup.outing_id == outing_id)
-        
-    # Get total count
-    count_query = select(func.count()).select_from(Signup)
-    if outing_id:
-        count_query = count_query.where(Signup.outing_id == outing_id)
-    
-    total_result = await db.execute(count_query)
-    total = total_result.scalar_one()
-    
-    # Get paginated results
-    query = query.offset(skip).limit(limit)
-    result = await db.execute(query)
-    signups = result.scalars().all()
-    
-    # Convert to response format
-    signup_responses = []
-    for signup in signups:
-        participant_responses = []
-        for participant in signup.participants:
-            # Get dietary restrictions from family member
-            dietary_restrictions = [dp.preference for dp in participant.family_member.dietary_preferences] if participant.family_member else []
-            
-            # Get allergies from family member
-            allergies = [a.allergy for a in participant.family_member.allergies] if participant.family_member else []
-            
-            participant_responses.append(ParticipantResponse(
-                id=participant.id,
-                name=participant.name,
-                age=participant.age,
-                participant_type=participant.participant_type,
-                is_adult=participant.is_adult,
-                gender=participant.gender,
-                troop_number=participant.troop_number,
-                patrol_name=participant.patrol_name,
-                has_youth_protection=participant.has_youth_protection,
-                vehicle_capacity=participant.vehicle_capacity,
-                dietary_restrictions=dietary_restrictions,
-                allergies=allergies,
-                medical_notes=participant.medical_notes,
-                created_at=participant.created_at
-            ))
-        
-        signup_responses.append(SignupResponse(
-            id=signup.id,
-            outing_id=signup.outing_id,
-            family_contact_name=signup.family_contact_name,
-            family_contact_email=signup.family_contact_email,
-            family_contact_phone=signup.family_contact_phone,
-            participants=participant_responses,
-            participant_count=signup.participant_count,
-            scout_count=signup.scout_count,
-            adult_count=signup.adult_count,
-            created_at=signup.created_at,
-            warnings=[]
-        ))
-    
-    return SignupListResponse(signups=signup_responses, total=total)
+    criteria = [Signup.outing_id == outing_id] if outing_id else []
+    # Only PostgreSQL can estimate; elsewhere the total is always exact
+    total_is_estimate = estimate_total and db.bind.dialect.name == "postgresql"
+    total = await crud_signup.count_signups(db, *criteria, estimated=total_is_estimate)
+
+    page_criteria = list(criteria)
+    if cursor:
+        try:
+            after_created_at, after_id = decode_cursor(cursor, 2)
+            page_criteria.append(
+                crud_signup.signups_after(datetime.fromisoformat(after_created_at), UUID(after_id))
+            )
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        skip = 0
+
+    # Fetch one extra signup to know whether another page exists
+    rows = await fetch_roster_rows(db, *page_criteria, offset=skip, limit=limit + 1)
+    signups = build_signup_responses(rows)
+    has_more = len(signups) > limit
+    signups = signups[:limit]
+    next_cursor = encode_cursor(signups[-1].created_at.isoformat(), signups[-1].id) if has_more else None
+
+    return SignupListResponse(
+        signups=signups,
+        total=total,
+        total_is_estimate=total_is_estimate,
+        next_cursor=next_cursor,
+    )
 
 
 @router.get("/my-signups", response_model=list[SignupResponse])
@@ -393,95 +151,122 @@ async def get_my_signups(
     Get all signups for the current user.
     Returns signups where any participant's family member belongs to the current user.
     """
-    # Get all family members for the current user
-    family_members_result = await db.execute(
-        select(FamilyMember)
+    # Signups with at least one participant from the user's family
+    user_signup_ids = (
+        select(Participant.signup_id)
+        .join(FamilyMember, FamilyMember.id == Participant.family_member_id)
         .where(FamilyMember.user_id == current_user.id)
     )
-    family_members = family_members_result.scalars().all()
-    
-    if not family_members:
-        return []
-    
-    family_member_ids = [fm.id for fm in family_members]
-    
-    # Get all participants that belong to user's family members
-    participants_result = await db.execute(
-        select(Participant)
-        .where(Participant.family_member_id.in_(family_member_ids))
-    )
-    participants = participants_result.scalars().all()
-    
-    if not participants:
-        return []
-    
-    # Get unique signup IDs
-    signup_ids = list(set(p.signup_id for p in participants))
-    
-    # Get all signups with full details
-    signups_result = await db.execute(
-        select(Signup)
-        .options(
-            selectinload(Signup.participants)
-            .selectinload(Participant.family_member)
-            .selectinload(FamilyMember.dietary_preferences)
+    rows = await fetch_roster_rows(db, Signup.id.in_(user_signup_ids))
+    return build_signup_responses(rows)
+
+
+async def _waitlist_entry_response(db: AsyncSession, entry: WaitlistEntry) -> WaitlistEntryResponse:
+    response = WaitlistEntryResponse.model_validate(entry)
+    response.position = await crud_waitlist.get_waitlist_position(db, entry)
+    return response
+
+
+async def _get_owned_waitlist_entry(db: AsyncSession, entry_id: UUID, current_user: User) -> WaitlistEntry:
+    entry = await crud_waitlist.get_waitlist_entry(db, entry_id)
+    if not entry:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Waitlist entry not found"
         )
-        .options(
-            selectinload(Signup.participants)
-            .selectinload(Participant.family_member)
-            .selectinload(FamilyMember.allergies)
+    if current_user.role != "admin" and entry.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only view your own waitlist requests"
         )
-        .options(
-            selectinload(Signup.outing)
+    return entry
+
+
+@router.post("/waitlist", response_model=WaitlistEntryResponse, status_code=status.HTTP_202_ACCEPTED)
+@limit_decorator("5/minute")
+async def join_waitlist(
+    request: Request,
+    signup: SignupCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Queue a signup request for an outing.
+    Rate limit: 5 requests per minute per IP.
+
+    The request is validated (everything except capacity) and accepted immediately.
+    Requests are admitted in the order they were received as spots open; the
+    response reports whether this one was admitted straight away or its place in line.
+    """
+    db_outing = await crud_outing.get_outing_for_update(db, signup.outing_id)
+    if not db_outing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Outing not found"
         )
-        .where(Signup.id.in_(signup_ids))
-        .order_by(Signup.created_at.desc())
-    )
-    signups = signups_result.scalars().all()
-    
-    # Convert to response format
-    response_list = []
-    for signup in signups:
-        participant_responses = []
-        for participant in signup.participants:
-            # Get dietary restrictions from family member
-            dietary_restrictions = [dp.preference for dp in participant.family_member.dietary_preferences] if participant.family_member else []
-            
-            # Get allergies from family member
-            allergies = [a.allergy for a in participant.family_member.allergies] if participant.family_member else []
-            
-            participant_responses.append(ParticipantResponse(
-                id=participant.id,
-                name=participant.name,
-                age=participant.age,
-                participant_type=participant.participant_type,
-                is_adult=participant.is_adult,
-                gender=participant.gender,
-                troop_number=participant.troop_number,
-                patrol_name=participant.patrol_name,
-                has_youth_protection=participant.has_youth_protection,
-                vehicle_capacity=participant.vehicle_capacity,
-                dietary_restrictions=dietary_restrictions,
-                allergies=allergies,
-                medical_notes=participant.medical_notes,
-                created_at=participant.created_at
-            ))
-        
-        response_list.append(SignupResponse(
-            id=signup.id,
-            outing_id=signup.outing_id,
-            family_contact_name=signup.family_contact_name,
-            family_contact_email=signup.family_contact_email,
-            family_contact_phone=signup.family_contact_phone,
-            participants=participant_responses,
-            participant_count=signup.participant_count,
-            scout_count=signup.scout_count,
-            adult_count=signup.adult_count,
-            created_at=signup.created_at,
-            warnings=[]
-        ))
-    
-    return response_list
+
+    entry = await enqueue_signup(db, db_outing, signup, current_user)
+    await process_waitlist(db, signup.outing_id)
+    entry = await crud_waitlist.get_waitlist_entry(db, entry.id)
+    return await _waitlist_entry_response(db, entry)
+
+
+@router.get("/my-waitlist", response_model=WaitlistListResponse)
+async def get_my_waitlist(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the current user's waitlist requests, newest first."""
+    entries = await crud_waitlist.get_user_waitlist_entries(db, current_user.id)
+    responses = [await _waitlist_entry_response(db, entry) for entry in entries]
+    return WaitlistListResponse(entries=responses, total=len(responses))
+
+
+@router.get("/waitlist/{entry_id}", response_model=WaitlistEntryResponse)
+async def get_waitlist_entry(
+    entry_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a waitlist request's status and queue position (owner or admin)."""
+    entry = await _get_owned_waitlist_entry(db, entry_id, current_user)
+    return await _waitlist_entry_response(db, entry)
+
+
+@router.delete("/waitlist/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def leave_waitlist(
+    entry_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Withdraw a waiting request (owner or admin)."""
+    entry = await _get_owned_waitlist_entry(db, entry_id, current_user)
+    if entry.status != crud_waitlist.WAITING:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Waitlist request is already {entry.status}"
+        )
+    outing_id = entry.outing_id
+    await crud_waitlist.cancel_waitlist_entry(db, entry)
+    # A smaller request behind this one may fit now
+    await process_waitlist(db, outing_id)
+    return None
+
+
+@router.get("/outings/{outing_id}/waitlist", response_model=WaitlistListResponse)
+async def get_outing_waitlist(
+    outing_id: UUID,
+    current_user: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the waiting requests for an outing in admission order (admin only)."""
+    entries = await crud_waitlist.get_outing_waitlist(db, outing_id)
+    responses = []
+    for position, entry in enumerate(entries, start=1):
+        response = WaitlistEntryResponse.model_validate(entry)
+        response.position = position
+        responses.append(response)
+    return WaitlistListResponse(entries=responses, total=len(responses))
 
 
 @router.put("/{signup_id}", response_model=SignupResponse)
@@ -534,22 +319,21 @@ async def update_signup(
             )
     
     # If updating participants, validate capacity and requirements
+    new_family_members = None
     if signup_update.family_member_ids is not None:
-        # Get the outing
-        db_outing = await crud_outing.get_outing(db, db_signup.outing_id)
+        # Get and lock the outing so the capacity check cannot race other signups
+        db_outing = await crud_outing.get_outing_for_update(db, db_signup.outing_id)
         if not db_outing:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Outing not found"
             )
         
-        # Load new family members
+        # Load new family members in one IN query, shared with the participant insert
+        members_by_id = await crud_family.get_family_members_by_ids(db, signup_update.family_member_ids)
         new_family_members = []
         for family_member_id in signup_update.family_member_ids:
-            result = await db.execute(
-                select(FamilyMember).where(FamilyMember.id == family_member_id)
-            )
-            family_member = result.scalar_one_or_none()
+            family_member = members_by_id.get(family_member_id)
             if not family_member:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -557,63 +341,17 @@ async def update_signup(
                 )
             new_family_members.append(family_member)
         
-        # Calculate capacity changes
-        old_participant_count = len(db_signup.participants)
-        new_participant_count = len(new_family_members)
-        participant_delta = new_participant_count - old_participant_count
-        
-        if db_outing.capacity_type == 'vehicle':
-            # Calculate old and new vehicle capacity
-            old_vehicle_capacity = sum(
-                p.vehicle_capacity if p.vehicle_capacity else 0
-                for p in db_signup.participants
-                if p.is_adult
-            )
-            new_vehicle_capacity = sum(
-                fm.vehicle_capacity if fm.vehicle_capacity else 0
-                for fm in new_family_members
-                if fm.member_type == 'adult'
-            )
-            vehicle_capacity_delta = new_vehicle_capacity - old_vehicle_capacity
-            
-            # Check if update would exceed capacity
-            projected_available_spots = db_outing.available_spots + vehicle_capacity_delta - participant_delta
-            
-            if projected_available_spots < 0:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Not enough available spots. Update would result in {abs(projected_available_spots)} over capacity."
-                )
-        else:
-            # Fixed capacity
-            if db_outing.available_spots < participant_delta:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Not enough available spots. Only {db_outing.available_spots} spots remaining."
-                )
-        
-        # Validate adult youth protection requirements
-        # Youth protection must be valid through the END of the outing
-        outing_end_date = db_outing.end_date if db_outing.end_date else db_outing.outing_date
-        new_adults = [fm for fm in new_family_members if fm.member_type == 'adult']
-        
-        for adult in new_adults:
-            if not adult.has_youth_protection:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Adult '{adult.name}' must have valid SAFE Youth Training certificate."
-                )
-            
-            if adult.youth_protection_expiration and adult.youth_protection_expiration < outing_end_date:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Adult '{adult.name}' has SAFE Youth Training that expires {adult.youth_protection_expiration}, "
-                           f"but must be valid through the outing end date ({outing_end_date})."
-                )
+        # Check capacity against roster counts read under the lock
+        counters = await count_outing_roster(db, db_outing.id)
+        old_family_members = [p.family_member for p in db_signup.participants]
+        check_capacity_change(db_outing, counters, old_family_members, new_family_members)
+        check_youth_protection(db_outing, new_family_members)
     
     # Update the signup
     try:
-        updated_signup = await crud_signup.update_signup(db, signup_id, signup_update)
+        updated_signup = await crud_signup.update_signup(
+            db, signup_id, signup_update, family_members=new_family_members
+        )
         if not updated_signup:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -625,42 +363,11 @@ async def update_signup(
             detail=str(e)
         )
     
-    # Convert to response format
-    participant_responses = []
-    for participant in updated_signup.participants:
-        dietary_restrictions = [dp.preference for dp in participant.family_member.dietary_preferences] if participant.family_member else []
-        allergies = [a.allergy for a in participant.family_member.allergies] if participant.family_member else []
-        
-        participant_responses.append(ParticipantResponse(
-            id=participant.id,
-            name=participant.name,
-            age=participant.age,
-            participant_type=participant.participant_type,
-            is_adult=participant.is_adult,
-            gender=participant.gender,
-            troop_number=participant.troop_number,
-            patrol_name=participant.patrol_name,
-            has_youth_protection=participant.has_youth_protection,
-            vehicle_capacity=participant.vehicle_capacity,
-            dietary_restrictions=dietary_restrictions,
-            allergies=allergies,
-            medical_notes=participant.medical_notes,
-            created_at=participant.created_at
-        ))
-    
-    return SignupResponse(
-        id=updated_signup.id,
-        outing_id=updated_signup.outing_id,
-        family_contact_name=updated_signup.family_contact_name,
-        family_contact_email=updated_signup.family_contact_email,
-        family_contact_phone=updated_signup.family_contact_phone,
-        participants=participant_responses,
-        participant_count=updated_signup.participant_count,
-        scout_count=updated_signup.scout_count,
-        adult_count=updated_signup.adult_count,
-        created_at=updated_signup.created_at,
-        warnings=[]
-    )
+    response = build_signup_responses(signup_rows(updated_signup))[0]
+    if new_family_members is not None:
+        # Fewer participants (or more seats) may make room for waitlisted families
+        await process_waitlist(db, updated_signup.outing_id)
+    return response
 
 
 @router.get("/{signup_id}", response_model=SignupResponse)
@@ -673,8 +380,8 @@ async def get_signup(
     Get a specific signup by ID.
     Users can view their own signups. Admins can view any signup.
     """
-    db_signup = await crud_signup.get_signup(db, signup_id)
-    if not db_signup:
+    rows = await fetch_roster_rows(db, Signup.id == signup_id)
+    if not rows:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Signup not found"
@@ -682,76 +389,15 @@ async def get_signup(
     
     # Check ownership unless user is admin
     if current_user.role != "admin":
-        # Get all participants for this signup
-        participants_result = await db.execute(
-            select(Participant)
-            .where(Participant.signup_id == signup_id)
-        )
-        participants = participants_result.scalars().all()
-        
-        if not participants:
-            # Even if empty, we shouldn't show it to non-admins if they don't own it
-            # But since we can't check ownership easily without participants, 
-            # we'll block access to empty signups for non-admins to be safe
+        # Check if any participant's family member belongs to current user;
+        # signups without participants have no owner, so non-admins are refused
+        if not any(row["family_member_user_id"] == current_user.id for row in rows):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You do not have permission to view this signup"
             )
-        
-        # Check if any participant's family member belongs to current user
-        family_member_ids = [p.family_member_id for p in participants]
-        family_members_result = await db.execute(
-            select(FamilyMember)
-            .where(FamilyMember.id.in_(family_member_ids))
-            .where(FamilyMember.user_id == current_user.id)
-        )
-        user_family_members = family_members_result.scalars().all()
-        
-        if not user_family_members:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You do not have permission to view this signup"
-            )
-    
-    # Convert to response format
-    participant_responses = []
-    for participant in db_signup.participants:
-        # Get dietary restrictions from family member
-        dietary_restrictions = [dp.preference for dp in participant.family_member.dietary_preferences] if participant.family_member else []
-        
-        # Get allergies from family member
-        allergies = [a.allergy for a in participant.family_member.allergies] if participant.family_member else []
-        
-        participant_responses.append(ParticipantResponse(
-            id=participant.id,
-            name=participant.name,
-            age=participant.age,
-            participant_type=participant.participant_type,
-            is_adult=participant.is_adult,
-            gender=participant.gender,
-            troop_number=participant.troop_number,
-            patrol_name=participant.patrol_name,
-            has_youth_protection=participant.has_youth_protection,
-            vehicle_capacity=participant.vehicle_capacity,
-            dietary_restrictions=dietary_restrictions,
-            allergies=allergies,
-            medical_notes=participant.medical_notes,
-            created_at=participant.created_at
-        ))
     
-    return SignupResponse(
-        id=db_signup.id,
-        outing_id=db_signup.outing_id,
-        family_contact_name=db_signup.family_contact_name,
-        family_contact_email=db_signup.family_contact_email,
-        family_contact_phone=db_signup.family_contact_phone,
-        participants=participant_responses,
-        participant_count=db_signup.participant_count,
-        scout_count=db_signup.scout_count,
-        adult_count=db_signup.adult_count,
-        created_at=db_signup.created_at,
-        warnings=[]  # No warnings for get endpoint
-    )
+    return build_signup_responses(rows)[0]
 
 
 @router.delete("/{signup_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -808,16 +454,65 @@ async def cancel_signup(
             )
     
     # Delete the signup
+    outing_id = signup.outing_id
     success = await crud_signup.delete_signup(db, signup_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete signup"
         )
+
+    # Promote waitlisted families into the freed spots
+    await process_waitlist(db, outing_id)
     
     return None
 
 
+@router.get("/outings/export")
+async def export_outings_archive(
+    start_date: Optional[date] = Query(None, description="First outing date to include"),
+    end_date: Optional[date] = Query(None, description="Last outing date to include"),
+    troop_id: Optional[UUID] = Query(None, description="Only outings open to or attended by this troop"),
+    current_user: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Export roster PDFs and check-in CSVs for many outings as one ZIP (admin only).
+    The archive is streamed while it is built, one folder per outing.
+    """
+    if start_date is None and end_date is None and troop_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Give a date range or a troop to export"
+        )
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must not be after end_date"
+        )
+
+    max_outings = settings.SEASON_EXPORT_MAX_OUTINGS
+    outings = await crud_outing.get_outings_for_export(db, start_date, end_date, troop_id, limit=max_outings + 1)
+    if not outings:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No outings match the filters"
+        )
+    if len(outings) > max_outings:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"More than {max_outings} outings match; narrow the filters"
+        )
+
+    first, last = outings[0].outing_date, outings[-1].outing_date
+    filename = f"rosters_{first.strftime('%Y%m%d')}-{last.strftime('%Y%m%d')}.zip"
+    return StreamingResponse(
+        stream_outing_archive(db, outings),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
 @router.get("/outings/{outing_id}/export-pdf")
 async def export_outing_roster_pdf(
     outing_id: UUID,
@@ -837,50 +532,10 @@ async def export_outing_roster_pdf(
         )
     
     # Get all signups
-    signups = await crud_signup.get_outing_signups(db, outing_id)
-    
-    # Prepare outing data
-    outing_data = {
-        'name': db_outing.name,
-        'outing_date': db_outing.outing_date.isoformat(),
-        'end_date': db_outing.end_date.isoformat() if db_outing.end_date else None,
-        'location': db_outing.location,
-        'description': db_outing.description,
-        'outing_lead_name': db_outing.outing_lead_name,
-        'outing_lead_email': db_outing.outing_lead_email,
-        'outing_lead_phone': db_outing.outing_lead_phone
-    }
-    
-    # Prepare signups data
-    signups_data = []
-    for signup in signups:
-        participants_data = []
-        for participant in signup.participants:
-            # Get dietary preferences and allergies from family member
-            dietary_prefs = [dp.preference for dp in participant.family_member.dietary_preferences] if participant.family_member else []
-            allergies = [a.allergy for a in participant.family_member.allergies] if participant.family_member else []
-            
-            participants_data.append({
-                'name': participant.name,
-                'age': participant.age,
-                'participant_type': participant.participant_type,
-                'gender': participant.gender,
-                'troop_number': participant.troop_number,
-                'patrol_name': participant.patrol_name,
-                'has_youth_protection': participant.has_youth_protection,
-                'vehicle_capacity': participant.vehicle_capacity,
-                'dietary_preferences': dietary_prefs,
-                'allergies': allergies
-            })
-        
-        signups_data.append({
-            'family_contact_name': signup.family_contact_name,
-            'family_contact_phone': signup.family_contact_phone,
-            'participants': participants_data
-        })
+    signups = build_signup_responses(await fetch_roster_rows(db, Signup.outing_id == outing_id))
     
-    # Generate PDF
-    pdf_buffer = generate_outing_roster_pdf(outing_data, signups_data)
+    # Generate PDF off the event loop
+    pdf_buffer = await render_pdf(generate_outing_roster_pdf, roster_pdf_outing(db_outing), roster_pdf_signups(signups))
     
     # Return as downloadable file
     return StreamingResponse(
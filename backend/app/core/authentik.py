@@ -2,12 +2,15 @@
 Authentik authentication integration for the backend.
 This module provides JWT verification for tokens issued by Authentik via OIDC.
 """
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator
+from contextlib import asynccontextmanager
 from fastapi import HTTPException, status
 import jwt
-from jwt import PyJWKClient
+from jwt import PyJWK, PyJWKSet
+import asyncio
 import httpx
 import logging
+import time
 
 from app.core.config import settings
 
@@ -24,6 +27,12 @@ def _parse_display_name(display_name: Optional[str]) -> tuple[Optional[str], Opt
     return first_name, last_name
 
 
+def _log_failed_prefetch(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        e = task.exception()
+        logger.warning(f"Initial JWKS fetch failed, will retry in background: {type(e).__name__} {e}")
+
+
 class AuthentikConfigurationError(Exception):
     """Raised when Authentik is not properly configured."""
     pass
@@ -36,31 +45,199 @@ class AuthentikClient:
         self.authentik_url = settings.AUTHENTIK_URL
         self.client_id = settings.AUTHENTIK_CLIENT_ID
         self.client_secret = settings.AUTHENTIK_CLIENT_SECRET
-        self._jwks_client: Optional[PyJWKClient] = None
         self._openid_config: Optional[Dict[str, Any]] = None
+        self._openid_config_lock = asyncio.Lock()
+
+        # Signing keys by kid, refreshed off the request path
+        self._signing_keys: Dict[str, PyJWK] = {}
+        self._keys_attempted_at: Optional[float] = None
+        self._key_refresh: Optional[asyncio.Task] = None
+        self._key_refresh_loop: Optional[asyncio.Task] = None
+
+        # Application-lifetime pooled HTTP client (see start_http_client)
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._http_requests = 0
+        self._http_sessions_active = 0
+        self._http_sessions_max_active = 0
         
         # Validate configuration on initialization
         self._validate_configuration()
 
+    def _new_http_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.AUTHENTIK_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.AUTHENTIK_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.AUTHENTIK_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(
+                settings.AUTHENTIK_HTTP_TIMEOUT_SECONDS,
+                connect=settings.AUTHENTIK_HTTP_CONNECT_TIMEOUT_SECONDS,
+            ),
+            event_hooks={"request": [self._count_request]},
+        )
+
+    async def _count_request(self, request: httpx.Request) -> None:
+        self._http_requests += 1
+
+    async def start_http_client(self) -> None:
+        """Open the shared, keep-alive HTTP client. Called at application startup."""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = self._new_http_client()
+
+    async def close_http_client(self) -> None:
+        """Close the shared HTTP client and its pooled connections at shutdown."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    @asynccontextmanager
+    async def http_session(self) -> AsyncIterator[httpx.AsyncClient]:
+        """
+        Yield the shared pooled client for a request to Authentik. Outside the
+        application lifespan (scripts, tests) a one-off client is used instead.
+        """
+        self._http_sessions_active += 1
+        self._http_sessions_max_active = max(self._http_sessions_max_active, self._http_sessions_active)
+        try:
+            if self._http_client is not None and not self._http_client.is_closed:
+                yield self._http_client
+            else:
+                async with self._new_http_client() as client:
+                    yield client
+        finally:
+            self._http_sessions_active -= 1
+
+    def http_pool_stats(self) -> Dict[str, Any]:
+        """
+        HTTP client statistics for monitoring. Only counters kept here are
+        reported; httpx has no public view of its connection pool.
+        """
+        return {
+            "open": self._http_client is not None and not self._http_client.is_closed,
+            "requests": self._http_requests,
+            "active_sessions": self._http_sessions_active,
+            "max_active_sessions": self._http_sessions_max_active,
+            "max_connections": settings.AUTHENTIK_HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.AUTHENTIK_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        }
+
+    async def _fetch_json(self, url: str) -> Dict[str, Any]:
+        async with self.http_session() as client:
+            resp = await client.get(url)
+            resp.raise_for_status()
+            return resp.json()
+
     async def get_openid_config(self) -> Dict[str, Any]:
         """
-        Fetch and cache the OpenID Connect discovery document for the
-        configured application (trailhead).
+        Return the OpenID Connect discovery document for the configured
+        application (trailhead).
+
+        Served from memory once fetched; the background key refresh keeps it
+        current. Concurrent callers on a cold cache share a single fetch.
         """
         if self._openid_config is not None:
             return self._openid_config
 
-        url = f"{self.authentik_url}/application/o/trailhead/.well-known/openid-configuration"
+        async with self._openid_config_lock:
+            if self._openid_config is None:
+                url = self.openid_config_url
+                try:
+                    self._openid_config = await self._fetch_json(url)
+                except Exception as e:
+                    logger.error(f"Failed to fetch OpenID configuration from {url}: {type(e).__name__} {e}")
+                    raise
+
+        return self._openid_config
+
+    async def _fetch_signing_keys(self) -> None:
+        """Fetch discovery and JWKS and swap them in; keeps the old keys on failure."""
+        self._keys_attempted_at = time.monotonic()
         try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(url, timeout=10)
-                resp.raise_for_status()
-                self._openid_config = resp.json()
+            self._openid_config = await self._fetch_json(self.openid_config_url)
         except Exception as e:
-            logger.error(f"Failed to fetch OpenID configuration from {url}: {type(e).__name__} {e}")
-            raise
+            logger.warning(f"Failed to refresh OpenID configuration: {type(e).__name__} {e}")
+
+        jwks = await self._fetch_json(self.jwks_url)
+        keys = {
+            key.key_id: key
+            for key in PyJWKSet.from_dict(jwks).keys
+            if key.key_id
+        }
+        self._signing_keys = keys
+        logger.info(f"Loaded {len(keys)} Authentik signing key(s)")
+
+    async def refresh_signing_keys(self) -> None:
+        """
+        Refresh the signing keys. Concurrent callers wait on the same
+        in-flight fetch rather than each hitting Authentik.
+        """
+        if self._key_refresh is None or self._key_refresh.done():
+            self._key_refresh = asyncio.create_task(self._fetch_signing_keys())
+        await asyncio.shield(self._key_refresh)
+
+    async def _refresh_signing_keys_periodically(self) -> None:
+        interval = settings.AUTHENTIK_JWKS_REFRESH_SECONDS
+        retry = min(interval, settings.AUTHENTIK_JWKS_MIN_REFETCH_SECONDS)
+        while True:
+            await asyncio.sleep(interval if self._signing_keys else retry)
+            try:
+                await self.refresh_signing_keys()
+            except Exception as e:
+                logger.warning(f"Background JWKS refresh failed: {type(e).__name__} {e}")
 
-        return self._openid_config
+    async def start_key_refresh(self) -> None:
+        """
+        Start prefetching discovery and signing keys, and the background refresh.
+        Called at application startup; returns without waiting for Authentik.
+        Requests arriving before the prefetch finishes wait on it (see
+        get_signing_key), and a failed prefetch is retried in the background.
+        """
+        if self._key_refresh is None or self._key_refresh.done():
+            self._key_refresh = asyncio.create_task(self._fetch_signing_keys())
+            self._key_refresh.add_done_callback(_log_failed_prefetch)
+        if self._key_refresh_loop is None or self._key_refresh_loop.done():
+            self._key_refresh_loop = asyncio.create_task(self._refresh_signing_keys_periodically())
+
+    async def stop_key_refresh(self) -> None:
+        """Cancel the background refresh at application shutdown."""
+        for task in (self._key_refresh_loop, self._key_refresh):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._key_refresh_loop = None
+        self._key_refresh = None
+
+    async def get_signing_key(self, token: str) -> PyJWK:
+        """
+        Look up the key that signed a token by its kid.
+
+        Keys come from memory. An unknown kid (key rotation, or a cold cache
+        after a failed prefetch) triggers one shared refetch, rate limited by
+        AUTHENTIK_JWKS_MIN_REFETCH_SECONDS so bad tokens cannot hammer Authentik.
+        """
+        kid = jwt.get_unverified_header(token).get("kid")
+        if not kid:
+            raise jwt.InvalidTokenError("Token header has no kid")
+
+        key = self._signing_keys.get(kid)
+        if key is not None:
+            return key
+
+        recently_attempted = (
+            self._keys_attempted_at is not None
+            and time.monotonic() - self._keys_attempted_at < settings.AUTHENTIK_JWKS_MIN_REFETCH_SECONDS
+        )
+        in_flight = self._key_refresh is not None and not self._key_refresh.done()
+        if in_flight or not recently_attempted:
+            await self.refresh_signing_keys()
+            key = self._signing_keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key: {kid}")
+        return key
 
     def _validate_configuration(self) -> None:
         """Validate Authentik configuration at startup."""
@@ -93,13 +270,6 @@ class AuthentikClient:
         """Get the userinfo endpoint URL"""
         return f"{self.authentik_url}/application/o/userinfo/"
 
-    @property
-    def jwks_client(self) -> PyJWKClient:
-        """Get or create JWKS client"""
-        if self._jwks_client is None:
-            self._jwks_client = PyJWKClient(self.jwks_url)
-        return self._jwks_client
-
     async def verify_token(self, token: str) -> Dict[str, Any]:
         """
         Verify an Authentik OIDC access token and return the claims.
@@ -139,7 +309,7 @@ class AuthentikClient:
                 )
             else:
                 # Asymmetric signing (JWKS)
-                signing_key = self.jwks_client.get_signing_key_from_jwt(token)
+                signing_key = await self.get_signing_key(token)
                 payload = jwt.decode(
                     token,
                     signing_key.key,
@@ -187,11 +357,10 @@ class AuthentikClient:
             Dict containing user information
         """
         try:
-            async with httpx.AsyncClient() as client:
+            async with self.http_session() as client:
                 response = await client.get(
                     self.userinfo_url,
                     headers={"Authorization": f"Bearer {token}"},
-                    timeout=10,
                 )
 
                 if response.status_code == 200:
@@ -223,7 +392,7 @@ class AuthentikClient:
 
                 # Use client credentials via post (client_secret_post) per discovery
                 introspect_data = {"token": token, "token_type_hint": "access_token", "client_id": self.client_id, "client_secret": self.client_secret}
-                introspect_resp = await client.post(introspect_url, data=introspect_data, timeout=10)
+                introspect_resp = await client.post(introspect_url, data=introspect_data)
                 if introspect_resp.status_code != 200:
                     logger.error(f"Introspection failed: {introspect_resp.status_code}")
                     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found in Authentik")
@@ -25,6 +25,9 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Verified-token cache in front of get_current_user (0 entries disables it)
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_TOKEN_CACHE_TTL_SECONDS: int = 300
     
     # Initial Admin User
     # When a user with this email signs in, they will automatically be granted admin role
@@ -35,6 +38,34 @@ class Settings(BaseSettings):
     AUTHENTIK_CLIENT_ID: str = ""
     AUTHENTIK_CLIENT_SECRET: str = ""
     AUTHENTIK_EXTERNAL_URL: Optional[str] = "http://localhost:9000"
+    # Signing keys and discovery are refreshed in the background on this interval
+    AUTHENTIK_JWKS_REFRESH_SECONDS: int = 3600
+    # Minimum gap between key refetches triggered by tokens with an unknown kid
+    AUTHENTIK_JWKS_MIN_REFETCH_SECONDS: int = 30
+    # Shared connection pool for all HTTP traffic to Authentik
+    AUTHENTIK_HTTP_MAX_CONNECTIONS: int = 20
+    AUTHENTIK_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    AUTHENTIK_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    AUTHENTIK_HTTP_TIMEOUT_SECONDS: float = 10.0
+    AUTHENTIK_HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+
+    # change_log retention in days (background task). Off by default: once it is on, clients
+    # with cursors older than the retention period resync from a checkpoint
+    CHANGE_LOG_RETENTION_DAYS: int = 0
+    CHANGE_LOG_PRUNE_INTERVAL_SECONDS: int = 3600
+    # Unpartitioned fallback: rows per DELETE transaction, and batches per run
+    CHANGE_LOG_PRUNE_BATCH_SIZE: int = 5000
+    CHANGE_LOG_PRUNE_MAX_BATCHES: int = 200
+
+    # PDF rendering pool: concurrent renders, renders allowed to wait, and how long a request waits
+    PDF_RENDER_WORKERS: int = 2
+    PDF_RENDER_QUEUE_DEPTH: int = 8
+    PDF_RENDER_TIMEOUT_SECONDS: float = 30.0
+    # Rendered handout cache (defaults to a directory under the system temp dir; 0 bytes disables it)
+    PDF_CACHE_DIR: Optional[str] = None
+    PDF_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    # Bulk roster export: most outings in one ZIP
+    SEASON_EXPORT_MAX_OUTINGS: int = 200
     
     # Frontend URL
     FRONTEND_URL: str = "http://localhost:3000"
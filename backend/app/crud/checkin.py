@@ -1,12 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import and_, select, delete
+from sqlalchemy import and_, func, select, delete
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import selectinload, joinedload
-from typing import List, Optional
-from uuid import UUID
+from typing import Dict, Iterable, List, Optional, Set
+from uuid import UUID, uuid4
 from datetime import datetime
 from app.utils.timezone import utc_now
 
-from app.models.checkin import CheckIn
+from app.models.checkin import CheckIn, CheckInOperation
 from app.models.participant import Participant
 from app.models.signup import Signup
 from app.models.outing import Outing
@@ -79,6 +80,20 @@ async def get_checkin_summary(db: AsyncSession, outing_id: UUID) -> Optional[Che
     )
 
 
+async def get_participant_signup_ids(
+    db: AsyncSession, outing_id: UUID, participant_ids: Iterable[UUID]
+) -> Dict[UUID, UUID]:
+    """
+    Map participant id -> signup id for those of the given participants signed up for the outing
+    """
+    result = await db.execute(
+        select(Participant.id, Participant.signup_id)
+        .join(Signup, Signup.id == Participant.signup_id)
+        .where(Signup.outing_id == outing_id, Participant.id.in_(list(participant_ids)))
+    )
+    return dict(result.all())
+
+
 async def create_checkins(
     db: AsyncSession,
     outing_id: UUID,
@@ -88,48 +103,40 @@ async def create_checkins(
     """
     Create check-in records for multiple participants
     Returns list of created check-in records
+
+    One query validates every id (unknown participants and participants of other
+    outings are skipped) and one multi-row INSERT ... ON CONFLICT DO NOTHING writes
+    them, so repeating a check-in (e.g. a retry on a flaky connection) is a no-op.
     """
-    checkins = []
+    requested = list(dict.fromkeys(participant_ids))
+    signup_ids = await get_participant_signup_ids(db, outing_id, requested)
+    valid_ids = [participant_id for participant_id in requested if participant_id in signup_ids]
+    if not valid_ids:
+        return []
+
     checked_in_at = utc_now()
-    
-    for participant_id in participant_ids:
-        # Get participant to find signup_id
-        result = await db.execute(select(Participant).filter(Participant.id == participant_id))
-        participant = result.scalars().first()
-        if not participant:
-            continue
-        
-        # Check if already checked in
-        result = await db.execute(
-            select(CheckIn).filter(
-                and_(
-                    CheckIn.outing_id == outing_id,
-                    CheckIn.participant_id == participant_id
-                )
-            )
-        )
-        existing = result.scalars().first()
-        
-        if existing:
-            # Already checked in, skip
-            continue
-        
-        # Create new check-in
-        checkin = CheckIn(
-            outing_id=outing_id,
-            signup_id=participant.signup_id,
-            participant_id=participant_id,
-            checked_in_by=checked_in_by,
-            checked_in_at=checked_in_at
-        )
-        db.add(checkin)
-        checkins.append(checkin)
-    
+    insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+    stmt = (
+        insert(CheckIn)
+        .values([
+            {
+                "id": uuid4(),
+                "outing_id": outing_id,
+                "signup_id": signup_ids[participant_id],
+                "participant_id": participant_id,
+                "checked_in_by": checked_in_by,
+                "checked_in_at": checked_in_at,
+                "created_at": checked_in_at,
+            }
+            for participant_id in valid_ids
+        ])
+        .on_conflict_do_nothing(index_elements=[CheckIn.outing_id, CheckIn.participant_id])
+        .returning(CheckIn)
+    )
+    result = await db.scalars(stmt)
+    created = {checkin.participant_id: checkin for checkin in result.all()}
     await db.commit()
-    for checkin in checkins:
-        await db.refresh(checkin)
-    
-    return checkins
+    return [created[participant_id] for participant_id in valid_ids if participant_id in created]
 
 
 async def delete_checkin(db: AsyncSession, outing_id: UUID, participant_id: UUID) -> bool:
@@ -149,6 +156,7 @@ async def delete_checkin(db: AsyncSession, outing_id: UUID, participant_id: UUID
     
     if checkin:
         await db.delete(checkin)
+        _record_server_undos(db, outing_id, [participant_id])
         await db.commit()
         return True
     return False
@@ -169,7 +177,71 @@ async def delete_all_checkins(db: AsyncSession, outing_id: UUID) -> int:
     """
     # SQLAlchemy delete with async session requires execution
     result = await db.execute(
-        delete(CheckIn).where(CheckIn.outing_id == outing_id)
+        delete(CheckIn).where(CheckIn.outing_id == outing_id).returning(CheckIn.participant_id)
     )
+    participant_ids = result.scalars().all()
+    _record_server_undos(db, outing_id, participant_ids)
     await db.commit()
-    return result.rowcount
+    return len(participant_ids)
+
+
+def _record_server_undos(db: AsyncSession, outing_id: UUID, participant_ids: Iterable[UUID]) -> None:
+    """
+    Log undos made online so older offline check-ins replayed later don't revive them
+    """
+    now = utc_now()
+    db.add_all([
+        CheckInOperation(
+            outing_id=outing_id,
+            idempotency_key=f"server:{uuid4()}",
+            participant_id=participant_id,
+            op="undo",
+            occurred_at=now,
+            status="applied",
+            processed_at=now,
+        )
+        for participant_id in participant_ids
+    ])
+
+
+async def get_checkins_for_participants(
+    db: AsyncSession, outing_id: UUID, participant_ids: Iterable[UUID]
+) -> List[CheckIn]:
+    """
+    Get the check-in records of the given participants for an outing
+    """
+    result = await db.execute(
+        select(CheckIn).where(CheckIn.outing_id == outing_id, CheckIn.participant_id.in_(list(participant_ids)))
+    )
+    return result.scalars().all()
+
+
+async def get_operation_keys(db: AsyncSession, outing_id: UUID, keys: Iterable[str]) -> Set[str]:
+    """
+    Idempotency keys among the given ones that were already processed for an outing
+    """
+    result = await db.execute(
+        select(CheckInOperation.idempotency_key).where(
+            CheckInOperation.outing_id == outing_id,
+            CheckInOperation.idempotency_key.in_(list(keys)),
+        )
+    )
+    return set(result.scalars().all())
+
+
+async def get_last_applied_operations(
+    db: AsyncSession, outing_id: UUID, participant_ids: Iterable[UUID]
+) -> Dict[UUID, datetime]:
+    """
+    Latest occurred_at of an applied operation per participant
+    """
+    result = await db.execute(
+        select(CheckInOperation.participant_id, func.max(CheckInOperation.occurred_at))
+        .where(
+            CheckInOperation.outing_id == outing_id,
+            CheckInOperation.participant_id.in_(list(participant_ids)),
+            CheckInOperation.status == "applied",
+        )
+        .group_by(CheckInOperation.participant_id)
+    )
+    return dict(result.all())
@@ -1,7 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 from uuid import UUID
 
 from app.models.family import FamilyMember, FamilyMemberDietaryPreference, FamilyMemberAllergy
@@ -9,6 +9,7 @@ from app.models.participant import Participant
 from app.models.signup import Signup
 from app.schemas.family import FamilyMemberCreate, FamilyMemberUpdate
 from app.services.change_log import record_change, compute_payload_hash
+from app.services.outing_capacity import refresh_outing_capacity
 
 
 async def get_family_members_for_user(db: AsyncSession, user_id: UUID) -> List[FamilyMember]:
@@ -36,6 +37,25 @@ async def get_family_member(db: AsyncSession, member_id: UUID, user_id: Optional
     return result.scalar_one_or_none()
 
 
+async def get_family_members_by_ids(db: AsyncSession, member_ids: Iterable[UUID]) -> Dict[UUID, FamilyMember]:
+    """Load family members by ID in one IN query, with dietary preferences and allergies.
+
+    IDs that do not exist are simply absent from the returned mapping.
+    """
+    ids = set(member_ids)
+    if not ids:
+        return {}
+    result = await db.execute(
+        select(FamilyMember)
+        .where(FamilyMember.id.in_(ids))
+        .options(
+            selectinload(FamilyMember.dietary_preferences),
+            selectinload(FamilyMember.allergies)
+        )
+    )
+    return {member.id: member for member in result.scalars().all()}
+
+
 async def create_family_member(db: AsyncSession, user_id: UUID, member_data: FamilyMemberCreate) -> FamilyMember:
     member = FamilyMember(
         user_id=user_id,
@@ -167,6 +187,12 @@ async def delete_family_member(db: AsyncSession, member_id: UUID, user_id: UUID)
         participants = participants_result.scalars().all()
         for participant in participants:
             await db.execute(delete(Participant).where(Participant.id == participant.id))
+
+        # Core deletes bypass the flush hook, so re-aggregate the affected outings explicitly
+        outing_ids_result = await db.execute(
+            select(Signup.outing_id).where(Signup.id.in_(set(signup_ids)))
+        )
+        await refresh_outing_capacity(db, outing_ids_result.scalars().all())
         
         # Force expiration of signups to ensure fresh data in session
         for signup_id in set(signup_ids):
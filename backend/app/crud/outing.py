@@ -1,13 +1,16 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, func, and_, or_
+from sqlalchemy.orm import selectinload, joinedload, contains_eager
 from uuid import UUID
-from typing import Optional
+from typing import Iterable, Optional
+from datetime import date, datetime
 
 from app.models.outing import Outing
+from app.models.outing_capacity import OutingCapacity
 from app.models.signup import Signup
 from app.models.participant import Participant
 from app.models.family import FamilyMember
+from app.models.troop import Troop
 from app.schemas.outing import OutingCreate, OutingUpdate
 from app.services.change_log import record_change, compute_payload_hash
 
@@ -29,6 +32,22 @@ async def get_outing(db: AsyncSession, outing_id: UUID) -> Optional[Outing]:
     return result.scalar_one_or_none()
 
 
+async def get_outing_for_update(db: AsyncSession, outing_id: UUID) -> Optional[Outing]:
+    """Get an outing and lock its row until the transaction ends.
+
+    Serializes signup admission per outing: a second writer blocks here until the
+    first commits, then sees its participants. Only allowed troops are loaded.
+    """
+    result = await db.execute(
+        select(Outing)
+        .options(selectinload(Outing.allowed_troops))
+        .where(Outing.id == outing_id)
+        .with_for_update(of=Outing)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+
 async def get(db: AsyncSession, outing_id: UUID) -> Optional[Outing]:
     """Get an outing by ID (alias for get_outing for consistency with other CRUD modules)"""
     return await get_outing(db, outing_id)
@@ -43,7 +62,8 @@ async def get_outing_with_details(db: AsyncSession, outing_id: UUID) -> Optional
         select(Outing)
         .options(
             # Needed for participants' troop numbers on PDF
-            selectinload(Outing.signups).selectinload(Signup.participants).selectinload(Participant.family_member),
+            selectinload(Outing.signups).selectinload(Signup.participants)
+            .selectinload(Participant.family_member).selectinload(FamilyMember.troop),
             selectinload(Outing.outing_requirements).selectinload(OutingRequirement.requirement),
             selectinload(Outing.outing_merit_badges).selectinload(OutingMeritBadge.merit_badge),
             selectinload(Outing.packing_lists).selectinload(OutingPackingList.items),
@@ -57,18 +77,28 @@ async def get_outing_with_details(db: AsyncSession, outing_id: UUID) -> Optional
     return result.scalar_one_or_none()
 
 
+def _outing_response_options():
+    """Loader options for building OutingResponse without touching the signup graph"""
+    return (
+        # Single-row relationships ride along in the outing query itself, so
+        # responses can access them without additional IO
+        joinedload(Outing.capacity),
+        joinedload(Outing.outing_place),
+        joinedload(Outing.pickup_place),
+        joinedload(Outing.dropoff_place),
+        selectinload(Outing.allowed_troops),
+    )
+
+
 async def get_outings(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[Outing]:
-    """Get all outings with pagination"""
+    """Get all outings with pagination.
+
+    Loads the materialized capacity counters instead of the signup graph; build
+    responses with services.outing_capacity.build_outing_response.
+    """
     result = await db.execute(
         select(Outing)
-        .options(
-            selectinload(Outing.signups).selectinload(Signup.participants).selectinload(Participant.family_member),
-            # Eager-load place relationships so responses can access them without additional IO
-            selectinload(Outing.outing_place),
-            selectinload(Outing.pickup_place),
-            selectinload(Outing.dropoff_place),
-            selectinload(Outing.allowed_troops)
-        )
+        .options(*_outing_response_options())
         .offset(skip)
         .limit(limit)
         .order_by(Outing.outing_date.desc())
@@ -76,22 +106,111 @@ async def get_outings(db: AsyncSession, skip: int = 0, limit: int = 100) -> list
     return result.scalars().all()
 
 
-async def get_available_outings(db: AsyncSession) -> list[Outing]:
-    """Get outings that still have available spots"""
+async def get_outings_by_ids(db: AsyncSession, outing_ids: Iterable[UUID]) -> list[Outing]:
+    """Get outings by ID, loaded like get_outings (missing IDs are skipped)"""
+    outing_ids = list(outing_ids)
+    if not outing_ids:
+        return []
     result = await db.execute(
         select(Outing)
+        .options(*_outing_response_options())
+        .where(Outing.id.in_(outing_ids))
+    )
+    return list(result.scalars().all())
+
+
+async def get_outings_for_export(
+    db: AsyncSession,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    troop_id: Optional[UUID] = None,
+    limit: Optional[int] = None,
+) -> list[Outing]:
+    """Outings starting in [start_date, end_date], oldest first, without relationships.
+
+    troop_id matches outings open to that troop or with a participant from it.
+    """
+    query = select(Outing)
+    if start_date is not None:
+        query = query.where(Outing.outing_date >= start_date)
+    if end_date is not None:
+        query = query.where(Outing.outing_date <= end_date)
+    if troop_id is not None:
+        query = query.where(or_(
+            Outing.allowed_troops.any(Troop.id == troop_id),
+            Outing.signups.any(Signup.participants.any(
+                Participant.family_member.has(FamilyMember.troop_id == troop_id)
+            )),
+        ))
+    query = query.order_by(Outing.outing_date, Outing.id)
+    if limit is not None:
+        query = query.limit(limit)
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+def available_outings_filter(today: date, now: datetime):
+    """SQL predicate for outings open to new signups.
+
+    Future-dated, not closed (manually or by signups_close_at) and below fixed or
+    vehicle capacity according to the materialized counters. Requires an outer join
+    to OutingCapacity.
+    """
+    participants = func.coalesce(OutingCapacity.participant_count, 0)
+    seats = func.coalesce(OutingCapacity.vehicle_capacity, 0)
+    return and_(
+        Outing.outing_date >= today,
+        Outing.signups_closed.is_(False),
+        or_(Outing.signups_close_at.is_(None), Outing.signups_close_at > now),
+        or_(
+            and_(Outing.capacity_type == 'vehicle', participants < seats),
+            and_(Outing.capacity_type != 'vehicle', participants < Outing.max_participants),
+        ),
+    )
+
+
+async def get_available_outings(
+    db: AsyncSession,
+    after: Optional[tuple[date, UUID]] = None,
+    limit: int = 100,
+) -> list[Outing]:
+    """Get a page of outings that still have available spots, soonest first.
+
+    Keyset-paginated on (outing_date, id): pass the last row's key as `after`.
+    """
+    query = (
+        select(Outing)
+        .outerjoin(OutingCapacity, OutingCapacity.outing_id == Outing.id)
         .options(
-            selectinload(Outing.signups).selectinload(Signup.participants).selectinload(Participant.family_member),
+            contains_eager(Outing.capacity),
             selectinload(Outing.outing_place),
             selectinload(Outing.pickup_place),
             selectinload(Outing.dropoff_place),
             selectinload(Outing.allowed_troops)
         )
-        .order_by(Outing.outing_date.asc())
+        .where(available_outings_filter(date.today(), datetime.utcnow()))
+    )
+    if after is not None:
+        after_date, after_id = after
+        query = query.where(
+            or_(
+                Outing.outing_date > after_date,
+                and_(Outing.outing_date == after_date, Outing.id > after_id),
+            )
+        )
+    result = await db.execute(query.order_by(Outing.outing_date.asc(), Outing.id.asc()).limit(limit))
+    return result.scalars().all()
+
+
+async def get_available_outing_count(db: AsyncSession) -> int:
+    """Count outings that still have available spots"""
+    result = await db.execute(
+        select(func.count(Outing.id))
+        .select_from(Outing)
+        .outerjoin(OutingCapacity, OutingCapacity.outing_id == Outing.id)
+        .where(available_outings_filter(date.today(), datetime.utcnow()))
     )
-    outings = result.scalars().all()
-    # Filter outings with available spots
-    return [outing for outing in outings if not outing.is_full]
+    return result.scalar_one()
 
 
 from datetime import timezone
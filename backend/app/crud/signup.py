@@ -1,13 +1,16 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import and_, func, or_, select, text
 from sqlalchemy.orm import selectinload
 from uuid import UUID
-from typing import Optional
+from datetime import datetime
+from typing import Optional, Sequence
+import json
 
 from app.models.signup import Signup
 from app.models.participant import Participant
 from app.models.family import FamilyMember
-from app.schemas.signup import SignupCreate, SignupUpdate
+from app.schemas.signup import SignupCreate, SignupUpdate, GrubmasterRequestItem
+from app.crud.family import get_family_members_by_ids
 from app.services.change_log import record_change, compute_payload_hash
 
 
@@ -30,6 +33,33 @@ async def get_signup(db: AsyncSession, signup_id: UUID) -> Optional[Signup]:
     return result.scalar_one_or_none()
 
 
+def signups_after(created_at: datetime, signup_id: UUID):
+    """Keyset criterion: signups after (created_at, id) in newest-first order"""
+    return or_(
+        Signup.created_at < created_at,
+        and_(Signup.created_at == created_at, Signup.id < signup_id),
+    )
+
+
+async def count_signups(db: AsyncSession, *criteria, estimated: bool = False) -> int:
+    """Count signups matching `criteria`.
+
+    With `estimated`, PostgreSQL returns the planner's row estimate instead of
+    scanning every matching row; other databases always count exactly.
+    """
+    if estimated and db.bind.dialect.name == "postgresql":
+        query = select(Signup.id).where(*criteria)
+        compiled = query.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+        result = await db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    result = await db.execute(select(func.count()).select_from(Signup).where(*criteria))
+    return result.scalar_one()
+
+
 async def get_outing_signups(db: AsyncSession, outing_id: UUID) -> list[Signup]:
     """Get all signups for a specific outing"""
     result = await db.execute(
@@ -50,55 +80,66 @@ async def get_outing_signups(db: AsyncSession, outing_id: UUID) -> list[Signup]:
     return result.scalars().all()
 
 
-async def create_signup(db: AsyncSession, signup: SignupCreate) -> Signup:
-    """Create a new signup with family member references"""
-    # Verify all family members exist
+async def _load_family_members(db: AsyncSession, family_member_ids: Sequence[UUID]) -> list[FamilyMember]:
+    """Batch-load family members in request order, failing on any unknown ID"""
+    members_by_id = await get_family_members_by_ids(db, family_member_ids)
     family_members = []
-    for family_member_id in signup.family_member_ids:
-        result = await db.execute(
-            select(FamilyMember).where(FamilyMember.id == family_member_id)
-        )
-        family_member = result.scalar_one_or_none()
+    for family_member_id in family_member_ids:
+        family_member = members_by_id.get(family_member_id)
         if not family_member:
             raise ValueError(f"Family member with ID {family_member_id} not found")
         family_members.append(family_member)
+    return family_members
+
+
+def _build_participants(
+    family_members: Sequence[FamilyMember],
+    grubmaster_requests: Optional[Sequence[GrubmasterRequestItem]],
+) -> list[Participant]:
+    """Participant rows for a signup, with grubmaster interest applied"""
+    grubmaster_lookup = {r.family_member_id: r for r in grubmaster_requests or []}
+    participants = []
+    for family_member in family_members:
+        grubmaster_request = grubmaster_lookup.get(family_member.id)
+        participants.append(Participant(
+            family_member_id=family_member.id,
+            family_member=family_member,
+            grubmaster_interest=grubmaster_request.grubmaster_interest if grubmaster_request else False,
+            grubmaster_reason=grubmaster_request.grubmaster_reason if grubmaster_request else None,
+        ))
+    return participants
+
+
+async def create_signup(
+    db: AsyncSession,
+    signup: SignupCreate,
+    family_members: Optional[Sequence[FamilyMember]] = None,
+) -> Signup:
+    """Create a new signup with family member references.
+
+    Pass `family_members` (loaded with dietary preferences and allergies, in
+    family_member_ids order) when the caller has already validated them, to
+    avoid loading them twice.
+    """
+    if family_members is None:
+        family_members = await _load_family_members(db, signup.family_member_ids)
     
-    # Create grubmaster request lookup
-    grubmaster_lookup = {}
-    if signup.grubmaster_requests:
-        for request in signup.grubmaster_requests:
-            grubmaster_lookup[request.family_member_id] = request
-    
-    # Create signup
+    # Create signup and its participant records; the participants flush as one batched INSERT
     db_signup = Signup(
         outing_id=signup.outing_id,
         family_contact_name=signup.family_contact.emergency_contact_name,
         family_contact_email=signup.family_contact.email,
         family_contact_phone=signup.family_contact.phone,
+        participants=_build_participants(family_members, signup.grubmaster_requests),
     )
     db.add(db_signup)
     await db.flush()
     # Record signup creation
     payload_hash = compute_payload_hash(db_signup, ["outing_id", "family_contact_email", "family_contact_name"]) 
     await record_change(db, entity_type="signup", entity_id=db_signup.id, op_type="create", payload_hash=payload_hash)
-    
-    # Create participant records linking to family members
-    for family_member in family_members:
-        grubmaster_request = grubmaster_lookup.get(family_member.id)
-        db_participant = Participant(
-            signup_id=db_signup.id,
-            family_member_id=family_member.id,
-            grubmaster_interest=grubmaster_request.grubmaster_interest if grubmaster_request else False,
-            grubmaster_reason=grubmaster_request.grubmaster_reason if grubmaster_request else None,
-        )
-        db.add(db_participant)
-    
-    await db.flush()
-    payload_hash = compute_payload_hash(db_signup, ["outing_id", "family_contact_email", "family_contact_name"]) 
     await record_change(db, entity_type="signup", entity_id=db_signup.id, op_type="update", payload_hash=payload_hash)
     try:
         await db.commit()
-        await db.refresh(db_signup)
     except Exception:
         await db.rollback()
         # Check if signup exists (race condition)
@@ -112,26 +153,21 @@ async def create_signup(db: AsyncSession, signup: SignupCreate) -> Signup:
             return existing_signup
         raise
 
-    # Load relationships
-    result = await db.execute(
-        select(Signup)
-        .options(
-            selectinload(Signup.participants)
-            .selectinload(Participant.family_member)
-            .selectinload(FamilyMember.dietary_preferences)
-        )
-        .options(
-            selectinload(Signup.participants)
-            .selectinload(Participant.family_member)
-            .selectinload(FamilyMember.allergies)
-        )
-        .where(Signup.id == db_signup.id)
-    )
-    return result.scalar_one()
+    # Participants and their family members (with dietary/allergy data) are already loaded
+    return db_signup
+
 
+async def update_signup(
+    db: AsyncSession,
+    signup_id: UUID,
+    signup_update: SignupUpdate,
+    family_members: Optional[Sequence[FamilyMember]] = None,
+) -> Optional[Signup]:
+    """Update a signup's contact info and/or participants.
 
-async def update_signup(db: AsyncSession, signup_id: UUID, signup_update: SignupUpdate) -> Optional[Signup]:
-    """Update a signup's contact info and/or participants"""
+    As with create_signup, `family_members` may carry the already-validated
+    members for signup_update.family_member_ids.
+    """
     db_signup = await get_signup(db, signup_id)
     if not db_signup:
         return None
@@ -145,37 +181,15 @@ async def update_signup(db: AsyncSession, signup_id: UUID, signup_update: Signup
     # Update participants if provided
     if signup_update.family_member_ids is not None:
         # Verify all family members exist
-        family_members = []
-        for family_member_id in signup_update.family_member_ids:
-            result = await db.execute(
-                select(FamilyMember).where(FamilyMember.id == family_member_id)
-            )
-            family_member = result.scalar_one_or_none()
-            if not family_member:
-                raise ValueError(f"Family member with ID {family_member_id} not found")
-            family_members.append(family_member)
+        if family_members is None:
+            family_members = await _load_family_members(db, signup_update.family_member_ids)
         
-        # Create grubmaster request lookup
-        grubmaster_lookup = {}
-        if signup_update.grubmaster_requests:
-            for request in signup_update.grubmaster_requests:
-                grubmaster_lookup[request.family_member_id] = request
-        
-        # Delete existing participants
-        for participant in db_signup.participants:
-            await db.delete(participant)
+        # Delete existing participants (orphans) before inserting their replacements
+        db_signup.participants.clear()
         await db.flush()
         
         # Create new participant records
-        for family_member in family_members:
-            grubmaster_request = grubmaster_lookup.get(family_member.id)
-            db_participant = Participant(
-                signup_id=db_signup.id,
-                family_member_id=family_member.id,
-                grubmaster_interest=grubmaster_request.grubmaster_interest if grubmaster_request else False,
-                grubmaster_reason=grubmaster_request.grubmaster_reason if grubmaster_request else None,
-            )
-            db.add(db_participant)
+        db_signup.participants.extend(_build_participants(family_members, signup_update.grubmaster_requests))
     elif signup_update.grubmaster_requests:
         # Update grubmaster requests for existing participants
         grubmaster_lookup = {r.family_member_id: r for r in signup_update.grubmaster_requests}
@@ -189,24 +203,9 @@ async def update_signup(db: AsyncSession, signup_id: UUID, signup_update: Signup
     payload_hash = compute_payload_hash(db_signup, ["outing_id", "family_contact_email", "family_contact_name"]) 
     await record_change(db, entity_type="signup", entity_id=db_signup.id, op_type="update", payload_hash=payload_hash)
     await db.commit()
-    await db.refresh(db_signup)
 
-    # Reload with relationships
-    result = await db.execute(
-        select(Signup)
-        .options(
-            selectinload(Signup.participants)
-            .selectinload(Participant.family_member)
-            .selectinload(FamilyMember.dietary_preferences)
-        )
-        .options(
-            selectinload(Signup.participants)
-            .selectinload(Participant.family_member)
-            .selectinload(FamilyMember.allergies)
-        )
-        .where(Signup.id == signup_id)
-    )
-    return result.scalar_one()
+    # The participant collection was rebuilt in place, so no reload is needed
+    return db_signup
 
 
 async def delete_signup(db: AsyncSession, signup_id: UUID) -> bool:
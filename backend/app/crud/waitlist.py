@@ -0,0 +1,113 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, select, func
+from typing import List, Optional
+from uuid import UUID
+
+from app.models.user import User
+from app.models.waitlist import WaitlistEntry
+from app.schemas.signup import SignupCreate
+
+WAITING = "waiting"
+ADMITTED = "admitted"
+REJECTED = "rejected"
+CANCELLED = "cancelled"
+
+
+def _queue_order():
+    return (WaitlistEntry.created_at, WaitlistEntry.id)
+
+
+async def create_waitlist_entry(db: AsyncSession, signup: SignupCreate, user: User) -> WaitlistEntry:
+    """Queue a signup request behind everything already waiting for the outing"""
+    entry = WaitlistEntry(
+        outing_id=signup.outing_id,
+        user_id=user.id,
+        signup_request=signup.model_dump(mode="json"),
+        participant_count=len(signup.family_member_ids),
+        status=WAITING,
+    )
+    db.add(entry)
+    await db.commit()
+    return entry
+
+
+async def get_waitlist_entry(db: AsyncSession, entry_id: UUID) -> Optional[WaitlistEntry]:
+    """Get a waitlist entry, re-reading its row so status changes made elsewhere are visible"""
+    result = await db.execute(
+        select(WaitlistEntry)
+        .where(WaitlistEntry.id == entry_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+
+async def get_waitlist_head(db: AsyncSession, outing_id: UUID) -> Optional[WaitlistEntry]:
+    """Oldest waiting request for an outing"""
+    result = await db.execute(
+        select(WaitlistEntry)
+        .where(WaitlistEntry.outing_id == outing_id, WaitlistEntry.status == WAITING)
+        .order_by(*_queue_order())
+        .limit(1)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+
+async def has_waiting_entry(db: AsyncSession, outing_id: UUID, user_id: UUID) -> bool:
+    """Whether a user already has a request waiting for an outing"""
+    result = await db.execute(
+        select(WaitlistEntry.id)
+        .where(
+            WaitlistEntry.outing_id == outing_id,
+            WaitlistEntry.user_id == user_id,
+            WaitlistEntry.status == WAITING,
+        )
+        .limit(1)
+    )
+    return result.scalar_one_or_none() is not None
+
+
+async def get_waitlist_position(db: AsyncSession, entry: WaitlistEntry) -> Optional[int]:
+    """1-based queue position of a waiting entry; None once it has left the queue"""
+    if entry.status != WAITING:
+        return None
+    result = await db.execute(
+        select(func.count())
+        .select_from(WaitlistEntry)
+        .where(
+            WaitlistEntry.outing_id == entry.outing_id,
+            WaitlistEntry.status == WAITING,
+            or_(
+                WaitlistEntry.created_at < entry.created_at,
+                and_(WaitlistEntry.created_at == entry.created_at, WaitlistEntry.id < entry.id),
+            ),
+        )
+    )
+    return result.scalar_one() + 1
+
+
+async def get_outing_waitlist(db: AsyncSession, outing_id: UUID) -> List[WaitlistEntry]:
+    """Waiting requests for an outing in admission order"""
+    result = await db.execute(
+        select(WaitlistEntry)
+        .where(WaitlistEntry.outing_id == outing_id, WaitlistEntry.status == WAITING)
+        .order_by(*_queue_order())
+    )
+    return list(result.scalars().all())
+
+
+async def get_user_waitlist_entries(db: AsyncSession, user_id: UUID) -> List[WaitlistEntry]:
+    """All of a user's waitlist requests, newest first"""
+    result = await db.execute(
+        select(WaitlistEntry)
+        .where(WaitlistEntry.user_id == user_id)
+        .order_by(WaitlistEntry.created_at.desc(), WaitlistEntry.id.desc())
+    )
+    return list(result.scalars().all())
+
+
+async def cancel_waitlist_entry(db: AsyncSession, entry: WaitlistEntry) -> WaitlistEntry:
+    """Take a waiting request out of the queue"""
+    entry.status = CANCELLED
+    await db.commit()
+    return entry
@@ -3,6 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
+from contextlib import asynccontextmanager
 import traceback
 import logging
 import uuid
@@ -12,6 +13,9 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
 from app.core.config import settings
+from app.core.authentik import get_authentik_client
+from app.db.session import engine
+from app.services import change_log_prune, change_stream, pdf_generator, pdf_render
 from app.api.endpoints import outings, signups, registration, family, requirements, places, packing_lists, troops, offline, grubmaster, tenting, roster, organizations
 from app.api.endpoints import auth
 from app.api import checkin
@@ -25,6 +29,25 @@ import os
 _is_pytest = bool(os.environ.get("PYTEST_CURRENT_TEST"))
 limiter = Limiter(key_func=get_remote_address, default_limits=["200/minute"] if not _is_pytest else ["100000/minute"])
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the pooled Authentik client, warm signing keys and start the change log background tasks"""
+    authentik = get_authentik_client()
+    await authentik.start_http_client()
+    await authentik.start_key_refresh()
+    await change_stream.start_listener(engine)
+    change_log_prune.start_retention_task()
+    # Fonts, styles and static images once, not on the first download
+    pdf_generator.warm_up()
+    yield
+    await change_log_prune.stop_retention_task()
+    await change_stream.stop_listener()
+    await authentik.stop_key_refresh()
+    await authentik.close_http_client()
+    pdf_render.shutdown()
+
+
 # Create FastAPI application with enhanced documentation
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -66,6 +89,7 @@ For detailed documentation, see the individual endpoint descriptions below.
     license_info={
         "name": "MIT License",
     },
+    lifespan=lifespan,
 )
 
 # Register rate limiter
@@ -1,10 +1,12 @@
 from app.models.user import User
 from app.models.outing import Outing
+from app.models.outing_capacity import OutingCapacity
 from app.models.signup import Signup
+from app.models.waitlist import WaitlistEntry
 from app.models.participant import Participant
 from app.models.family import FamilyMember, FamilyMemberAllergy, FamilyMemberDietaryPreference
 from app.models.refresh_token import RefreshToken
-from app.models.checkin import CheckIn
+from app.models.checkin import CheckIn, CheckInOperation
 from app.models.place import Place
 from app.models.requirement import RankRequirement, MeritBadge, OutingRequirement, OutingMeritBadge
 from app.models.packing_list import (
@@ -15,7 +17,7 @@ from app.models.packing_list import (
 )
 from app.models.troop import Troop, Patrol
 from app.models.organization import Organization
-from app.models.change_log import ChangeLog
+from app.models.change_log import ChangeLog, EntityVersion, ChangeLogCheckpoint, ChangeLogCheckpointEntry
 from app.models.eating_group import EatingGroup, EatingGroupMember
 from app.models.tenting_group import TentingGroup, TentingGroupMember
 from app.models.roster import RosterMember
@@ -24,13 +26,16 @@ from app.models.roster import RosterMember
 __all__ = [
     "User",
     "Outing",
+    "OutingCapacity",
     "Signup",
+    "WaitlistEntry",
     "Participant",
     "FamilyMember",
     "FamilyMemberAllergy",
     "FamilyMemberDietaryPreference",
     "RefreshToken",
     "CheckIn",
+    "CheckInOperation",
     "Place",
     "RankRequirement",
     "MeritBadge",
@@ -44,6 +49,9 @@ __all__ = [
     "Patrol",
     "Organization",
     "ChangeLog",
+    "EntityVersion",
+    "ChangeLogCheckpoint",
+    "ChangeLogCheckpointEntry",
     "EatingGroup",
     "EatingGroupMember",
     "TentingGroup",
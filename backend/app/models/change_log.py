@@ -1,6 +1,5 @@
-from sqlalchemy import Column, String, Integer, DateTime
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Identity, Index
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import declarative_mixin
 import uuid
 from datetime import datetime
 
@@ -9,11 +8,20 @@ from app.db.base import Base
 class ChangeLog(Base):
     """Change log entries used for incremental offline sync.
     Each row represents a mutation event for a domain entity.
-    Query using created_at + id for keyset pagination.
+    Query using seq (insertion order) for keyset pagination.
     """
     __tablename__ = "change_log"
+    __table_args__ = (
+        # One index range scan per delta page, with or without an entity type filter
+        Index("ix_change_log_entity_type_seq", "entity_type", "seq"),
+    )
+    # seq is assigned by the database; fetch it with the INSERT rather than lazily
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    # Monotonic insertion order (bigint identity), the delta cursor. Unique by construction;
+    # not declared unique because on PostgreSQL the table is partitioned by created_at.
+    seq = Column(BigInteger().with_variant(Integer, "sqlite"), Identity(), nullable=False, index=True)
     entity_type = Column(String(50), nullable=False, index=True)  # e.g. 'outing', 'signup', 'participant'
     entity_id = Column(UUID(as_uuid=True), nullable=True, index=True)  # UUID of the entity affected (nullable for global events)
     op_type = Column(String(10), nullable=False)  # 'create' | 'update' | 'delete'
@@ -22,4 +30,57 @@ class ChangeLog(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
 
     def __repr__(self):  # pragma: no cover - debug helper
-        return f"<ChangeLog(id={self.id}, entity_type={self.entity_type}, op_type={self.op_type}, version={self.version})>"
+        return f"<ChangeLog(id={self.id}, seq={self.seq}, entity_type={self.entity_type}, op_type={self.op_type}, version={self.version})>"
+
+
+
+class EntityVersion(Base):
+    """Current change log version per (entity_type, entity_id).
+
+    Bumped with an upsert for every change log entry (see app.services.change_log),
+    so versions are allocated atomically and survive change log pruning.
+    """
+    __tablename__ = "entity_versions"
+
+    entity_type = Column(String(50), primary_key=True)
+    entity_id = Column(UUID(as_uuid=True), primary_key=True)  # Nil UUID for global events
+    version = Column(Integer, nullable=False)
+
+    def __repr__(self):  # pragma: no cover - debug helper
+        return f"<EntityVersion(entity_type={self.entity_type}, entity_id={self.entity_id}, version={self.version})>"
+
+
+class ChangeLogCheckpoint(Base):
+    """A point up to which change_log has been folded into change_log_checkpoint_entries.
+
+    Rows with seq <= the latest checkpoint's seq may be pruned from change_log.
+    """
+    __tablename__ = "change_log_checkpoints"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    seq = Column(BigInteger().with_variant(Integer, "sqlite"), nullable=False, index=True)
+    entities_updated = Column(Integer, nullable=False, default=0)  # Checkpoint entries written by this checkpoint
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):  # pragma: no cover - debug helper
+        return f"<ChangeLogCheckpoint(seq={self.seq}, entities_updated={self.entities_updated})>"
+
+
+class ChangeLogCheckpointEntry(Base):
+    """Latest change log entry per entity as of the latest checkpoint (deletes kept as tombstones)"""
+    __tablename__ = "change_log_checkpoint_entries"
+    __table_args__ = (
+        Index("ix_change_log_checkpoint_entries_seq", "seq"),
+    )
+
+    entity_type = Column(String(50), primary_key=True)
+    entity_id = Column(UUID(as_uuid=True), primary_key=True)
+    change_id = Column(UUID(as_uuid=True), nullable=False)  # id of the folded change_log row
+    seq = Column(BigInteger().with_variant(Integer, "sqlite"), nullable=False)
+    op_type = Column(String(10), nullable=False)
+    version = Column(Integer, nullable=False)
+    payload_hash = Column(String(64), nullable=True)
+    created_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):  # pragma: no cover - debug helper
+        return f"<ChangeLogCheckpointEntry(entity_type={self.entity_type}, entity_id={self.entity_id}, seq={self.seq})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -35,3 +35,31 @@ class CheckIn(Base):
 
     def __repr__(self):
         return f"<CheckIn(id={self.id}, outing_id={self.outing_id}, participant_id={self.participant_id})>"
+
+
+class CheckInOperation(Base):
+    """A check-in or undo replayed from an offline client, kept for idempotency.
+
+    Keyed by the client's idempotency key (unique per outing), so a batch resent
+    after a dropped response is recognised. The latest applied occurred_at per
+    participant is the last-writer-wins clock for later replays (see
+    app.services.checkin_replay).
+    """
+    __tablename__ = "checkin_operations"
+
+    outing_id = Column(UUID(as_uuid=True), ForeignKey("outings.id", ondelete="CASCADE"), primary_key=True)
+    idempotency_key = Column(String(100), primary_key=True)
+    # Not a foreign key: rejected operations may name participants that don't exist
+    participant_id = Column(UUID(as_uuid=True), nullable=False)
+    op = Column(String(10), nullable=False)  # checkin, undo
+    occurred_at = Column(DateTime, nullable=False)  # Client timestamp, UTC
+    checked_in_by = Column(String(255), nullable=True)
+    status = Column(String(20), nullable=False)  # applied, stale, rejected
+    processed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_checkin_operations_participant", "outing_id", "participant_id", "occurred_at"),
+    )
+
+    def __repr__(self):
+        return f"<CheckInOperation(key={self.idempotency_key}, op={self.op}, status={self.status})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, Date, Text, DateTime, Time, Numeric, ForeignKey, Table
+from sqlalchemy import Column, String, Integer, Boolean, Date, Text, DateTime, Time, Numeric, ForeignKey, Table, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -18,6 +18,10 @@ outing_troops = Table(
 class Outing(Base):
     """Outing model for managing Scouting Outings"""
     __tablename__ = "outings"
+    __table_args__ = (
+        # Backs the keyset-paginated "available outings" query
+        Index("ix_outings_open_by_date", "outing_date", "id", postgresql_where=text("signups_closed = false")),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     name = Column(String(255), nullable=False)
@@ -67,6 +71,7 @@ class Outing(Base):
     allowed_troops = relationship("Troop", secondary=outing_troops, back_populates="allowed_outings")
     eating_groups = relationship("EatingGroup", back_populates="outing", cascade="all, delete-orphan")
     tenting_groups = relationship("TentingGroup", back_populates="outing", cascade="all, delete-orphan")
+    capacity = relationship("OutingCapacity", back_populates="outing", uselist=False, cascade="all, delete-orphan")
     
     # Place relationships
     outing_place = relationship("Place", foreign_keys=[outing_place_id], back_populates="outings_at_location")
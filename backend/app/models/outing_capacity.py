@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+from app.db.base import Base
+
+
+class OutingCapacity(Base):
+    """Materialized participant and seat counters for an outing.
+
+    One row per outing, recomputed from signups/participants whenever they change
+    (see app.services.outing_capacity) so list endpoints never walk the roster graph.
+    """
+    __tablename__ = "outing_capacity"
+
+    outing_id = Column(UUID(as_uuid=True), ForeignKey("outings.id", ondelete="CASCADE"), primary_key=True)
+    participant_count = Column(Integer, default=0, nullable=False)  # All participants across signups
+    adult_count = Column(Integer, default=0, nullable=False)
+    female_adult_count = Column(Integer, default=0, nullable=False)
+    female_youth_count = Column(Integer, default=0, nullable=False)
+    vehicle_capacity = Column(Integer, default=0, nullable=False)  # Sum of adult vehicle seats
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Relationships
+    outing = relationship("Outing", back_populates="capacity")
+
+    def __repr__(self):
+        return f"<OutingCapacity(outing_id={self.outing_id}, participants={self.participant_count})>"
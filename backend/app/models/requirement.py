@@ -17,6 +17,7 @@ class RankRequirement(Base):
     requirement_number = Column(String(20), nullable=False)  # e.g., '1a', '2b', '3'
     requirement_text = Column(Text, nullable=False)  # Full description of the requirement
     keywords = Column(SQLiteCompatibleArray, nullable=True)  # Array of keywords for matching
+    keyword_forms = Column(SQLiteCompatibleArray, nullable=True)  # Keywords plus stemmed forms, see services.keyword_index
     category = Column(String(100), nullable=True, index=True)  # 'Camping', 'Hiking', 'First Aid', etc.
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -41,6 +42,7 @@ class MeritBadge(Base):
     name = Column(String(100), nullable=False, unique=True, index=True)  # Merit badge name
     description = Column(Text, nullable=True)  # Brief description
     keywords = Column(SQLiteCompatibleArray, nullable=True)  # Array of keywords for matching
+    keyword_forms = Column(SQLiteCompatibleArray, nullable=True)  # Keywords plus stemmed forms, see services.keyword_index
     eagle_required = Column(Boolean, nullable=False, default=False)  # True if Eagle-required
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
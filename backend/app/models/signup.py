@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -10,6 +10,11 @@ from app.db.base import Base
 class Signup(Base):
     """Signup model for family outing registrations"""
     __tablename__ = "signups"
+    __table_args__ = (
+        # Back the keyset-paginated (created_at, id) signup listing, with and without an outing filter
+        Index("ix_signups_created_at_id", "created_at", "id"),
+        Index("ix_signups_outing_created_at_id", "outing_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     outing_id = Column(UUID(as_uuid=True), ForeignKey("outings.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, Index, JSON
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from datetime import datetime
+
+from app.db.base import Base
+
+
+class WaitlistEntry(Base):
+    """A queued signup request for an outing.
+
+    Requests are accepted immediately and admitted strictly in (created_at, id) order
+    by app.services.waitlist, which turns the stored request into a real Signup once
+    the outing has room.
+    """
+    __tablename__ = "signup_waitlist"
+    __table_args__ = (
+        Index("ix_signup_waitlist_queue", "outing_id", "status", "created_at"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    outing_id = Column(UUID(as_uuid=True), ForeignKey("outings.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    signup_request = Column(JSON, nullable=False)  # SignupCreate payload, replayed on admission
+    participant_count = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False, default="waiting")  # 'waiting' | 'admitted' | 'rejected' | 'cancelled'
+    status_reason = Column(Text, nullable=True)  # Why a request was rejected
+    signup_id = Column(UUID(as_uuid=True), ForeignKey("signups.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<WaitlistEntry(id={self.id}, outing_id={self.outing_id}, status={self.status})>"
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
 from uuid import UUID
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 
 class ChangeLogEntry(BaseModel):
     id: UUID
@@ -11,11 +11,16 @@ class ChangeLogEntry(BaseModel):
     version: int = Field(..., description="Incrementing version per entity")
     payload_hash: Optional[str] = Field(None, description="Optional 64-char hash of serialized entity payload")
     created_at: datetime
+    payload: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Current serialized entity when requested with include_payloads; null if deleted or not inlined",
+    )
 
     model_config = ConfigDict(from_attributes=True)
 
 class ChangeLogDeltaResponse(BaseModel):
     items: List[ChangeLogEntry]
     has_more: bool
-    next_cursor: Optional[UUID] = Field(None, description="Cursor for next page (last item's id)")
+    next_cursor: Optional[str] = Field(None, description="Opaque cursor for the next page")
     latest_timestamp: datetime = Field(..., description="Timestamp of last item returned or server now if empty")
+    compacted: bool = Field(False, description="Items hold only the latest entry per entity (deletes as tombstones)")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from typing import Literal, Optional
 from datetime import datetime
 from uuid import UUID
 
@@ -63,6 +63,36 @@ class CheckInResponse(BaseModel):
     checked_in_count: int
     participant_ids: list[UUID]
     checked_in_at: datetime
+    summary: Optional[CheckInSummary] = Field(None, description="Check-in status for the whole outing after this request")
+
+
+class CheckInOperationCreate(BaseModel):
+    """One check-in or undo recorded by a client, possibly while offline"""
+    idempotency_key: str = Field(..., min_length=1, max_length=100, description="Client-generated key, unique per operation")
+    op: Literal["checkin", "undo"]
+    participant_id: UUID
+    occurred_at: datetime = Field(..., description="When the operation happened on the client")
+    checked_in_by: Optional[str] = Field(None, min_length=1, max_length=255, description="Defaults to the current user")
+
+
+class CheckInReplayRequest(BaseModel):
+    """Queued operations to apply, in any order"""
+    operations: list[CheckInOperationCreate] = Field(..., min_length=1, max_length=500)
+
+
+class CheckInOperationResult(BaseModel):
+    """Outcome of one replayed operation"""
+    idempotency_key: str
+    participant_id: UUID
+    status: Literal["applied", "stale", "rejected", "duplicate"]
+    detail: Optional[str] = None
+
+
+class CheckInReplayResponse(BaseModel):
+    """Per-operation outcomes plus the outing's check-in state after the replay"""
+    results: list[CheckInOperationResult]
+    applied_count: int
+    summary: CheckInSummary
 
 
 class CheckInExportRow(BaseModel):
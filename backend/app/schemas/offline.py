@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List
+
+from app.schemas.auth import UserResponse
+from app.schemas.outing import OutingResponse
+from app.schemas.signup import SignupResponse
+
+
+class OfflineDataResponse(BaseModel):
+    """Schema for the bulk offline snapshot"""
+    user: UserResponse
+    outings: List[OutingResponse]
+    rosters: Dict[str, List[SignupResponse]] = Field(
+        default_factory=dict, description="Signups per outing id (admin only)"
+    )
+    last_updated: str = Field(..., description="ISO8601 time the snapshot was taken")
@@ -185,7 +185,8 @@ class OutingResponse(OutingBase):
 class OutingListResponse(BaseModel):
     """Schema for list of outings"""
     outings: list[OutingResponse]
-    total: int
+    total: Optional[int] = Field(None, description="Total matching outings; cursor-paginated lists report it on the first page only")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page; null when there are no more results")
 
 # Rebuild models to resolve forward references to PlaceResponse
 OutingResponse.model_rebuild()
@@ -89,4 +89,25 @@ class SignupResponse(BaseModel):
 class SignupListResponse(BaseModel):
     """Schema for list of signups"""
     signups: list[SignupResponse]
-    total: int
\ No newline at end of file
+    total: int
+    total_is_estimate: bool = Field(False, description="Whether total is a planner estimate rather than an exact count")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page; null when there are no more results")
+
+class WaitlistEntryResponse(BaseModel):
+    """Schema for a queued signup request"""
+    id: UUID
+    outing_id: UUID
+    status: str = Field(..., description="waiting, admitted, rejected or cancelled")
+    position: Optional[int] = Field(None, description="1-based place in the queue while waiting")
+    participant_count: int
+    signup_id: Optional[UUID] = Field(None, description="Signup created when the request was admitted")
+    status_reason: Optional[str] = Field(None, description="Why the request was rejected")
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class WaitlistListResponse(BaseModel):
+    """Schema for list of waitlist entries"""
+    entries: list[WaitlistEntryResponse]
+    total: int
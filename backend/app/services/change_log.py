@@ -1,16 +1,48 @@
-from datetime import datetime
+"""Change log writes and delta reads for incremental offline sync.
+
+record_change only adds the entry to the session. At flush, one upsert into
+entity_versions allocates the versions of every pending entry (the upserted rows stay
+locked until commit, so concurrent writers of one entity cannot get the same
+version), and the ORM writes the entries themselves as one multi-row INSERT.
+
+Compaction: get_compacted_deltas returns only the latest entry per entity (deletes
+kept as tombstones), and create_checkpoint periodically folds change_log into
+change_log_checkpoint_entries (latest entry per entity) so that rows it covers can
+be pruned while clients with an older cursor still converge from checkpoint + tail.
+Global events (no entity_id) are not carried into checkpoints.
+
+Commit order: a seq allocated at flush becomes visible only at commit, so a slow
+transaction could commit seq N after another committed N+1, and a reader whose
+cursor had moved past N+1 would never see N. Seqs taken at flush are therefore
+provisional: just before commit, under a transaction-scoped advisory lock,
+_assign_commit_seqs renumbers the transaction's entries from the sequence. The lock
+is held only from there to the end of the commit, so every seq a reader can see was
+committed after all lower ones, and cursors can always move to the last seq read.
+"""
+from collections import Counter
+from datetime import datetime, timedelta
 from typing import Optional, Iterable
 from uuid import UUID
 import hashlib
 import json
 
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import bindparam, event, inspect, select, func, text, union_all, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.models.change_log import ChangeLog
+from app.models.change_log import ChangeLog, ChangeLogCheckpoint, ChangeLogCheckpointEntry, EntityVersion
+from app.services import change_stream
 
 VALID_OP_TYPES = {"create", "update", "delete"}
 
+# entity_versions key for entries without an entity (global events)
+GLOBAL_ENTITY_ID = UUID(int=0)
+
+# pg_advisory_xact_lock key serializing the final seq assignment of committing writers
+_COMMIT_SEQ_LOCK_KEY = 0x6368616E67657371  # "changesq"
+
 def compute_payload_hash(entity: object, fields: Iterable[str]) -> str:
     """Compute a stable SHA-256 hash for selected fields of an entity.
     Skips missing attributes gracefully; serializes as sorted JSON.
@@ -28,62 +60,271 @@ async def record_change(
     op_type: str,
     payload_hash: Optional[str] = None,
 ) -> ChangeLog:
-    """Insert a change log entry and auto-increment version for (entity_type, entity_id).
+    """Add a change log entry for (entity_type, entity_id) to the session.
 
     Should be called inside CRUD write functions after flush so entity_id is available.
+    The entry's version (and seq) are assigned when the session next flushes.
     """
     if op_type not in VALID_OP_TYPES:
         raise ValueError(f"Invalid op_type '{op_type}' – expected one of {VALID_OP_TYPES}")
 
-    version_query = select(func.coalesce(func.max(ChangeLog.version), 0)).where(
-        ChangeLog.entity_type == entity_type,
-        ChangeLog.entity_id == entity_id,
-    )
-    result = await db.execute(version_query)
-    last_version = result.scalar_one()
-    next_version = last_version + 1
-
     entry = ChangeLog(
         entity_type=entity_type,
         entity_id=entity_id,
         op_type=op_type,
-        version=next_version,
         payload_hash=payload_hash,
     )
     db.add(entry)
-    await db.flush()
     return entry
 
+
+def version_upsert_statement(dialect_name: str, increments: dict):
+    """INSERT ... ON CONFLICT DO UPDATE adding `increments` to each entity's version.
+
+    Rows are listed in key order so concurrent transactions lock them in the same order.
+    """
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    stmt = insert(EntityVersion).values([
+        {"entity_type": entity_type, "entity_id": entity_id, "version": increment}
+        for (entity_type, entity_id), increment in sorted(increments.items(), key=lambda item: (item[0][0], str(item[0][1])))
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[EntityVersion.entity_type, EntityVersion.entity_id],
+        set_={"version": EntityVersion.version + stmt.excluded.version},
+    )
+    return stmt.returning(EntityVersion.entity_type, EntityVersion.entity_id, EntityVersion.version)
+
+
+def _version_key(entry: ChangeLog) -> tuple:
+    return entry.entity_type, entry.entity_id if entry.entity_id is not None else GLOBAL_ENTITY_ID
+
+
+@event.listens_for(Session, "before_flush")
+def _allocate_change_versions(session: Session, flush_context, instances) -> None:
+    """Assign versions (and, without identity columns, seq) to the change log entries being flushed."""
+    entries = sorted(
+        (obj for obj in session.new if isinstance(obj, ChangeLog)),
+        key=lambda obj: inspect(obj).insert_order,
+    )
+    if not entries:
+        return
+    connection = session.connection()
+
+    pending = [entry for entry in entries if entry.version is None]
+    if pending:
+        increments = Counter(_version_key(entry) for entry in pending)
+        result = connection.execute(version_upsert_statement(connection.dialect.name, increments))
+        # Each entity's new versions end at the returned value, assigned in insertion order
+        next_versions = {(row[0], row[1]): row[2] - increments[(row[0], row[1])] + 1 for row in result.all()}
+        for entry in pending:
+            key = _version_key(entry)
+            entry.version = next_versions[key]
+            next_versions[key] += 1
+
+    if connection.dialect.name != "postgresql":
+        next_seq = _next_sqlite_seq(connection)
+        for entry in entries:
+            if entry.seq is None:
+                entry.seq = next_seq
+                next_seq += 1
+
+
+def _next_sqlite_seq(connection) -> int:
+    """SQLite (tests) has no identity columns; writes there are serialized, so max + 1 is
+    safe. Checkpoints remember the highest seq ever used once old rows are pruned."""
+    return max(
+        connection.scalar(select(func.coalesce(func.max(ChangeLog.seq), 0))),
+        connection.scalar(select(func.coalesce(func.max(ChangeLogCheckpoint.seq), 0))),
+    ) + 1
+
+
+def _commit_seqs(connection, count: int) -> list[int]:
+    """`count` fresh seqs, higher than any seq a committed or committing writer holds"""
+    if connection.dialect.name != "postgresql":
+        first = _next_sqlite_seq(connection)
+        return list(range(first, first + count))
+    # Released at the end of this commit: the next writer renumbers after we are visible
+    connection.execute(select(func.pg_advisory_xact_lock(_COMMIT_SEQ_LOCK_KEY)))
+    result = connection.execute(
+        text("SELECT nextval('change_log_seq_seq') FROM generate_series(1, :count)"), {"count": count}
+    )
+    return sorted(result.scalars().all())
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_entries(session: Session, flush_context) -> None:
+    entries = [obj for obj in session.new if isinstance(obj, ChangeLog)]
+    if entries:
+        session.info.setdefault("change_log_flushed", []).extend(entries)
+
+
+@event.listens_for(Session, "before_commit")
+def _assign_commit_seqs(session: Session) -> None:
+    """Give this transaction's entries their final seqs, in flush order, right before commit."""
+    if session.in_nested_transaction():
+        return
+    # Commit would flush what is still pending after this hook; do it now so it is renumbered
+    session.flush()
+    # Entries flushed inside a rolled back savepoint are no longer persistent
+    entries = [entry for entry in session.info.pop("change_log_flushed", []) if inspect(entry).persistent]
+    if not entries:
+        return
+    entries.sort(key=lambda entry: entry.seq)
+    connection = session.connection()
+    seqs = _commit_seqs(connection, len(entries))
+    table = ChangeLog.__table__
+    connection.execute(
+        update(table)
+        # created_at lets PostgreSQL go straight to the entry's partition
+        .where(table.c.id == bindparam("entry_id"), table.c.created_at == bindparam("entry_created_at"))
+        .values(seq=bindparam("final_seq")),
+        [
+            {"entry_id": entry.id, "entry_created_at": entry.created_at, "final_seq": seq}
+            for entry, seq in zip(entries, seqs)
+        ],
+    )
+    for entry, seq in zip(entries, seqs):
+        set_committed_value(entry, "seq", seq)
+    change_stream.queue_committed_changes(session, connection, entries)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_flushed_entries(session: Session, previous_transaction) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop("change_log_flushed", None)
+
+
 async def get_deltas(
     db: AsyncSession,
     since: Optional[datetime] = None,
-    cursor_id: Optional[UUID] = None,
+    after_seq: Optional[int] = None,
     limit: int = 200,
     entity_types: Optional[Iterable[str]] = None,
 ) -> list[ChangeLog]:
-    """Return change log entries using keyset pagination.
-    If cursor_id provided, start strictly after that cursor (created_at, id).
-    Else use 'since' timestamp if provided.
+    """Return up to `limit` change log entries in insertion (seq) order.
+
+    If after_seq is provided, start strictly after that sequence number (a single
+    index range scan, no cursor row lookup). Else use 'since' timestamp if provided.
     """
     base = select(ChangeLog)
-    if cursor_id:
-        # Look up cursor row
-        cursor_row_result = await db.execute(select(ChangeLog).where(ChangeLog.id == cursor_id))
-        cursor_row = cursor_row_result.scalar_one_or_none()
-        if not cursor_row:
-            return []  # caller may choose to treat as reset
-        # Keyset comparison: (created_at, id) > (cursor.created_at, cursor.id)
-        base = base.where(
-            or_(
-                ChangeLog.created_at > cursor_row.created_at,
-                and_(ChangeLog.created_at == cursor_row.created_at, ChangeLog.id > cursor_row.id),
-            )
-        )
+    if after_seq is not None:
+        base = base.where(ChangeLog.seq > after_seq)
     elif since:
         base = base.where(ChangeLog.created_at > since)
 
     if entity_types:
         base = base.where(ChangeLog.entity_type.in_(list(entity_types)))
-    stmt = base.order_by(ChangeLog.created_at, ChangeLog.id).limit(limit + 1)
+    stmt = base.order_by(ChangeLog.seq).limit(limit)
     result = await db.execute(stmt)
     return result.scalars().all()
+
+
+async def get_seq_for_id(db: AsyncSession, change_id: UUID) -> Optional[int]:
+    """Sequence number of a change log entry, for clients still holding a UUID cursor"""
+    result = await db.execute(select(ChangeLog.seq).where(ChangeLog.id == change_id))
+    return result.scalar_one_or_none()
+
+
+def _change_log_columns():
+    return (
+        ChangeLog.id, ChangeLog.seq, ChangeLog.entity_type, ChangeLog.entity_id,
+        ChangeLog.op_type, ChangeLog.version, ChangeLog.payload_hash, ChangeLog.created_at,
+    )
+
+
+def _checkpoint_columns():
+    entry = ChangeLogCheckpointEntry
+    return (
+        entry.change_id.label("id"), entry.seq, entry.entity_type, entry.entity_id,
+        entry.op_type, entry.version, entry.payload_hash, entry.created_at,
+    )
+
+
+async def get_latest_checkpoint(db: AsyncSession) -> Optional[ChangeLogCheckpoint]:
+    result = await db.execute(select(ChangeLogCheckpoint).order_by(ChangeLogCheckpoint.seq.desc()).limit(1))
+    return result.scalar_one_or_none()
+
+
+async def get_compacted_deltas(
+    db: AsyncSession,
+    since: Optional[datetime] = None,
+    after_seq: Optional[int] = None,
+    limit: int = 200,
+    entity_types: Optional[Iterable[str]] = None,
+    checkpoint_seq: Optional[int] = None,
+) -> list:
+    """Latest change log entry per (entity_type, entity_id) after the cursor, in seq order.
+
+    Deletes are returned like any other op, as tombstones. Pages compose: the next
+    page starts after the last returned seq. If checkpoint_seq is given and the cursor
+    is older, entries up to the checkpoint come from the checkpoint (change_log rows
+    there may be pruned) and only the tail after it from change_log. Returns rows with
+    the ChangeLog column names.
+    """
+    tail = select(*_change_log_columns())
+    sources = []
+    if after_seq is not None:
+        if checkpoint_seq is not None and after_seq < checkpoint_seq:
+            sources.append(select(*_checkpoint_columns()).where(ChangeLogCheckpointEntry.seq > after_seq))
+            tail = tail.where(ChangeLog.seq > checkpoint_seq)
+        else:
+            tail = tail.where(ChangeLog.seq > after_seq)
+    elif since:
+        tail = tail.where(ChangeLog.created_at > since)
+    sources.append(tail)
+
+    if entity_types:
+        types = list(entity_types)
+        sources = [source.where(source.selected_columns.entity_type.in_(types)) for source in sources]
+    deltas = (union_all(*sources) if len(sources) > 1 else sources[0]).cte("deltas")
+
+    latest = select(func.max(deltas.c.seq)).group_by(deltas.c.entity_type, deltas.c.entity_id)
+    stmt = select(deltas).where(deltas.c.seq.in_(latest)).order_by(deltas.c.seq).limit(limit)
+    result = await db.execute(stmt)
+    return result.all()
+
+
+async def may_be_pruned_after(db: AsyncSession, after_seq: int) -> bool:
+    """Whether change_log rows after `after_seq` may have been pruned (the cursor is past the horizon)"""
+    result = await db.execute(select(func.min(ChangeLog.seq)))
+    min_seq = result.scalar()
+    return min_seq is None or min_seq > after_seq + 1
+
+
+def checkpoint_upsert_statement(dialect_name: str, after_seq: int, upto_seq: int):
+    """Fold the latest entry per entity in (after_seq, upto_seq] into the checkpoint entries"""
+    in_window = (ChangeLog.seq > after_seq, ChangeLog.seq <= upto_seq, ChangeLog.entity_id.is_not(None))
+    latest = select(func.max(ChangeLog.seq)).where(*in_window).group_by(ChangeLog.entity_type, ChangeLog.entity_id)
+    rows = select(
+        ChangeLog.entity_type, ChangeLog.entity_id, ChangeLog.id, ChangeLog.seq,
+        ChangeLog.op_type, ChangeLog.version, ChangeLog.payload_hash, ChangeLog.created_at,
+    ).where(ChangeLog.seq.in_(latest))
+    columns = ["entity_type", "entity_id", "change_id", "seq", "op_type", "version", "payload_hash", "created_at"]
+
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    stmt = insert(ChangeLogCheckpointEntry).from_select(columns, rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[ChangeLogCheckpointEntry.entity_type, ChangeLogCheckpointEntry.entity_id],
+        set_={name: stmt.excluded[name] for name in columns[2:]},
+        # Never move an entity back if two checkpoints race
+        where=ChangeLogCheckpointEntry.seq < stmt.excluded.seq,
+    )
+
+
+async def create_checkpoint(db: AsyncSession) -> Optional[ChangeLogCheckpoint]:
+    """Fold change_log rows since the latest checkpoint into a new one; None if nothing is new
+
+    Seqs commit in order, so no row can later appear below the checkpoint's seq.
+    """
+    latest = await get_latest_checkpoint(db)
+    after_seq = latest.seq if latest else 0
+    upto_seq = (await db.execute(select(func.max(ChangeLog.seq)))).scalar()
+    if upto_seq is None or upto_seq <= after_seq:
+        await db.commit()
+        return None
+
+    result = await db.execute(checkpoint_upsert_statement(db.bind.dialect.name, after_seq, upto_seq))
+    checkpoint = ChangeLogCheckpoint(seq=upto_seq, entities_updated=max(result.rowcount, 0))
+    db.add(checkpoint)
+    await db.commit()
+    return checkpoint
@@ -1,15 +1,307 @@
-from datetime import datetime, timedelta
+"""change_log retention.
+
+On PostgreSQL change_log is range-partitioned by month on created_at
+(change_log_pYYYYMM, plus change_log_default). Retention there drops whole
+partitions once they are entirely older than the cutoff, so rows can outlive the
+retention period by up to a month but are never deleted row by row.
+
+Partition maintenance runs whether or not retention is enabled: every pass creates
+this month's and the next few months' partitions. Only if rows still landed in
+change_log_default (the task was down across a month boundary) is the default
+partition detached while they are moved into their month's partition, so they
+are dropped with it later. Retention itself is off unless
+CHANGE_LOG_RETENTION_DAYS is set.
+
+Each run first writes a compaction checkpoint (app.services.change_log) covering
+every row it could prune, so cursors older than the horizon still resync.
+
+Unpartitioned tables (SQLite in tests, or a database not yet migrated) fall back to
+deletes of at most CHANGE_LOG_PRUNE_BATCH_SIZE rows per transaction, so the delta
+endpoint is never blocked behind one huge DELETE.
+
+start_retention_task runs this in the background every
+CHANGE_LOG_PRUNE_INTERVAL_SECONDS; retention_stats() feeds the health endpoint.
+"""
+import asyncio
+import logging
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import delete
 
+from app.core.config import settings
 from app.models.change_log import ChangeLog
+from app.services.change_log import create_checkpoint
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = "change_log_p"
+PARTITIONS_AHEAD = 2
+# pg_try_advisory_xact_lock key so only one worker prunes at a time
+_ADVISORY_LOCK_KEY = 0x6368616E6765  # "change"
+
+_stats: Dict[str, Any] = {
+    "runs": 0,
+    "rows_pruned_total": 0,
+    "partitions_dropped_total": 0,
+    "last_run_at": None,
+    "last_run_rows_pruned": 0,
+    "last_run_partitions_dropped": 0,
+    "last_run_seconds": None,
+    # Failure details go to the log only; stats are exposed over HTTP
+    "last_run_failed": False,
+    "last_failed_at": None,
+    "partitioned": None,
+    "last_checkpoint_seq": None,
+}
+
+
+def retention_stats() -> Dict[str, Any]:
+    return dict(_stats)
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARTITION_PREFIX}{month:%Y%m}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    """First day of the month a change_log_pYYYYMM partition covers, None for other names"""
+    if not name.startswith(PARTITION_PREFIX):
+        return None
+    try:
+        return datetime.strptime(name[len(PARTITION_PREFIX):], "%Y%m").date()
+    except ValueError:
+        return None
+
+
+async def is_partitioned(db: AsyncSession) -> bool:
+    if db.bind.dialect.name != "postgresql":
+        return False
+    result = await db.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'public.change_log'::regclass)"
+    ))
+    return bool(result.scalar())
+
+
+async def _monthly_partitions(db: AsyncSession) -> Dict[date, str]:
+    result = await db.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'public.change_log'::regclass"
+    ))
+    partitions = {}
+    for name in result.scalars():
+        month = partition_month(name)
+        if month is not None:
+            partitions[month] = name
+    return partitions
+
+
+async def _try_lock(db: AsyncSession) -> bool:
+    """Transaction-scoped lock so concurrent workers don't prune the same rows"""
+    if db.bind.dialect.name != "postgresql":
+        return True
+    result = await db.execute(select(func.pg_try_advisory_xact_lock(_ADVISORY_LOCK_KEY)))
+    return bool(result.scalar())
+
+
+async def _default_partition_months(db: AsyncSession) -> set[date]:
+    """Months with rows in change_log_default; normally it is empty and only probed"""
+    has_rows = await db.execute(text('SELECT EXISTS (SELECT 1 FROM "public"."change_log_default")'))
+    if not has_rows.scalar():
+        return set()
+    result = await db.execute(text(
+        "SELECT DISTINCT date_trunc('month', \"created_at\")::date FROM \"public\".\"change_log_default\""
+    ))
+    return set(result.scalars())
+
+
+def create_partition_statements(month: date, move_default_rows: bool = False) -> list[str]:
+    """DDL creating month's partition.
+
+    A partition can't be created while change_log_default holds rows in its range, so
+    with move_default_rows the default partition is detached for the duration and
+    those rows are moved into the new partition.
+    """
+    name = partition_name(month)
+    bounds = f"FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+    create = f'CREATE TABLE "public"."{name}" PARTITION OF "public"."change_log" FOR VALUES {bounds}'
+    if not move_default_rows:
+        return [create]
+    in_range = f"created_at >= '{month.isoformat()}' AND created_at < '{_next_month(month).isoformat()}'"
+    return [
+        'ALTER TABLE "public"."change_log" DETACH PARTITION "public"."change_log_default"',
+        create,
+        f'INSERT INTO "public"."{name}" SELECT * FROM "public"."change_log_default" WHERE {in_range}',
+        f'DELETE FROM "public"."change_log_default" WHERE {in_range}',
+        'ALTER TABLE "public"."change_log" ATTACH PARTITION "public"."change_log_default" DEFAULT',
+    ]
+
+
+async def ensure_partitions(db: AsyncSession, today: Optional[date] = None) -> list[str]:
+    """Create partitions for this month, the next PARTITIONS_AHEAD, and any month with rows
+    stranded in change_log_default; returns new names (none if another worker holds the lock)
+    """
+    if not await _try_lock(db):
+        await db.rollback()
+        return []
+    month = _month_start(today or datetime.utcnow().date())
+    wanted = set()
+    for _ in range(PARTITIONS_AHEAD + 1):
+        wanted.add(month)
+        month = _next_month(month)
+    stranded = await _default_partition_months(db)
+    existing = await _monthly_partitions(db)
+    created = []
+    for month in sorted((wanted | stranded) - existing.keys()):
+        for statement in create_partition_statements(month, month in stranded):
+            await db.execute(text(statement))
+        created.append(partition_name(month))
+    await db.commit()
+    if stranded:
+        logger.info("Moved change_log rows out of the default partition for %s", sorted(stranded))
+    return created
+
+
+async def drop_expired_partitions(db: AsyncSession, cutoff: datetime) -> list[str]:
+    """Drop monthly partitions whose whole range is older than cutoff"""
+    dropped = []
+    for month, name in sorted((await _monthly_partitions(db)).items()):
+        if datetime.combine(_next_month(month), datetime.min.time()) > cutoff:
+            break
+        if not await _try_lock(db):
+            await db.rollback()
+            break
+        await db.execute(text(f'ALTER TABLE "public"."change_log" DETACH PARTITION "public"."{name}"'))
+        await db.execute(text(f'DROP TABLE "public"."{name}"'))
+        await db.commit()
+        dropped.append(name)
+    return dropped
+
+
+async def delete_in_batches(
+    db: AsyncSession,
+    cutoff: datetime,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+) -> int:
+    """Delete rows older than cutoff, at most batch_size per transaction; returns rows deleted"""
+    batch_size = batch_size or settings.CHANGE_LOG_PRUNE_BATCH_SIZE
+    max_batches = max_batches or settings.CHANGE_LOG_PRUNE_MAX_BATCHES
+    deleted = 0
+    for _ in range(max_batches):
+        if not await _try_lock(db):
+            await db.rollback()
+            break
+        batch = (
+            select(ChangeLog.seq)
+            .where(ChangeLog.created_at < cutoff)
+            .order_by(ChangeLog.seq)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        result = await db.execute(delete(ChangeLog).where(ChangeLog.seq.in_(batch)))
+        await db.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            break
+        # Let delta reads in between batches
+        await asyncio.sleep(0)
+    return deleted
+
+
+async def run_retention(db: AsyncSession, older_than_days: Optional[int] = None) -> Dict[str, int]:
+    """One retention pass: checkpoint, maintain partitions, drop or delete expired rows, record stats"""
+    days = older_than_days if older_than_days is not None else settings.CHANGE_LOG_RETENTION_DAYS
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    started = time.monotonic()
+    dropped: list[str] = []
+    try:
+        # Everything about to be pruned must first be covered by a checkpoint
+        checkpoint = await create_checkpoint(db)
+        if checkpoint is not None:
+            _stats["last_checkpoint_seq"] = checkpoint.seq
+        partitioned = await is_partitioned(db)
+        _stats["partitioned"] = partitioned
+        delete_before = cutoff
+        if partitioned:
+            await ensure_partitions(db)
+            dropped = await drop_expired_partitions(db, cutoff)
+            remaining = await _monthly_partitions(db)
+            if remaining:
+                # Only rows that landed in the default partition, older than every monthly one
+                delete_before = min(cutoff, datetime.combine(min(remaining), datetime.min.time()))
+        rows = await delete_in_batches(db, delete_before)
+    except Exception:
+        await db.rollback()
+        _stats["last_run_failed"] = True
+        _stats["last_failed_at"] = datetime.utcnow().isoformat()
+        raise
+    _stats["runs"] += 1
+    _stats["rows_pruned_total"] += rows
+    _stats["partitions_dropped_total"] += len(dropped)
+    _stats["last_run_at"] = datetime.utcnow().isoformat()
+    _stats["last_run_rows_pruned"] = rows
+    _stats["last_run_partitions_dropped"] = len(dropped)
+    _stats["last_run_seconds"] = round(time.monotonic() - started, 3)
+    _stats["last_run_failed"] = False
+    if rows or dropped:
+        logger.info("Pruned %s change_log rows and %s partitions older than %s", rows, len(dropped), cutoff)
+    return {"rows_pruned": rows, "partitions_dropped": len(dropped)}
+
 
 async def prune_change_log(db: AsyncSession, older_than_days: int = 30) -> int:
     """Delete change log rows older than the given age.
-    Returns number of rows scheduled for deletion (best-effort; rowcount may be dialect-dependent).
+    Returns number of rows deleted; whole partitions dropped are not counted.
     """
-    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
-    stmt = delete(ChangeLog).where(ChangeLog.created_at < cutoff)
-    result = await db.execute(stmt)
-    await db.commit()
-    return result.rowcount if hasattr(result, 'rowcount') else -1
+    return (await run_retention(db, older_than_days))["rows_pruned"]
+
+
+async def run_maintenance(db: AsyncSession) -> None:
+    """One background pass: retention when enabled, otherwise just partition upkeep"""
+    if settings.CHANGE_LOG_RETENTION_DAYS > 0:
+        await run_retention(db)
+    elif await is_partitioned(db):
+        await ensure_partitions(db)
+
+
+_retention_task: Optional[asyncio.Task] = None
+
+
+async def _retention_loop() -> None:
+    from app.db.session import AsyncSessionLocal
+
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await run_maintenance(db)
+        except Exception as e:
+            logger.warning(f"change_log retention run failed: {type(e).__name__} {e}")
+        await asyncio.sleep(settings.CHANGE_LOG_PRUNE_INTERVAL_SECONDS)
+
+
+def start_retention_task() -> None:
+    """Start periodic maintenance; with CHANGE_LOG_RETENTION_DAYS at 0 nothing is pruned"""
+    global _retention_task
+    if _retention_task is None or _retention_task.done():
+        _retention_task = asyncio.create_task(_retention_loop())
+
+
+async def stop_retention_task() -> None:
+    global _retention_task
+    if _retention_task is not None and not _retention_task.done():
+        _retention_task.cancel()
+        try:
+            await _retention_task
+        except (asyncio.CancelledError, Exception):
+            pass
+    _retention_task = None
@@ -0,0 +1,98 @@
+"""Current-state payloads for change log entries.
+
+When a delta page is requested with payloads, the entities it references are loaded
+with one query per entity type and serialized with the same response schemas the
+regular endpoints use, so a sync round needs no follow-up GET per entity.
+
+Entries get payload None when the entity is gone (deleted since) or its type has no
+loader below; clients fall back to fetching those individually.
+"""
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.crud import outing as crud_outing
+from app.models.change_log import ChangeLog
+from app.models.family import FamilyMember
+from app.models.organization import Organization
+from app.models.participant import Participant
+from app.models.place import Place
+from app.models.requirement import MeritBadge, RankRequirement
+from app.models.signup import Signup
+from app.models.troop import Patrol, Troop
+from app.schemas.family import FamilyMemberResponse
+from app.schemas.organization import OrganizationResponse
+from app.schemas.place import PlaceResponse
+from app.schemas.requirement import MeritBadgeResponse, RankRequirementResponse
+from app.schemas.troop import PatrolResponse, TroopResponse
+from app.services.outing_capacity import build_outing_response
+from app.services.signup_roster import build_signup_responses, fetch_roster_rows
+
+Payloads = dict[UUID, dict[str, Any]]
+PayloadLoader = Callable[[AsyncSession, list[UUID]], Awaitable[Payloads]]
+
+
+def _simple_loader(model, schema, *options) -> PayloadLoader:
+    async def load(db: AsyncSession, ids: list[UUID]) -> Payloads:
+        result = await db.execute(select(model).options(*options).where(model.id.in_(ids)))
+        return {obj.id: schema.model_validate(obj).model_dump(mode="json") for obj in result.scalars().all()}
+    return load
+
+
+async def _load_outings(db: AsyncSession, ids: list[UUID]) -> Payloads:
+    outings = await crud_outing.get_outings_by_ids(db, ids)
+    return {outing.id: build_outing_response(outing).model_dump(mode="json") for outing in outings}
+
+
+async def _load_signups(db: AsyncSession, ids: list[UUID]) -> Payloads:
+    signups = build_signup_responses(await fetch_roster_rows(db, Signup.id.in_(ids)))
+    return {signup.id: signup.model_dump(mode="json") for signup in signups}
+
+
+async def _load_participants(db: AsyncSession, ids: list[UUID]) -> Payloads:
+    signups = build_signup_responses(await fetch_roster_rows(db, Participant.id.in_(ids)))
+    return {
+        participant.id: {**participant.model_dump(mode="json"), "signup_id": str(signup.id)}
+        for signup in signups
+        for participant in signup.participants
+    }
+
+
+PAYLOAD_LOADERS: dict[str, PayloadLoader] = {
+    "outing": _load_outings,
+    "signup": _load_signups,
+    "participant": _load_participants,
+    "place": _simple_loader(Place, PlaceResponse),
+    "family_member": _simple_loader(
+        FamilyMember,
+        FamilyMemberResponse,
+        selectinload(FamilyMember.dietary_preferences),
+        selectinload(FamilyMember.allergies),
+    ),
+    "troop": _simple_loader(Troop, TroopResponse, selectinload(Troop.patrols)),
+    "patrol": _simple_loader(Patrol, PatrolResponse),
+    "organization": _simple_loader(Organization, OrganizationResponse),
+    "rank_requirement": _simple_loader(RankRequirement, RankRequirementResponse),
+    "merit_badge": _simple_loader(MeritBadge, MeritBadgeResponse),
+}
+
+
+async def load_change_payloads(
+    db: AsyncSession, entries: Iterable[ChangeLog]
+) -> dict[tuple[str, UUID], Optional[dict[str, Any]]]:
+    """Current serialized state keyed by (entity_type, entity_id), one query per entity type"""
+    ids_by_type: dict[str, set[UUID]] = defaultdict(set)
+    for entry in entries:
+        if entry.entity_id is not None and entry.entity_type in PAYLOAD_LOADERS:
+            ids_by_type[entry.entity_type].add(entry.entity_id)
+
+    payloads: dict[tuple[str, UUID], Optional[dict[str, Any]]] = {}
+    for entity_type, ids in ids_by_type.items():
+        loaded = await PAYLOAD_LOADERS[entity_type](db, list(ids))
+        for entity_id, payload in loaded.items():
+            payloads[(entity_type, entity_id)] = payload
+    return payloads
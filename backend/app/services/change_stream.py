@@ -0,0 +1,273 @@
+"""Live fan-out of change log entries to connected clients.
+
+Every committed change log entry becomes an event on the in-process ChangeBroker,
+which copies it into the bounded queue of each subscription whose entity types
+match. Where events come from depends on the database:
+
+* PostgreSQL: the committing transaction sends pg_notify on CHANNEL once its
+  entries have their final seqs, which is delivered to every worker at commit (and
+  never on rollback); one LISTEN connection per worker (start_listener) publishes
+  them to the local broker.
+* Anything else (SQLite in tests): a session's entries are held until it
+  commits, then published directly. Only this process sees them.
+
+Backpressure is per client: publishing never waits. A subscription whose queue is
+full is marked overflowed and stops receiving; its consumer drains what was queued,
+then tells the client to catch up from /api/offline/deltas and reconnect.
+"""
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from app.models.change_log import ChangeLog
+from app.utils.pagination import encode_cursor
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "change_log"
+SUBSCRIBER_QUEUE_SIZE = 256
+KEEPALIVE_SECONDS = 15
+# NOTIFY payloads are limited to 8000 bytes; stay well clear of it
+_NOTIFY_PAYLOAD_LIMIT = 7000
+_LISTENER_RETRY_SECONDS = 5
+# How long a live stream waits on a gap in seqs before moving its cursor past it
+GAP_SETTLE_SECONDS = 1.0
+
+
+def change_event(entry: ChangeLog) -> dict[str, Any]:
+    return {
+        "seq": entry.seq,
+        "id": str(entry.id),
+        "entity_type": entry.entity_type,
+        "entity_id": str(entry.entity_id) if entry.entity_id is not None else None,
+        "op_type": entry.op_type,
+        "version": entry.version,
+        "created_at": entry.created_at.isoformat(),
+    }
+
+
+@dataclass(eq=False)
+class Subscription:
+    """One connected client: its entity type filter and bounded event queue"""
+    entity_types: Optional[frozenset[str]]
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE))
+    overflowed: bool = False
+
+    def wants(self, change: dict) -> bool:
+        return self.entity_types is None or change["entity_type"] in self.entity_types
+
+
+class ChangeBroker:
+    def __init__(self):
+        self._subscriptions: set[Subscription] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self, entity_types: Optional[Iterable[str]] = None) -> Subscription:
+        subscription = Subscription(frozenset(entity_types) if entity_types is not None else None)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def publish(self, changes: Iterable[dict]) -> None:
+        """Queue changes for every matching subscriber without ever waiting on one"""
+        for change in changes:
+            for subscription in self._subscriptions:
+                if subscription.overflowed or not subscription.wants(change):
+                    continue
+                try:
+                    subscription.queue.put_nowait(change)
+                except asyncio.QueueFull:
+                    subscription.overflowed = True
+                    logger.warning("Change stream subscriber fell behind; asking it to resync")
+
+
+broker = ChangeBroker()
+
+
+def _notify_payloads(changes: list[dict]) -> list[str]:
+    """JSON arrays of changes, each small enough for one NOTIFY"""
+    payloads, batch, size = [], [], 2
+    for change in changes:
+        encoded = json.dumps(change, separators=(",", ":"))
+        if batch and size + len(encoded) + 1 > _NOTIFY_PAYLOAD_LIMIT:
+            payloads.append("[" + ",".join(batch) + "]")
+            batch, size = [], 2
+        batch.append(encoded)
+        size += len(encoded) + 1
+    if batch:
+        payloads.append("[" + ",".join(batch) + "]")
+    return payloads
+
+
+def queue_committed_changes(session: Session, connection, entries: Iterable[ChangeLog]) -> None:
+    """Send entries that are about to commit, with their final seqs, to the live streams.
+
+    Called by app.services.change_log right before commit.
+    """
+    changes = sorted((change_event(entry) for entry in entries), key=lambda change: change["seq"])
+    if connection.dialect.name == "postgresql":
+        for payload in _notify_payloads(changes):
+            connection.execute(select(func.pg_notify(CHANNEL, payload)))
+    else:
+        session.info.setdefault("change_stream_pending", []).extend(changes)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_changes(session: Session) -> None:
+    changes = session.info.pop("change_stream_pending", None)
+    if changes:
+        broker.publish(changes)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back_changes(session: Session, previous_transaction) -> None:
+    session.info.pop("change_stream_pending", None)
+
+
+def _on_notify(connection, pid, channel, payload) -> None:
+    try:
+        broker.publish(json.loads(payload))
+    except ValueError:
+        logger.warning("Ignoring malformed %s notification", channel)
+
+
+_listener_task: Optional[asyncio.Task] = None
+
+
+async def _listen(engine: AsyncEngine) -> None:
+    """Hold one LISTEN connection, reconnecting after failures, until cancelled"""
+    while True:
+        try:
+            async with engine.connect() as conn:
+                raw = await conn.get_raw_connection()
+                driver_connection = raw.driver_connection
+                await driver_connection.add_listener(CHANNEL, _on_notify)
+                try:
+                    # Notifications arrive via callback; just keep the connection open
+                    while not driver_connection.is_closed():
+                        await asyncio.sleep(_LISTENER_RETRY_SECONDS)
+                finally:
+                    if not driver_connection.is_closed():
+                        await driver_connection.remove_listener(CHANNEL, _on_notify)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Change stream listener lost its connection; retrying")
+        await asyncio.sleep(_LISTENER_RETRY_SECONDS)
+
+
+async def start_listener(engine: AsyncEngine) -> None:
+    """Start relaying pg_notify events to the local broker (no-op off PostgreSQL)"""
+    global _listener_task
+    if engine.dialect.name != "postgresql" or _listener_task is not None:
+        return
+    _listener_task = asyncio.create_task(_listen(engine))
+
+
+async def stop_listener() -> None:
+    global _listener_task
+    if _listener_task is None:
+        return
+    _listener_task.cancel()
+    try:
+        await _listener_task
+    except asyncio.CancelledError:
+        pass
+    _listener_task = None
+
+
+def sse_message(event_name: str, data: dict, event_id: Optional[str] = None) -> bytes:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_name}")
+    lines.append("data: " + json.dumps(data, separators=(",", ":")))
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+class StreamCursor:
+    """The /deltas cursor a live stream can hand out: no seq at or below it may still arrive.
+
+    Seqs commit in order, but a stream still sees gaps: filtered out or rolled back
+    seqs, and those already sent by the replay. The cursor moves up through seqs
+    seen back to back; past a gap only once some higher seq has waited
+    settle_seconds, after which the missing seq is taken to be one of those.
+    """
+
+    def __init__(self, seq: Optional[int], settle_seconds: float):
+        self.seq = seq
+        self.settle_seconds = settle_seconds
+        # Seqs sent above the cursor -> when they arrived
+        self._ahead: dict[int, float] = {}
+
+    def saw(self, seq: int) -> None:
+        if self.seq is None or seq > self.seq:
+            self._ahead[seq] = time.monotonic()
+        self.settle()
+
+    def settle(self) -> None:
+        cutoff = time.monotonic() - self.settle_seconds
+        aged = [seq for seq, arrived in self._ahead.items() if arrived <= cutoff]
+        if aged:
+            self.seq = max(aged) if self.seq is None else max(self.seq, *aged)
+        while self.seq is not None and self.seq + 1 in self._ahead:
+            self.seq += 1
+        if self.seq is not None:
+            self._ahead = {seq: arrived for seq, arrived in self._ahead.items() if seq > self.seq}
+
+    @property
+    def cursor(self) -> Optional[str]:
+        return encode_cursor(self.seq) if self.seq is not None else None
+
+
+async def sse_events(
+    subscription: Subscription,
+    replay: Iterable[dict] = (),
+    after_seq: Optional[int] = None,
+    keepalive_seconds: float = KEEPALIVE_SECONDS,
+    settle_seconds: float = GAP_SETTLE_SECONDS,
+):
+    """Server-Sent Events for a subscription, after replaying `replay`.
+
+    Event ids are delta cursors (see StreamCursor), so a reconnecting client's
+    Last-Event-ID (or the cursor in a "resync" event) can be passed straight to
+    /api/offline/deltas. Live events already sent during the replay are skipped.
+    Always unsubscribes when the stream ends or the client goes away.
+    """
+    cursor = StreamCursor(after_seq, settle_seconds)
+    replayed: set[int] = set()
+    try:
+        for change in replay:
+            # Replay comes from /deltas: every seq below it has already committed
+            replayed.add(change["seq"])
+            cursor.seq = change["seq"]
+            yield sse_message("change", change, cursor.cursor)
+        while True:
+            if subscription.overflowed and subscription.queue.empty():
+                cursor.settle()
+                yield sse_message("resync", {"cursor": cursor.cursor})
+                return
+            try:
+                change = await asyncio.wait_for(subscription.queue.get(), keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if change["seq"] in replayed:
+                replayed.discard(change["seq"])
+                continue
+            cursor.saw(change["seq"])
+            yield sse_message("change", change, cursor.cursor)
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,148 @@
+"""Replay of check-ins recorded while offline.
+
+The check-in page queues check-ins and undos locally when it has no connection and
+sends them in one batch when it is back. Each operation carries a client-generated
+idempotency key and the time it happened on the device.
+
+Operations are applied oldest first, last writer wins per participant: an operation
+is stale (recorded, not applied) unless it is newer than the participant's last
+write, i.e. their current check-in time or the latest operation applied to them,
+including undos made online. Timestamps in the future are clamped to now so one
+device with a fast clock can't lock everyone else out.
+
+A batch is one transaction holding the outing row lock, so replays from several
+devices for the same outing are serialized. Whatever a batch applies is written with
+at most one DELETE and one INSERT on checkins plus one INSERT into the operation log;
+keys already in the log are reported as duplicates, so resending a batch after a
+dropped response changes nothing.
+"""
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import checkin as crud_checkin
+from app.crud import outing as crud_outing
+from app.models.checkin import CheckIn, CheckInOperation
+from app.schemas.checkin import CheckInOperationCreate, CheckInOperationResult
+from app.utils.timezone import utc_now
+
+# (checked_in_at, checked_in_by) of a checked-in participant
+CheckInState = tuple[datetime, str]
+
+
+def _as_utc(occurred_at: datetime, now: datetime) -> datetime:
+    """Naive UTC, no later than now; naive client timestamps are taken as UTC"""
+    if occurred_at.tzinfo is not None:
+        occurred_at = occurred_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return min(occurred_at, now)
+
+
+async def replay_checkin_operations(
+    db: AsyncSession,
+    outing_id: UUID,
+    operations: list[CheckInOperationCreate],
+    checked_in_by: str,
+) -> list[CheckInOperationResult]:
+    """Apply queued operations for an outing; returns one result per operation, in request order.
+
+    checked_in_by is used for check-ins that don't name who performed them.
+    """
+    outing = await crud_outing.get_outing_for_update(db, outing_id)
+    if not outing:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Outing not found")
+
+    now = utc_now()
+    results: dict[int, CheckInOperationResult] = {}
+    seen = await crud_checkin.get_operation_keys(db, outing_id, {op.idempotency_key for op in operations})
+    fresh = []
+    for index, op in enumerate(operations):
+        if op.idempotency_key in seen:
+            results[index] = _result(op, "duplicate", "Already processed")
+            continue
+        seen.add(op.idempotency_key)
+        fresh.append((_as_utc(op.occurred_at, now), index, op))
+
+    participant_ids = {op.participant_id for _, _, op in fresh}
+    signup_ids = await crud_checkin.get_participant_signup_ids(db, outing_id, participant_ids) if fresh else {}
+    initial: dict[UUID, Optional[CheckInState]] = {}
+    last_write: dict[UUID, datetime] = {}
+    if signup_ids:
+        last_write = await crud_checkin.get_last_applied_operations(db, outing_id, signup_ids)
+        for checkin in await crud_checkin.get_checkins_for_participants(db, outing_id, signup_ids):
+            initial[checkin.participant_id] = (checkin.checked_in_at, checkin.checked_in_by)
+            last_write[checkin.participant_id] = max(
+                last_write.get(checkin.participant_id, checkin.checked_in_at), checkin.checked_in_at
+            )
+
+    state = dict(initial)
+    log_rows = []
+    for occurred_at, index, op in sorted(fresh, key=lambda item: (item[0], item[1])):
+        performed_by = op.checked_in_by or checked_in_by
+        participant_id = op.participant_id
+        if participant_id not in signup_ids:
+            result = _result(op, "rejected", "Participant is not signed up for this outing")
+        elif participant_id in last_write and occurred_at <= last_write[participant_id]:
+            result = _result(op, "stale", "A newer change for this participant already applies")
+        else:
+            result = _result(op, "applied")
+            last_write[participant_id] = occurred_at
+            if op.op == "undo":
+                state[participant_id] = None
+            elif state.get(participant_id) is None:
+                state[participant_id] = (occurred_at, performed_by)
+        results[index] = result
+        log_rows.append({
+            "outing_id": outing_id,
+            "idempotency_key": op.idempotency_key,
+            "participant_id": participant_id,
+            "op": op.op,
+            "occurred_at": occurred_at,
+            "checked_in_by": performed_by if op.op == "checkin" else None,
+            "status": result.status,
+            "processed_at": now,
+        })
+
+    removed = [pid for pid, before in initial.items() if state.get(pid) != before]
+    added = {pid: after for pid, after in state.items() if after is not None and initial.get(pid) != after}
+    insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+    if removed:
+        await db.execute(delete(CheckIn).where(CheckIn.outing_id == outing_id, CheckIn.participant_id.in_(removed)))
+    if added:
+        await db.execute(
+            insert(CheckIn)
+            .values([
+                {
+                    "id": uuid4(),
+                    "outing_id": outing_id,
+                    "signup_id": signup_ids[participant_id],
+                    "participant_id": participant_id,
+                    "checked_in_by": performed_by,
+                    "checked_in_at": checked_in_at,
+                    "created_at": now,
+                }
+                for participant_id, (checked_in_at, performed_by) in added.items()
+            ])
+            .on_conflict_do_nothing(index_elements=[CheckIn.outing_id, CheckIn.participant_id])
+        )
+    if log_rows:
+        await db.execute(
+            insert(CheckInOperation)
+            .values(log_rows)
+            .on_conflict_do_nothing(index_elements=[CheckInOperation.outing_id, CheckInOperation.idempotency_key])
+        )
+    await db.commit()
+    return [results[index] for index in range(len(operations))]
+
+
+def _result(op: CheckInOperationCreate, outcome: str, detail: Optional[str] = None) -> CheckInOperationResult:
+    return CheckInOperationResult(
+        idempotency_key=op.idempotency_key,
+        participant_id=op.participant_id,
+        status=outcome,
+        detail=detail,
+    )
@@ -0,0 +1,277 @@
+"""Rendered outing handouts, cached on disk by content.
+
+A handout is keyed by outing id plus handout_digest(): a SHA-256 over everything
+the handout shows (outing fields, places, requirements and merit badges, packing
+lists and their items, participants' troop numbers) and HANDOUT_LAYOUT_VERSION.
+Any change to those inputs, whether or not it went through the change log (packing
+list edits don't), yields a new key, so a cached file is never stale; the digest
+doubles as the response ETag and the file's mtime as Last-Modified.
+
+Files live in PDF_CACHE_DIR as <outing id>-<digest>.pdf. The cache is bounded by
+PDF_CACHE_MAX_BYTES, evicting least recently served files first (use is tracked in
+each file's atime, set explicitly so noatime mounts don't matter). Committed
+change log entries for an outing drop its files (in the default executor, off the
+event loop) rather than waiting for eviction, and storing a new render replaces the outing's previous ones.
+
+HandoutCache is the backend interface; DiskHandoutCache is the implementation used
+unless set_handout_cache() installs another.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, Optional
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.change_log import ChangeLog
+from app.models.outing import Outing
+from app.services.pdf_generator import handout_troop_numbers
+
+logger = logging.getLogger(__name__)
+
+# Bump when the handout layout changes so existing renders are not served
+HANDOUT_LAYOUT_VERSION = 1
+_CHUNK_SIZE = 64 * 1024
+
+
+def _columns(obj: Any) -> Optional[dict]:
+    if obj is None:
+        return None
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+
+def _by_id(rows) -> list:
+    """Relationship collections come back in no particular order"""
+    return sorted(rows, key=lambda row: str(row.id))
+
+
+def handout_digest(outing: Outing) -> str:
+    """Content hash of the handout's inputs; outing must be loaded with get_outing_with_details"""
+    data = {
+        "layout": HANDOUT_LAYOUT_VERSION,
+        "outing": _columns(outing),
+        "places": [_columns(outing.outing_place), _columns(outing.pickup_place), _columns(outing.dropoff_place)],
+        "requirements": [_columns(req.requirement) for req in _by_id(outing.outing_requirements)],
+        "merit_badges": [_columns(badge.merit_badge) for badge in _by_id(outing.outing_merit_badges)],
+        "packing_lists": [
+            {"list": _columns(packing_list), "items": [_columns(item) for item in _by_id(packing_list.items)]}
+            for packing_list in _by_id(outing.packing_lists)
+        ],
+        "troops": sorted(handout_troop_numbers(outing)),
+    }
+    blob = json.dumps(data, sort_keys=True, default=str).encode()
+    return hashlib.sha256(blob).hexdigest()
+
+
+@dataclass
+class CachedHandout:
+    """An open cached file; stream it with chunks() (the handle closes at the end)"""
+    handle: BinaryIO
+    digest: str
+    size: int
+    last_modified: datetime
+
+    def chunks(self) -> Iterator[bytes]:
+        with self.handle:
+            while chunk := self.handle.read(_CHUNK_SIZE):
+                yield chunk
+
+
+class HandoutCache(ABC):
+    """Backend interface for rendered handouts; open and store do blocking I/O"""
+
+    @abstractmethod
+    def open(self, outing_id: UUID, digest: str) -> Optional[CachedHandout]:
+        ...
+
+    @abstractmethod
+    def store(self, outing_id: UUID, digest: str, pdf: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def invalidate(self, outing_id: UUID) -> None:
+        ...
+
+    def stats(self) -> dict:
+        return {}
+
+
+class DiskHandoutCache(HandoutCache):
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, outing_id: UUID, digest: str) -> Path:
+        return self.directory / f"{outing_id}-{digest}.pdf"
+
+    def open(self, outing_id: UUID, digest: str) -> Optional[CachedHandout]:
+        path = self._path(outing_id, digest)
+        try:
+            # An open handle keeps streaming even if the file is evicted meanwhile
+            handle = open(path, "rb")
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        stat = os.fstat(handle.fileno())
+        try:
+            os.utime(path, (time.time(), stat.st_mtime))
+        except OSError:
+            pass
+        self.hits += 1
+        return CachedHandout(
+            handle=handle,
+            digest=digest,
+            size=stat.st_size,
+            last_modified=datetime.fromtimestamp(int(stat.st_mtime), tz=timezone.utc),
+        )
+
+    def store(self, outing_id: UUID, digest: str, pdf: bytes) -> None:
+        if self.max_bytes <= 0 or len(pdf) > self.max_bytes:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Write then rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(pdf)
+            os.replace(tmp_path, self._path(outing_id, digest))
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        self._remove(outing_id, keep=digest)
+        self._evict()
+
+    def invalidate(self, outing_id: UUID) -> None:
+        self._remove(outing_id)
+
+    def _remove(self, outing_id: UUID, keep: Optional[str] = None) -> None:
+        keep_name = self._path(outing_id, keep).name if keep else None
+        for path in self.directory.glob(f"{outing_id}-*.pdf"):
+            if path.name != keep_name:
+                path.unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        with self._lock:
+            files = []
+            for path in self.directory.glob("*.pdf"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_atime, stat.st_size, path))
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files, key=lambda f: f[0]):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        sizes = []
+        for path in self.directory.glob("*.pdf"):
+            try:
+                sizes.append(path.stat().st_size)
+            except FileNotFoundError:
+                continue
+        return {
+            "files": len(sizes),
+            "bytes": sum(sizes),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def not_modified_since(if_modified_since: Optional[str], last_modified: datetime) -> bool:
+    """If-Modified-Since evaluation; unparseable dates never match"""
+    if not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified <= since
+
+
+_cache: Optional[HandoutCache] = None
+
+
+def get_handout_cache() -> HandoutCache:
+    global _cache
+    if _cache is None:
+        directory = settings.PDF_CACHE_DIR or os.path.join(tempfile.gettempdir(), "trailhead-handouts")
+        _cache = DiskHandoutCache(Path(directory), settings.PDF_CACHE_MAX_BYTES)
+    return _cache
+
+
+def set_handout_cache(cache: Optional[HandoutCache]) -> None:
+    """Install a different backend (None resets to the configured disk cache)"""
+    global _cache
+    _cache = cache
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_outings(session: Session, flush_context) -> None:
+    outing_ids = {
+        obj.entity_id for obj in session.new
+        if isinstance(obj, ChangeLog) and obj.entity_type == "outing" and obj.entity_id is not None
+    }
+    if outing_ids:
+        session.info.setdefault("handout_cache_stale", set()).update(outing_ids)
+
+
+# Invalidations still running in the executor
+_pending_invalidations: set = set()
+
+
+def _drop_cached_handouts(cache: HandoutCache, outing_ids: set) -> None:
+    for outing_id in outing_ids:
+        try:
+            cache.invalidate(outing_id)
+        except OSError:
+            logger.warning("Could not drop cached handouts for outing %s", outing_id, exc_info=True)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_outings(session: Session) -> None:
+    outing_ids = session.info.pop("handout_cache_stale", None)
+    if not outing_ids:
+        return
+    cache = get_handout_cache()
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Plain synchronous session: no event loop to keep free
+        _drop_cached_handouts(cache, outing_ids)
+        return
+    # Globbing and unlinking must not hold up the committing request's event loop.
+    # Nothing waits on it: keys are content digests, so a stale file is never served.
+    future = loop.run_in_executor(None, _drop_cached_handouts, cache, outing_ids)
+    _pending_invalidations.add(future)
+    future.add_done_callback(_pending_invalidations.discard)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_changed_outings(session: Session, previous_transaction) -> None:
+    session.info.pop("handout_cache_stale", None)
@@ -0,0 +1,170 @@
+"""Inverted keyword index for requirement and merit badge suggestions.
+
+Suggestions match an outing's keywords against each rank requirement's and merit
+badge's keywords, allowing for simple plurals and '-ing' forms (hiking matches
+hike). Rather than loading every row and normalizing its keywords per lookup:
+
+* keyword_forms holds every form a row's keywords match under. On PostgreSQL a
+  trigger (migration 20261017000011) computes it on every write, plain SQL
+  included; the before_flush hook below sets it for ORM writes on any database;
+* search() selects only rows whose forms overlap the outing's forms. On PostgreSQL
+  that is `keyword_forms && :forms`, served by a GIN index. Other databases (SQLite
+  in tests and local runs) use an in-memory form -> ids index per engine, built on
+  first use and dropped whenever a flushed change touches the table (rows written
+  with plain SQL show up the next time it is rebuilt).
+
+A row matches exactly when calculate_match_score would give it a non-zero score.
+"""
+import weakref
+from functools import lru_cache
+from itertools import chain
+from typing import Iterable, Optional, Type, Union
+from uuid import UUID
+
+from sqlalchemy import String, event, inspect, select, type_coerce
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.requirement import MeritBadge, RankRequirement
+
+Indexed = Union[RankRequirement, MeritBadge]
+_INDEXED_MODELS = (RankRequirement, MeritBadge)
+
+
+@lru_cache(maxsize=4096)
+def expand_keyword(token: str) -> frozenset[str]:
+    """Forms a requirement keyword matches under (hiking -> hiking, hik, hike)"""
+    forms = {token}
+    if token.endswith('s') and len(token) > 3:
+        forms.add(token[:-1])
+    if token.endswith('ing') and len(token) > 5:
+        base = token[:-3]
+        forms.add(base)
+        forms.add(base + 'e')  # handle common pattern: hiking -> hike
+    return frozenset(forms)
+
+
+def keyword_forms(keywords: Optional[Iterable[str]]) -> Optional[list[str]]:
+    """Stored forms for a row's keywords"""
+    if keywords is None:
+        return None
+    forms: set[str] = set()
+    for keyword in keywords:
+        if keyword:
+            forms |= expand_keyword(keyword.lower())
+    return sorted(forms)
+
+
+def outing_keyword_forms(keywords: Iterable[str]) -> set[str]:
+    """Forms an outing's keywords match under (plurals and '-ing' reduced to the base)"""
+    norm: set[str] = set()
+    for keyword in keywords:
+        if not keyword:
+            continue
+        token = keyword.lower()
+        norm.add(token)
+        # Handle common plural -> singular
+        if token.endswith('s') and len(token) > 3:
+            norm.add(token[:-1])
+        # Handle simple '-ing' forms: include base
+        if token.endswith('ing') and len(token) > 5:
+            norm.add(token[:-3])
+    return norm
+
+
+class MemoryKeywordIndex:
+    """form -> row ids for one table on one engine"""
+
+    def __init__(self, rows: Iterable[tuple[UUID, Optional[list[str]], Optional[list[str]]]]):
+        self._ids: dict[str, set[UUID]] = {}
+        for row_id, keywords, forms in rows:
+            # Rows written outside the ORM have no stored forms yet
+            for form in forms if forms is not None else keyword_forms(keywords) or ():
+                self._ids.setdefault(form, set()).add(row_id)
+
+    def lookup(self, forms: Iterable[str]) -> set[UUID]:
+        ids: set[UUID] = set()
+        for form in forms:
+            ids |= self._ids.get(form, set())
+        return ids
+
+
+# engine -> model -> index; generations let a build that raced a write be discarded
+_memory_indexes: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_generations: dict[type, int] = {model: 0 for model in _INDEXED_MODELS}
+
+
+async def _memory_index(db: AsyncSession, model: Type[Indexed]) -> MemoryKeywordIndex:
+    engine = db.bind.sync_engine
+    indexes = _memory_indexes.setdefault(engine, {})
+    index = indexes.get(model)
+    if index is None:
+        generation = _generations[model]
+        result = await db.execute(select(model.id, model.keywords, model.keyword_forms))
+        index = MemoryKeywordIndex(result.all())
+        if _generations[model] == generation:
+            indexes[model] = index
+    return index
+
+
+def invalidate(model: Type[Indexed]) -> None:
+    _generations[model] += 1
+    for indexes in list(_memory_indexes.values()):
+        indexes.pop(model, None)
+
+
+def forms_overlap(model: Type[Indexed], forms: Iterable[str]):
+    """keyword_forms && forms; the column is a plain array on PostgreSQL, so the GIN index applies"""
+    return type_coerce(model.keyword_forms, ARRAY(String)).overlap(sorted(forms))
+
+
+async def search(db: AsyncSession, model: Type[Indexed], keywords: Iterable[str]) -> list:
+    """Rows of model sharing at least one keyword form with keywords"""
+    forms = outing_keyword_forms(keywords)
+    if not forms:
+        return []
+    if db.bind.dialect.name == "postgresql":
+        stmt = select(model).where(forms_overlap(model, forms))
+    else:
+        ids = (await _memory_index(db, model)).lookup(forms)
+        if not ids:
+            return []
+        stmt = select(model).where(model.id.in_(ids))
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
+
+
+@event.listens_for(Session, "before_flush")
+def _store_keyword_forms(session: Session, flush_context, instances) -> None:
+    for obj in chain(session.new, session.dirty):
+        if not isinstance(obj, _INDEXED_MODELS):
+            continue
+        if obj in session.new or inspect(obj).attrs.keywords.history.has_changes():
+            obj.keyword_forms = keyword_forms(obj.keywords)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed_tables(session: Session, flush_context) -> None:
+    models = {
+        type(obj) for obj in chain(session.new, session.dirty, session.deleted)
+        if isinstance(obj, _INDEXED_MODELS)
+    }
+    for model in models:
+        invalidate(model)
+    if models:
+        session.info.setdefault("keyword_index_stale", set()).update(models)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_tables(session: Session) -> None:
+    # Another session may have rebuilt the index before these rows were visible
+    for model in session.info.pop("keyword_index_stale", ()):
+        invalidate(model)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _invalidate_rolled_back_tables(session: Session, previous_transaction) -> None:
+    # An index built inside the transaction may reflect rows that never happened
+    for model in session.info.pop("keyword_index_stale", ()):
+        invalidate(model)
@@ -0,0 +1,181 @@
+"""Offline snapshot assembly, versioning and encoding.
+
+The snapshot behind /api/offline/data changes only when something the caller's
+snapshot is built from is written to the change log (every entity type for admins,
+whose rosters cover signups, participants and family members; outings and places
+otherwise), when the outing capacity counters change, when the caller's own profile
+changes, when an outing passes its automatic signup close time, or when the date
+changes (participant ages are computed from today's date). snapshot_etag folds
+exactly those inputs into a strong ETag, so clients that send If-None-Match get a
+304 without the snapshot being built at all.
+
+The body is deterministic for a given ETag: last_updated is the time of the latest
+relevant change log entry rather than the time of the request.
+"""
+import gzip
+import hashlib
+import json
+import zlib
+from datetime import date, datetime
+from typing import AsyncIterable, AsyncIterator, Dict, List, Optional, Sequence
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import outing as crud_outing
+from app.models.change_log import ChangeLog
+from app.models.outing import Outing
+from app.models.outing_capacity import OutingCapacity
+from app.models.signup import Signup
+from app.models.user import User
+from app.schemas.auth import UserResponse
+from app.schemas.offline import OfflineDataResponse
+from app.schemas.signup import SignupResponse
+from app.services.outing_capacity import build_outing_response
+from app.services.signup_roster import build_signup_responses, fetch_roster_rows
+
+SNAPSHOT_OUTING_LIMIT = 100
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+_EPOCH = datetime(1970, 1, 1)
+# Change log entity types behind a non-admin snapshot (outings and their places);
+# signup counts there come from outing_capacity, versioned by its updated_at
+PUBLIC_ENTITY_TYPES = frozenset({"outing", "place"})
+
+
+def _user_response(user: User) -> UserResponse:
+    return UserResponse(
+        id=user.id,
+        email=user.email,
+        full_name=user.full_name,
+        role=user.role,
+        is_initial_admin=user.is_initial_admin,
+        phone=user.phone,
+        emergency_contact_name=user.emergency_contact_name,
+        emergency_contact_phone=user.emergency_contact_phone,
+        youth_protection_expiration=user.youth_protection_expiration
+    )
+
+
+def snapshot_entity_types(user: User) -> Optional[frozenset]:
+    """Change log entity types the caller's snapshot is built from; None for all of them"""
+    return None if user.role == "admin" else PUBLIC_ENTITY_TYPES
+
+
+async def snapshot_version(db: AsyncSession, user: User) -> dict:
+    """Everything the caller's snapshot depends on besides the caller's own profile"""
+    latest_stmt = select(ChangeLog.id, ChangeLog.created_at).order_by(ChangeLog.seq.desc()).limit(1)
+    entity_types = snapshot_entity_types(user)
+    if entity_types is not None:
+        latest_stmt = latest_stmt.where(ChangeLog.entity_type.in_(sorted(entity_types)))
+    latest = (await db.execute(latest_stmt)).first()
+    capacity_changed_at = (await db.execute(select(func.max(OutingCapacity.updated_at)))).scalar()
+    closed_result = await db.execute(
+        select(func.count()).select_from(Outing).where(Outing.signups_close_at <= datetime.utcnow())
+    )
+    return {
+        "change_id": str(latest.id) if latest else None,
+        "changed_at": latest.created_at if latest else _EPOCH,
+        "capacity_changed_at": capacity_changed_at or _EPOCH,
+        "auto_closed_outings": closed_result.scalar_one(),
+        "today": date.today(),
+    }
+
+
+def snapshot_etag(user: User, version: dict, representation: str) -> str:
+    """Strong ETag for one caller's snapshot in one representation (format + content coding)"""
+    key = json.dumps(
+        [
+            representation,
+            _user_response(user).model_dump(mode="json"),
+            version["change_id"],
+            version["changed_at"].isoformat(),
+            version["capacity_changed_at"].isoformat(),
+            version["auto_closed_outings"],
+            version["today"].isoformat(),
+        ],
+        separators=(",", ":"),
+    )
+    return '"' + hashlib.sha256(key.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match evaluation (weak comparison, as RFC 9110 requires for this header)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+async def _snapshot_outings(db: AsyncSession) -> Sequence[Outing]:
+    return await crud_outing.get_outings(db, skip=0, limit=SNAPSHOT_OUTING_LIMIT)
+
+
+async def _snapshot_rosters(db: AsyncSession, user: User, outings: Sequence[Outing]) -> Dict[str, List[SignupResponse]]:
+    """All rosters (only for admin users) in one query, grouped by outing in memory"""
+    rosters: Dict[str, List[SignupResponse]] = {}
+    if user.role == "admin" and outings:
+        rosters = {str(outing.id): [] for outing in outings}
+        rows = await fetch_roster_rows(db, Signup.outing_id.in_([outing.id for outing in outings]))
+        for signup in build_signup_responses(rows):
+            rosters[str(signup.outing_id)].append(signup)
+    return rosters
+
+
+async def build_snapshot(db: AsyncSession, user: User, version: dict) -> OfflineDataResponse:
+    """Outings for everyone, rosters for admins, in a fixed number of queries"""
+    outings = await _snapshot_outings(db)
+    rosters = await _snapshot_rosters(db, user, outings)
+    return OfflineDataResponse(
+        user=_user_response(user),
+        outings=[build_outing_response(outing) for outing in outings],
+        rosters=rosters,
+        last_updated=version["changed_at"].isoformat(),
+    )
+
+
+async def ndjson_records(db: AsyncSession, user: User, version: dict) -> AsyncIterator[bytes]:
+    """The snapshot as newline-delimited JSON, one record per line, sent as it is loaded.
+
+    Records: one "user" (before any query), one "outing" per outing once the outing
+    query returns, then one "roster" per outing with a roster once the roster query
+    returns, and a closing "end" record carrying last_updated. A stream without the
+    "end" record was cut off and must not replace local data.
+    """
+    yield _record("user", _user_response(user).model_dump_json())
+    outings = await _snapshot_outings(db)
+    for outing in outings:
+        yield _record("outing", build_outing_response(outing).model_dump_json())
+    rosters = await _snapshot_rosters(db, user, outings)
+    for outing_id, signups in rosters.items():
+        signups_json = ",".join(signup.model_dump_json() for signup in signups)
+        yield _record("roster", f'{{"outing_id":"{outing_id}","signups":[{signups_json}]}}')
+    yield _record("end", json.dumps({"last_updated": version["changed_at"].isoformat()}))
+
+
+def _record(record_type: str, data_json: str) -> bytes:
+    return f'{{"type":"{record_type}","data":{data_json}}}\n'.encode()
+
+
+async def gzip_stream(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Gzip-encode a chunk stream, flushing per chunk so clients can decode as it arrives"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def gzip_body(body: bytes) -> bytes:
+    # mtime=0 keeps the bytes (and so the strong ETag) stable across requests
+    return gzip.compress(body, mtime=0)
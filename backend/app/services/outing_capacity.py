@@ -0,0 +1,240 @@
+"""Materialized per-outing capacity counters.
+
+The outing_capacity table holds participant / adult / female / vehicle-seat counts for
+each outing so list endpoints can report "N spots left" without loading every
+signup -> participant -> family_member row. Counters are recomputed from the source
+tables inside the same transaction as the write that changed them, via an ORM
+after_flush hook, so every write path (CRUD, cascades, tests) keeps them current.
+"""
+from datetime import datetime
+from itertools import chain
+from typing import Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import select, func, case, and_, literal, event, inspect, DateTime
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.outing import Outing
+from app.models.outing_capacity import OutingCapacity
+from app.models.signup import Signup
+from app.models.participant import Participant
+from app.models.family import FamilyMember
+from app.schemas.outing import OutingResponse
+
+COUNTER_FIELDS = (
+    "participant_count",
+    "adult_count",
+    "female_adult_count",
+    "female_youth_count",
+    "vehicle_capacity",
+)
+
+# OutingResponse fields derived from the counters rather than read off the Outing model
+SUMMARY_FIELDS = {
+    "signup_count",
+    "available_spots",
+    "is_full",
+    "total_vehicle_capacity",
+    "needs_more_drivers",
+    "adult_count",
+    "needs_two_deep_leadership",
+    "needs_female_leader",
+}
+
+# Family member columns that feed the counters
+_MEMBER_COUNTER_ATTRS = ("member_type", "gender", "vehicle_capacity")
+
+
+def _aggregate_select(outing_ids: set):
+    """Grouped query computing every counter for the given outings in one pass."""
+    is_adult = FamilyMember.member_type == "adult"
+    is_female = FamilyMember.gender == "female"
+    return (
+        select(
+            Outing.id,
+            func.count(Participant.id),
+            func.coalesce(func.sum(case((is_adult, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((and_(is_adult, is_female), 1), else_=0)), 0),
+            func.coalesce(func.sum(case((and_(FamilyMember.member_type != "adult", is_female), 1), else_=0)), 0),
+            func.coalesce(func.sum(case((is_adult, func.coalesce(FamilyMember.vehicle_capacity, 0)), else_=0)), 0),
+            literal(datetime.utcnow(), DateTime),
+        )
+        .select_from(Outing)
+        .outerjoin(Signup, Signup.outing_id == Outing.id)
+        .outerjoin(Participant, Participant.signup_id == Signup.id)
+        .outerjoin(FamilyMember, FamilyMember.id == Participant.family_member_id)
+        .where(Outing.id.in_(outing_ids))
+        .group_by(Outing.id)
+    )
+
+
+def capacity_upsert_statement(dialect_name: str, outing_ids: set):
+    """INSERT ... SELECT ... ON CONFLICT DO UPDATE recomputing the counters.
+
+    Outings that no longer exist produce no row, so this is safe to run for outings
+    deleted in the same flush.
+    """
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    columns = ["outing_id", *COUNTER_FIELDS, "updated_at"]
+    stmt = insert(OutingCapacity).from_select(columns, _aggregate_select(outing_ids))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[OutingCapacity.outing_id],
+        set_={name: stmt.excluded[name] for name in columns[1:]},
+    )
+    return stmt.returning(OutingCapacity.outing_id, *(getattr(OutingCapacity, f) for f in COUNTER_FIELDS))
+
+
+def _refresh(session: Session, outing_ids: set) -> None:
+    """Recompute counters and sync any OutingCapacity rows already in the identity map."""
+    connection = session.connection()
+    result = connection.execute(capacity_upsert_statement(connection.dialect.name, outing_ids))
+    for row in result.all():
+        key = session.identity_key(OutingCapacity, row[0])
+        instance = session.identity_map.get(key)
+        if instance is None:
+            continue
+        for name, value in zip(COUNTER_FIELDS, row[1:]):
+            set_committed_value(instance, name, value)
+
+
+async def refresh_outing_capacity(db: AsyncSession, outing_ids: Iterable[UUID]) -> None:
+    """Recompute the materialized counters for the given outings.
+
+    Only needed after bulk/Core statements that bypass the ORM flush hook.
+    """
+    ids = {outing_id for outing_id in outing_ids if outing_id is not None}
+    if ids:
+        await db.run_sync(_refresh, ids)
+
+
+def _changed_values(obj, attr: str) -> set:
+    """Current value plus any pre-flush value of an attribute."""
+    history = inspect(obj).attrs[attr].history
+    return {value for value in chain(history.added, history.unchanged, history.deleted) if value is not None}
+
+
+def _affected_outing_ids(session: Session) -> set:
+    outing_ids: set = set()
+    signup_ids: set = set()
+    member_ids: set = set()
+
+    for obj in session.new:
+        if isinstance(obj, Outing):
+            outing_ids.add(obj.id)
+
+    for obj in chain(session.new, session.deleted):
+        if isinstance(obj, Signup):
+            outing_ids.add(obj.outing_id)
+        elif isinstance(obj, Participant):
+            signup_ids.add(obj.signup_id)
+
+    for obj in session.dirty:
+        state = inspect(obj)
+        if isinstance(obj, Signup) and state.attrs.outing_id.history.has_changes():
+            outing_ids |= _changed_values(obj, "outing_id")
+        elif isinstance(obj, Participant) and (
+            state.attrs.signup_id.history.has_changes() or state.attrs.family_member_id.history.has_changes()
+        ):
+            signup_ids |= _changed_values(obj, "signup_id")
+        elif isinstance(obj, FamilyMember) and any(
+            state.attrs[attr].history.has_changes() for attr in _MEMBER_COUNTER_ATTRS
+        ):
+            member_ids.add(obj.id)
+
+    connection = session.connection()
+    signup_ids.discard(None)
+    if signup_ids:
+        outing_ids.update(connection.execute(
+            select(Signup.outing_id).where(Signup.id.in_(signup_ids))
+        ).scalars())
+    if member_ids:
+        outing_ids.update(connection.execute(
+            select(Signup.outing_id)
+            .join(Participant, Participant.signup_id == Signup.id)
+            .where(Participant.family_member_id.in_(member_ids))
+            .distinct()
+        ).scalars())
+
+    outing_ids.discard(None)
+    return outing_ids
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_capacity_after_flush(session: Session, flush_context) -> None:
+    """Keep outing_capacity in step with roster writes, inside the flushing transaction."""
+    if not any(
+        isinstance(obj, (Outing, Signup, Participant, FamilyMember))
+        for obj in chain(session.new, session.deleted, session.dirty)
+    ):
+        return
+    outing_ids = _affected_outing_ids(session)
+    if outing_ids:
+        _refresh(session, outing_ids)
+
+
+async def count_outing_roster(db: AsyncSession, outing_id: UUID) -> dict:
+    """Current counters for one outing, aggregated from the roster in one grouped query.
+
+    Reads the source tables rather than the materialized row, so under the outing row
+    lock (crud.outing.get_outing_for_update) it reflects every committed signup.
+    """
+    result = await db.execute(_aggregate_select({outing_id}))
+    row = result.first()
+    if row is None:
+        return dict.fromkeys(COUNTER_FIELDS, 0)
+    return dict(zip(COUNTER_FIELDS, row[1:-1]))
+
+
+def capacity_summary(outing: Outing, counters: Optional[dict] = None) -> dict:
+    """Capacity-derived OutingResponse fields computed from the materialized counters.
+
+    Mirrors the Outing model properties without touching outing.signups. Pass
+    `counters` (e.g. from count_outing_roster) to summarize those instead of
+    outing.capacity.
+    """
+    if counters is None:
+        capacity = outing.capacity
+        counters = {
+            name: getattr(capacity, name) if capacity else 0
+            for name in COUNTER_FIELDS
+        }
+    participants = counters["participant_count"]
+    adults = counters["adult_count"]
+    female_adults = counters["female_adult_count"]
+    female_youth = counters["female_youth_count"]
+    seats = counters["vehicle_capacity"]
+
+    if outing.capacity_type == 'vehicle':
+        available_spots = max(0, seats - participants)
+        is_full = participants >= seats
+        needs_more_drivers = seats < participants
+    else:
+        available_spots = max(0, outing.max_participants - participants)
+        is_full = participants >= outing.max_participants
+        needs_more_drivers = False
+
+    return {
+        "signup_count": participants,
+        "available_spots": available_spots,
+        "is_full": is_full,
+        "total_vehicle_capacity": seats,
+        "needs_more_drivers": needs_more_drivers,
+        "adult_count": adults,
+        "needs_two_deep_leadership": adults < 2,
+        "needs_female_leader": female_youth > 0 and female_adults < 1,
+    }
+
+
+def build_outing_response(outing: Outing) -> OutingResponse:
+    """Build an OutingResponse for an outing loaded with capacity, places and allowed troops."""
+    outing_dict = {
+        k: getattr(outing, k)
+        for k in OutingResponse.model_fields.keys()
+        if k not in SUMMARY_FIELDS and hasattr(outing, k)
+    }
+    outing_dict.update(capacity_summary(outing))
+    outing_dict['allowed_troop_ids'] = [troop.id for troop in outing.allowed_troops]
+    return OutingResponse.model_validate(outing_dict)
@@ -1,9 +1,10 @@
 import io
 import os
+from functools import lru_cache
 import qrcode
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, KeepTogether
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
@@ -15,143 +16,245 @@ from datetime import datetime
 from app.models.outing import Outing
 from app.models.packing_list import OutingPackingList
 
+# Colors
+BSA_OLIVE = colors.HexColor('#6F784B')
+DARK_GRAY = colors.HexColor('#2E2E2E')
+LIGHT_GRAY = colors.HexColor('#F5F5F5')
+
+
+def handout_troop_numbers(outing: Outing) -> set:
+    """Troop numbers of the outing's participants, as shown on the handout"""
+    troop_numbers = set()
+    try:
+        if getattr(outing, 'signups', None):
+            for s in outing.signups:
+                for p in getattr(s, 'participants', []):
+                    # Try explicit text troop_number first
+                    tn = getattr(p, 'troop_number', None)
+                    if not tn and getattr(p, 'family_member', None) and getattr(p.family_member, 'troop', None):
+                        tn = getattr(p.family_member.troop, 'number', None)
+                    if tn:
+                        troop_numbers.add(str(tn))
+    except Exception:
+        pass
+    return troop_numbers
+
+
+def _place_data(place) -> Optional[dict]:
+    if place is None:
+        return None
+    return {'name': place.name, 'address': place.address, 'google_maps_url': place.google_maps_url}
+
+
+def handout_pdf_outing(outing: Outing) -> dict:
+    """Outing fields in the shape generate_outing_handout expects.
+
+    outing must be loaded with get_outing_with_details; the result is plain data, so the
+    render thread never touches the request's session.
+    """
+    return {
+        'name': outing.name,
+        'description': outing.description,
+        'outing_date': outing.outing_date,
+        'end_date': outing.end_date,
+        'location': outing.location,
+        'outing_lead_name': outing.outing_lead_name,
+        'outing_lead_phone': outing.outing_lead_phone,
+        'drop_off_time': outing.drop_off_time,
+        'drop_off_location': outing.drop_off_location,
+        'dropoff_address': outing.dropoff_address,
+        'pickup_time': outing.pickup_time,
+        'pickup_location': outing.pickup_location,
+        'pickup_address': outing.pickup_address,
+        'outing_address': outing.outing_address,
+        'outing_place': _place_data(outing.outing_place),
+        'requirements': [
+            {'rank': req.requirement.rank, 'requirement_number': req.requirement.requirement_number}
+            for req in outing.outing_requirements
+        ],
+        'merit_badges': [mb.merit_badge.name for mb in outing.outing_merit_badges],
+        'troop_numbers': sorted(handout_troop_numbers(outing)),
+    }
+
+
+def handout_pdf_packing_lists(packing_lists: List[OutingPackingList]) -> List[dict]:
+    """Packing lists in the shape generate_outing_handout expects"""
+    return [
+        {'items': [{'name': item.name, 'quantity': item.quantity} for item in packing_list.items]}
+        for packing_list in packing_lists
+    ]
+
+
+QR_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=None)
+def register_merriweather_fonts() -> bool:
+    """Register the Merriweather fonts once per process; False if they are not shipped"""
+    try:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        repo_root = os.path.abspath(os.path.join(base_dir, '..', '..', '..'))
+        # Expected font locations (add more if needed)
+        candidate_dirs = [
+            os.path.join(repo_root, 'backend', 'app', 'assets', 'fonts'),
+            os.path.join(repo_root, 'assets', 'fonts'),
+        ]
+        regular_name = 'Merriweather-Regular.ttf'
+        bold_name = 'Merriweather-Bold.ttf'
+        for d in candidate_dirs:
+            if not os.path.isdir(d):
+                continue
+            r = os.path.join(d, regular_name)
+            b = os.path.join(d, bold_name)
+            if os.path.exists(r) and os.path.exists(b):
+                pdfmetrics.registerFont(TTFont('Merriweather', r))
+                pdfmetrics.registerFont(TTFont('Merriweather-Bold', b))
+                return True
+    except Exception:
+        # Do not fail PDF generation if fonts cannot be registered
+        pass
+    return False
+
+
+@lru_cache(maxsize=None)
+def _handout_styles() -> StyleSheet1:
+    """Style sheet shared by every handout; built once, only read afterwards"""
+    styles = getSampleStyleSheet()
+    heading_font = 'Merriweather-Bold' if register_merriweather_fonts() else 'Helvetica-Bold'
+
+    # Main title (slightly tighter)
+    styles.add(ParagraphStyle(
+        name='Header1',
+        parent=styles['Heading1'],
+        fontSize=26,  # was 28
+        leading=30,   # was 34
+        spaceAfter=12,  # was 20
+        textColor=BSA_OLIVE,
+        alignment=TA_CENTER,
+        fontName=heading_font
+    ))
+
+    styles.add(ParagraphStyle(
+        name='SectionHeader',
+        parent=styles['Heading2'],
+        fontSize=14,
+        leading=16,  # slightly reduced
+        spaceBefore=12,  # was 15
+        spaceAfter=6,    # was 10
+        textColor=colors.white,
+        backColor=BSA_OLIVE,
+        borderPadding=6,  # was 8
+        fontName=heading_font,
+        alignment=TA_CENTER
+    ))
+
+    styles.add(ParagraphStyle(
+        name='CardTitle',
+        parent=styles['Heading3'],
+        fontSize=11,   # was 12
+        leading=13,    # was 14
+        textColor=BSA_OLIVE,
+        spaceAfter=4,  # was 6
+        fontName=heading_font
+    ))
+
+    styles.add(ParagraphStyle(
+        name='Label',
+        parent=styles['Normal'],
+        fontSize=8,    # was 9
+        leading=10,    # was 11
+        textColor=colors.HexColor('#666666'),
+        fontName='Helvetica-Bold',
+        spaceAfter=1   # was 2
+    ))
+
+    styles.add(ParagraphStyle(
+        name='Value',
+        parent=styles['Normal'],
+        fontSize=9,     # was 10
+        leading=12,     # was 13
+        textColor=colors.black,
+        spaceAfter=4    # was 8
+    ))
+
+    styles.add(ParagraphStyle(
+        name='CheckboxItem',
+        parent=styles['Normal'],
+        fontSize=10,
+        leading=14,
+        spaceAfter=4,
+        textColor=DARK_GRAY
+    ))
+    return styles
+
+
+@lru_cache(maxsize=1)
+def _trip_icon_png() -> Optional[bytes]:
+    """The trip icon's bytes, read once; None if the frontend assets are not present"""
+    try:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        repo_root = os.path.abspath(os.path.join(base_dir, '..', '..', '..'))
+        icon_path = os.path.join(repo_root, 'frontend', 'public', 'icon', 'icon-small-bordered.png')
+        if os.path.exists(icon_path):
+            with open(icon_path, 'rb') as f:
+                return f.read()
+    except Exception:
+        return None
+    return None
+
+
+@lru_cache(maxsize=QR_CACHE_SIZE)
+def _qr_png(data: str) -> bytes:
+    """PNG of a QR code for data; the same map links recur across handouts"""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=1,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+
+    img_buffer = io.BytesIO()
+    img.save(img_buffer, format="PNG")
+    return img_buffer.getvalue()
+
+
+def warm_up() -> None:
+    """Do the fixed PDF setup (fonts, styles, icon, font metrics) ahead of the first request"""
+    from app.utils.pdf_generator import roster_styles
+
+    _handout_styles()
+    _trip_icon_png()
+    roster_styles()
+    for font_name in ('Helvetica', 'Helvetica-Bold', 'ZapfDingbats'):
+        pdfmetrics.getFont(font_name)
+
 
 class PDFGenerator:
     def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self._register_merriweather_fonts()
-        
+        self.styles = _handout_styles()
+        self._merriweather_available = register_merriweather_fonts()
+
         # Colors
-        self.bsa_olive = colors.HexColor('#6F784B')
-        self.dark_gray = colors.HexColor('#2E2E2E')
-        self.light_gray = colors.HexColor('#F5F5F5')
-        
-        # Main title (slightly tighter)
-        self.styles.add(ParagraphStyle(
-            name='Header1',
-            parent=self.styles['Heading1'],
-            fontSize=26,  # was 28
-            leading=30,   # was 34
-            spaceAfter=12,  # was 20
-            textColor=self.bsa_olive,
-            alignment=TA_CENTER,
-            fontName='Merriweather-Bold' if self._merriweather_available else 'Helvetica-Bold'
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='SectionHeader',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            leading=16,  # slightly reduced
-            spaceBefore=12,  # was 15
-            spaceAfter=6,    # was 10
-            textColor=colors.white,
-            backColor=self.bsa_olive,
-            borderPadding=6,  # was 8
-            fontName='Merriweather-Bold' if self._merriweather_available else 'Helvetica-Bold',
-            alignment=TA_CENTER
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='CardTitle',
-            parent=self.styles['Heading3'],
-            fontSize=11,   # was 12
-            leading=13,    # was 14
-            textColor=self.bsa_olive,
-            spaceAfter=4,  # was 6
-            fontName='Merriweather-Bold' if self._merriweather_available else 'Helvetica-Bold'
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='Label',
-            parent=self.styles['Normal'],
-            fontSize=8,    # was 9
-            leading=10,    # was 11
-            textColor=colors.HexColor('#666666'),
-            fontName='Helvetica-Bold',
-            spaceAfter=1   # was 2
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='Value',
-            parent=self.styles['Normal'],
-            fontSize=9,     # was 10
-            leading=12,     # was 13
-            textColor=colors.black,
-            spaceAfter=4    # was 8
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='CheckboxItem',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            leading=14,
-            spaceAfter=4,
-            textColor=self.dark_gray
-        ))
-
-    def _register_merriweather_fonts(self) -> None:
-        """Attempt to register Merriweather fonts. Falls back if not present."""
-        self._merriweather_available = False
-        try:
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            repo_root = os.path.abspath(os.path.join(base_dir, '..', '..', '..'))
-            # Expected font locations (add more if needed)
-            candidate_dirs = [
-                os.path.join(repo_root, 'backend', 'app', 'assets', 'fonts'),
-                os.path.join(repo_root, 'assets', 'fonts'),
-            ]
-            regular_name = 'Merriweather-Regular.ttf'
-            bold_name = 'Merriweather-Bold.ttf'
-            regular_path = None
-            bold_path = None
-            for d in candidate_dirs:
-                if not os.path.isdir(d):
-                    continue
-                r = os.path.join(d, regular_name)
-                b = os.path.join(d, bold_name)
-                if os.path.exists(r) and os.path.exists(b):
-                    regular_path, bold_path = r, b
-                    break
-            if regular_path and bold_path:
-                pdfmetrics.registerFont(TTFont('Merriweather', regular_path))
-                pdfmetrics.registerFont(TTFont('Merriweather-Bold', bold_path))
-                self._merriweather_available = True
-        except Exception:
-            # Do not fail PDF generation if fonts cannot be registered
-            self._merriweather_available = False
+        self.bsa_olive = BSA_OLIVE
+        self.dark_gray = DARK_GRAY
+        self.light_gray = LIGHT_GRAY
 
     def _get_trip_icon(self) -> Optional[Image]:
-        """Locate and return the trip icon image if available."""
-        try:
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            repo_root = os.path.abspath(os.path.join(base_dir, '..', '..', '..'))
-            icon_path = os.path.join(repo_root, 'frontend', 'public', 'icon', 'icon-small-bordered.png')
-            if os.path.exists(icon_path):
-                return Image(icon_path, width=0.45*inch, height=0.45*inch)
-        except Exception:
+        """Return the trip icon image if available."""
+        png = _trip_icon_png()
+        if png is None:
             return None
-        return None
+        return Image(io.BytesIO(png), width=0.45*inch, height=0.45*inch)
 
     def _generate_qr_code(self, data: str) -> io.BytesIO:
         """Generate a QR code image stream"""
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=1,
-        )
-        qr.add_data(data)
-        qr.make(fit=True)
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        img_buffer = io.BytesIO()
-        img.save(img_buffer, format="PNG")
-        img_buffer.seek(0)
-        return img_buffer
+        return io.BytesIO(_qr_png(data))
 
-    def generate_outing_handout(self, outing: Outing, packing_lists: List[OutingPackingList]) -> bytes:
-        """Generate a PDF handout for the outing"""
+    def generate_outing_handout(self, outing: dict, packing_lists: List[dict]) -> bytes:
+        """Generate a PDF handout from handout_pdf_outing / handout_pdf_packing_lists data"""
         buffer = io.BytesIO()
         doc = SimpleDocTemplate(
             buffer,
@@ -165,7 +268,7 @@ class PDFGenerator:
         story = []
         
         # Title with icon
-        title_para = Paragraph(outing.name, self.styles['Header1'])
+        title_para = Paragraph(outing['name'], self.styles['Header1'])
         icon_img = self._get_trip_icon()
         if icon_img:
             title_table = Table(
@@ -205,50 +308,33 @@ class PDFGenerator:
 
         # WHO
         # Participants line: scouts and leaders from troop(s) [troop numbers]
-        troop_numbers = set()
-        try:
-            if getattr(outing, 'signups', None):
-                for s in outing.signups:
-                    for p in getattr(s, 'participants', []):
-                        # Try explicit text troop_number first
-                        tn = getattr(p, 'troop_number', None)
-                        if not tn and getattr(p, 'family_member', None) and getattr(p.family_member, 'troop', None):
-                            tn = getattr(p.family_member.troop, 'number', None)
-                        if tn:
-                            troop_numbers.add(str(tn))
-        except Exception:
-            pass
+        troop_numbers = outing['troop_numbers']
 
         troop_list = ", ".join(sorted(troop_numbers, key=lambda x: (not x.isdigit(), int(x) if x.isdigit() else x))) if troop_numbers else None
         participants_value = f"scouts and leaders from troop(s) {troop_list}" if troop_list else "scouts and leaders"
 
         who_items = [
-            ("Outing Lead:", f"{outing.outing_lead_name or 'TBD'} ({outing.outing_lead_phone or 'No phone'})"),
+            ("Outing Lead:", f"{outing['outing_lead_name'] or 'TBD'} ({outing['outing_lead_phone'] or 'No phone'})"),
             ("Participants:", participants_value),
         ]
         
         # WHAT
         what_items = [
-            ("Description:", outing.description or "No description provided.")
+            ("Description:", outing['description'] or "No description provided.")
         ]
         
         # WHEN
-        start_date = outing.outing_date.strftime("%B %d, %Y")
-        end_date = outing.end_date.strftime("%B %d, %Y") if outing.end_date else start_date
+        start_date = outing['outing_date'].strftime("%B %d, %Y")
+        end_date = outing['end_date'].strftime("%B %d, %Y") if outing['end_date'] else start_date
         date_str = f"{start_date} - {end_date}" if start_date != end_date else start_date
         
         # Derive locations for drop-off and pick-up
-        loc_name = outing.location
-        if getattr(outing, 'outing_place', None):
-            try:
-                if outing.outing_place and outing.outing_place.name:
-                    loc_name = outing.outing_place.name
-            except Exception:
-                pass
-        drop_loc = getattr(outing, 'drop_off_location', None) or loc_name or 'TBD'
-        pick_loc = getattr(outing, 'pickup_location', None) or loc_name or 'TBD'
-        drop_time = outing.drop_off_time.strftime("%I:%M %p") if getattr(outing, 'drop_off_time', None) else "TBD"
-        pick_time = outing.pickup_time.strftime("%I:%M %p") if getattr(outing, 'pickup_time', None) else "TBD"
+        place = outing['outing_place']
+        loc_name = place['name'] if place and place['name'] else outing['location']
+        drop_loc = outing['drop_off_location'] or loc_name or 'TBD'
+        pick_loc = outing['pickup_location'] or loc_name or 'TBD'
+        drop_time = outing['drop_off_time'].strftime("%I:%M %p") if outing['drop_off_time'] else "TBD"
+        pick_time = outing['pickup_time'].strftime("%I:%M %p") if outing['pickup_time'] else "TBD"
         when_items = [
             ("Dates:", date_str),
             ("Drop-off:", f"{drop_time}, {drop_loc}"),
@@ -257,13 +343,11 @@ class PDFGenerator:
         
         # WHY
         reqs_text = []
-        if outing.outing_requirements:
-            for req in outing.outing_requirements:
-                reqs_text.append(f"• {req.requirement.rank} #{req.requirement.requirement_number}")
-        
-        if outing.outing_merit_badges:
-            for mb in outing.outing_merit_badges:
-                reqs_text.append(f"• Merit Badge: {mb.merit_badge.name}")
+        for req in outing['requirements']:
+            reqs_text.append(f"• {req['rank']} #{req['requirement_number']}")
+
+        for badge_name in outing['merit_badges']:
+            reqs_text.append(f"• Merit Badge: {badge_name}")
                 
         if not reqs_text:
             reqs_text.append("Fun and fellowship!")
@@ -338,27 +422,27 @@ class PDFGenerator:
             return [content, qr_img]
 
         # Trip Location
-        loc_name = outing.location
-        if outing.outing_place:
-            loc_name = outing.outing_place.name
-        
-        addr = outing.outing_address
-        if not addr and outing.outing_place:
-            addr = outing.outing_place.address
-            
+        loc_name = outing['location']
+        if place:
+            loc_name = place['name']
+
+        addr = outing['outing_address']
+        if not addr and place:
+            addr = place['address']
+
         map_url = None
-        if outing.outing_place and outing.outing_place.google_maps_url:
-            map_url = outing.outing_place.google_maps_url
+        if place and place['google_maps_url']:
+            map_url = place['google_maps_url']
             
         where_data.append(add_location_row("DESTINATION", loc_name, addr, map_url))
         
         # Drop-off (if different)
-        if outing.drop_off_location and outing.drop_off_location != loc_name:
-             where_data.append(add_location_row("DROP-OFF", outing.drop_off_location, outing.dropoff_address))
+        if outing['drop_off_location'] and outing['drop_off_location'] != loc_name:
+             where_data.append(add_location_row("DROP-OFF", outing['drop_off_location'], outing['dropoff_address']))
              
         # Pick-up (if different)
-        if outing.pickup_location and outing.pickup_location != loc_name and outing.pickup_location != outing.drop_off_location:
-             where_data.append(add_location_row("PICK-UP", outing.pickup_location, outing.pickup_address))
+        if outing['pickup_location'] and outing['pickup_location'] != loc_name and outing['pickup_location'] != outing['drop_off_location']:
+             where_data.append(add_location_row("PICK-UP", outing['pickup_location'], outing['pickup_address']))
 
         # Render Where Table
         if where_data:
@@ -391,11 +475,11 @@ class PDFGenerator:
             # Collect all items
             all_items = []
             for pl in packing_lists:
-                for item in pl.items:
+                for item in pl['items']:
                     all_items.append(item)
             
             # Sort items by name
-            all_items.sort(key=lambda x: x.name)
+            all_items.sort(key=lambda x: x['name'])
             
             # Create 2-column list
             col1 = []
@@ -403,9 +487,9 @@ class PDFGenerator:
             mid = (len(all_items) + 1) // 2
             
             for i, item in enumerate(all_items):
-                qty_str = f" ({item.quantity})" if item.quantity > 1 else ""
+                qty_str = f" ({item['quantity']})" if item['quantity'] > 1 else ""
                 # Use a cleaner checkbox visual
-                text = f"<font name='ZapfDingbats'>o</font>  {item.name}{qty_str}"
+                text = f"<font name='ZapfDingbats'>o</font>  {item['name']}{qty_str}"
                 p = Paragraph(text, self.styles['CheckboxItem'])
                 if i < mid:
                     col1.append(p)
@@ -0,0 +1,140 @@
+"""Bounded worker pool for PDF rendering.
+
+ReportLab renders synchronously and can take a good fraction of a second per
+document, which would stall every other request on the worker if run inside an
+async handler. render_pdf runs the render in a small thread pool instead:
+
+* At most PDF_RENDER_WORKERS renders run at once, and at most PDF_RENDER_QUEUE_DEPTH
+  more wait for a thread. Anything beyond that is refused straight away with a 503
+  and Retry-After, so a burst of handout downloads can't queue unbounded work.
+* A caller waits at most PDF_RENDER_TIMEOUT_SECONDS and then gets a 504. A thread
+  can't be interrupted, so the render itself runs to completion and keeps its
+  slot until it does; the bound above therefore always holds.
+
+Threads rather than processes because renders take loaded ORM objects (the outing
+and its packing lists) that can't be sent to another process as they are.
+render_stats() feeds the health endpoint.
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+_in_flight = 0
+
+_stats: Dict[str, Any] = {
+    "submitted": 0,
+    "completed": 0,
+    "failed": 0,
+    "rejected": 0,
+    "timed_out": 0,
+    "max_in_flight": 0,
+    "render_seconds_total": 0.0,
+    "last_render_seconds": None,
+}
+
+
+def render_stats() -> Dict[str, Any]:
+    with _lock:
+        stats = dict(_stats)
+        stats["in_flight"] = _in_flight
+    stats["workers"] = settings.PDF_RENDER_WORKERS
+    stats["queue_depth"] = settings.PDF_RENDER_QUEUE_DEPTH
+    stats["queued"] = max(0, stats["in_flight"] - settings.PDF_RENDER_WORKERS)
+    finished = stats["completed"] + stats["failed"]
+    stats["avg_render_seconds"] = round(stats["render_seconds_total"] / finished, 3) if finished else None
+    stats["render_seconds_total"] = round(stats["render_seconds_total"], 3)
+    return stats
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.PDF_RENDER_WORKERS, thread_name_prefix="pdf-render")
+        return _executor
+
+
+def _try_acquire() -> bool:
+    global _in_flight
+    with _lock:
+        if _in_flight >= settings.PDF_RENDER_WORKERS + settings.PDF_RENDER_QUEUE_DEPTH:
+            _stats["rejected"] += 1
+            return False
+        _in_flight += 1
+        _stats["submitted"] += 1
+        _stats["max_in_flight"] = max(_stats["max_in_flight"], _in_flight)
+        return True
+
+
+def _release(future=None) -> None:
+    global _in_flight
+    with _lock:
+        _in_flight -= 1
+
+
+def _run(render: Callable[..., T], args: tuple) -> T:
+    """Runs on a pool thread, timing the render"""
+    started = time.monotonic()
+    failed = True
+    try:
+        result = render(*args)
+        failed = False
+        return result
+    finally:
+        elapsed = time.monotonic() - started
+        with _lock:
+            _stats["failed" if failed else "completed"] += 1
+            _stats["render_seconds_total"] += elapsed
+            _stats["last_render_seconds"] = round(elapsed, 3)
+
+
+async def render_pdf(render: Callable[..., T], *args: Any, timeout: Optional[float] = None) -> T:
+    """Run render(*args) on the PDF pool; 503 when the queue is full, 504 on timeout"""
+    if not _try_acquire():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="PDF rendering is busy, please try again shortly",
+            headers={"Retry-After": "5"},
+        )
+    try:
+        future = _get_executor().submit(_run, render, args)
+    except BaseException:
+        _release()
+        raise
+    # The slot is held until the render really ends (or is dropped at shutdown),
+    # not just until this caller stops waiting
+    future.add_done_callback(_release)
+    timeout = timeout if timeout is not None else settings.PDF_RENDER_TIMEOUT_SECONDS
+    try:
+        # shield: giving up on the wait must not cancel the render behind it
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+    except asyncio.TimeoutError:
+        with _lock:
+            _stats["timed_out"] += 1
+        logger.warning("PDF render %s timed out after %ss", getattr(render, "__name__", render), timeout)
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="PDF rendering timed out",
+        )
+
+
+def shutdown() -> None:
+    """Stop the pool at application shutdown; queued renders are dropped"""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
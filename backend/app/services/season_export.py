@@ -0,0 +1,172 @@
+"""Bulk roster export: one ZIP of roster PDFs and check-in CSVs for many outings.
+
+stream_outing_archive yields the archive as it is built rather than assembling it
+in memory. Each outing gets a folder, <date>_<name>_<id prefix>/, holding
+roster.pdf (the same document as the single-outing export) and checkins.csv (the
+same rows as the check-in export).
+
+Outing data is read one outing at a time on the request's session, which can't be
+shared across tasks, while the PDFs render concurrently on the shared pool from
+services.pdf_render: up to `parallelism` renders are in flight and entries are
+written in outing order as each one finishes. zipfile writes into a sink that is
+drained after every outing, so memory holds at most `parallelism` rendered PDFs
+plus the archive's central directory, however many outings are exported.
+
+A roster that can't be rendered (the pool stays busy, the render times out, or
+it fails outright) gets a roster_error.txt entry instead, so one bad outing
+doesn't lose the rest of the archive. By default the export leaves one pool worker
+free so single-outing handouts aren't starved while it runs.
+"""
+import asyncio
+import csv
+import io
+import logging
+import re
+import zipfile
+from collections import deque
+from typing import AsyncIterator, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud import checkin as crud_checkin
+from app.models.outing import Outing
+from app.models.signup import Signup
+from app.schemas.checkin import CheckInSummary
+from app.services.pdf_render import render_pdf
+from app.services.signup_roster import (
+    build_signup_responses, fetch_roster_rows, roster_pdf_outing, roster_pdf_signups,
+)
+from app.utils.pdf_generator import generate_outing_roster_pdf
+
+logger = logging.getLogger(__name__)
+
+CHECKIN_CSV_HEADER = [
+    "Participant Name",
+    "Type",
+    "Family",
+    "Patrol",
+    "Troop",
+    "Checked In",
+    "Check-in Time",
+    "Checked In By",
+]
+
+# How often, and how long apart, a render refused by a full pool is retried
+RENDER_RETRIES = 5
+RENDER_RETRY_SECONDS = 1.0
+
+
+def checkin_csv(summary: CheckInSummary) -> str:
+    """Check-in status of every participant as CSV text"""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(CHECKIN_CSV_HEADER)
+    for participant in summary.participants:
+        writer.writerow([
+            participant.name,
+            participant.member_type,
+            participant.family_name,
+            participant.patrol_name or "",
+            participant.troop_number or "",
+            "Yes" if participant.is_checked_in else "No",
+            participant.checked_in_at.strftime("%Y-%m-%d %H:%M:%S") if participant.checked_in_at else "",
+            participant.checked_in_by or "",
+        ])
+    return output.getvalue()
+
+
+def archive_folder(outing: Outing) -> str:
+    """Folder name for an outing's entries; the id prefix keeps same-day namesakes apart"""
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", outing.name).strip("_")[:60] or "outing"
+    return f"{outing.outing_date.isoformat()}_{slug}_{outing.id.hex[:8]}"
+
+
+class _ArchiveSink(io.RawIOBase):
+    """Write-only, non-seekable target for zipfile that hands out what it received"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # zipfile records entry offsets from tell(), even on unseekable streams
+        return self._position
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+async def _render_roster(outing_data: dict, signups_data: list) -> bytes:
+    """Render one roster on the PDF pool, waiting out a full queue a few times"""
+    for _ in range(RENDER_RETRIES):
+        try:
+            pdf = await render_pdf(generate_outing_roster_pdf, outing_data, signups_data)
+            return pdf.getvalue()
+        except HTTPException as exc:
+            if exc.status_code != status.HTTP_503_SERVICE_UNAVAILABLE:
+                raise
+            await asyncio.sleep(RENDER_RETRY_SECONDS)
+    pdf = await render_pdf(generate_outing_roster_pdf, outing_data, signups_data)
+    return pdf.getvalue()
+
+
+async def _load_outing(db: AsyncSession, outing: Outing) -> tuple[dict, list, str]:
+    signups = build_signup_responses(await fetch_roster_rows(db, Signup.outing_id == outing.id))
+    summary = await crud_checkin.get_checkin_summary(db, outing.id)
+    return roster_pdf_outing(outing), roster_pdf_signups(signups), checkin_csv(summary)
+
+
+async def _write_outing(archive: zipfile.ZipFile, folder: str, render: asyncio.Task, csv_text: str) -> None:
+    try:
+        pdf = await render
+    except HTTPException as exc:
+        logger.warning("Roster for %s left out of export: %s", folder, exc.detail)
+        archive.writestr(f"{folder}/roster_error.txt", f"Roster could not be rendered: {exc.detail}\n")
+    except Exception:
+        logger.exception("Roster for %s failed to render", folder)
+        archive.writestr(f"{folder}/roster_error.txt", "Roster could not be rendered: unexpected error\n")
+    else:
+        # PDFs are already compressed
+        archive.writestr(f"{folder}/roster.pdf", pdf, compress_type=zipfile.ZIP_STORED)
+    archive.writestr(f"{folder}/checkins.csv", csv_text, compress_type=zipfile.ZIP_DEFLATED)
+
+
+async def stream_outing_archive(
+    db: AsyncSession,
+    outings: Sequence[Outing],
+    parallelism: Optional[int] = None,
+) -> AsyncIterator[bytes]:
+    """Yield a ZIP archive of each outing's roster PDF and check-in CSV, in order"""
+    parallelism = max(1, parallelism or settings.PDF_RENDER_WORKERS - 1)
+    sink = _ArchiveSink()
+    pending: deque = deque()
+    try:
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for outing in outings:
+                outing_data, signups_data, csv_text = await _load_outing(db, outing)
+                render = asyncio.create_task(_render_roster(outing_data, signups_data))
+                pending.append((archive_folder(outing), render, csv_text))
+                if len(pending) >= parallelism:
+                    await _write_outing(archive, *pending.popleft())
+                    yield sink.drain()
+            while pending:
+                await _write_outing(archive, *pending.popleft())
+                yield sink.drain()
+        # Closing the archive wrote the central directory
+        yield sink.drain()
+    finally:
+        # Client went away mid-stream: stop waiting on renders nobody will read
+        for _, render, _ in pending:
+            render.cancel()
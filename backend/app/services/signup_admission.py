@@ -0,0 +1,300 @@
+"""Signup admission rules shared by direct signups and the waitlist.
+
+Every check raises HTTPException with the message shown to the family. Capacity
+failures raise CapacityExceeded so the waitlist can tell "wait for a spot" apart
+from "this request can never be admitted".
+
+Callers hold the outing row lock (crud.outing.get_outing_for_update) while running
+admit_signup so capacity is checked against a roster no one else is changing.
+"""
+from typing import Optional, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import family as crud_family
+from app.crud import signup as crud_signup
+from app.crud import waitlist as crud_waitlist
+from app.models.family import FamilyMember
+from app.models.outing import Outing
+from app.models.signup import Signup
+from app.models.troop import Troop
+from app.models.user import User
+from app.schemas.signup import SignupCreate
+from app.services.outing_capacity import count_outing_roster, capacity_summary
+
+
+class CapacityExceeded(HTTPException):
+    """The outing does not currently have room for the requested participants."""
+
+    def __init__(self, detail: str):
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+async def get_restricted_troop(db: AsyncSession, outing: Outing) -> Optional[Troop]:
+    """Troop an outing is locked to (legacy single-troop restriction), if any"""
+    if outing.restricted_troop_id is None:
+        return None
+    # Strictly validate that the restricted troop ID still exists
+    troop_result = await db.execute(
+        select(Troop).where(Troop.id == outing.restricted_troop_id)
+    )
+    restricted_troop = troop_result.scalar_one_or_none()
+    if restricted_troop is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Restricted troop not found for outing")
+    return restricted_troop
+
+
+def check_signups_open(outing: Outing) -> None:
+    if outing.are_signups_closed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Signups are closed for this outing"
+        )
+
+
+async def load_signup_members(
+    db: AsyncSession,
+    outing: Outing,
+    family_member_ids: Sequence[UUID],
+    user: User,
+    restricted_troop: Optional[Troop],
+) -> list[FamilyMember]:
+    """Load family members (one IN query, shared with the insert) and check ownership and troop rules"""
+    allowed_troop_ids = {troop.id for troop in outing.allowed_troops}
+    members_by_id = await crud_family.get_family_members_by_ids(db, family_member_ids)
+    family_members = []
+    for family_member_id in family_member_ids:
+        family_member = members_by_id.get(family_member_id)
+        if not family_member:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Family member with ID {family_member_id} not found"
+            )
+
+        # Security check: Ensure family member belongs to current user
+        if family_member.user_id != user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"You do not have permission to sign up family member {family_member.name}"
+            )
+
+        # Troop restriction validation (legacy single-troop restriction)
+        if outing.restricted_troop_id:
+            # Prefer relational troop_id match, fallback to troop_number match
+            if not (
+                (family_member.troop_id and family_member.troop_id == outing.restricted_troop_id) or
+                (family_member.troop_number and restricted_troop and family_member.troop_number == restricted_troop.number)
+            ):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=(
+                        f"Family member '{family_member.name}' is not part of restricted troop "
+                        f"{restricted_troop.number if restricted_troop else 'unknown'}."
+                    )
+                )
+
+        # New multi-troop validation: Check if scout's troop is allowed (only for scouts with troop_id)
+        if family_member.member_type == 'scout' and family_member.troop_id and allowed_troop_ids:
+            if family_member.troop_id not in allowed_troop_ids:
+                # Get troop numbers for error message
+                allowed_troops_result = await db.execute(
+                    select(Troop).where(Troop.id.in_(allowed_troop_ids))
+                )
+                allowed_troops = allowed_troops_result.scalars().all()
+                allowed_numbers = ", ".join([t.number for t in allowed_troops])
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Scout '{family_member.name}' cannot sign up for this outing. "
+                           f"This outing is only open to troops: {allowed_numbers}."
+                )
+
+        family_members.append(family_member)
+    return family_members
+
+
+def _new_vehicle_capacity(family_members: Sequence[FamilyMember]) -> int:
+    """Vehicle seats brought by the adults in a signup"""
+    return sum(
+        fm.vehicle_capacity if fm.vehicle_capacity else 0
+        for fm in family_members
+        if fm.member_type == 'adult'
+    )
+
+
+def projected_available_spots(outing: Outing, counters: dict, family_members: Sequence[FamilyMember]) -> int:
+    """Spots left after admitting these family members; negative means over capacity"""
+    available_spots = capacity_summary(outing, counters)["available_spots"]
+    if outing.capacity_type == 'vehicle':
+        return available_spots + _new_vehicle_capacity(family_members) - len(family_members)
+    return available_spots - len(family_members)
+
+
+def check_capacity(outing: Outing, counters: dict, family_members: Sequence[FamilyMember]) -> None:
+    """Raise CapacityExceeded if the outing cannot take these family members"""
+    summary = capacity_summary(outing, counters)
+    total_participants = len(family_members)
+    projected = projected_available_spots(outing, counters, family_members)
+    if projected >= 0:
+        return
+
+    if outing.capacity_type == 'vehicle':
+        new_vehicle_capacity = _new_vehicle_capacity(family_members)
+        raise CapacityExceeded(
+            f"Not enough available spots. Current capacity: {summary['total_vehicle_capacity']} seats, "
+            f"current participants: {summary['signup_count']}. Your signup adds {new_vehicle_capacity} seats "
+            f"but requires {total_participants} spots, resulting in {abs(projected)} over capacity."
+        )
+    raise CapacityExceeded(
+        f"Not enough available spots. Only {summary['available_spots']} spots remaining."
+    )
+
+
+def counters_without(counters: dict, family_members: Sequence[FamilyMember]) -> dict:
+    """Roster counters with these family members (e.g. a signup being edited) taken out"""
+    adults = [fm for fm in family_members if fm.member_type == 'adult']
+    return {
+        **counters,
+        "participant_count": counters["participant_count"] - len(family_members),
+        "adult_count": counters["adult_count"] - len(adults),
+        "female_adult_count": counters["female_adult_count"] - sum(1 for fm in adults if fm.gender == 'female'),
+        "female_youth_count": counters["female_youth_count"] - sum(
+            1 for fm in family_members if fm.member_type != 'adult' and fm.gender == 'female'
+        ),
+        "vehicle_capacity": counters["vehicle_capacity"] - _new_vehicle_capacity(family_members),
+    }
+
+
+def check_capacity_change(
+    outing: Outing,
+    counters: dict,
+    old_members: Sequence[FamilyMember],
+    new_members: Sequence[FamilyMember],
+) -> None:
+    """Raise CapacityExceeded if swapping a signup's old_members for new_members needs room the outing lacks.
+
+    Changes that need no more room than the signup already takes always pass, even
+    on an outing that is over capacity.
+    """
+    others = counters_without(counters, old_members)
+    if projected_available_spots(outing, others, new_members) >= projected_available_spots(outing, others, old_members):
+        return
+    check_capacity(outing, others, new_members)
+
+
+async def check_waitlist_empty(db: AsyncSession, outing: Outing) -> None:
+    """Direct signups may not jump the queue: once anyone is waiting, new requests wait too"""
+    if await crud_waitlist.get_waitlist_head(db, outing.id) is not None:
+        raise CapacityExceeded(
+            "Other families are already waiting for a spot on this outing. "
+            "Join the waitlist to be admitted in order."
+        )
+
+
+def leadership_warnings(counters: dict, family_members: Sequence[FamilyMember]) -> list[str]:
+    """Scouting America leadership warnings for the roster after this signup"""
+    # Count adults and youth by gender across all signups (existing + new)
+    new_adults = [fm for fm in family_members if fm.member_type == 'adult']
+    new_youth = [fm for fm in family_members if fm.member_type == 'scout']
+    total_adults = counters["adult_count"] + len(new_adults)
+    total_female_adults = counters["female_adult_count"] + sum(1 for fm in new_adults if fm.gender == 'female')
+    total_female_youth = counters["female_youth_count"] + sum(1 for fm in new_youth if fm.gender == 'female')
+
+    warnings = []
+
+    # Scouting America Two-Deep Leadership: Minimum 2 adults required
+    if total_adults < 2:
+        warnings.append(
+            f"⚠️ Scouting America requires at least 2 adults on every outing. Currently {total_adults} adult(s) signed up. "
+            "Please ensure at least 2 adults are registered before the outing."
+        )
+
+    # Scouting America Gender-Specific Leadership: If female youth present, require female adult leader
+    if total_female_youth > 0 and total_female_adults < 1:
+        warnings.append(
+            "⚠️ Scouting America requires at least one female adult leader when female youth are present. "
+            "Please ensure a female adult is registered before the outing."
+        )
+    return warnings
+
+
+def check_youth_protection(outing: Outing, family_members: Sequence[FamilyMember]) -> None:
+    """Adults need SAFE Youth Training valid through the END of the outing"""
+    outing_end_date = outing.end_date if outing.end_date else outing.outing_date
+    new_adults = [fm for fm in family_members if fm.member_type == 'adult']
+
+    for adult in new_adults:
+        # Check if adult has youth protection training
+        if not adult.has_youth_protection:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Adult '{adult.name}' must have valid SAFE Youth Training (Youth Protection) certificate to sign up for outings. "
+                       "Please complete the training at my.scouting.org before signing up."
+            )
+
+        # Check if youth protection will be valid through the end of the outing
+        if adult.youth_protection_expiration:
+            if adult.youth_protection_expiration < outing_end_date:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Adult '{adult.name}' has SAFE Youth Training that expires {adult.youth_protection_expiration}, "
+                           f"but must be valid through the outing end date ({outing_end_date}). "
+                           "Please renew the training at my.scouting.org before signing up."
+                )
+
+    # Additional validation for overnight outings
+    if outing.is_overnight and new_adults:
+        # Check if at least one adult has youth protection training
+        if not any(a.has_youth_protection for a in new_adults):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="At least one adult must have Scouting America youth protection training for overnight outings"
+            )
+
+
+async def validate_signup_request(
+    db: AsyncSession,
+    outing: Outing,
+    signup: SignupCreate,
+    user: User,
+) -> list[FamilyMember]:
+    """Every admission rule except capacity; returns the validated family members"""
+    restricted_troop = await get_restricted_troop(db, outing)
+    check_signups_open(outing)
+    family_members = await load_signup_members(db, outing, signup.family_member_ids, user, restricted_troop)
+    check_youth_protection(outing, family_members)
+    return family_members
+
+
+async def admit_signup(
+    db: AsyncSession,
+    outing: Outing,
+    signup: SignupCreate,
+    user: User,
+) -> tuple[Signup, list[str]]:
+    """Validate a signup against the locked outing and create it.
+
+    Returns the committed signup and any leadership warnings. Raises
+    CapacityExceeded when there is no room, HTTPException for any other rule.
+    """
+    restricted_troop = await get_restricted_troop(db, outing)
+    check_signups_open(outing)
+    family_members = await load_signup_members(db, outing, signup.family_member_ids, user, restricted_troop)
+
+    # Check if outing has enough spots, using roster counts read under the outing lock
+    counters = await count_outing_roster(db, outing.id)
+    check_capacity(outing, counters, family_members)
+    warnings = leadership_warnings(counters, family_members)
+    check_youth_protection(outing, family_members)
+
+    # Create the signup
+    try:
+        db_signup = await crud_signup.create_signup(db, signup, family_members=family_members)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return db_signup, warnings
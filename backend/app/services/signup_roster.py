@@ -0,0 +1,256 @@
+"""Roster read model for signup responses.
+
+Every endpoint that returns signups with their participants reads them through
+fetch_roster_rows: one statement joining signups -> participants -> family members,
+projecting only the columns the responses need, with each family member's dietary
+preferences and allergies aggregated in SQL, sorted by value so a roster reads
+the same on every request. Rows come back as plain mappings, so
+nothing is added to the session's identity map, and build_signup_responses turns
+them into SignupResponse objects.
+
+Write paths that already hold the ORM graph (create/update) feed it through
+signup_rows instead of re-reading it.
+"""
+from datetime import date
+from typing import Any, Iterable, Mapping, Optional, Sequence
+
+from sqlalchemy import Select, String, literal, select, func
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.family import FamilyMember, FamilyMemberAllergy, FamilyMemberDietaryPreference
+from app.models.participant import Participant
+from app.models.signup import Signup
+from app.schemas.signup import ParticipantResponse, SignupResponse
+
+# Unit separator: cannot appear in a dietary preference or allergy typed into a form
+_LIST_SEPARATOR = "\x1f"
+
+DEFAULT_ORDER = (Signup.created_at.desc(), Signup.id.desc())
+
+
+def _aggregated(column, family_member_id_column, dialect_name: str):
+    """Correlated subquery joining one family member's list values, sorted, into a single string"""
+    if dialect_name == "postgresql":
+        return (
+            select(func.string_agg(column, aggregate_order_by(literal(_LIST_SEPARATOR), column), type_=String))
+            .where(family_member_id_column == FamilyMember.id)
+            .correlate(FamilyMember)
+            .scalar_subquery()
+        )
+    # SQLite (tests) has no ORDER BY inside aggregates before 3.44; group_concat takes
+    # rows in the order the sorted subquery yields them
+    values = (
+        select(column.label("value"))
+        .where(family_member_id_column == FamilyMember.id)
+        .correlate(FamilyMember)
+        .order_by(column)
+        .subquery()
+    )
+    return select(func.aggregate_strings(values.c.value, _LIST_SEPARATOR)).scalar_subquery()
+
+
+def roster_select(dialect_name: str) -> Select:
+    """Signups with one row per participant (or one empty row for a signup without any)"""
+    return (
+        select(
+            Signup.id.label("signup_id"),
+            Signup.outing_id,
+            Signup.family_contact_name,
+            Signup.family_contact_email,
+            Signup.family_contact_phone,
+            Signup.created_at.label("signup_created_at"),
+            Participant.id.label("participant_id"),
+            Participant.grubmaster_interest,
+            Participant.grubmaster_reason,
+            Participant.created_at.label("participant_created_at"),
+            FamilyMember.user_id.label("family_member_user_id"),
+            FamilyMember.name,
+            FamilyMember.date_of_birth,
+            FamilyMember.member_type,
+            FamilyMember.gender,
+            FamilyMember.troop_number,
+            FamilyMember.patrol_name,
+            FamilyMember.has_youth_protection,
+            FamilyMember.vehicle_capacity,
+            FamilyMember.medical_notes,
+            _aggregated(
+                FamilyMemberDietaryPreference.preference, FamilyMemberDietaryPreference.family_member_id, dialect_name
+            ).label("dietary_restrictions"),
+            _aggregated(FamilyMemberAllergy.allergy, FamilyMemberAllergy.family_member_id, dialect_name)
+            .label("allergies"),
+        )
+        .select_from(Signup)
+        .outerjoin(Participant, Participant.signup_id == Signup.id)
+        .outerjoin(FamilyMember, FamilyMember.id == Participant.family_member_id)
+    )
+
+
+async def fetch_roster_rows(
+    db: AsyncSession,
+    *criteria,
+    order_by: Sequence = DEFAULT_ORDER,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> list[Mapping[str, Any]]:
+    """Roster rows for the signups matching `criteria`, in `order_by` order.
+
+    `offset`/`limit` page over signups, not participant rows.
+    """
+    query = roster_select(db.bind.dialect.name)
+    if limit is not None or offset:
+        page = select(Signup.id).where(*criteria).order_by(*order_by).offset(offset)
+        if limit is not None:
+            page = page.limit(limit)
+        query = query.where(Signup.id.in_(page))
+    else:
+        query = query.where(*criteria)
+    query = query.order_by(*order_by, Participant.created_at, Participant.id)
+    result = await db.execute(query)
+    return list(result.mappings().all())
+
+
+def signup_rows(signup: Signup) -> list[Mapping[str, Any]]:
+    """Roster rows for a signup whose participants and family members are already loaded"""
+    signup_values = {
+        "signup_id": signup.id,
+        "outing_id": signup.outing_id,
+        "family_contact_name": signup.family_contact_name,
+        "family_contact_email": signup.family_contact_email,
+        "family_contact_phone": signup.family_contact_phone,
+        "signup_created_at": signup.created_at,
+    }
+    rows = []
+    for participant in signup.participants:
+        member = participant.family_member
+        rows.append({
+            **signup_values,
+            "participant_id": participant.id,
+            "grubmaster_interest": participant.grubmaster_interest,
+            "grubmaster_reason": participant.grubmaster_reason,
+            "participant_created_at": participant.created_at,
+            "family_member_user_id": member.user_id,
+            "name": member.name,
+            "date_of_birth": member.date_of_birth,
+            "member_type": member.member_type,
+            "gender": member.gender,
+            "troop_number": member.troop_number,
+            "patrol_name": member.patrol_name,
+            "has_youth_protection": member.has_youth_protection,
+            "vehicle_capacity": member.vehicle_capacity,
+            "medical_notes": member.medical_notes,
+            "dietary_restrictions": sorted(dp.preference for dp in member.dietary_preferences),
+            "allergies": sorted(a.allergy for a in member.allergies),
+        })
+    return rows or [{**signup_values, "participant_id": None}]
+
+
+def _as_list(value) -> list[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        return value.split(_LIST_SEPARATOR)
+    return list(value)
+
+
+def _age(date_of_birth: Optional[date]) -> Optional[int]:
+    if not date_of_birth:
+        return None
+    today = date.today()
+    return today.year - date_of_birth.year - ((today.month, today.day) < (date_of_birth.month, date_of_birth.day))
+
+
+def _participant_response(row: Mapping[str, Any]) -> ParticipantResponse:
+    return ParticipantResponse(
+        id=row["participant_id"],
+        name=row["name"],
+        age=_age(row["date_of_birth"]),
+        participant_type=row["member_type"],
+        is_adult=row["member_type"] == "adult",
+        gender=row["gender"],
+        troop_number=row["troop_number"],
+        patrol_name=row["patrol_name"],
+        has_youth_protection=row["has_youth_protection"],
+        vehicle_capacity=row["vehicle_capacity"],
+        dietary_restrictions=_as_list(row["dietary_restrictions"]),
+        allergies=_as_list(row["allergies"]),
+        medical_notes=row["medical_notes"],
+        grubmaster_interest=bool(row["grubmaster_interest"]),
+        grubmaster_reason=row["grubmaster_reason"],
+        created_at=row["participant_created_at"],
+    )
+
+
+def build_signup_responses(
+    rows: Iterable[Mapping[str, Any]],
+    warnings: Optional[list[str]] = None,
+) -> list[SignupResponse]:
+    """Group roster rows (ordered by signup) into SignupResponse objects"""
+    signups: dict = {}
+    participants: dict = {}
+    for row in rows:
+        signup_id = row["signup_id"]
+        if signup_id not in signups:
+            signups[signup_id] = row
+            participants[signup_id] = []
+        if row["participant_id"] is not None:
+            participants[signup_id].append(_participant_response(row))
+
+    responses = []
+    for signup_id, row in signups.items():
+        signup_participants = participants[signup_id]
+        adult_count = sum(1 for p in signup_participants if p.is_adult)
+        responses.append(SignupResponse(
+            id=signup_id,
+            outing_id=row["outing_id"],
+            family_contact_name=row["family_contact_name"],
+            family_contact_email=row["family_contact_email"],
+            family_contact_phone=row["family_contact_phone"],
+            participants=signup_participants,
+            participant_count=len(signup_participants),
+            scout_count=len(signup_participants) - adult_count,
+            adult_count=adult_count,
+            created_at=row["signup_created_at"],
+            warnings=list(warnings or []),
+        ))
+    return responses
+
+
+def roster_pdf_outing(outing) -> dict:
+    """Outing fields in the shape generate_outing_roster_pdf expects"""
+    return {
+        'name': outing.name,
+        'outing_date': outing.outing_date.isoformat(),
+        'end_date': outing.end_date.isoformat() if outing.end_date else None,
+        'location': outing.location,
+        'description': outing.description,
+        'outing_lead_name': outing.outing_lead_name,
+        'outing_lead_email': outing.outing_lead_email,
+        'outing_lead_phone': outing.outing_lead_phone,
+    }
+
+
+def roster_pdf_signups(signups: Iterable[SignupResponse]) -> list[dict]:
+    """Signup responses in the shape generate_outing_roster_pdf expects"""
+    return [
+        {
+            'family_contact_name': signup.family_contact_name,
+            'family_contact_phone': signup.family_contact_phone,
+            'participants': [
+                {
+                    'name': p.name,
+                    'age': p.age,
+                    'participant_type': p.participant_type,
+                    'gender': p.gender,
+                    'troop_number': p.troop_number,
+                    'patrol_name': p.patrol_name,
+                    'has_youth_protection': p.has_youth_protection,
+                    'vehicle_capacity': p.vehicle_capacity,
+                    'dietary_preferences': p.dietary_restrictions,
+                    'allergies': p.allergies,
+                }
+                for p in signup.participants
+            ],
+        }
+        for signup in signups
+    ]
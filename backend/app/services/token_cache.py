@@ -0,0 +1,134 @@
+"""Cache of verified access tokens for get_current_user.
+
+Verifying an Authentik token and resolving its user costs a signature check, a user
+lookup by email and sometimes a commit. The cache maps a token's SHA-256 to a
+snapshot of the resolved user so repeat requests with the same token skip all of it.
+
+Entries live until the earlier of the token's `exp` and AUTH_TOKEN_CACHE_TTL_SECONDS,
+and are evicted least-recently-used beyond AUTH_TOKEN_CACHE_MAX_ENTRIES. Any flushed
+change to a User (role change, deactivation, profile edit, delete) drops that user's
+entries, so the next request re-verifies and reloads them.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from itertools import chain
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.models.user import User
+
+_USER_COLUMNS = tuple(attr.key for attr in inspect(User).column_attrs)
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of token hash -> (expiry, user column snapshot)"""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._keys_by_user: dict[UUID, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> Optional[dict[str, Any]]:
+        """Return the cached user snapshot for a token, or None if absent or expired."""
+        key = _token_key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, values = entry
+        if expires_at <= time.time():
+            self._discard(key)
+            return None
+        self._entries.move_to_end(key)
+        return values
+
+    def put(self, token: str, user: User, exp: Optional[float] = None) -> None:
+        """Cache a verified token for an active user until min(exp, now + TTL)."""
+        if self.max_entries <= 0 or not user.is_active:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+        if expires_at <= time.time():
+            return
+
+        key = _token_key(token)
+        self._discard(key)
+        values = {name: getattr(user, name) for name in _USER_COLUMNS}
+        self._entries[key] = (expires_at, values)
+        self._keys_by_user.setdefault(user.id, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._discard(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        """Drop every cached token belonging to a user."""
+        for key in self._keys_by_user.pop(user_id, set()):
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_user.clear()
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_id = entry[1]["id"]
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+
+
+verified_tokens = VerifiedTokenCache(
+    max_entries=settings.AUTH_TOKEN_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_TOKEN_CACHE_TTL_SECONDS,
+)
+
+
+async def attach_cached_user(db: AsyncSession, values: dict[str, Any]) -> User:
+    """Attach a cached user snapshot to the session without querying the database."""
+    user = User(**values)
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed_users(session: Session, flush_context) -> None:
+    """Drop cached tokens for users changed in this flush, now and again at commit."""
+    user_ids = {
+        obj.id
+        for obj in chain(session.dirty, session.deleted)
+        if isinstance(obj, User) and obj.id is not None
+    }
+    if not user_ids:
+        return
+    for user_id in user_ids:
+        verified_tokens.invalidate_user(user_id)
+    session.info.setdefault("token_cache_user_ids", set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session) -> None:
+    # A request may have re-cached the old row between flush and commit
+    for user_id in session.info.pop("token_cache_user_ids", ()):
+        verified_tokens.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back_users(session: Session, previous_transaction) -> None:
+    session.info.pop("token_cache_user_ids", None)
@@ -0,0 +1,105 @@
+"""FIFO waitlist for outing signups.
+
+Requests are validated and queued immediately (crud.waitlist), then admitted in
+(created_at, id) order by process_waitlist. Admission for an outing is serialized
+twice over: an in-process asyncio.Lock keeps one drainer per outing per worker, and
+the outing row lock (crud.outing.get_outing_for_update) serializes drainers across
+workers and against direct signups.
+
+Admission is strictly first-in-first-out: if the request at the head of the queue
+does not fit, nothing behind it is admitted, even a smaller request that would.
+Requests that can never be admitted (signups closed, family member removed, expired
+training) are marked rejected with the reason so the queue keeps moving.
+"""
+import asyncio
+import logging
+from collections import Counter
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import outing as crud_outing
+from app.crud import waitlist as crud_waitlist
+from app.models.outing import Outing
+from app.models.user import User
+from app.models.waitlist import WaitlistEntry
+from app.schemas.signup import SignupCreate
+from app.services.signup_admission import CapacityExceeded, admit_signup, validate_signup_request
+
+logger = logging.getLogger(__name__)
+
+# Per-outing drain locks, kept only while some drainer holds or waits for one
+_drain_locks: dict[UUID, asyncio.Lock] = {}
+_drain_lock_users: Counter[UUID] = Counter()
+
+
+async def enqueue_signup(
+    db: AsyncSession,
+    outing: Outing,
+    signup: SignupCreate,
+    user: User,
+) -> WaitlistEntry:
+    """Validate a signup request (everything but capacity) and queue it"""
+    await validate_signup_request(db, outing, signup, user)
+    if await crud_waitlist.has_waiting_entry(db, outing.id, user.id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You already have a request waiting for this outing"
+        )
+    return await crud_waitlist.create_waitlist_entry(db, signup, user)
+
+
+async def process_waitlist(db: AsyncSession, outing_id: UUID) -> list[WaitlistEntry]:
+    """Admit waiting requests for an outing, in order, until the head no longer fits.
+
+    Returns the entries admitted by this call.
+    """
+    lock = _drain_locks.setdefault(outing_id, asyncio.Lock())
+    _drain_lock_users[outing_id] += 1
+    try:
+        async with lock:
+            admitted = []
+            while True:
+                entry = await _admit_next(db, outing_id)
+                if entry is None:
+                    return admitted
+                if entry.status == crud_waitlist.ADMITTED:
+                    admitted.append(entry)
+    finally:
+        _drain_lock_users[outing_id] -= 1
+        if not _drain_lock_users[outing_id]:
+            del _drain_lock_users[outing_id]
+            del _drain_locks[outing_id]
+
+
+async def _admit_next(db: AsyncSession, outing_id: UUID):
+    """Try the head of the queue; returns it once admitted or rejected, None to stop draining"""
+    outing = await crud_outing.get_outing_for_update(db, outing_id)
+    entry = await crud_waitlist.get_waitlist_head(db, outing_id) if outing else None
+    if entry is None:
+        # Release the outing lock
+        await db.commit()
+        return None
+
+    user = await db.get(User, entry.user_id)
+    signup = SignupCreate.model_validate(entry.signup_request)
+    # Marked before admission so the status change commits together with the signup
+    entry.status = crud_waitlist.ADMITTED
+    try:
+        db_signup, _ = await admit_signup(db, outing, signup, user)
+    except CapacityExceeded:
+        entry.status = crud_waitlist.WAITING
+        await db.commit()
+        return None
+    except HTTPException as exc:
+        entry.status = crud_waitlist.REJECTED
+        entry.status_reason = str(exc.detail)
+        await db.commit()
+        logger.info("Rejected waitlist entry %s for outing %s: %s", entry.id, outing_id, exc.detail)
+        return entry
+
+    entry.signup_id = db_signup.id
+    await db.commit()
+    logger.info("Admitted waitlist entry %s for outing %s as signup %s", entry.id, outing_id, db_signup.id)
+    return entry
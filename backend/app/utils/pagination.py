@@ -0,0 +1,29 @@
+"""Opaque keyset-pagination cursors.
+
+A cursor is the sort key of the last row on a page, serialized as URL-safe base64 JSON
+so clients treat it as an opaque token and never build offsets themselves.
+"""
+import base64
+import json
+from typing import Any
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key values of the last row on a page."""
+    blob = json.dumps([str(v) for v in values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(blob).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[str]:
+    """Decode a cursor into its string components.
+
+    Raises ValueError if the cursor is malformed or does not have `size` components.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception as e:
+        raise ValueError("Malformed cursor") from e
+    if not isinstance(values, list) or len(values) != size or not all(isinstance(v, str) for v in values):
+        raise ValueError("Malformed cursor")
+    return values
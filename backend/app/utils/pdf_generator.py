@@ -4,7 +4,8 @@ Creates attractive, printable check-in sheets for outing leaders.
 """
 from io import BytesIO
 from datetime import datetime
-from typing import List
+from functools import lru_cache
+from typing import List, Tuple
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, landscape
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -13,33 +14,11 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 
 
-def generate_outing_roster_pdf(outing_data: dict, signups: List[dict]) -> BytesIO:
+@lru_cache(maxsize=None)
+def roster_styles() -> Tuple[ParagraphStyle, ParagraphStyle, ParagraphStyle]:
     """
-    Generate a PDF roster for a outing with checkboxes for check-in.
-    
-    Args:
-        outing_data: Dictionary containing outing information (name, date, location, etc.)
-        signups: List of signup dictionaries with participant information
-        
-    Returns:
-        BytesIO object containing the PDF data
+    Title, subtitle and header styles for roster PDFs, built once per process.
     """
-    buffer = BytesIO()
-    
-    # Use landscape orientation for better table layout
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=landscape(letter),
-        rightMargin=0.5*inch,
-        leftMargin=0.5*inch,
-        topMargin=0.75*inch,
-        bottomMargin=0.5*inch
-    )
-    
-    # Container for the 'Flowable' objects
-    elements = []
-    
-    # Define styles
     styles = getSampleStyleSheet()
     title_style = ParagraphStyle(
         'CustomTitle',
@@ -50,7 +29,7 @@ def generate_outing_roster_pdf(outing_data: dict, signups: List[dict]) -> BytesI
         alignment=TA_CENTER,
         fontName='Helvetica-Bold'
     )
-    
+
     subtitle_style = ParagraphStyle(
         'CustomSubtitle',
         parent=styles['Normal'],
@@ -60,7 +39,7 @@ def generate_outing_roster_pdf(outing_data: dict, signups: List[dict]) -> BytesI
         alignment=TA_CENTER,
         fontName='Helvetica'
     )
-    
+
     header_style = ParagraphStyle(
         'CustomHeader',
         parent=styles['Normal'],
@@ -70,6 +49,37 @@ def generate_outing_roster_pdf(outing_data: dict, signups: List[dict]) -> BytesI
         alignment=TA_LEFT,
         fontName='Helvetica'
     )
+    return title_style, subtitle_style, header_style
+
+
+def generate_outing_roster_pdf(outing_data: dict, signups: List[dict]) -> BytesIO:
+    """
+    Generate a PDF roster for a outing with checkboxes for check-in.
+    
+    Args:
+        outing_data: Dictionary containing outing information (name, date, location, etc.)
+        signups: List of signup dictionaries with participant information
+        
+    Returns:
+        BytesIO object containing the PDF data
+    """
+    buffer = BytesIO()
+    
+    # Use landscape orientation for better table layout
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=landscape(letter),
+        rightMargin=0.5*inch,
+        leftMargin=0.5*inch,
+        topMargin=0.75*inch,
+        bottomMargin=0.5*inch
+    )
+    
+    # Container for the 'Flowable' objects
+    elements = []
+    
+    # Define styles
+    title_style, subtitle_style, header_style = roster_styles()
     
     # Add title
     title = Paragraph(f"<b>{outing_data['name']}</b>", title_style)
@@ -1,10 +1,11 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Tuple
+from typing import List, Optional, Set, Tuple
 import re
 
 from app.models.outing import Outing
 from app.models.requirement import RankRequirement, MeritBadge
 from app.crud import requirement as crud_requirement
+from app.services.keyword_index import expand_keyword, outing_keyword_forms
 from app.schemas.requirement import RequirementSuggestion, MeritBadgeSuggestion, OutingSuggestions
 
 DOMAIN_STOPWORDS = {
@@ -67,50 +68,23 @@ def extract_keywords_from_text(text: str) -> List[str]:
 
 def calculate_match_score(
     requirement_keywords: List[str],
-    outing_keywords: List[str]
+    outing_keywords: List[str],
+    outing_forms: Optional[Set[str]] = None,
 ) -> Tuple[float, List[str]]:
     """Calculate match score between requirement and outing keywords.
     Scoring strategy: score = matched / max(len(requirement_keywords), 1)
     (focus on coverage of requirement keywords, matching test expectations).
+    Pass outing_forms (outing_keyword_forms(outing_keywords)) when scoring many
+    requirements against the same outing so it is normalized once.
     Returns (score, matched_keywords).
     """
     if not requirement_keywords or not outing_keywords:
         return 0.0, []
 
-    def normalize_set(tokens: List[str]) -> set[str]:
-        norm: set[str] = set()
-        for t in tokens:
-            if not t:
-                continue
-            token = t.lower()
-            norm.add(token)
-            # Handle common plural -> singular
-            if token.endswith('s') and len(token) > 3:
-                norm.add(token[:-1])
-            # Handle simple '-ing' forms: include base
-            if token.endswith('ing') and len(token) > 5:
-                base = token[:-3]
-                norm.add(base)
-        return norm
-
-    out_norm = normalize_set(outing_keywords)
+    out_norm = outing_forms if outing_forms is not None else outing_keyword_forms(outing_keywords)
     req_orig = list({t.lower() for t in requirement_keywords})
 
-    def expand(token: str) -> List[str]:
-        forms = {token}
-        if token.endswith('s') and len(token) > 3:
-            forms.add(token[:-1])
-        if token.endswith('ing') and len(token) > 5:
-            base = token[:-3]
-            forms.add(base)
-            forms.add(base + 'e')  # handle common pattern: hiking -> hike
-        return list(forms)
-
-    matched_orig: List[str] = []
-    for tok in req_orig:
-        forms = expand(tok)
-        if any(f in out_norm for f in forms):
-            matched_orig.append(tok)
+    matched_orig = [tok for tok in req_orig if not expand_keyword(tok).isdisjoint(out_norm)]
 
     score = len(matched_orig) / max(len(req_orig), 1)
     return score, matched_orig
@@ -140,6 +114,7 @@ def get_requirement_suggestions(
     
     if not outing_keywords:
         return []
+    outing_forms = outing_keyword_forms(outing_keywords)
     
     # Search for requirements with matching keywords
     result = crud_requirement.search_rank_requirements_by_keywords(db, outing_keywords)
@@ -158,7 +133,8 @@ def get_requirement_suggestions(
         
         score, matched = calculate_match_score(
             requirement.keywords,
-            outing_keywords
+            outing_keywords,
+            outing_forms,
         )
         
         if score >= min_score:
@@ -202,6 +178,7 @@ def get_merit_badge_suggestions(
     
     if not outing_keywords:
         return []
+    outing_forms = outing_keyword_forms(outing_keywords)
     
     # Search for merit badges with matching keywords
     result = crud_requirement.search_merit_badges_by_keywords(db, outing_keywords)
@@ -220,7 +197,8 @@ def get_merit_badge_suggestions(
         
         score, matched = calculate_match_score(
             badge.keywords,
-            outing_keywords
+            outing_keywords,
+            outing_forms,
         )
         
         if score >= min_score:
@@ -0,0 +1,33 @@
+-- Materialized per-outing capacity counters so outing lists do not load every signup/participant
+CREATE TABLE IF NOT EXISTS "public"."outing_capacity" (
+  "outing_id" uuid NOT NULL,
+  "participant_count" integer NOT NULL DEFAULT 0,
+  "adult_count" integer NOT NULL DEFAULT 0,
+  "female_adult_count" integer NOT NULL DEFAULT 0,
+  "female_youth_count" integer NOT NULL DEFAULT 0,
+  "vehicle_capacity" integer NOT NULL DEFAULT 0,
+  "updated_at" timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY ("outing_id"),
+  CONSTRAINT "outing_capacity_outing_id_fkey" FOREIGN KEY ("outing_id") REFERENCES "public"."outings"("id") ON UPDATE NO ACTION ON DELETE CASCADE
+);
+
+-- Backfill counters for existing outings
+INSERT INTO "public"."outing_capacity" (
+  "outing_id", "participant_count", "adult_count", "female_adult_count", "female_youth_count", "vehicle_capacity", "updated_at"
+)
+SELECT
+  o.id,
+  COUNT(p.id),
+  COALESCE(SUM(CASE WHEN fm.member_type = 'adult' THEN 1 ELSE 0 END), 0),
+  COALESCE(SUM(CASE WHEN fm.member_type = 'adult' AND fm.gender = 'female' THEN 1 ELSE 0 END), 0),
+  COALESCE(SUM(CASE WHEN fm.member_type <> 'adult' AND fm.gender = 'female' THEN 1 ELSE 0 END), 0),
+  COALESCE(SUM(CASE WHEN fm.member_type = 'adult' THEN COALESCE(fm.vehicle_capacity, 0) ELSE 0 END), 0),
+  CURRENT_TIMESTAMP
+FROM "public"."outings" o
+LEFT JOIN "public"."signups" s ON s.outing_id = o.id
+LEFT JOIN "public"."participants" p ON p.signup_id = s.id
+LEFT JOIN "public"."family_members" fm ON fm.id = p.family_member_id
+GROUP BY o.id
+ON CONFLICT ("outing_id") DO NOTHING;
+
+COMMENT ON TABLE "public"."outing_capacity" IS 'Materialized participant/seat counters per outing, maintained by the application on roster writes.';
@@ -0,0 +1,2 @@
+-- Partial index backing the keyset-paginated "available outings" query
+CREATE INDEX IF NOT EXISTS "ix_outings_open_by_date" ON "public"."outings" ("outing_date", "id") WHERE (signups_closed = false);
@@ -0,0 +1,23 @@
+-- FIFO waitlist of signup requests, admitted in (created_at, id) order as spots open
+CREATE TABLE IF NOT EXISTS "public"."signup_waitlist" (
+  "id" uuid NOT NULL,
+  "outing_id" uuid NOT NULL,
+  "user_id" uuid NOT NULL,
+  "signup_request" jsonb NOT NULL,
+  "participant_count" integer NOT NULL,
+  "status" character varying(20) NOT NULL DEFAULT 'waiting',
+  "status_reason" text NULL,
+  "signup_id" uuid NULL,
+  "created_at" timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  "updated_at" timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY ("id"),
+  CONSTRAINT "signup_waitlist_outing_id_fkey" FOREIGN KEY ("outing_id") REFERENCES "public"."outings"("id") ON UPDATE NO ACTION ON DELETE CASCADE,
+  CONSTRAINT "signup_waitlist_user_id_fkey" FOREIGN KEY ("user_id") REFERENCES "public"."users"("id") ON UPDATE NO ACTION ON DELETE CASCADE,
+  CONSTRAINT "signup_waitlist_signup_id_fkey" FOREIGN KEY ("signup_id") REFERENCES "public"."signups"("id") ON UPDATE NO ACTION ON DELETE SET NULL
+);
+CREATE INDEX IF NOT EXISTS "ix_signup_waitlist_id" ON "public"."signup_waitlist" ("id");
+CREATE INDEX IF NOT EXISTS "ix_signup_waitlist_outing_id" ON "public"."signup_waitlist" ("outing_id");
+CREATE INDEX IF NOT EXISTS "ix_signup_waitlist_user_id" ON "public"."signup_waitlist" ("user_id");
+CREATE INDEX IF NOT EXISTS "ix_signup_waitlist_queue" ON "public"."signup_waitlist" ("outing_id", "status", "created_at");
+
+COMMENT ON TABLE "public"."signup_waitlist" IS 'Queued signup requests admitted in FIFO order by the application as outing spots open.';
@@ -0,0 +1,3 @@
+-- Indexes backing the keyset-paginated (created_at, id) signup listing
+CREATE INDEX IF NOT EXISTS "ix_signups_created_at_id" ON "public"."signups" ("created_at", "id");
+CREATE INDEX IF NOT EXISTS "ix_signups_outing_created_at_id" ON "public"."signups" ("outing_id", "created_at", "id");
@@ -0,0 +1,16 @@
+-- Monotonic insertion sequence for change_log, used as the delta pagination cursor.
+-- Existing rows are numbered in their previous (created_at, id) order so cursors
+-- handed out before this migration keep resolving to the same position.
+ALTER TABLE "public"."change_log" ADD COLUMN "seq" bigint NULL;
+UPDATE "public"."change_log" AS c
+SET "seq" = o."rn"
+FROM (SELECT "id", row_number() OVER (ORDER BY "created_at", "id") AS "rn" FROM "public"."change_log") AS o
+WHERE c."id" = o."id";
+ALTER TABLE "public"."change_log" ALTER COLUMN "seq" SET NOT NULL;
+ALTER TABLE "public"."change_log" ALTER COLUMN "seq" ADD GENERATED BY DEFAULT AS IDENTITY;
+SELECT setval(pg_get_serial_sequence('"public"."change_log"', 'seq'), COALESCE(MAX("seq"), 0) + 1, false) FROM "public"."change_log";
+
+CREATE UNIQUE INDEX "ix_change_log_seq" ON "public"."change_log" ("seq");
+CREATE INDEX "ix_change_log_entity_type_seq" ON "public"."change_log" ("entity_type", "seq");
+
+COMMENT ON COLUMN "public"."change_log"."seq" IS 'Monotonic insertion order; delta cursors are keyed on it';
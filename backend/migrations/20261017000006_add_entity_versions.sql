@@ -0,0 +1,16 @@
+-- Per-entity change log version counters, bumped with an upsert for every change log
+-- entry instead of reading max(version) from change_log on each write
+CREATE TABLE "public"."entity_versions" (
+  "entity_type" character varying(50) NOT NULL,
+  "entity_id" uuid NOT NULL,
+  "version" integer NOT NULL,
+  PRIMARY KEY ("entity_type", "entity_id")
+);
+
+-- Seed from the existing log; global events (no entity) are keyed by the nil UUID
+INSERT INTO "public"."entity_versions" ("entity_type", "entity_id", "version")
+SELECT "entity_type", COALESCE("entity_id", '00000000-0000-0000-0000-000000000000'::uuid), MAX("version")
+FROM "public"."change_log"
+GROUP BY 1, 2;
+
+COMMENT ON TABLE "public"."entity_versions" IS 'Current change log version per entity; survives change log pruning';
@@ -0,0 +1,59 @@
+-- Range-partition change_log by month on created_at so retention drops whole
+-- partitions instead of running large DELETEs (see app/services/change_log_prune.py).
+-- Partitions are named change_log_pYYYYMM; the retention task creates upcoming ones.
+-- Primary keys and unique indexes on a partitioned table must include created_at:
+-- the (entity_type, entity_id, version) unique index is dropped (entity_versions now
+-- allocates versions), and seq stays unique by construction.
+ALTER TABLE "public"."change_log" RENAME TO "change_log_unpartitioned";
+ALTER INDEX IF EXISTS "public"."ix_change_log_seq" RENAME TO "ix_change_log_unpartitioned_seq";
+ALTER INDEX IF EXISTS "public"."ix_change_log_entity_type_seq" RENAME TO "ix_change_log_unpartitioned_entity_type_seq";
+ALTER INDEX IF EXISTS "public"."ix_change_log_created_at" RENAME TO "ix_change_log_unpartitioned_created_at";
+ALTER INDEX IF EXISTS "public"."ix_change_log_entity_type_created_at" RENAME TO "ix_change_log_unpartitioned_entity_type_created_at";
+ALTER INDEX IF EXISTS "public"."ix_change_log_entity_type_entity_id" RENAME TO "ix_change_log_unpartitioned_entity_type_entity_id";
+
+CREATE SEQUENCE "public"."change_log_seq_seq" AS bigint;
+SELECT setval('"public"."change_log_seq_seq"', COALESCE(MAX("seq"), 0) + 1, false) FROM "public"."change_log_unpartitioned";
+
+CREATE TABLE "public"."change_log" (
+  "id" uuid NOT NULL,
+  "seq" bigint NOT NULL DEFAULT nextval('"public"."change_log_seq_seq"'),
+  "entity_type" character varying(50) NOT NULL,
+  "entity_id" uuid NULL,
+  "op_type" character varying(10) NOT NULL,
+  "version" integer NOT NULL DEFAULT 1,
+  "payload_hash" character varying(64) NULL,
+  "created_at" timestamp NOT NULL,
+  PRIMARY KEY ("id", "created_at")
+) PARTITION BY RANGE ("created_at");
+ALTER SEQUENCE "public"."change_log_seq_seq" OWNED BY "public"."change_log"."seq";
+
+CREATE TABLE "public"."change_log_default" PARTITION OF "public"."change_log" DEFAULT;
+
+-- Monthly partitions from the oldest existing row through two months ahead
+DO $$
+DECLARE
+  month date := date_trunc('month', COALESCE((SELECT MIN("created_at") FROM "public"."change_log_unpartitioned"), now()))::date;
+  last_month date := (date_trunc('month', now()) + interval '2 months')::date;
+BEGIN
+  WHILE month <= last_month LOOP
+    EXECUTE format(
+      'CREATE TABLE "public".%I PARTITION OF "public"."change_log" FOR VALUES FROM (%L) TO (%L)',
+      'change_log_p' || to_char(month, 'YYYYMM'), month, (month + interval '1 month')::date
+    );
+    month := (month + interval '1 month')::date;
+  END LOOP;
+END $$;
+
+CREATE INDEX "ix_change_log_seq" ON "public"."change_log" ("seq");
+CREATE INDEX "ix_change_log_entity_type_seq" ON "public"."change_log" ("entity_type", "seq");
+CREATE INDEX "ix_change_log_created_at" ON "public"."change_log" ("created_at");
+CREATE INDEX "ix_change_log_entity_type_entity_id" ON "public"."change_log" ("entity_type", "entity_id");
+
+INSERT INTO "public"."change_log" ("id", "seq", "entity_type", "entity_id", "op_type", "version", "payload_hash", "created_at")
+SELECT "id", "seq", "entity_type", "entity_id", "op_type", "version", "payload_hash", "created_at"
+FROM "public"."change_log_unpartitioned";
+
+DROP TABLE "public"."change_log_unpartitioned";
+
+COMMENT ON TABLE "public"."change_log" IS 'Append-only change log for incremental client sync, partitioned by month';
+COMMENT ON COLUMN "public"."change_log"."seq" IS 'Monotonic insertion order; delta cursors are keyed on it';
@@ -0,0 +1,26 @@
+-- Compaction checkpoints for change_log: the latest entry per entity up to a seq,
+-- written by the retention task before it prunes, so clients whose cursor predates
+-- the retention horizon resync from the checkpoint plus the change_log tail
+CREATE TABLE "public"."change_log_checkpoints" (
+  "id" uuid NOT NULL,
+  "seq" bigint NOT NULL,
+  "entities_updated" integer NOT NULL DEFAULT 0,
+  "created_at" timestamp NOT NULL,
+  PRIMARY KEY ("id")
+);
+CREATE INDEX "ix_change_log_checkpoints_seq" ON "public"."change_log_checkpoints" ("seq");
+
+CREATE TABLE "public"."change_log_checkpoint_entries" (
+  "entity_type" character varying(50) NOT NULL,
+  "entity_id" uuid NOT NULL,
+  "change_id" uuid NOT NULL,
+  "seq" bigint NOT NULL,
+  "op_type" character varying(10) NOT NULL,
+  "version" integer NOT NULL,
+  "payload_hash" character varying(64) NULL,
+  "created_at" timestamp NOT NULL,
+  PRIMARY KEY ("entity_type", "entity_id")
+);
+CREATE INDEX "ix_change_log_checkpoint_entries_seq" ON "public"."change_log_checkpoint_entries" ("seq");
+
+COMMENT ON TABLE "public"."change_log_checkpoint_entries" IS 'Latest change_log entry per entity as of the latest checkpoint; deletes kept as tombstones';
@@ -0,0 +1,17 @@
+-- Check-in/undo operations replayed by offline clients, keyed by their idempotency
+-- key so resent batches are not applied twice
+CREATE TABLE "public"."checkin_operations" (
+  "outing_id" uuid NOT NULL,
+  "idempotency_key" character varying(100) NOT NULL,
+  "participant_id" uuid NOT NULL,
+  "op" character varying(10) NOT NULL,
+  "occurred_at" timestamp NOT NULL,
+  "checked_in_by" character varying(255) NULL,
+  "status" character varying(20) NOT NULL,
+  "processed_at" timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY ("outing_id", "idempotency_key"),
+  CONSTRAINT "checkin_operations_outing_id_fkey" FOREIGN KEY ("outing_id") REFERENCES "public"."outings"("id") ON UPDATE NO ACTION ON DELETE CASCADE
+);
+CREATE INDEX "ix_checkin_operations_participant" ON "public"."checkin_operations" ("outing_id", "participant_id", "occurred_at");
+
+COMMENT ON TABLE "public"."checkin_operations" IS 'Replayed offline check-in operations; latest applied occurred_at per participant is the last-writer-wins clock';
@@ -0,0 +1,38 @@
+-- Precomputed keyword forms for suggestion lookups: each keyword lowercased plus its
+-- plural/'-ing' reductions. This backfills existing rows; the triggers added in
+-- 20261017000011_keyword_forms_trigger.sql keep them up to date on every write.
+-- Suggestions select rows with keyword_forms && the outing's forms, served by the
+-- GIN indexes below instead of scanning every row.
+ALTER TABLE "public"."rank_requirements" ADD COLUMN "keyword_forms" text[] NULL;
+ALTER TABLE "public"."merit_badges" ADD COLUMN "keyword_forms" text[] NULL;
+
+UPDATE "public"."rank_requirements" AS r
+SET "keyword_forms" = (
+  SELECT COALESCE(array_agg(DISTINCT f."form" ORDER BY f."form"), '{}')
+  FROM unnest(r."keywords") AS k("keyword")
+  CROSS JOIN LATERAL (VALUES
+    (lower(k."keyword")),
+    (CASE WHEN length(k."keyword") > 3 AND lower(k."keyword") LIKE '%s' THEN left(lower(k."keyword"), -1) END),
+    (CASE WHEN length(k."keyword") > 5 AND lower(k."keyword") LIKE '%ing' THEN left(lower(k."keyword"), -3) END),
+    (CASE WHEN length(k."keyword") > 5 AND lower(k."keyword") LIKE '%ing' THEN left(lower(k."keyword"), -3) || 'e' END)
+  ) AS f("form")
+  WHERE f."form" IS NOT NULL AND f."form" <> ''
+)
+WHERE r."keywords" IS NOT NULL;
+
+UPDATE "public"."merit_badges" AS b
+SET "keyword_forms" = (
+  SELECT COALESCE(array_agg(DISTINCT f."form" ORDER BY f."form"), '{}')
+  FROM unnest(b."keywords") AS k("keyword")
+  CROSS JOIN LATERAL (VALUES
+    (lower(k."keyword")),
+    (CASE WHEN length(k."keyword") > 3 AND lower(k."keyword") LIKE '%s' THEN left(lower(k."keyword"), -1) END),
+    (CASE WHEN length(k."keyword") > 5 AND lower(k."keyword") LIKE '%ing' THEN left(lower(k."keyword"), -3) END),
+    (CASE WHEN length(k."keyword") > 5 AND lower(k."keyword") LIKE '%ing' THEN left(lower(k."keyword"), -3) || 'e' END)
+  ) AS f("form")
+  WHERE f."form" IS NOT NULL AND f."form" <> ''
+)
+WHERE b."keywords" IS NOT NULL;
+
+CREATE INDEX "idx_rank_requirements_keyword_forms" ON "public"."rank_requirements" USING GIN ("keyword_forms");
+CREATE INDEX "idx_merit_badges_keyword_forms" ON "public"."merit_badges" USING GIN ("keyword_forms");
@@ -0,0 +1,38 @@
+-- Keep keyword_forms in step with keywords on every write, including plain SQL
+-- (seed migrations, manual fixes) that never passes through the ORM hook in
+-- app/services/keyword_index.py. Forms are computed exactly as in the backfill of
+-- 20261017000010_add_keyword_forms.sql.
+CREATE OR REPLACE FUNCTION keyword_forms(keywords text[])
+RETURNS text[] AS $$
+  SELECT CASE WHEN keywords IS NULL THEN NULL ELSE (
+    SELECT COALESCE(array_agg(DISTINCT f."form" ORDER BY f."form"), '{}')
+    FROM unnest(keywords) AS k("keyword")
+    CROSS JOIN LATERAL (VALUES
+      (lower(k."keyword")),
+      (CASE WHEN length(k."keyword") > 3 AND lower(k."keyword") LIKE '%s' THEN left(lower(k."keyword"), -1) END),
+      (CASE WHEN length(k."keyword") > 5 AND lower(k."keyword") LIKE '%ing' THEN left(lower(k."keyword"), -3) END),
+      (CASE WHEN length(k."keyword") > 5 AND lower(k."keyword") LIKE '%ing' THEN left(lower(k."keyword"), -3) || 'e' END)
+    ) AS f("form")
+    WHERE f."form" IS NOT NULL AND f."form" <> ''
+  ) END;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION set_keyword_forms()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.keyword_forms = keyword_forms(NEW.keywords);
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER set_rank_requirements_keyword_forms BEFORE INSERT OR UPDATE OF keywords, keyword_forms ON rank_requirements
+    FOR EACH ROW EXECUTE FUNCTION set_keyword_forms();
+
+CREATE TRIGGER set_merit_badges_keyword_forms BEFORE INSERT OR UPDATE OF keywords, keyword_forms ON merit_badges
+    FOR EACH ROW EXECUTE FUNCTION set_keyword_forms();
+
+-- Rows written with plain SQL since the backfill
+UPDATE "public"."rank_requirements" SET "keyword_forms" = keyword_forms("keywords")
+WHERE "keyword_forms" IS DISTINCT FROM keyword_forms("keywords");
+UPDATE "public"."merit_badges" SET "keyword_forms" = keyword_forms("keywords")
+WHERE "keyword_forms" IS DISTINCT FROM keyword_forms("keywords");
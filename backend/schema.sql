@@ -44,6 +44,7 @@ CREATE TABLE outings (
 CREATE INDEX ix_outings_id ON outings (id);
 CREATE INDEX ix_outings_outing_date ON outings (outing_date);
 CREATE INDEX ix_outings_end_date ON outings (end_date);
+CREATE INDEX ix_outings_open_by_date ON outings (outing_date, id) WHERE signups_closed = false;
 -- Troop restriction (optional)
 
 CREATE TABLE signups (
@@ -56,6 +57,8 @@ CREATE TABLE signups (
 	PRIMARY KEY (id), 
 	FOREIGN KEY(outing_id) REFERENCES outings (id) ON DELETE CASCADE
 );
+CREATE INDEX ix_signups_created_at_id ON signups (created_at, id);
+CREATE INDEX ix_signups_outing_created_at_id ON signups (outing_id, created_at, id);
 CREATE INDEX ix_signups_outing_id ON signups (outing_id);
 CREATE INDEX ix_signups_id ON signups (id);
 CREATE TABLE refresh_tokens (
@@ -185,6 +188,7 @@ CREATE TABLE rank_requirements (
 	requirement_number VARCHAR(20) NOT NULL,
 	requirement_text TEXT NOT NULL,
 	keywords TEXT[],
+	keyword_forms TEXT[],
 	category VARCHAR(100),
 	created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
 	updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
@@ -193,6 +197,7 @@ CREATE TABLE rank_requirements (
 CREATE INDEX ix_rank_requirements_rank ON rank_requirements (rank);
 CREATE INDEX ix_rank_requirements_category ON rank_requirements (category);
 CREATE INDEX ix_rank_requirements_id ON rank_requirements (id);
+CREATE INDEX idx_rank_requirements_keyword_forms ON rank_requirements USING GIN (keyword_forms);
 
 -- Merit badges
 CREATE TABLE merit_badges (
@@ -200,6 +205,7 @@ CREATE TABLE merit_badges (
 	name VARCHAR(100) NOT NULL,
 	description TEXT,
 	keywords TEXT[],
+	keyword_forms TEXT[],
 	eagle_required BOOLEAN NOT NULL DEFAULT FALSE,
 	created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
 	updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
@@ -208,6 +214,7 @@ CREATE TABLE merit_badges (
 CREATE UNIQUE INDEX uq_merit_badges_name ON merit_badges (name);
 CREATE INDEX ix_merit_badges_name ON merit_badges (name);
 CREATE INDEX ix_merit_badges_id ON merit_badges (id);
+CREATE INDEX idx_merit_badges_keyword_forms ON merit_badges USING GIN (keyword_forms);
 
 -- Junction table: outings to rank requirements
 CREATE TABLE outing_requirements (
@@ -370,3 +377,49 @@ CREATE TABLE roster_members (
 );
 CREATE INDEX ix_roster_members_bsa_member_id ON roster_members (bsa_member_id);
 
+
+-- Materialized outing capacity counters
+CREATE TABLE outing_capacity (
+	outing_id UUID NOT NULL,
+	participant_count INTEGER NOT NULL,
+	adult_count INTEGER NOT NULL,
+	female_adult_count INTEGER NOT NULL,
+	female_youth_count INTEGER NOT NULL,
+	vehicle_capacity INTEGER NOT NULL,
+	updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+	PRIMARY KEY (outing_id),
+	FOREIGN KEY(outing_id) REFERENCES outings (id) ON DELETE CASCADE
+);
+CREATE TABLE signup_waitlist (
+	id UUID NOT NULL,
+	outing_id UUID NOT NULL,
+	user_id UUID NOT NULL,
+	signup_request JSON NOT NULL,
+	participant_count INTEGER NOT NULL,
+	status VARCHAR(20) NOT NULL,
+	status_reason TEXT,
+	signup_id UUID,
+	created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+	updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+	PRIMARY KEY (id),
+	FOREIGN KEY(outing_id) REFERENCES outings (id) ON DELETE CASCADE,
+	FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE,
+	FOREIGN KEY(signup_id) REFERENCES signups (id) ON DELETE SET NULL
+);
+CREATE INDEX ix_signup_waitlist_queue ON signup_waitlist (outing_id, status, created_at);
+CREATE INDEX ix_signup_waitlist_id ON signup_waitlist (id);
+CREATE INDEX ix_signup_waitlist_outing_id ON signup_waitlist (outing_id);
+CREATE INDEX ix_signup_waitlist_user_id ON signup_waitlist (user_id);
+CREATE TABLE checkin_operations (
+	outing_id UUID NOT NULL,
+	idempotency_key VARCHAR(100) NOT NULL,
+	participant_id UUID NOT NULL,
+	op VARCHAR(10) NOT NULL,
+	occurred_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+	checked_in_by VARCHAR(255),
+	status VARCHAR(20) NOT NULL,
+	processed_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+	PRIMARY KEY (outing_id, idempotency_key),
+	FOREIGN KEY(outing_id) REFERENCES outings (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_checkin_operations_participant ON checkin_operations (outing_id, participant_id, occurred_at);
@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 """Manual pruning script for change_log retention.
+The API runs the same retention in the background (CHANGE_LOG_RETENTION_DAYS);
+use this for one-off runs with a different age.
 Usage:
   python backend/scripts/prune_change_log.py [days]
 Default days = 30.
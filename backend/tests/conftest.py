@@ -2,6 +2,7 @@
 import pytest
 import asyncio
 import os
+import tempfile
 from typing import AsyncGenerator, Generator
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.pool import NullPool, StaticPool
@@ -64,6 +65,8 @@ os.environ["AUTHENTIK_CLIENT_ID"] = creds["authentik_client_id"]
 os.environ["AUTHENTIK_CLIENT_SECRET"] = creds["authentik_client_secret"]
 os.environ["BACKEND_CORS_ORIGINS"] = "http://localhost:3000"
 os.environ["TESTING"] = "1"
+# Keep rendered handouts out of the shared temp dir
+os.environ["PDF_CACHE_DIR"] = tempfile.mkdtemp(prefix="trailhead-handouts-test-")
 
 from app.main import app
 from app.db.base import Base
@@ -172,6 +175,15 @@ async def setup_test_database():
     await ensure_test_database_exists()
 
 
+@pytest.fixture(autouse=True)
+def clear_verified_token_cache():
+    """Keep cached token -> user resolutions from leaking between tests."""
+    from app.services.token_cache import verified_tokens
+    verified_tokens.clear()
+    yield
+    verified_tokens.clear()
+
+
 @pytest.fixture(scope="function")
 async def test_engine():
     """Create a test database engine"""
@@ -159,6 +159,8 @@ class TestCheckInParticipants:
         assert response.status_code == 200
         data = response.json()
         assert data["checked_in_count"] == len(participants)
+        assert data["summary"]["checked_in_count"] == len(participants)
+        assert all(p["is_checked_in"] for p in data["summary"]["participants"])
     
     async def test_check_in_duplicate_prevented(
         self, client: AsyncClient, auth_headers, test_outing, test_checkin, db_session
@@ -358,3 +360,74 @@ class TestExportCheckinData:
         )
         
         assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+class TestReplayCheckins:
+    """Test POST /api/outings/{outing_id}/checkin/replay endpoint"""
+
+    async def test_replay_returns_results_and_summary(
+        self, client: AsyncClient, auth_headers, test_outing, test_checkin
+    ):
+        """Queued operations are applied and reported in one round trip"""
+        summary = (await client.get(f"/api/outings/{test_outing.id}/checkin", headers=auth_headers)).json()
+        other = next(p["id"] for p in summary["participants"] if p["id"] != str(test_checkin.participant_id))
+        now = datetime.now(timezone.utc)
+        operations = [
+            {
+                "idempotency_key": "tablet-1",
+                "op": "checkin",
+                "participant_id": other,
+                "occurred_at": now.isoformat(),
+            },
+            {
+                "idempotency_key": "tablet-2",
+                "op": "undo",
+                "participant_id": str(test_checkin.participant_id),
+                "occurred_at": now.isoformat(),
+            },
+        ]
+
+        response = await client.post(
+            f"/api/outings/{test_outing.id}/checkin/replay",
+            json={"operations": operations},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["status"] for r in data["results"]] == ["applied", "applied"]
+        assert data["applied_count"] == 2
+        checked_in = {p["id"] for p in data["summary"]["participants"] if p["is_checked_in"]}
+        assert checked_in == {other}
+
+        response = await client.post(
+            f"/api/outings/{test_outing.id}/checkin/replay",
+            json={"operations": operations},
+            headers=auth_headers
+        )
+        assert [r["status"] for r in response.json()["results"]] == ["duplicate", "duplicate"]
+
+    async def test_replay_outing_not_found(self, client: AsyncClient, auth_headers):
+        """Replaying against a missing outing fails"""
+        response = await client.post(
+            f"/api/outings/{uuid4()}/checkin/replay",
+            json={"operations": [{
+                "idempotency_key": "k",
+                "op": "checkin",
+                "participant_id": str(uuid4()),
+                "occurred_at": datetime.now(timezone.utc).isoformat(),
+            }]},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 404
+
+    async def test_replay_no_auth(self, client: AsyncClient, test_outing):
+        """Replaying without authentication fails"""
+        response = await client.post(
+            f"/api/outings/{test_outing.id}/checkin/replay",
+            json={"operations": []}
+        )
+
+        assert response.status_code == 403
@@ -267,3 +267,18 @@ async def test_ready_tables_not_present(monkeypatch):
         response = await ac.get("/api/ready")
     assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
     assert response.json()["status"] == "not ready"
+
+
+@pytest.mark.asyncio
+async def test_authentik_pool_stats(client, auth_headers):
+    """Test the Authentik HTTP client statistics endpoint"""
+    response = await client.get("/api/health/authentik-pool", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert {"open", "requests", "active_sessions", "max_active_sessions"} <= data.keys()
+
+
+@pytest.mark.asyncio
+async def test_authentik_pool_stats_requires_admin(client, regular_user_headers):
+    response = await client.get("/api/health/authentik-pool", headers=regular_user_headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,357 @@
+"""Tests for api/endpoints/offline.py"""
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+class TestBulkOfflineData:
+    """Test GET /api/offline/data"""
+
+    async def test_admin_receives_rosters(self, client: AsyncClient, auth_headers, test_signup, test_outing):
+        response = await client.get("/api/offline/data", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        roster = data["rosters"][str(test_outing.id)]
+        assert [s["id"] for s in roster] == [str(test_signup.id)]
+        assert roster[0]["participant_count"] == 2
+
+    async def test_non_admin_receives_no_rosters(self, client: AsyncClient, regular_user_headers, test_signup):
+        response = await client.get("/api/offline/data", headers=regular_user_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["rosters"] == {}
+        assert len(data["outings"]) == 1
+
+    async def test_query_count_does_not_grow_with_outings(self, client: AsyncClient, auth_headers, test_signup, db_session):
+        from sqlalchemy import event
+        from app.models.outing import Outing
+        from app.models.signup import Signup
+        from datetime import date, timedelta
+        import uuid
+
+        engine = db_session.bind.sync_engine
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        async def count_request_statements():
+            statements.clear()
+            event.listen(engine, "before_cursor_execute", record)
+            try:
+                response = await client.get("/api/offline/data", headers=auth_headers)
+            finally:
+                event.remove(engine, "before_cursor_execute", record)
+            assert response.status_code == 200
+            return len(statements), response.json()
+
+        baseline, _ = await count_request_statements()
+
+        for i in range(4):
+            outing = Outing(
+                id=uuid.uuid4(),
+                name=f"Extra Outing {i}",
+                outing_date=date.today() + timedelta(days=40 + i),
+                location="Camp",
+                max_participants=10,
+            )
+            db_session.add(outing)
+            db_session.add(Signup(
+                outing_id=outing.id,
+                family_contact_name=f"Family {i}",
+                family_contact_email=f"family{i}@test.com",
+                family_contact_phone="555-0000",
+            ))
+        await db_session.commit()
+
+        with_more, data = await count_request_statements()
+
+        assert with_more == baseline
+        assert len(data["outings"]) == 5
+        assert all(len(roster) == 1 for roster in data["rosters"].values())
+
+
+@pytest.mark.asyncio
+class TestOfflineSnapshotCaching:
+    """ETag / If-None-Match handling for the offline snapshot"""
+
+    async def test_unchanged_snapshot_returns_304(self, client: AsyncClient, auth_headers, test_signup):
+        first = await client.get("/api/offline/data", headers=auth_headers)
+        etag = first.headers["etag"]
+        assert first.status_code == 200
+        assert etag.startswith('"') and etag.endswith('"')
+
+        second = await client.get("/api/offline/data", headers={**auth_headers, "If-None-Match": etag})
+
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["etag"] == etag
+
+    async def test_body_is_stable_for_an_etag(self, client: AsyncClient, auth_headers, test_signup):
+        headers = {**auth_headers, "Accept-Encoding": "identity"}
+        first = await client.get("/api/offline/data", headers=headers)
+        second = await client.get("/api/offline/data", headers=headers)
+
+        assert first.headers["etag"] == second.headers["etag"]
+        assert first.content == second.content
+
+    async def test_change_log_write_changes_etag(self, client: AsyncClient, auth_headers, test_signup, db_session):
+        from app.services.change_log import record_change
+
+        first = await client.get("/api/offline/data", headers=auth_headers)
+        await record_change(db_session, entity_type="signup", entity_id=test_signup.id, op_type="update")
+        await db_session.commit()
+
+        second = await client.get("/api/offline/data", headers={**auth_headers, "If-None-Match": first.headers["etag"]})
+
+        assert second.status_code == 200
+        assert second.headers["etag"] != first.headers["etag"]
+
+    async def test_non_admin_etag_ignores_roster_writes(self, client: AsyncClient, regular_user_headers, test_signup, test_outing, db_session):
+        from app.services.change_log import record_change
+
+        first = await client.get("/api/offline/data", headers=regular_user_headers)
+        # Non-admins get no rosters, so a signup write doesn't change their snapshot
+        await record_change(db_session, entity_type="signup", entity_id=test_signup.id, op_type="update")
+        await db_session.commit()
+        second = await client.get("/api/offline/data", headers={**regular_user_headers, "If-None-Match": first.headers["etag"]})
+        assert second.status_code == 304
+
+        await record_change(db_session, entity_type="outing", entity_id=test_outing.id, op_type="update")
+        await db_session.commit()
+        third = await client.get("/api/offline/data", headers={**regular_user_headers, "If-None-Match": first.headers["etag"]})
+        assert third.status_code == 200
+
+    async def test_gzip_and_identity_have_distinct_etags(self, client: AsyncClient, auth_headers, test_signup):
+        gzipped = await client.get("/api/offline/data", headers={**auth_headers, "Accept-Encoding": "gzip"})
+        plain = await client.get("/api/offline/data", headers={**auth_headers, "Accept-Encoding": "identity"})
+
+        assert gzipped.headers["content-encoding"] == "gzip"
+        assert "content-encoding" not in plain.headers
+        assert gzipped.headers["etag"] != plain.headers["etag"]
+        assert gzipped.json() == plain.json()
+
+
+@pytest.mark.asyncio
+class TestOfflineSnapshotStream:
+    """Test GET /api/offline/data/stream"""
+
+    async def test_stream_records(self, client: AsyncClient, auth_headers, test_signup, test_outing):
+        import json
+
+        response = await client.get("/api/offline/data/stream", headers={**auth_headers, "Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert response.headers["content-encoding"] == "gzip"
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["type"] for r in records] == ["user", "outing", "roster", "end"]
+        assert records[1]["data"]["id"] == str(test_outing.id)
+        assert records[2]["data"]["outing_id"] == str(test_outing.id)
+        assert records[2]["data"]["signups"][0]["id"] == str(test_signup.id)
+
+        snapshot = await client.get("/api/offline/data", headers=auth_headers)
+        assert records[3]["data"]["last_updated"] == snapshot.json()["last_updated"]
+
+    async def test_stream_304(self, client: AsyncClient, auth_headers, test_signup):
+        first = await client.get("/api/offline/data/stream", headers=auth_headers)
+
+        second = await client.get(
+            "/api/offline/data/stream", headers={**auth_headers, "If-None-Match": first.headers["etag"]}
+        )
+
+        assert second.status_code == 304
+        assert second.content == b""
+
+
+@pytest.mark.asyncio
+class TestChangeDeltaPayloads:
+    """Test GET /api/offline/deltas?include_payloads=true"""
+
+    async def test_payloads_inlined_on_request(self, client: AsyncClient, auth_headers, test_signup, test_outing, db_session):
+        from app.services.change_log import record_change
+
+        await record_change(db_session, "outing", test_outing.id, "update")
+        await record_change(db_session, "signup", test_signup.id, "update")
+        await db_session.commit()
+
+        plain = await client.get("/api/offline/deltas", headers=auth_headers)
+        assert all(item["payload"] is None for item in plain.json()["items"])
+
+        response = await client.get("/api/offline/deltas?include_payloads=true", headers=auth_headers)
+
+        assert response.status_code == 200
+        items = {(i["entity_type"], i["entity_id"]): i for i in response.json()["items"]}
+        assert items[("outing", str(test_outing.id))]["payload"]["name"] == test_outing.name
+        assert items[("signup", str(test_signup.id))]["payload"]["participant_count"] == 2
+
+    async def test_deleted_entity_payload_is_null(self, client: AsyncClient, regular_user_headers, db_session):
+        import uuid
+        from app.services.change_log import record_change
+
+        await record_change(db_session, "place", uuid.uuid4(), "delete")
+        await db_session.commit()
+
+        response = await client.get("/api/offline/deltas?include_payloads=true", headers=regular_user_headers)
+
+        assert response.status_code == 200
+        assert [i["payload"] for i in response.json()["items"]] == [None]
+
+
+@pytest.mark.asyncio
+class TestChangeDeltaCursor:
+    """Test sequence-cursor pagination of GET /api/offline/deltas"""
+
+    async def _record(self, db_session, count):
+        import uuid
+        from app.services.change_log import record_change
+
+        entries = [await record_change(db_session, "place", uuid.uuid4(), "create") for _ in range(count)]
+        await db_session.commit()
+        return entries
+
+    async def test_pages_follow_insertion_order(self, client: AsyncClient, auth_headers, db_session):
+        entries = await self._record(db_session, 5)
+        assert [e.seq for e in entries] == sorted(e.seq for e in entries)
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, "entity_types": "place"}
+            if cursor:
+                params["cursor"] = cursor
+            data = (await client.get("/api/offline/deltas", params=params, headers=auth_headers)).json()
+            seen.extend(item["id"] for item in data["items"])
+            cursor = data["next_cursor"]
+            if not data["has_more"]:
+                break
+
+        assert seen == [str(e.id) for e in entries]
+
+    async def test_cursored_page_is_one_query(self, client: AsyncClient, auth_headers, db_session):
+        from sqlalchemy import event
+        from app.utils.pagination import encode_cursor
+
+        entries = await self._record(db_session, 3)
+        engine = db_session.bind.sync_engine
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if "change_log" in statement:
+                statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            response = await client.get(
+                "/api/offline/deltas", params={"cursor": encode_cursor(entries[0].seq)}, headers=auth_headers
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert [item["id"] for item in response.json()["items"]] == [str(e.id) for e in entries[1:]]
+        assert len(statements) == 1
+
+    async def test_legacy_uuid_cursor(self, client: AsyncClient, auth_headers, db_session):
+        entries = await self._record(db_session, 3)
+
+        response = await client.get("/api/offline/deltas", params={"cursor": str(entries[0].id)}, headers=auth_headers)
+
+        assert response.status_code == 200
+        assert [item["id"] for item in response.json()["items"]] == [str(e.id) for e in entries[1:]]
+
+    async def test_invalid_cursor(self, client: AsyncClient, auth_headers):
+        response = await client.get("/api/offline/deltas", params={"cursor": "not-a-cursor"}, headers=auth_headers)
+
+        assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+class TestChangeDeltaStream:
+    """Test GET /api/offline/deltas/stream"""
+
+    async def test_unknown_last_event_id_resyncs(self, client: AsyncClient, auth_headers):
+        import uuid
+        from app.services.change_stream import broker
+
+        response = await client.get(
+            "/api/offline/deltas/stream", headers={**auth_headers, "Last-Event-ID": str(uuid.uuid4())}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text == 'event: resync\ndata: {"cursor":null}\n\n'
+        assert broker.subscriber_count == 0
+
+    async def test_replay_beyond_limit_resyncs_from_last_event_id(self, client: AsyncClient, regular_user_headers, db_session, monkeypatch):
+        import uuid
+        from app.api.endpoints import offline
+        from app.services.change_log import record_change
+        from app.utils.pagination import encode_cursor
+
+        monkeypatch.setattr(offline, "STREAM_REPLAY_LIMIT", 1)
+        first = await record_change(db_session, "place", uuid.uuid4(), "create")
+        for _ in range(2):
+            await record_change(db_session, "place", uuid.uuid4(), "create")
+        await db_session.commit()
+
+        response = await client.get(
+            "/api/offline/deltas/stream",
+            headers={**regular_user_headers, "Last-Event-ID": encode_cursor(first.seq)},
+        )
+
+        assert response.text == f'event: resync\ndata: {{"cursor":"{encode_cursor(first.seq)}"}}\n\n'
+
+
+@pytest.mark.asyncio
+class TestCompactedDeltas:
+    """Test compacted mode and checkpoint resync of GET /api/offline/deltas"""
+
+    async def test_compact_returns_latest_per_entity(self, client: AsyncClient, auth_headers, db_session):
+        import uuid
+        from app.services.change_log import record_change
+
+        place = uuid.uuid4()
+        for op in ("create", "update", "update"):
+            await record_change(db_session, "place", place, op)
+        await db_session.commit()
+
+        full = await client.get("/api/offline/deltas", params={"entity_types": "place"}, headers=auth_headers)
+        compacted = await client.get(
+            "/api/offline/deltas", params={"entity_types": "place", "compact": "true"}, headers=auth_headers
+        )
+
+        assert len(full.json()["items"]) == 3
+        assert full.json()["compacted"] is False
+        assert [(i["op_type"], i["version"]) for i in compacted.json()["items"]] == [("update", 3)]
+        assert compacted.json()["compacted"] is True
+
+    async def test_cursor_past_retention_horizon_resyncs_from_checkpoint(self, client: AsyncClient, auth_headers, db_session):
+        import uuid
+        from sqlalchemy import delete
+        from app.models.change_log import ChangeLog
+        from app.services.change_log import create_checkpoint, record_change
+        from app.utils.pagination import encode_cursor
+
+        place, deleted_place = uuid.uuid4(), uuid.uuid4()
+        first = await record_change(db_session, "place", place, "create")
+        await record_change(db_session, "place", deleted_place, "create")
+        await record_change(db_session, "place", deleted_place, "delete")
+        await record_change(db_session, "place", place, "update")
+        await db_session.commit()
+        await create_checkpoint(db_session)
+        await db_session.execute(delete(ChangeLog))
+        await db_session.commit()
+        await record_change(db_session, "place", place, "update")
+        await db_session.commit()
+
+        response = await client.get(
+            "/api/offline/deltas", params={"cursor": encode_cursor(first.seq)}, headers=auth_headers
+        )
+
+        data = response.json()
+        assert data["compacted"] is True
+        assert [(i["entity_id"], i["op_type"], i["version"]) for i in data["items"]] == [
+            (str(deleted_place), "delete", 2),
+            (str(place), "update", 3),
+        ]
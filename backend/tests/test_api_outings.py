@@ -72,6 +72,43 @@ class TestGetAvailableOutings:
         outing_ids = [t["id"] for t in response.json()["outings"]]
         assert str(outing.id) not in outing_ids
 
+    async def test_get_available_outings_cursor_pagination(self, client: AsyncClient, db_session):
+        """Test following next_cursor walks every available outing"""
+        from app.models.outing import Outing
+
+        for i in range(3):
+            db_session.add(Outing(
+                name=f"Paged Outing {i}",
+                outing_date=date.today() + timedelta(days=10 + i),
+                location="Test Location",
+                max_participants=10,
+            ))
+        await db_session.commit()
+
+        first = await client.get("/api/outings/available", params={"limit": 2})
+        assert first.status_code == 200
+        first_data = first.json()
+        assert len(first_data["outings"]) == 2
+        assert first_data["total"] == 3
+        assert first_data["next_cursor"]
+
+        second = await client.get(
+            "/api/outings/available", params={"limit": 2, "cursor": first_data["next_cursor"]}
+        )
+        second_data = second.json()
+        assert len(second_data["outings"]) == 1
+        assert second_data["next_cursor"] is None
+        # Only the first page is counted
+        assert second_data["total"] is None
+        names = [o["name"] for o in first_data["outings"] + second_data["outings"]]
+        assert names == ["Paged Outing 0", "Paged Outing 1", "Paged Outing 2"]
+
+    async def test_get_available_outings_invalid_cursor(self, client: AsyncClient):
+        """Test a malformed cursor is rejected"""
+        response = await client.get("/api/outings/available", params={"cursor": "not-a-cursor"})
+
+        assert response.status_code == 400
+
 
 @pytest.mark.asyncio
 class TestGetAllOutings:
@@ -156,6 +156,7 @@ class TestOutingAvailabilityBoundary:
         )
         db_session.add(participant)
         await db_session.commit()
+        outing_id = str(outing.id)
         # Expire session state to ensure relationships reload with latest data
         db_session.expire_all()
 
@@ -163,4 +164,4 @@ class TestOutingAvailabilityBoundary:
         after = await client.get("/api/outings/available")
         assert after.status_code == 200
         ids_after = {o["id"] for o in after.json()["outings"]}
-        assert str(outing.id) not in ids_after
+        assert outing_id not in ids_after
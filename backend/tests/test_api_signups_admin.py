@@ -62,6 +62,67 @@ class TestAdminListSignups:
         assert response.status_code == 403
 
 
+@pytest.mark.asyncio
+class TestListSignupsKeyset:
+    """Test cursor pagination of the admin signup list"""
+
+    async def _make_signups(self, db_session, outing, count):
+        from app.models.signup import Signup
+        from datetime import datetime
+
+        base = datetime(2026, 1, 1, 12, 0, 0)
+        signups = [
+            Signup(
+                id=uuid4(),
+                outing_id=outing.id,
+                family_contact_name=f"Family {i}",
+                family_contact_email=f"family{i}@test.com",
+                family_contact_phone="555-0000",
+                # Two signups share each timestamp so the id tie-break is exercised
+                created_at=base + timedelta(minutes=i // 2),
+            )
+            for i in range(count)
+        ]
+        db_session.add_all(signups)
+        await db_session.commit()
+        return signups
+
+    async def test_cursor_walks_every_signup_once(self, client: AsyncClient, auth_headers, db_session, test_outing):
+        signups = await self._make_signups(db_session, test_outing, 5)
+
+        seen = []
+        url = f"/api/signups?outing_id={test_outing.id}&limit=2"
+        response = await client.get(url, headers=auth_headers)
+        while True:
+            assert response.status_code == 200
+            data = response.json()
+            assert data["total"] == 5
+            assert data["total_is_estimate"] is False
+            seen.extend(s["id"] for s in data["signups"])
+            if not data["next_cursor"]:
+                break
+            response = await client.get(f"{url}&cursor={data['next_cursor']}", headers=auth_headers)
+
+        expected = sorted(signups, key=lambda s: (s.created_at, str(s.id)), reverse=True)
+        assert seen == [str(s.id) for s in expected]
+
+    async def test_total_respects_outing_filter(self, client: AsyncClient, auth_headers, db_session, test_outing, test_day_outing):
+        await self._make_signups(db_session, test_outing, 3)
+        await self._make_signups(db_session, test_day_outing, 2)
+
+        response = await client.get(f"/api/signups?outing_id={test_day_outing.id}&estimate_total=true", headers=auth_headers)
+
+        data = response.json()
+        assert data["total"] == 2
+        assert len(data["signups"]) == 2
+        assert data["next_cursor"] is None
+
+    async def test_invalid_cursor(self, client: AsyncClient, auth_headers):
+        response = await client.get("/api/signups?cursor=not-a-cursor", headers=auth_headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
+
+
 @pytest.mark.asyncio
 class TestMySignupsEdgeCases:
     """Test my-signups endpoint edge cases"""
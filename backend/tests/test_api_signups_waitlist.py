@@ -0,0 +1,195 @@
+"""Tests for the waitlist endpoints in api/endpoints/signups.py"""
+import uuid
+from datetime import date, timedelta
+
+import pytest
+from httpx import AsyncClient
+
+
+async def _scout(db_session, user, name="Waitlist Scout"):
+    from app.models.family import FamilyMember
+
+    member = FamilyMember(
+        id=uuid.uuid4(),
+        user_id=user.id,
+        name=name,
+        date_of_birth=date.today() - timedelta(days=365 * 12),
+        member_type="scout",
+        gender="male",
+    )
+    db_session.add(member)
+    await db_session.commit()
+    return member
+
+
+def _payload(outing_id, *members):
+    return {
+        "outing_id": str(outing_id),
+        "family_contact": {
+            "email": "test@test.com",
+            "phone": "555-0000",
+            "emergency_contact_name": "Emergency Contact",
+            "emergency_contact_phone": "555-1111",
+        },
+        "family_member_ids": [str(m.id) for m in members],
+    }
+
+
+@pytest.fixture
+async def one_spot_outing(db_session):
+    from app.models.outing import Outing
+
+    outing = Outing(
+        id=uuid.uuid4(),
+        name="One Spot Outing",
+        outing_date=date.today() + timedelta(days=14),
+        location="Camp",
+        max_participants=1,
+        is_overnight=False,
+    )
+    db_session.add(outing)
+    await db_session.commit()
+    return outing
+
+
+@pytest.mark.asyncio
+class TestWaitlistEndpoints:
+    async def test_join_admits_immediately_when_space(self, client: AsyncClient, auth_headers, one_spot_outing, test_user, db_session):
+        scout = await _scout(db_session, test_user)
+
+        response = await client.post("/api/signups/waitlist", json=_payload(one_spot_outing.id, scout), headers=auth_headers)
+
+        assert response.status_code == 202
+        data = response.json()
+        assert data["status"] == "admitted"
+        assert data["position"] is None
+        assert data["signup_id"] is not None
+
+    async def test_join_full_outing_reports_position(self, client: AsyncClient, auth_headers, one_spot_outing, test_user, db_session):
+        first = await _scout(db_session, test_user, "First")
+        second = await _scout(db_session, test_user, "Second")
+        signup = await client.post("/api/signups", json=_payload(one_spot_outing.id, first), headers=auth_headers)
+        assert signup.status_code == 201
+
+        response = await client.post("/api/signups/waitlist", json=_payload(one_spot_outing.id, second), headers=auth_headers)
+
+        assert response.status_code == 202
+        data = response.json()
+        assert data["status"] == "waiting"
+        assert data["position"] == 1
+
+        listing = await client.get(f"/api/signups/outings/{one_spot_outing.id}/waitlist", headers=auth_headers)
+        assert listing.status_code == 200
+        assert listing.json()["total"] == 1
+        assert listing.json()["entries"][0]["id"] == data["id"]
+
+    async def test_cancel_signup_promotes_waitlist(self, client: AsyncClient, auth_headers, one_spot_outing, test_user, db_session):
+        first = await _scout(db_session, test_user, "First")
+        second = await _scout(db_session, test_user, "Second")
+        signup = await client.post("/api/signups", json=_payload(one_spot_outing.id, first), headers=auth_headers)
+        entry = await client.post("/api/signups/waitlist", json=_payload(one_spot_outing.id, second), headers=auth_headers)
+        entry_id = entry.json()["id"]
+
+        cancel = await client.delete(f"/api/signups/{signup.json()['id']}", headers=auth_headers)
+        assert cancel.status_code == 204
+
+        response = await client.get(f"/api/signups/waitlist/{entry_id}", headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "admitted"
+        promoted = await client.get(f"/api/signups/{data['signup_id']}", headers=auth_headers)
+        assert promoted.json()["participants"][0]["name"] == "Second"
+
+    async def test_leave_waitlist(self, client: AsyncClient, auth_headers, one_spot_outing, test_user, db_session):
+        first = await _scout(db_session, test_user, "First")
+        second = await _scout(db_session, test_user, "Second")
+        await client.post("/api/signups", json=_payload(one_spot_outing.id, first), headers=auth_headers)
+        entry = await client.post("/api/signups/waitlist", json=_payload(one_spot_outing.id, second), headers=auth_headers)
+        entry_id = entry.json()["id"]
+
+        response = await client.delete(f"/api/signups/waitlist/{entry_id}", headers=auth_headers)
+        assert response.status_code == 204
+
+        mine = await client.get("/api/signups/my-waitlist", headers=auth_headers)
+        assert mine.json()["entries"][0]["status"] == "cancelled"
+        again = await client.delete(f"/api/signups/waitlist/{entry_id}", headers=auth_headers)
+        assert again.status_code == 400
+
+    async def test_join_closed_outing_rejected(self, client: AsyncClient, auth_headers, one_spot_outing, test_user, db_session):
+        scout = await _scout(db_session, test_user)
+        one_spot_outing.signups_closed = True
+        await db_session.commit()
+
+        response = await client.post("/api/signups/waitlist", json=_payload(one_spot_outing.id, scout), headers=auth_headers)
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Signups are closed for this outing"
+
+    async def test_join_unknown_outing(self, client: AsyncClient, auth_headers, test_user, db_session):
+        scout = await _scout(db_session, test_user)
+
+        response = await client.post("/api/signups/waitlist", json=_payload(uuid.uuid4(), scout), headers=auth_headers)
+
+        assert response.status_code == 404
+
+    async def test_entry_not_found(self, client: AsyncClient, auth_headers):
+        response = await client.get(f"/api/signups/waitlist/{uuid.uuid4()}", headers=auth_headers)
+        assert response.status_code == 404
+
+    async def test_direct_signup_cannot_jump_the_waitlist(self, client: AsyncClient, auth_headers, one_spot_outing, test_user, db_session):
+        first = await _scout(db_session, test_user, "First")
+        second = await _scout(db_session, test_user, "Second")
+        third = await _scout(db_session, test_user, "Third")
+        signup = await client.post("/api/signups", json=_payload(one_spot_outing.id, first), headers=auth_headers)
+        await client.post("/api/signups/waitlist", json=_payload(one_spot_outing.id, second), headers=auth_headers)
+        # Free the spot without draining the queue, as a concurrent cancel would before its drain runs
+        from app.crud import signup as crud_signup
+        await crud_signup.delete_signup(db_session, uuid.UUID(signup.json()["id"]))
+
+        response = await client.post("/api/signups", json=_payload(one_spot_outing.id, third), headers=auth_headers)
+
+        assert response.status_code == 400
+        assert "waiting" in response.json()["detail"]
+
+    async def test_shrinking_signup_promotes_waitlist(self, client: AsyncClient, auth_headers, test_user, db_session):
+        from app.models.outing import Outing
+
+        outing = Outing(
+            id=uuid.uuid4(),
+            name="Two Spot Outing",
+            outing_date=date.today() + timedelta(days=14),
+            location="Camp",
+            max_participants=2,
+            is_overnight=False,
+        )
+        db_session.add(outing)
+        await db_session.commit()
+        first = await _scout(db_session, test_user, "First")
+        second = await _scout(db_session, test_user, "Second")
+        waiting = await _scout(db_session, test_user, "Waiting")
+        signup = await client.post("/api/signups", json=_payload(outing.id, first, second), headers=auth_headers)
+        entry = await client.post("/api/signups/waitlist", json=_payload(outing.id, waiting), headers=auth_headers)
+        assert entry.json()["status"] == "waiting"
+
+        response = await client.put(
+            f"/api/signups/{signup.json()['id']}",
+            json={"family_member_ids": [str(first.id)]},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 200
+        promoted = await client.get(f"/api/signups/waitlist/{entry.json()['id']}", headers=auth_headers)
+        assert promoted.json()["status"] == "admitted"
+
+    async def test_growing_signup_checks_capacity(self, client: AsyncClient, auth_headers, one_spot_outing, test_user, db_session):
+        first = await _scout(db_session, test_user, "First")
+        second = await _scout(db_session, test_user, "Second")
+        signup = await client.post("/api/signups", json=_payload(one_spot_outing.id, first), headers=auth_headers)
+
+        response = await client.put(
+            f"/api/signups/{signup.json()['id']}",
+            json={"family_member_ids": [str(first.id), str(second.id)]},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 400
@@ -59,3 +59,101 @@ async def test_change_log_version_increment(db_session):
     rows3 = result3.scalars().all()
     assert rows3[-1].op_type == "delete"
     assert rows3[-1].version == rows2[-1].version + 1
+
+
+@pytest.mark.asyncio
+async def test_entries_in_one_flush_get_consecutive_versions_and_one_insert(db_session):
+    """Versions are allocated with one upsert and entries written with one INSERT per flush."""
+    import uuid
+    from sqlalchemy import event
+
+    entity_id = uuid.uuid4()
+    other_id = uuid.uuid4()
+    engine = db_session.bind.sync_engine
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    await record_change(db_session, "signup", entity_id, "create")
+    await record_change(db_session, "signup", entity_id, "update")
+    await record_change(db_session, "signup", other_id, "create")
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        await db_session.commit()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    inserts = [s for s in statements if s.startswith("INSERT INTO change_log")]
+    upserts = [s for s in statements if s.startswith("INSERT INTO entity_versions")]
+    assert len(inserts) == 1
+    assert len(upserts) == 1
+    assert not any("max(change_log.version)" in s for s in statements)
+
+    result = await db_session.execute(
+        select(ChangeLog.entity_id, ChangeLog.version, ChangeLog.op_type).order_by(ChangeLog.seq)
+    )
+    assert result.all() == [(entity_id, 1, "create"), (entity_id, 2, "update"), (other_id, 1, "create")]
+
+
+@pytest.mark.asyncio
+async def test_versions_survive_change_log_pruning(db_session):
+    import uuid
+    from sqlalchemy import delete
+
+    entity_id = uuid.uuid4()
+    await record_change(db_session, "place", entity_id, "create")
+    await record_change(db_session, "place", entity_id, "update")
+    await db_session.commit()
+    await db_session.execute(delete(ChangeLog))
+    await db_session.commit()
+
+    entry = await record_change(db_session, "place", entity_id, "update")
+    await db_session.commit()
+
+    assert entry.version == 3
+
+
+@pytest.mark.asyncio
+async def test_seqs_follow_commit_order(db_session, test_engine):
+    """A writer that flushed first but commits last still ends up after the other"""
+    import uuid
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+    from app.services.change_log import get_deltas
+
+    slow = async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)()
+    try:
+        late = await record_change(slow, "place", uuid.uuid4(), "create")
+        await slow.flush()
+        provisional_seq = late.seq
+
+        fast = await record_change(db_session, "place", uuid.uuid4(), "create")
+        await db_session.commit()
+        assert fast.seq > provisional_seq
+
+        await slow.commit()
+    finally:
+        await slow.close()
+
+    # A reader whose cursor reached the fast entry still gets the late one
+    assert late.seq > fast.seq
+    rows = await get_deltas(db_session, after_seq=fast.seq)
+    assert [row.id for row in rows] == [late.id]
+
+
+@pytest.mark.asyncio
+async def test_commit_seqs_keep_flush_order_and_skip_rolled_back_savepoints(db_session):
+    import uuid
+
+    first = await record_change(db_session, "place", uuid.uuid4(), "create")
+    await db_session.flush()
+    savepoint = await db_session.begin_nested()
+    await record_change(db_session, "place", uuid.uuid4(), "create")
+    await db_session.flush()
+    await savepoint.rollback()
+    second = await record_change(db_session, "place", uuid.uuid4(), "update")
+    await db_session.commit()
+
+    rows = (await db_session.execute(select(ChangeLog).order_by(ChangeLog.seq))).scalars().all()
+    assert [row.id for row in rows] == [first.id, second.id]
+    assert [row.seq for row in rows] == [first.seq, second.seq]
@@ -0,0 +1,95 @@
+import uuid
+
+import pytest
+from sqlalchemy import delete
+
+from app.models.change_log import ChangeLog
+from app.services.change_log import (
+    create_checkpoint,
+    get_compacted_deltas,
+    get_latest_checkpoint,
+    may_be_pruned_after,
+    record_change,
+)
+
+
+async def _history(db_session):
+    """Two outings and a place: many updates, one delete"""
+    outing_a, outing_b, place = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    await record_change(db_session, "outing", outing_a, "create")
+    await record_change(db_session, "outing", outing_b, "create")
+    for _ in range(3):
+        await record_change(db_session, "outing", outing_a, "update")
+    await record_change(db_session, "place", place, "create")
+    await record_change(db_session, "outing", outing_b, "delete")
+    await db_session.commit()
+    return outing_a, outing_b, place
+
+
+def _summary(rows):
+    return [(row.entity_id, row.op_type, row.version) for row in rows]
+
+
+@pytest.mark.asyncio
+async def test_compacted_deltas_keep_latest_entry_per_entity(db_session):
+    outing_a, outing_b, place = await _history(db_session)
+
+    rows = await get_compacted_deltas(db_session, after_seq=0)
+
+    assert _summary(rows) == [(outing_a, "update", 4), (place, "create", 1), (outing_b, "delete", 2)]
+    assert [row.seq for row in rows] == sorted(row.seq for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_compacted_pages_compose(db_session):
+    await _history(db_session)
+    everything = await get_compacted_deltas(db_session, after_seq=0)
+
+    first = await get_compacted_deltas(db_session, after_seq=0, limit=2)
+    rest = await get_compacted_deltas(db_session, after_seq=first[-1].seq)
+
+    assert _summary(first + rest) == _summary(everything)
+
+
+@pytest.mark.asyncio
+async def test_compacted_deltas_filter_entity_types(db_session):
+    _, _, place = await _history(db_session)
+
+    rows = await get_compacted_deltas(db_session, after_seq=0, entity_types={"place"})
+
+    assert _summary(rows) == [(place, "create", 1)]
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_plus_tail_survives_pruning(db_session):
+    outing_a, outing_b, place = await _history(db_session)
+    expected = _summary(await get_compacted_deltas(db_session, after_seq=0))
+
+    checkpoint = await create_checkpoint(db_session)
+    assert checkpoint.entities_updated == 3
+    assert await create_checkpoint(db_session) is None
+
+    await db_session.execute(delete(ChangeLog))
+    await db_session.commit()
+    await record_change(db_session, "place", place, "update")
+    await db_session.commit()
+
+    assert await may_be_pruned_after(db_session, 0)
+    rows = await get_compacted_deltas(db_session, after_seq=0, checkpoint_seq=checkpoint.seq)
+
+    assert _summary(rows) == [e for e in expected if e[0] != place] + [(place, "update", 2)]
+
+
+@pytest.mark.asyncio
+async def test_later_checkpoint_advances_entries(db_session):
+    outing_a, _, _ = await _history(db_session)
+    await create_checkpoint(db_session)
+    await record_change(db_session, "outing", outing_a, "delete")
+    await db_session.commit()
+
+    checkpoint = await create_checkpoint(db_session)
+
+    assert (await get_latest_checkpoint(db_session)).seq == checkpoint.seq
+    assert checkpoint.entities_updated == 1
+    rows = await get_compacted_deltas(db_session, after_seq=0, checkpoint_seq=checkpoint.seq)
+    assert (outing_a, "delete", 5) in _summary(rows)
@@ -41,14 +41,14 @@ async def test_deltas_non_admin_filters(db_session, test_regular_user):
 
     # Test non-admin filtering (simulate non-admin user requesting only outing/place)
     non_admin_types = {"outing", "place"}
-    rows = await get_deltas(db_session, since=None, cursor_id=None, limit=100, entity_types=non_admin_types)
+    rows = await get_deltas(db_session, since=None, limit=100, entity_types=non_admin_types)
     
     # All rows should be outing or place
     assert all(row.entity_type in non_admin_types for row in rows), \
         f"Expected only {non_admin_types}, got {set(r.entity_type for r in rows)}"
     
     # Test admin filtering (all types visible)
-    all_rows = await get_deltas(db_session, since=None, cursor_id=None, limit=100, entity_types=None)
+    all_rows = await get_deltas(db_session, since=None, limit=100, entity_types=None)
     entity_types_found = {row.entity_type for row in all_rows}
     
     # Admin should see merit_badge (and outing, place if present)
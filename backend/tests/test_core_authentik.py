@@ -84,14 +84,11 @@ async def test_verify_token_asymmetric():
     # Mock get_openid_config to return RS256
     client.get_openid_config = AsyncMock(return_value={"id_token_signing_alg_values_supported": ["RS256"]})
     
-    # Mock JWKS client
-    mock_jwks_client = MagicMock()
+    # Signing keys come from the in-memory key store
     mock_signing_key = MagicMock()
+    client.get_signing_key = AsyncMock(return_value=mock_signing_key)
     
-    # Generate a real RSA key pair for testing would be better, but mocking the key object works if we mock jwt.decode too
-    # But jwt.decode needs a real key or string.
-    # Let's mock jwt.decode instead to avoid key generation complexity
-    
+    # Mock jwt.decode to avoid key generation complexity
     with patch("app.core.authentik.jwt.decode") as mock_decode:
         mock_decode.return_value = {
             "sub": "user1",
@@ -100,10 +97,8 @@ async def test_verify_token_asymmetric():
             "groups": ["group1"]
         }
         
-        client._jwks_client = mock_jwks_client
-        mock_jwks_client.get_signing_key_from_jwt.return_value = mock_signing_key
-        
         claims = await client.verify_token("dummy_token")
         
         assert claims["user_id"] == "user1"
         assert claims["email"] == "user@example.com"
+        assert mock_decode.call_args[0][1] is mock_signing_key.key
@@ -7,20 +7,13 @@ from app.core import authentik
 from app.core.authentik import AuthentikClient, _parse_display_name, get_authentik_client
 
 
-def test_properties_and_jwks_client_creation():
+def test_properties():
     client = AuthentikClient()
     # Basic URL properties
     assert client.openid_config_url.endswith("/.well-known/openid-configuration")
     assert client.jwks_url.endswith("/jwks/")
     assert client.userinfo_url.endswith("/userinfo/")
 
-    # Patch PyJWKClient to ensure jwks_client property constructs it
-    with patch("app.core.authentik.PyJWKClient") as MockPyJWK:
-        # Clear existing jwks client
-        client._jwks_client = None
-        _ = client.jwks_client
-        MockPyJWK.assert_called_with(client.jwks_url)
-
 
 def test_check_configuration_raises_when_missing():
     client = AuthentikClient()
@@ -119,3 +112,52 @@ def test_get_authentik_client_singleton():
     a = get_authentik_client()
     b = get_authentik_client()
     assert a is b
+
+
+@pytest.mark.asyncio
+async def test_shared_http_client_lifecycle():
+    client = AuthentikClient()
+
+    # Outside the lifespan each session gets a one-off client
+    async with client.http_session() as first:
+        pass
+    assert first.is_closed
+
+    await client.start_http_client()
+    try:
+        async with client.http_session() as a:
+            pass
+        async with client.http_session() as b:
+            pass
+        assert a is b
+        assert not a.is_closed
+        assert client.http_pool_stats()["open"] is True
+    finally:
+        await client.close_http_client()
+
+    assert a.is_closed
+    assert client.http_pool_stats()["open"] is False
+
+
+@pytest.mark.asyncio
+async def test_shared_http_client_counts_requests():
+    import httpx
+
+    client = AuthentikClient()
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"ok": True}))
+    client._new_http_client = lambda: httpx.AsyncClient(
+        transport=transport, event_hooks={"request": [client._count_request]}
+    )
+
+    await client.start_http_client()
+    try:
+        assert await client._fetch_json(client.openid_config_url) == {"ok": True}
+        assert await client._fetch_json(client.jwks_url) == {"ok": True}
+        stats = client.http_pool_stats()
+    finally:
+        await client.close_http_client()
+
+    assert stats["requests"] == 2
+    assert stats["active_sessions"] == 0
+    assert stats["max_active_sessions"] == 1
+    assert stats["max_connections"] > 0
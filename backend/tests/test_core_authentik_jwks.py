@@ -0,0 +1,163 @@
+"""Tests for the Authentik signing key store in core/authentik.py"""
+import asyncio
+import json
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from jwt.algorithms import RSAAlgorithm
+
+from app.core.authentik import AuthentikClient
+
+DISCOVERY = {"id_token_signing_alg_values_supported": ["RS256"]}
+
+
+def _make_key(kid: str):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": kid, "use": "sig", "alg": "RS256"})
+    return private_key, jwk
+
+
+def _token(private_key, kid: str, client_id: str) -> str:
+    return jwt.encode(
+        {"sub": "user1", "aud": client_id, "email": "user@example.com"},
+        private_key,
+        algorithm="RS256",
+        headers={"kid": kid},
+    )
+
+
+class FakeAuthentik:
+    """Serves discovery and a mutable JWKS, counting JWKS fetches"""
+
+    def __init__(self, *jwks):
+        self.keys = list(jwks)
+        self.jwks_fetches = 0
+        self.fail = False
+
+    async def fetch_json(self, url: str):
+        if self.fail:
+            raise RuntimeError("authentik unavailable")
+        if url.endswith("/jwks/"):
+            self.jwks_fetches += 1
+            await asyncio.sleep(0)
+            return {"keys": list(self.keys)}
+        return DISCOVERY
+
+
+@pytest.fixture
+def key_pair():
+    return _make_key("key-1")
+
+
+@pytest.fixture
+def client_and_server(key_pair):
+    _, jwk = key_pair
+    server = FakeAuthentik(jwk)
+    client = AuthentikClient()
+    client.client_id = "client_id"
+    client._fetch_json = server.fetch_json
+    return client, server
+
+
+@pytest.mark.asyncio
+class TestSigningKeyStore:
+    async def test_prefetch_serves_tokens_without_fetching(self, client_and_server, key_pair):
+        client, server = client_and_server
+        private_key, _ = key_pair
+
+        await client.start_key_refresh()
+        try:
+            for _ in range(3):
+                claims = await client.verify_token(_token(private_key, "key-1", "client_id"))
+                assert claims["user_id"] == "user1"
+            assert server.jwks_fetches == 1
+            assert client._openid_config == DISCOVERY
+        finally:
+            await client.stop_key_refresh()
+
+    async def test_unknown_kid_refetches_once(self, client_and_server):
+        client, server = client_and_server
+        await client.refresh_signing_keys()
+
+        # Authentik rotates to a new key
+        rotated_private, rotated_jwk = _make_key("key-2")
+        server.keys.append(rotated_jwk)
+        client._keys_attempted_at = None
+
+        claims = await client.verify_token(_token(rotated_private, "key-2", "client_id"))
+
+        assert claims["user_id"] == "user1"
+        assert server.jwks_fetches == 2
+
+    async def test_unknown_kid_refetch_is_rate_limited(self, client_and_server):
+        client, server = client_and_server
+        await client.refresh_signing_keys()
+        stray_private, _ = _make_key("stray")
+
+        with pytest.raises(HTTPException) as exc:
+            await client.verify_token(_token(stray_private, "stray", "client_id"))
+
+        assert exc.value.status_code == 401
+        assert server.jwks_fetches == 1
+
+    async def test_concurrent_cold_lookups_share_one_fetch(self, client_and_server, key_pair):
+        client, server = client_and_server
+        private_key, _ = key_pair
+        token = _token(private_key, "key-1", "client_id")
+
+        results = await asyncio.gather(*(client.verify_token(token) for _ in range(10)))
+
+        assert all(r["user_id"] == "user1" for r in results)
+        assert server.jwks_fetches == 1
+
+    async def test_failed_prefetch_does_not_block_startup(self, client_and_server):
+        client, server = client_and_server
+        server.fail = True
+
+        await client.start_key_refresh()
+        try:
+            assert client._signing_keys == {}
+            assert client._key_refresh_loop is not None
+        finally:
+            await client.stop_key_refresh()
+        assert client._key_refresh_loop is None
+
+    async def test_startup_does_not_wait_for_slow_prefetch(self, client_and_server, key_pair):
+        client, server = client_and_server
+        private_key, _ = key_pair
+        release = asyncio.Event()
+        fetch = server.fetch_json
+
+        async def slow_fetch(url):
+            await release.wait()
+            return await fetch(url)
+
+        client._fetch_json = slow_fetch
+        try:
+            await asyncio.wait_for(client.start_key_refresh(), timeout=1)
+            assert client._signing_keys == {}
+
+            # A request during the prefetch waits for it instead of fetching again
+            verify = asyncio.create_task(client.verify_token(_token(private_key, "key-1", "client_id")))
+            await asyncio.sleep(0)
+            release.set()
+            claims = await verify
+            assert claims["user_id"] == "user1"
+            assert server.jwks_fetches == 1
+        finally:
+            await client.stop_key_refresh()
+
+    async def test_failed_refresh_keeps_existing_keys(self, client_and_server, key_pair):
+        client, server = client_and_server
+        private_key, _ = key_pair
+        await client.refresh_signing_keys()
+
+        server.fail = True
+        with pytest.raises(RuntimeError):
+            await client.refresh_signing_keys()
+
+        claims = await client.verify_token(_token(private_key, "key-1", "client_id"))
+        assert claims["user_id"] == "user1"
@@ -227,3 +227,68 @@ class TestCheckInCRUD:
         # Verify deleted
         records = await crud_checkin.get_checkin_records(db_session, outing.id)
         assert len(records) == 0
+
+
+class TestCreateCheckinsBulk:
+    async def _participants(self, db_session, outing_id, user_id, count):
+        signup = Signup(
+            outing_id=outing_id,
+            family_contact_name="Bus",
+            family_contact_email="bus@test.com",
+            family_contact_phone="555"
+        )
+        db_session.add(signup)
+        await db_session.flush()
+        participants = []
+        for i in range(count):
+            member = FamilyMember(
+                user_id=user_id,
+                name=f"Rider {i}",
+                date_of_birth=date.today() - timedelta(days=365 * 12),
+                member_type="scout",
+            )
+            db_session.add(member)
+            await db_session.flush()
+            participant = Participant(signup_id=signup.id, family_member_id=member.id)
+            db_session.add(participant)
+            participants.append(participant)
+        await db_session.commit()
+        return participants
+
+    async def test_statement_count_is_constant(self, db_session, test_user, test_outing):
+        from sqlalchemy import event
+
+        participants = await self._participants(db_session, test_outing.id, test_user.id, 12)
+        engine = db_session.bind.sync_engine
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            checkins = await crud_checkin.create_checkins(
+                db_session, test_outing.id, [p.id for p in participants], "Leader"
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert [c.participant_id for c in checkins] == [p.id for p in participants]
+        assert len([s for s in statements if s.startswith("SELECT")]) == 1
+        assert len([s for s in statements if s.startswith("INSERT INTO checkins")]) == 1
+
+    async def test_repeat_and_foreign_ids_are_skipped(self, db_session, test_user, test_outing, test_day_outing):
+        participants = await self._participants(db_session, test_outing.id, test_user.id, 3)
+        other = await self._participants(db_session, test_day_outing.id, test_user.id, 1)
+        await crud_checkin.create_checkins(db_session, test_outing.id, [participants[0].id], "Leader")
+
+        checkins = await crud_checkin.create_checkins(
+            db_session,
+            test_outing.id,
+            [participants[0].id, participants[1].id, participants[1].id, other[0].id, uuid.uuid4(), participants[2].id],
+            "Leader"
+        )
+
+        assert [c.participant_id for c in checkins] == [participants[1].id, participants[2].id]
+        records = await crud_checkin.get_checkin_records(db_session, test_outing.id)
+        assert len(records) == 3
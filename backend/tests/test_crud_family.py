@@ -141,6 +141,25 @@ class TestGetFamilyMember:
         assert result is None
 
 
+@pytest.mark.asyncio
+class TestGetFamilyMembersByIds:
+    """Test get_family_members_by_ids function"""
+    
+    async def test_loads_requested_members(self, db_session, test_family_member):
+        """Test existing IDs are returned keyed by ID and unknown IDs are skipped"""
+        fake_id = uuid4()
+        result = await crud_family.get_family_members_by_ids(
+            db_session, [test_family_member.id, fake_id]
+        )
+        
+        assert set(result) == {test_family_member.id}
+        assert result[test_family_member.id].dietary_preferences is not None
+    
+    async def test_empty_ids(self, db_session):
+        """Test no query result for an empty ID list"""
+        assert await crud_family.get_family_members_by_ids(db_session, []) == {}
+
+
 @pytest.mark.asyncio
 class TestUpdateFamilyMember:
     """Test update_family_member function"""
@@ -73,6 +73,33 @@ class TestGetOutings:
         assert outings[0].outing_date >= outings[1].outing_date
 
 
+@pytest.mark.asyncio
+class TestGetOutingForUpdate:
+    """Test get_outing_for_update function"""
+    
+    async def test_locks_outing_row(self, db_session, test_outing):
+        """Test the outing is returned and the query locks its row on PostgreSQL"""
+        from unittest.mock import patch
+        from sqlalchemy.dialects import postgresql
+        
+        statements = []
+        original_execute = db_session.execute
+        
+        async def spy(stmt, *args, **kwargs):
+            statements.append(stmt)
+            return await original_execute(stmt, *args, **kwargs)
+        
+        with patch.object(db_session, "execute", spy):
+            result = await crud_outing.get_outing_for_update(db_session, test_outing.id)
+        
+        assert result.id == test_outing.id
+        assert "FOR UPDATE OF outings" in str(statements[0].compile(dialect=postgresql.dialect()))
+    
+    async def test_missing_outing(self, db_session):
+        """Test None for an unknown outing"""
+        assert await crud_outing.get_outing_for_update(db_session, uuid4()) is None
+
+
 @pytest.mark.asyncio
 class TestGetAvailableOutings:
     """Test get_available_outings function"""
@@ -143,6 +170,56 @@ class TestGetAvailableOutings:
             for i in range(len(outings) - 1):
                 assert outings[i].outing_date <= outings[i + 1].outing_date
 
+    async def test_get_available_outings_excludes_past_and_closed(self, db_session):
+        """Test past outings and outings with closed signups are excluded"""
+        past = Outing(
+            name="Past Outing",
+            outing_date=date.today() - timedelta(days=1),
+            location="Test Location",
+            max_participants=10,
+        )
+        closed = Outing(
+            name="Closed Outing",
+            outing_date=date.today() + timedelta(days=5),
+            location="Test Location",
+            max_participants=10,
+            signups_closed=True,
+        )
+        db_session.add_all([past, closed])
+        await db_session.commit()
+
+        available = await crud_outing.get_available_outings(db_session)
+        ids = [t.id for t in available]
+        assert past.id not in ids
+        assert closed.id not in ids
+
+    async def test_get_available_outings_keyset_pagination(self, db_session):
+        """Test paging with (outing_date, id) keys covers every outing exactly once"""
+        outing_date = date.today() + timedelta(days=3)
+        for i in range(5):
+            db_session.add(Outing(
+                name=f"Paged Outing {i}",
+                outing_date=outing_date if i < 3 else outing_date + timedelta(days=i),
+                location="Test Location",
+                max_participants=10,
+            ))
+        await db_session.commit()
+
+        seen = []
+        after = None
+        while True:
+            page = await crud_outing.get_available_outings(db_session, after=after, limit=2)
+            if not page:
+                break
+            seen.extend(page)
+            after = (page[-1].outing_date, page[-1].id)
+
+        assert len(seen) == 5
+        assert len({o.id for o in seen}) == 5
+        keys = [(o.outing_date, str(o.id)) for o in seen]
+        assert keys == sorted(keys)
+        assert await crud_outing.get_available_outing_count(db_session) == 5
+
 
 @pytest.mark.asyncio
 class TestCreateOuting:
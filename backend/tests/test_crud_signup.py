@@ -554,7 +554,7 @@ class TestSignupEdgeCases:
 
     async def test_create_signup_race_condition(self, db_session, test_outing, test_family_member):
         """Test race condition handling during signup creation"""
-        from unittest.mock import AsyncMock, patch
+        from unittest.mock import AsyncMock, MagicMock, patch
         from sqlalchemy.exc import IntegrityError
         
         signup_data = SignupCreate(
@@ -585,7 +585,8 @@ class TestSignupEdgeCases:
         async def execute_side_effect(stmt):
             str_stmt = str(stmt)
             if "family_members" in str_stmt:
-                return AsyncMock(scalar_one_or_none=lambda: test_family_member)
+                # Batched family member load
+                return MagicMock(scalars=lambda: MagicMock(all=lambda: [test_family_member]))
             if "signups" in str_stmt:
                 # If we are in the exception handler (commit failed)
                 # The code will try to find the existing signup
@@ -604,4 +605,100 @@ class TestSignupEdgeCases:
         result = await crud_signup.create_signup(mock_db, signup_data)
         
         assert result == mock_signup
-        assert mock_db.rollback.called
\ No newline at end of file
+        assert mock_db.rollback.called
+
+
+@pytest.mark.asyncio
+class TestBatchedFamilyMemberLoad:
+    """create_signup loads family members once and batches participant inserts"""
+    
+    async def test_create_signup_round_trips(self, db_session, test_outing, test_user):
+        """Test a family of six costs one family member query and one participant insert"""
+        from sqlalchemy import event
+        
+        members = [
+            FamilyMember(
+                user_id=test_user.id,
+                name=f"Scout {i}",
+                date_of_birth=date.today() - timedelta(days=365 * 12),
+                member_type="scout",
+            )
+            for i in range(6)
+        ]
+        db_session.add_all(members)
+        await db_session.commit()
+        
+        statements = []
+        
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        engine = db_session.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            db_signup = await crud_signup.create_signup(db_session, SignupCreate(
+                outing_id=test_outing.id,
+                family_contact=FamilyContact(
+                    email="six@test.com",
+                    phone="555-0006",
+                    emergency_contact_name="Parent",
+                    emergency_contact_phone="555-0007",
+                ),
+                family_member_ids=[m.id for m in members],
+            ))
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        
+        member_selects = [s for s in statements if s.lstrip().startswith("SELECT") and "FROM family_members" in s]
+        participant_inserts = [s for s in statements if s.startswith("INSERT INTO participants")]
+        assert len(member_selects) == 1
+        assert len(participant_inserts) == 1
+        assert [p.family_member_id for p in db_signup.participants] == [m.id for m in members]
+        assert all(p.family_member.allergies == [] for p in db_signup.participants)
+    
+    async def test_create_signup_unknown_member(self, db_session, test_outing):
+        """Test an unknown family member ID is rejected before anything is written"""
+        with pytest.raises(ValueError):
+            await crud_signup.create_signup(db_session, SignupCreate(
+                outing_id=test_outing.id,
+                family_contact=FamilyContact(
+                    email="ghost@test.com",
+                    phone="555-0008",
+                    emergency_contact_name="Parent",
+                    emergency_contact_phone="555-0009",
+                ),
+                family_member_ids=[uuid4()],
+            ))
+
+
+@pytest.mark.asyncio
+class TestCountSignups:
+    """Test count_signups function"""
+
+    async def test_exact_count_with_criteria(self, db_session, test_signup):
+        from app.models.signup import Signup
+
+        assert await crud_signup.count_signups(db_session) == 1
+        assert await crud_signup.count_signups(db_session, Signup.outing_id == test_signup.outing_id) == 1
+        assert await crud_signup.count_signups(db_session, Signup.outing_id == uuid4()) == 0
+
+    async def test_estimate_falls_back_to_exact_on_sqlite(self, db_session, test_signup):
+        assert await crud_signup.count_signups(db_session, estimated=True) == 1
+
+    async def test_estimate_uses_postgres_planner(self):
+        from unittest.mock import AsyncMock, MagicMock
+        from sqlalchemy.dialects import postgresql
+        from app.models.signup import Signup
+
+        db = MagicMock()
+        db.bind.dialect = postgresql.dialect()
+        result = MagicMock()
+        result.scalar_one.return_value = '[{"Plan": {"Plan Rows": 1234}}]'
+        db.execute = AsyncMock(return_value=result)
+
+        total = await crud_signup.count_signups(db, Signup.outing_id == UUID(int=1), estimated=True)
+
+        assert total == 1234
+        statement = str(db.execute.await_args.args[0])
+        assert statement.startswith("EXPLAIN (FORMAT JSON) SELECT signups.id")
+        assert "00000000-0000-0000-0000-000000000001" in statement
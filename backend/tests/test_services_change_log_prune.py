@@ -0,0 +1,154 @@
+"""Tests for services/change_log_prune.py"""
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event, func, select, update
+
+from app.models.change_log import ChangeLog
+from app.services import change_log_prune
+from app.services.change_log import record_change
+
+
+async def _record(db_session, count, age_days=0):
+    entries = [await record_change(db_session, "place", uuid.uuid4(), "create") for _ in range(count)]
+    await db_session.commit()
+    if age_days:
+        await db_session.execute(
+            update(ChangeLog)
+            .where(ChangeLog.id.in_([e.id for e in entries]))
+            .values(created_at=datetime.utcnow() - timedelta(days=age_days))
+        )
+        await db_session.commit()
+    return entries
+
+
+async def _remaining(db_session):
+    return (await db_session.execute(select(func.count()).select_from(ChangeLog))).scalar_one()
+
+
+@pytest.mark.asyncio
+class TestDeleteInBatches:
+    async def test_deletes_only_expired_rows_in_bounded_batches(self, db_session):
+        await _record(db_session, 5, age_days=40)
+        await _record(db_session, 2)
+        engine = db_session.bind.sync_engine
+        deletes = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("DELETE"):
+                deletes.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            deleted = await change_log_prune.delete_in_batches(
+                db_session, datetime.utcnow() - timedelta(days=30), batch_size=2
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert deleted == 5
+        assert len(deletes) == 3
+        assert await _remaining(db_session) == 2
+
+    async def test_stops_after_max_batches(self, db_session):
+        await _record(db_session, 5, age_days=40)
+
+        deleted = await change_log_prune.delete_in_batches(
+            db_session, datetime.utcnow() - timedelta(days=30), batch_size=2, max_batches=1
+        )
+
+        assert deleted == 2
+        assert await _remaining(db_session) == 3
+
+
+@pytest.mark.asyncio
+class TestRunRetention:
+    async def test_records_stats(self, db_session):
+        before = change_log_prune.retention_stats()
+        await _record(db_session, 3, age_days=40)
+
+        result = await change_log_prune.run_retention(db_session, older_than_days=30)
+
+        stats = change_log_prune.retention_stats()
+        assert result == {"rows_pruned": 3, "partitions_dropped": 0}
+        assert stats["runs"] == before["runs"] + 1
+        assert stats["rows_pruned_total"] == before["rows_pruned_total"] + 3
+        assert stats["last_run_rows_pruned"] == 3
+        assert stats["partitioned"] is False
+        assert stats["last_run_failed"] is False
+
+    async def test_failure_is_flagged_without_details(self, db_session, monkeypatch):
+        async def broken(db):
+            raise RuntimeError("connection to 10.0.0.5 refused")
+
+        monkeypatch.setattr(change_log_prune, "create_checkpoint", broken)
+
+        with pytest.raises(RuntimeError):
+            await change_log_prune.run_retention(db_session, older_than_days=30)
+
+        stats = change_log_prune.retention_stats()
+        assert stats["last_run_failed"] is True
+        assert stats["last_failed_at"]
+        assert "10.0.0.5" not in str(stats)
+
+    async def test_prune_change_log_keeps_recent_rows(self, db_session):
+        await _record(db_session, 2, age_days=40)
+        await _record(db_session, 1, age_days=10)
+
+        assert await change_log_prune.prune_change_log(db_session, older_than_days=30) == 2
+        assert await _remaining(db_session) == 1
+
+
+def test_partition_names_round_trip():
+    month = date(2026, 12, 1)
+
+    assert change_log_prune.partition_name(month) == "change_log_p202612"
+    assert change_log_prune.partition_month("change_log_p202612") == month
+    assert change_log_prune.partition_month("change_log_default") is None
+    assert change_log_prune._next_month(month) == date(2027, 1, 1)
+
+
+def test_partition_statements_move_rows_out_of_default():
+    plain = change_log_prune.create_partition_statements(date(2026, 12, 1))
+    moving = change_log_prune.create_partition_statements(date(2026, 12, 1), move_default_rows=True)
+
+    assert plain == [
+        'CREATE TABLE "public"."change_log_p202612" PARTITION OF "public"."change_log" '
+        "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+    ]
+    # The default partition is detached around the create and reattached once emptied
+    assert "DETACH PARTITION" in moving[0] and "change_log_default" in moving[0]
+    assert moving[1] == plain[0]
+    assert moving[2].startswith('INSERT INTO "public"."change_log_p202612" SELECT * FROM "public"."change_log_default"')
+    assert moving[3].startswith('DELETE FROM "public"."change_log_default"')
+    assert "ATTACH PARTITION" in moving[4] and moving[4].endswith("DEFAULT")
+
+
+@pytest.mark.asyncio
+async def test_maintenance_without_retention_prunes_nothing(db_session):
+    from app.core.config import Settings
+
+    # Retention is opt-in
+    assert Settings.model_fields["CHANGE_LOG_RETENTION_DAYS"].default == 0
+    await _record(db_session, 2, age_days=400)
+
+    await change_log_prune.run_maintenance(db_session)
+
+    assert await _remaining(db_session) == 2
+
+
+@pytest.mark.asyncio
+async def test_retention_stats_endpoint(client, auth_headers):
+    response = await client.get("/api/health/change-log-retention", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert "rows_pruned_total" in response.json()
+    assert "last_error" not in response.json()
+
+
+@pytest.mark.asyncio
+async def test_retention_stats_require_admin(client, regular_user_headers):
+    response = await client.get("/api/health/change-log-retention", headers=regular_user_headers)
+
+    assert response.status_code == 403
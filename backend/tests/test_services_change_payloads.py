@@ -0,0 +1,85 @@
+"""Tests for services/change_payloads.py"""
+import uuid
+
+import pytest
+from sqlalchemy import event, select
+
+from app.models.change_log import ChangeLog
+from app.models.participant import Participant
+from app.models.place import Place
+from app.services.change_log import record_change
+from app.services.change_payloads import load_change_payloads
+
+
+@pytest.mark.asyncio
+class TestLoadChangePayloads:
+    async def _record(self, db_session, *changes):
+        entries = [await record_change(db_session, entity_type, entity_id, op) for entity_type, entity_id, op in changes]
+        await db_session.commit()
+        return entries
+
+    async def test_payloads_match_entity_responses(self, db_session, test_outing, test_signup):
+        participants = (await db_session.execute(
+            select(Participant).where(Participant.signup_id == test_signup.id)
+        )).scalars().all()
+        entries = await self._record(
+            db_session,
+            ("outing", test_outing.id, "update"),
+            ("signup", test_signup.id, "create"),
+            ("participant", participants[0].id, "create"),
+        )
+
+        payloads = await load_change_payloads(db_session, entries)
+
+        outing = payloads[("outing", test_outing.id)]
+        assert outing["id"] == str(test_outing.id)
+        assert outing["signup_count"] == 2
+        signup = payloads[("signup", test_signup.id)]
+        assert signup["participant_count"] == 2
+        participant = payloads[("participant", participants[0].id)]
+        assert participant["signup_id"] == str(test_signup.id)
+        assert participant["name"] in {"Test Scout Member", "Test Adult"}
+
+    async def test_one_query_per_entity_type(self, db_session, test_outing, test_signup):
+        places = [Place(name=f"Place {i}", address=f"{i} Main St") for i in range(3)]
+        db_session.add_all(places)
+        await db_session.flush()
+        entries = await self._record(
+            db_session,
+            *[("place", place.id, "create") for place in places],
+            ("place", places[0].id, "update"),
+            ("outing", test_outing.id, "update"),
+            ("signup", test_signup.id, "update"),
+        )
+
+        engine = db_session.bind.sync_engine
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            payloads = await load_change_payloads(db_session, entries)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        # outing: outing + allowed_troops selectin; place: 1; signup: 1
+        assert len(statements) <= 4
+        assert {place["name"] for key, place in payloads.items() if key[0] == "place"} == {
+            "Place 0", "Place 1", "Place 2"
+        }
+
+    async def test_deleted_and_unsupported_entities_have_no_payload(self, db_session):
+        entries = await self._record(
+            db_session,
+            ("place", uuid.uuid4(), "delete"),
+            ("outing_requirement", uuid.uuid4(), "create"),
+        )
+
+        payloads = await load_change_payloads(db_session, entries)
+
+        assert payloads == {}
+
+    async def test_no_entries_no_queries(self, db_session):
+        assert await load_change_payloads(db_session, []) == {}
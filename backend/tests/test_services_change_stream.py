@@ -0,0 +1,145 @@
+"""Tests for services/change_stream.py"""
+import asyncio
+import json
+import uuid
+
+import pytest
+
+from app.services import change_stream
+from app.services.change_log import record_change
+from app.services.change_stream import broker, sse_events
+from app.utils.pagination import encode_cursor
+
+
+def _parse(message: bytes) -> dict:
+    fields = dict(line.split(": ", 1) for line in message.decode().strip().splitlines())
+    fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+def _change(seq: int, entity_type: str = "signup") -> dict:
+    return {"seq": seq, "id": str(uuid.uuid4()), "entity_type": entity_type}
+
+
+@pytest.mark.asyncio
+class TestChangeBroker:
+    async def test_committed_changes_reach_matching_subscribers(self, db_session):
+        signups = broker.subscribe({"signup"})
+        places = broker.subscribe({"place"})
+        try:
+            entry = await record_change(db_session, "signup", uuid.uuid4(), "create")
+            await db_session.commit()
+
+            change = signups.queue.get_nowait()
+            assert change["id"] == str(entry.id)
+            assert change["seq"] == entry.seq
+            assert change["version"] == 1
+            assert places.queue.empty()
+        finally:
+            broker.unsubscribe(signups)
+            broker.unsubscribe(places)
+
+    async def test_rolled_back_changes_are_not_published(self, db_session):
+        subscription = broker.subscribe()
+        try:
+            await record_change(db_session, "signup", uuid.uuid4(), "create")
+            await db_session.flush()
+            await db_session.rollback()
+            await db_session.commit()
+
+            assert subscription.queue.empty()
+        finally:
+            broker.unsubscribe(subscription)
+
+    async def test_full_queue_overflows_without_blocking(self, monkeypatch):
+        monkeypatch.setattr(change_stream, "SUBSCRIBER_QUEUE_SIZE", 2)
+        slow = broker.subscribe()
+        fast = broker.subscribe()
+        try:
+            for seq in range(1, 4):
+                broker.publish([_change(seq)])
+                fast.queue.get_nowait()
+
+            assert slow.overflowed
+            assert not fast.overflowed
+            assert slow.queue.qsize() == 2
+        finally:
+            broker.unsubscribe(slow)
+            broker.unsubscribe(fast)
+
+
+@pytest.mark.asyncio
+class TestSseEvents:
+    async def test_replay_then_live_without_duplicates(self):
+        subscription = broker.subscribe()
+        broker.publish([_change(2), _change(3)])
+        stream = sse_events(subscription, replay=[_change(1), _change(2)], after_seq=0)
+
+        messages = [_parse(await stream.__anext__()) for _ in range(3)]
+        await stream.aclose()
+
+        assert [m["data"]["seq"] for m in messages] == [1, 2, 3]
+        assert messages[2]["id"] == encode_cursor(3)
+        assert broker.subscriber_count == 0
+
+    async def test_late_lower_seq_after_replay_is_sent(self):
+        subscription = broker.subscribe()
+        # 2 commits after the replay was read; 1 and 3 arrive again live
+        broker.publish([_change(3), _change(2), _change(1), _change(4)])
+        stream = sse_events(subscription, replay=[_change(1), _change(3)], after_seq=0, settle_seconds=60)
+
+        messages = [_parse(await stream.__anext__()) for _ in range(4)]
+        await stream.aclose()
+
+        assert [m["data"]["seq"] for m in messages] == [1, 3, 2, 4]
+        assert [m["id"] for m in messages] == [encode_cursor(seq) for seq in (1, 3, 3, 4)]
+
+    async def test_cursor_waits_at_a_gap_until_it_settles(self):
+        subscription = broker.subscribe()
+        broker.publish([_change(7), _change(6), _change(9)])
+        stream = sse_events(subscription, after_seq=5, settle_seconds=60)
+
+        messages = [_parse(await stream.__anext__()) for _ in range(3)]
+        await stream.aclose()
+
+        # 6 arrives after 7; 8 hasn't arrived (yet) when 9 is sent
+        assert [m["id"] for m in messages] == [encode_cursor(seq) for seq in (5, 7, 7)]
+
+    async def test_settled_gaps_are_skipped(self):
+        subscription = broker.subscribe()
+        broker.publish([_change(7), _change(9)])
+        stream = sse_events(subscription, settle_seconds=0)
+
+        messages = [_parse(await stream.__anext__()) for _ in range(2)]
+        await stream.aclose()
+
+        assert [m["id"] for m in messages] == [encode_cursor(7), encode_cursor(9)]
+
+    async def test_overflow_drains_then_resyncs(self, monkeypatch):
+        monkeypatch.setattr(change_stream, "SUBSCRIBER_QUEUE_SIZE", 2)
+        subscription = broker.subscribe()
+        broker.publish([_change(1), _change(2), _change(3)])
+
+        messages = [_parse(message) async for message in sse_events(subscription, settle_seconds=0)]
+
+        assert [m["event"] for m in messages] == ["change", "change", "resync"]
+        assert messages[-1]["data"] == {"cursor": encode_cursor(2)}
+        assert broker.subscriber_count == 0
+
+    async def test_keepalive_while_idle(self):
+        subscription = broker.subscribe()
+        stream = sse_events(subscription, keepalive_seconds=0.01)
+
+        assert await asyncio.wait_for(stream.__anext__(), 1) == b": keepalive\n\n"
+        await stream.aclose()
+
+
+def test_notify_payloads_stay_under_limit(monkeypatch):
+    monkeypatch.setattr(change_stream, "_NOTIFY_PAYLOAD_LIMIT", 200)
+    changes = [_change(seq) for seq in range(10)]
+
+    payloads = change_stream._notify_payloads(changes)
+
+    assert len(payloads) > 1
+    assert all(len(payload) <= 200 for payload in payloads)
+    assert [c["seq"] for payload in payloads for c in json.loads(payload)] == list(range(10))
@@ -0,0 +1,144 @@
+"""Tests for services/checkin_replay.py"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, select
+
+from app.crud import checkin as crud_checkin
+from app.models.checkin import CheckInOperation
+from app.models.participant import Participant
+from app.schemas.checkin import CheckInOperationCreate
+from app.services.checkin_replay import replay_checkin_operations
+
+
+def _op(participant_id, op="checkin", minutes_ago=10, key=None, by=None):
+    return CheckInOperationCreate(
+        idempotency_key=key or str(uuid.uuid4()),
+        op=op,
+        participant_id=participant_id,
+        occurred_at=datetime.utcnow() - timedelta(minutes=minutes_ago),
+        checked_in_by=by,
+    )
+
+
+@pytest.mark.asyncio
+class TestReplayCheckinOperations:
+    async def _participants(self, db_session, test_signup):
+        result = await db_session.execute(
+            select(Participant).where(Participant.signup_id == test_signup.id).order_by(Participant.id)
+        )
+        return result.scalars().all()
+
+    async def _checked_in(self, db_session, outing_id):
+        return {c.participant_id: c for c in await crud_checkin.get_checkin_records(db_session, outing_id)}
+
+    async def test_applies_in_timestamp_order(self, db_session, test_outing, test_signup):
+        first, second = await self._participants(db_session, test_signup)
+
+        # Sent out of order: the undo happened after the check-in
+        results = await replay_checkin_operations(db_session, test_outing.id, [
+            _op(first.id, "undo", minutes_ago=5),
+            _op(first.id, "checkin", minutes_ago=10),
+            _op(second.id, "checkin", minutes_ago=8, by="Leader"),
+        ], "Admin")
+
+        assert [r.status for r in results] == ["applied", "applied", "applied"]
+        checked_in = await self._checked_in(db_session, test_outing.id)
+        assert set(checked_in) == {second.id}
+        assert checked_in[second.id].checked_in_by == "Leader"
+
+    async def test_resent_batch_is_duplicate(self, db_session, test_outing, test_signup):
+        first, _ = await self._participants(db_session, test_signup)
+        batch = [_op(first.id, "checkin", key="device-1:1"), _op(first.id, "undo", minutes_ago=5, key="device-1:2")]
+
+        await replay_checkin_operations(db_session, test_outing.id, batch, "Admin")
+        # Checked in again online after the batch was first applied
+        await crud_checkin.create_checkins(db_session, test_outing.id, [first.id], "Admin")
+        results = await replay_checkin_operations(db_session, test_outing.id, batch, "Admin")
+
+        assert [r.status for r in results] == ["duplicate", "duplicate"]
+        assert first.id in await self._checked_in(db_session, test_outing.id)
+
+    async def test_older_operations_are_stale(self, db_session, test_outing, test_signup):
+        first, second = await self._participants(db_session, test_signup)
+        await crud_checkin.create_checkins(db_session, test_outing.id, [first.id], "Admin")
+        await crud_checkin.create_checkins(db_session, test_outing.id, [second.id], "Admin")
+        # Undone online just now
+        await crud_checkin.delete_checkin(db_session, test_outing.id, second.id)
+
+        results = await replay_checkin_operations(db_session, test_outing.id, [
+            _op(first.id, "undo", minutes_ago=30),
+            _op(second.id, "checkin", minutes_ago=30),
+        ], "Admin")
+
+        assert [r.status for r in results] == ["stale", "stale"]
+        assert set(await self._checked_in(db_session, test_outing.id)) == {first.id}
+        logged = (await db_session.execute(select(CheckInOperation.status))).scalars().all()
+        assert sorted(logged) == ["applied", "stale", "stale"]
+
+    async def test_newer_undo_wins_over_existing_checkin(self, db_session, test_outing, test_signup):
+        first, _ = await self._participants(db_session, test_signup)
+        await crud_checkin.create_checkins(db_session, test_outing.id, [first.id], "Admin")
+
+        results = await replay_checkin_operations(db_session, test_outing.id, [
+            _op(first.id, "undo", minutes_ago=-1),
+        ], "Admin")
+
+        assert results[0].status == "applied"
+        assert await self._checked_in(db_session, test_outing.id) == {}
+
+    async def test_future_timestamps_are_clamped(self, db_session, test_outing, test_signup):
+        first, _ = await self._participants(db_session, test_signup)
+        await replay_checkin_operations(db_session, test_outing.id, [
+            CheckInOperationCreate(
+                idempotency_key="fast-clock",
+                op="checkin",
+                participant_id=first.id,
+                occurred_at=datetime.now(timezone.utc) + timedelta(days=1),
+            )
+        ], "Admin")
+
+        checkin = (await self._checked_in(db_session, test_outing.id))[first.id]
+        assert checkin.checked_in_at <= datetime.utcnow()
+        assert checkin.checked_in_by == "Admin"
+
+    async def test_unknown_participants_are_rejected(self, db_session, test_outing, test_signup):
+        first, _ = await self._participants(db_session, test_signup)
+
+        results = await replay_checkin_operations(db_session, test_outing.id, [
+            _op(uuid.uuid4()),
+            _op(first.id),
+        ], "Admin")
+
+        assert [r.status for r in results] == ["rejected", "applied"]
+
+    async def test_statement_count_is_constant(self, db_session, test_outing, test_signup):
+        first, second = await self._participants(db_session, test_signup)
+        await replay_checkin_operations(db_session, test_outing.id, [_op(first.id, minutes_ago=30)], "Admin")
+        operations = [
+            _op(participant.id, op, minutes_ago=minutes)
+            for minutes in range(20, 0, -1)
+            for participant, op in ((first, "undo"), (second, "checkin"))
+        ]
+        engine = db_session.bind.sync_engine
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            await replay_checkin_operations(db_session, test_outing.id, operations, "Admin")
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        writes = [s for s in statements if not s.startswith("SELECT")]
+        assert len(writes) == 3  # DELETE checkins, INSERT checkins, INSERT checkin_operations
+        assert len(statements) - len(writes) <= 6
+
+    async def test_missing_outing(self, db_session):
+        with pytest.raises(HTTPException) as exc:
+            await replay_checkin_operations(db_session, uuid.uuid4(), [_op(uuid.uuid4())], "Admin")
+        assert exc.value.status_code == 404
@@ -0,0 +1,239 @@
+"""Tests for services/handout_cache.py"""
+import asyncio
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from email.utils import format_datetime
+
+import pytest
+from httpx import AsyncClient
+
+from app.crud import outing as crud_outing
+from app.models.packing_list import OutingPackingList, OutingPackingListItem
+from app.services import handout_cache
+from app.services.change_log import record_change
+from app.services.handout_cache import DiskHandoutCache, HandoutCache, handout_digest, not_modified_since
+from app.services.pdf_generator import pdf_generator
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    cache = DiskHandoutCache(tmp_path, max_bytes=10_000)
+    handout_cache.set_handout_cache(cache)
+    yield cache
+    handout_cache.set_handout_cache(None)
+
+
+async def _load(db_session, outing_id):
+    db_session.expire_all()
+    return await crud_outing.get_outing_with_details(db_session, outing_id)
+
+
+@pytest.mark.asyncio
+class TestHandoutDigest:
+    async def test_digest_is_stable_and_follows_packing_lists(self, db_session, test_outing):
+        packing_list = OutingPackingList(outing_id=test_outing.id)
+        db_session.add(packing_list)
+        await db_session.flush()
+        item = OutingPackingListItem(outing_packing_list_id=packing_list.id, name="Tent")
+        db_session.add(item)
+        await db_session.commit()
+
+        first = handout_digest(await _load(db_session, test_outing.id))
+        assert handout_digest(await _load(db_session, test_outing.id)) == first
+
+        item.name = "Hammock"
+        await db_session.commit()
+
+        assert handout_digest(await _load(db_session, test_outing.id)) != first
+
+
+@pytest.mark.asyncio
+class TestHandoutPdfData:
+    async def test_render_input_is_plain_data(self, db_session, test_outing, test_signup, test_troop):
+        from sqlalchemy import select
+        from app.db.base import Base
+        from app.models.family import FamilyMember
+        from app.models.participant import Participant
+        from app.services.pdf_generator import handout_pdf_outing, handout_pdf_packing_lists
+        from app.services.pdf_render import render_pdf
+
+        member = (await db_session.execute(
+            select(FamilyMember).join(Participant).where(Participant.signup_id == test_signup.id).limit(1)
+        )).scalar_one()
+        member.troop_number = None
+        member.troop_id = test_troop.id
+        packing_list = OutingPackingList(outing_id=test_outing.id)
+        db_session.add(packing_list)
+        await db_session.flush()
+        db_session.add(OutingPackingListItem(outing_packing_list_id=packing_list.id, name="Tent", quantity=1))
+        await db_session.commit()
+        outing = await _load(db_session, test_outing.id)
+
+        data = handout_pdf_outing(outing)
+        packing_lists = handout_pdf_packing_lists(outing.packing_lists)
+        db_session.expunge_all()
+
+        def orm_objects(value):
+            if isinstance(value, dict):
+                return [o for v in value.values() for o in orm_objects(v)]
+            if isinstance(value, list):
+                return [o for v in value for o in orm_objects(v)]
+            return [value] if isinstance(value, Base) else []
+
+        assert orm_objects(data) == [] and orm_objects(packing_lists) == []
+        # The troop comes through the eager-loaded relationship, not a lazy load
+        assert "123" in data["troop_numbers"]
+        assert packing_lists == [{"items": [{"name": "Tent", "quantity": 1}]}]
+        pdf = await render_pdf(pdf_generator.generate_outing_handout, data, packing_lists)
+        assert pdf.startswith(b"%PDF")
+
+
+class TestDiskHandoutCache:
+    def test_store_open_and_replace(self, tmp_path):
+        cache = DiskHandoutCache(tmp_path, max_bytes=10_000)
+        outing_id = uuid.uuid4()
+
+        assert cache.open(outing_id, "a") is None
+        cache.store(outing_id, "a", b"%PDF old")
+        cache.store(outing_id, "b", b"%PDF new")
+
+        assert cache.open(outing_id, "a") is None
+        cached = cache.open(outing_id, "b")
+        assert b"".join(cached.chunks()) == b"%PDF new"
+        assert cached.size == 8
+        assert cache.stats()["files"] == 1
+
+    def test_evicts_least_recently_served(self, tmp_path):
+        cache = DiskHandoutCache(tmp_path, max_bytes=250)
+        ids = [uuid.uuid4() for _ in range(3)]
+        cache.store(ids[0], "x", b"0" * 100)
+        cache.store(ids[1], "x", b"1" * 100)
+        # Age the first two, then serve the first again
+        old = time.time() - 60
+        for outing_id in ids[:2]:
+            os.utime(tmp_path / f"{outing_id}-x.pdf", (old, old))
+        cache.open(ids[0], "x").handle.close()
+
+        cache.store(ids[2], "x", b"2" * 100)
+
+        assert cache.open(ids[1], "x") is None
+        assert cache.open(ids[0], "x") is not None
+        assert cache.open(ids[2], "x") is not None
+        assert cache.evictions == 1
+
+    def test_invalidate_drops_outing_files(self, tmp_path):
+        cache = DiskHandoutCache(tmp_path, max_bytes=10_000)
+        kept, dropped = uuid.uuid4(), uuid.uuid4()
+        cache.store(kept, "x", b"%PDF")
+        cache.store(dropped, "x", b"%PDF")
+
+        cache.invalidate(dropped)
+
+        assert cache.open(dropped, "x") is None
+        assert cache.open(kept, "x") is not None
+
+    def test_backends_must_implement_the_interface(self):
+        class Partial(HandoutCache):
+            def open(self, outing_id, digest):
+                return None
+
+        with pytest.raises(TypeError):
+            Partial()
+
+    def test_not_modified_since(self):
+        last_modified = datetime(2026, 10, 1, 12, 0, tzinfo=timezone.utc)
+
+        assert not_modified_since(format_datetime(last_modified, usegmt=True), last_modified)
+        assert not not_modified_since("Tue, 01 Sep 2026 12:00:00 GMT", last_modified)
+        assert not not_modified_since("yesterday", last_modified)
+        assert not not_modified_since(None, last_modified)
+
+
+@pytest.mark.asyncio
+class TestChangeLogInvalidation:
+    async def test_committed_outing_change_drops_files(self, db_session, disk_cache, test_outing, monkeypatch):
+        outing_id = test_outing.id
+        disk_cache.store(outing_id, "x", b"%PDF")
+
+        await record_change(db_session, "outing", outing_id, "update")
+        await db_session.flush()
+        await db_session.rollback()
+        assert disk_cache.open(outing_id, "x") is not None
+
+        invalidate_threads = []
+        invalidate = disk_cache.invalidate
+
+        def recording_invalidate(*args):
+            invalidate_threads.append(threading.current_thread())
+            return invalidate(*args)
+
+        monkeypatch.setattr(disk_cache, "invalidate", recording_invalidate)
+        await record_change(db_session, "outing", outing_id, "update")
+        await db_session.commit()
+        await asyncio.gather(*handout_cache._pending_invalidations)
+
+        assert disk_cache.open(outing_id, "x") is None
+        assert invalidate_threads and threading.current_thread() not in invalidate_threads
+
+
+@pytest.mark.asyncio
+class TestHandoutEndpointCaching:
+    async def test_second_download_streams_cached_file(self, client: AsyncClient, disk_cache, test_outing, monkeypatch):
+        disk_cache.max_bytes = 10_000_000
+        renders = []
+        render = pdf_generator.generate_outing_handout
+
+        def counting_render(*args):
+            renders.append(args)
+            return render(*args)
+
+        monkeypatch.setattr(pdf_generator, "generate_outing_handout", counting_render)
+        url = f"/api/outings/{test_outing.id}/handout"
+
+        first = await client.get(url)
+        second = await client.get(url)
+
+        assert first.status_code == second.status_code == 200
+        assert len(renders) == 1
+        assert second.content == first.content
+        assert second.headers["etag"] == first.headers["etag"]
+        assert second.headers["content-length"] == str(len(first.content))
+        assert second.headers["last-modified"]
+
+        not_modified = await client.get(url, headers={"If-None-Match": first.headers["etag"]})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+
+        not_modified = await client.get(url, headers={"If-Modified-Since": first.headers["last-modified"]})
+        assert not_modified.status_code == 304
+        assert len(renders) == 1
+
+    async def test_served_without_cache_when_disabled(self, client: AsyncClient, disk_cache, test_outing):
+        disk_cache.max_bytes = 0
+
+        response = await client.get(f"/api/outings/{test_outing.id}/handout")
+
+        assert response.status_code == 200
+        assert response.content.startswith(b"%PDF")
+        assert response.headers["etag"]
+
+    async def test_cache_reads_run_off_the_event_loop(self, client: AsyncClient, disk_cache, test_outing, monkeypatch):
+        disk_cache.max_bytes = 10_000_000
+        loop_thread = threading.current_thread()
+        open_threads = []
+        open_cached = disk_cache.open
+
+        def recording_open(*args):
+            open_threads.append(threading.current_thread())
+            return open_cached(*args)
+
+        monkeypatch.setattr(disk_cache, "open", recording_open)
+
+        response = await client.get(f"/api/outings/{test_outing.id}/handout")
+
+        assert response.status_code == 200
+        assert len(open_threads) == 2
+        assert loop_thread not in open_threads
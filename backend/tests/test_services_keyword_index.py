@@ -0,0 +1,132 @@
+"""Tests for services/keyword_index.py"""
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql
+
+from app.crud import requirement as crud_requirement
+from app.models.requirement import MeritBadge, RankRequirement
+from app.schemas.requirement import MeritBadgeCreate, RankRequirementCreate, RankRequirementUpdate
+from app.services import keyword_index
+from app.services.keyword_index import forms_overlap, keyword_forms, outing_keyword_forms
+from app.utils.suggestions import calculate_match_score
+
+
+def _requirement(number, keywords):
+    return RankRequirementCreate(
+        rank="Scout",
+        requirement_number=number,
+        requirement_text=f"Requirement {number}",
+        keywords=keywords,
+    )
+
+
+class TestKeywordForms:
+    def test_requirement_forms_include_stems(self):
+        assert keyword_forms(["Hiking", "tents"]) == ["hik", "hike", "hiking", "tent", "tents"]
+        assert keyword_forms(None) is None
+
+    def test_outing_forms(self):
+        assert outing_keyword_forms(["Camping", "maps", ""]) == {"camping", "camp", "maps", "map"}
+
+    def test_postgres_lookup_uses_array_overlap(self):
+        clause = forms_overlap(RankRequirement, {"hike"})
+        sql = str(select(RankRequirement.id).where(clause).compile(dialect=postgresql.dialect()))
+        assert "rank_requirements.keyword_forms && " in sql
+
+
+@pytest.mark.asyncio
+class TestKeywordIndexSearch:
+    async def test_forms_are_stored_on_write(self, db_session):
+        created = await crud_requirement.create_rank_requirement(db_session, _requirement("1a", ["Swimming"]))
+        assert created.keyword_forms == ["swimm", "swimme", "swimming"]
+
+        updated = await crud_requirement.update_rank_requirement(
+            db_session, created.id, RankRequirementUpdate(keywords=["knots"])
+        )
+        assert updated.keyword_forms == ["knot", "knots"]
+
+    async def test_matches_stemmed_forms(self, db_session):
+        hiking = await crud_requirement.create_rank_requirement(db_session, _requirement("1a", ["hiking"]))
+        await crud_requirement.create_rank_requirement(db_session, _requirement("1b", ["swimming"]))
+
+        results = await crud_requirement.search_rank_requirements_by_keywords(db_session, ["hike"])
+
+        assert [r.id for r in results] == [hiking.id]
+
+    async def test_candidates_are_exactly_the_scored_rows(self, db_session):
+        keyword_sets = [["camping", "tents"], ["hiking", "map"], ["knots"], ["cooking", "fire"], ["swim"]]
+        for number, keywords in enumerate(keyword_sets):
+            await crud_requirement.create_rank_requirement(db_session, _requirement(str(number), keywords))
+        outing = ["camp", "maps", "cooking", "tent"]
+
+        results = await crud_requirement.search_rank_requirements_by_keywords(db_session, outing)
+
+        everything = (await db_session.execute(select(RankRequirement))).scalars().all()
+        scored = {r.id for r in everything if calculate_match_score(r.keywords, outing)[0] > 0}
+        assert {r.id for r in results} == scored
+        assert len(scored) == 3
+
+    async def test_loads_only_candidate_rows(self, db_session):
+        for number in range(20):
+            await crud_requirement.create_rank_requirement(db_session, _requirement(str(number), [f"skill{number}"]))
+        await crud_requirement.create_rank_requirement(db_session, _requirement("x", ["canoeing"]))
+        await crud_requirement.search_rank_requirements_by_keywords(db_session, ["warm", "up"])
+
+        engine = db_session.bind.sync_engine
+        rows = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            rows.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            results = await crud_requirement.search_rank_requirements_by_keywords(db_session, ["canoe", "canoeing"])
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert [r.requirement_number for r in results] == ["x"]
+        # Warm index: a single primary-key lookup
+        assert len(rows) == 1
+        assert "IN" in rows[0]
+
+    async def test_index_follows_updates_and_deletes(self, db_session):
+        badge = await crud_requirement.create_merit_badge(
+            db_session, MeritBadgeCreate(name="Fishing", keywords=["fishing"])
+        )
+        assert await crud_requirement.search_merit_badges_by_keywords(db_session, ["fish"])
+
+        badge.keywords = ["angling"]
+        await db_session.commit()
+        assert await crud_requirement.search_merit_badges_by_keywords(db_session, ["fish"]) == []
+        assert await crud_requirement.search_merit_badges_by_keywords(db_session, ["angling"])
+
+        await crud_requirement.delete_merit_badge(db_session, badge.id)
+        assert await crud_requirement.search_merit_badges_by_keywords(db_session, ["angling"]) == []
+
+    async def test_rolled_back_delete_is_searchable_again(self, db_session):
+        badge = await crud_requirement.create_merit_badge(
+            db_session, MeritBadgeCreate(name="Rowing", keywords=["rowing"])
+        )
+        badge_id = badge.id
+        await db_session.delete(badge)
+        await db_session.flush()
+        assert await crud_requirement.search_merit_badges_by_keywords(db_session, ["rowing"]) == []
+
+        await db_session.rollback()
+
+        results = await crud_requirement.search_merit_badges_by_keywords(db_session, ["rowing"])
+        assert [b.id for b in results] == [badge_id]
+
+    async def test_rows_without_stored_forms(self, db_session):
+        badge = MeritBadge(name="Legacy", keywords=["orienteering"])
+        db_session.add(badge)
+        await db_session.flush()
+        await db_session.execute(
+            MeritBadge.__table__.update().where(MeritBadge.id == badge.id).values(keyword_forms=None)
+        )
+        await db_session.commit()
+        keyword_index.invalidate(MeritBadge)
+
+        results = await crud_requirement.search_merit_badges_by_keywords(db_session, ["orienteer"])
+
+        assert [b.id for b in results] == [badge.id]
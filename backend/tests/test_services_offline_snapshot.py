@@ -0,0 +1,82 @@
+"""Tests for services/offline_snapshot.py helpers"""
+import gzip
+import json
+import uuid
+from datetime import date, datetime
+
+from app.models.user import User
+from app.services import offline_snapshot
+from app.services.offline_snapshot import accepts_gzip, etag_matches, gzip_stream, ndjson_records, snapshot_etag
+
+
+def _user(role="admin"):
+    return User(id=uuid.UUID(int=7), email="a@test.com", full_name="A", role=role,
+                is_initial_admin=False, hashed_password="")
+
+
+VERSION = {
+    "change_id": str(uuid.UUID(int=1)),
+    "changed_at": datetime(2026, 1, 1),
+    "capacity_changed_at": datetime(2026, 1, 1),
+    "auto_closed_outings": 0,
+    "today": date(2026, 1, 2),
+}
+
+
+class TestSnapshotEtag:
+    def test_depends_on_version_role_and_representation(self):
+        etag = snapshot_etag(_user(), VERSION, "json")
+
+        assert etag == snapshot_etag(_user(), dict(VERSION), "json")
+        assert etag != snapshot_etag(_user(), {**VERSION, "change_id": str(uuid.UUID(int=2))}, "json")
+        assert etag != snapshot_etag(_user(), {**VERSION, "capacity_changed_at": datetime(2026, 1, 2)}, "json")
+        assert etag != snapshot_etag(_user(), {**VERSION, "auto_closed_outings": 1}, "json")
+        # Ages in the snapshot roll over at midnight
+        assert etag != snapshot_etag(_user(), {**VERSION, "today": date(2026, 1, 3)}, "json")
+        assert etag != snapshot_etag(_user("user"), VERSION, "json")
+        assert etag != snapshot_etag(_user(), VERSION, "ndjson")
+
+    def test_if_none_match(self):
+        assert etag_matches('"abc"', '"abc"')
+        assert etag_matches('"x", W/"abc"', '"abc"')
+        assert etag_matches("*", '"abc"')
+        assert not etag_matches('"abd"', '"abc"')
+        assert not etag_matches(None, '"abc"')
+
+
+class TestEncoding:
+    def test_accepts_gzip(self):
+        assert accepts_gzip("gzip, deflate, br")
+        assert accepts_gzip("br;q=1.0, gzip;q=0.8")
+        assert not accepts_gzip("identity")
+        assert not accepts_gzip("gzip;q=0")
+        assert not accepts_gzip(None)
+
+    async def test_gzip_stream_round_trip(self):
+        chunks = [f'{{"n":{i}}}\n'.encode() for i in range(50)]
+
+        async def produce():
+            for chunk in chunks:
+                yield chunk
+
+        encoded = b"".join([data async for data in gzip_stream(produce())])
+
+        assert gzip.decompress(encoded) == b"".join(chunks)
+
+
+async def test_ndjson_records_are_sent_as_each_query_returns(db_session, test_user, test_outing, monkeypatch):
+    loaded = []
+    for name in ("_snapshot_outings", "_snapshot_rosters"):
+        def tracking(*args, _name=name, _load=getattr(offline_snapshot, name)):
+            loaded.append(_name)
+            return _load(*args)
+        monkeypatch.setattr(offline_snapshot, name, tracking)
+
+    records = ndjson_records(db_session, test_user, VERSION)
+
+    assert json.loads(await records.__anext__())["type"] == "user"
+    assert loaded == []
+    assert json.loads(await records.__anext__())["data"]["id"] == str(test_outing.id)
+    assert loaded == ["_snapshot_outings"]
+    assert [json.loads(record)["type"] async for record in records] == ["roster", "end"]
+    assert loaded == ["_snapshot_outings", "_snapshot_rosters"]
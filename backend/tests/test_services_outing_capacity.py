@@ -0,0 +1,176 @@
+"""Tests for the materialized outing capacity counters"""
+import pytest
+from datetime import date, timedelta
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.crud import signup as crud_signup
+from app.models.family import FamilyMember
+from app.models.outing import Outing
+from app.models.outing_capacity import OutingCapacity
+from app.schemas.signup import SignupCreate, FamilyContact
+from app.services.outing_capacity import capacity_summary, count_outing_roster, refresh_outing_capacity
+
+
+async def _counters(db_session, outing_id) -> OutingCapacity:
+    result = await db_session.execute(
+        select(OutingCapacity).where(OutingCapacity.outing_id == outing_id)
+    )
+    return result.scalar_one()
+
+
+@pytest.mark.asyncio
+class TestCapacityMaintenance:
+    """Counters follow roster writes made through the ORM"""
+
+    async def test_new_outing_gets_zero_row(self, db_session, test_outing):
+        counters = await _counters(db_session, test_outing.id)
+
+        assert counters.participant_count == 0
+        assert counters.adult_count == 0
+        assert counters.vehicle_capacity == 0
+
+    async def test_counts_fixture_signup(self, db_session, test_outing, test_signup):
+        counters = await _counters(db_session, test_outing.id)
+
+        # test_signup has one scout and one adult (male, 5 seats)
+        assert counters.participant_count == 2
+        assert counters.adult_count == 1
+        assert counters.female_adult_count == 0
+        assert counters.female_youth_count == 0
+        assert counters.vehicle_capacity == 5
+
+    async def test_crud_create_and_delete_signup(self, db_session, test_outing, test_user):
+        members = [
+            FamilyMember(user_id=test_user.id, name="Mom", member_type="adult", gender="female",
+                         has_youth_protection=True, vehicle_capacity=3),
+            FamilyMember(user_id=test_user.id, name="Daughter", member_type="scout", gender="female",
+                         date_of_birth=date.today() - timedelta(days=365 * 12)),
+        ]
+        db_session.add_all(members)
+        await db_session.commit()
+
+        signup = await crud_signup.create_signup(db_session, SignupCreate(
+            outing_id=test_outing.id,
+            family_contact=FamilyContact(
+                email="mom@test.com",
+                phone="555-0101",
+                emergency_contact_name="Mom",
+                emergency_contact_phone="555-0102",
+            ),
+            family_member_ids=[m.id for m in members],
+        ))
+
+        counters = await _counters(db_session, test_outing.id)
+        assert counters.participant_count == 2
+        assert counters.female_adult_count == 1
+        assert counters.female_youth_count == 1
+        assert counters.vehicle_capacity == 3
+
+        await crud_signup.delete_signup(db_session, signup.id)
+
+        counters = await _counters(db_session, test_outing.id)
+        assert counters.participant_count == 0
+        assert counters.female_youth_count == 0
+
+    async def test_family_member_edit_reaggregates(self, db_session, test_outing, test_signup):
+        result = await db_session.execute(select(FamilyMember).where(FamilyMember.member_type == "adult"))
+        adult = result.scalar_one()
+        adult.vehicle_capacity = 7
+        await db_session.commit()
+
+        counters = await _counters(db_session, test_outing.id)
+        assert counters.vehicle_capacity == 7
+
+    async def test_refresh_is_idempotent(self, db_session, test_outing, test_signup):
+        await refresh_outing_capacity(db_session, [test_outing.id, None])
+        await refresh_outing_capacity(db_session, [test_outing.id])
+
+        counters = await _counters(db_session, test_outing.id)
+        assert counters.participant_count == 2
+
+
+@pytest.mark.asyncio
+class TestCountOutingRoster:
+    """Grouped roster aggregate used for signup admission"""
+
+    async def test_matches_materialized_counters(self, db_session, test_outing, test_signup):
+        counts = await count_outing_roster(db_session, test_outing.id)
+        counters = await _counters(db_session, test_outing.id)
+
+        assert counts == {
+            "participant_count": counters.participant_count,
+            "adult_count": counters.adult_count,
+            "female_adult_count": counters.female_adult_count,
+            "female_youth_count": counters.female_youth_count,
+            "vehicle_capacity": counters.vehicle_capacity,
+        }
+
+    async def test_unknown_outing_is_empty(self, db_session):
+        from uuid import uuid4
+
+        counts = await count_outing_roster(db_session, uuid4())
+
+        assert set(counts.values()) == {0}
+
+    async def test_summary_from_counts(self, db_session, test_outing, test_signup):
+        summary = capacity_summary(test_outing, await count_outing_roster(db_session, test_outing.id))
+
+        assert summary["signup_count"] == 2
+        assert summary["available_spots"] == test_outing.max_participants - 2
+
+
+@pytest.mark.asyncio
+class TestCapacitySummary:
+    """capacity_summary mirrors the Outing model properties"""
+
+    async def test_matches_model_properties(self, db_session, test_outing, test_signup):
+        from app.crud import outing as crud_outing
+
+        outing = await crud_outing.get_outing(db_session, test_outing.id)
+        await db_session.refresh(outing, ["capacity"])
+        summary = capacity_summary(outing)
+
+        assert summary["signup_count"] == outing.signup_count
+        assert summary["available_spots"] == outing.available_spots
+        assert summary["is_full"] == outing.is_full
+        assert summary["adult_count"] == outing.adult_count
+        assert summary["needs_two_deep_leadership"] == outing.needs_two_deep_leadership
+        assert summary["needs_female_leader"] == outing.needs_female_leader
+
+    async def test_vehicle_capacity_type(self, db_session):
+        outing = Outing(
+            name="Carpool Outing",
+            outing_date=date.today() + timedelta(days=10),
+            location="Somewhere",
+            max_participants=0,
+            capacity_type="vehicle",
+        )
+        outing.capacity = OutingCapacity(
+            participant_count=4,
+            adult_count=1,
+            female_adult_count=0,
+            female_youth_count=0,
+            vehicle_capacity=3,
+        )
+
+        summary = capacity_summary(outing)
+
+        assert summary["available_spots"] == 0
+        assert summary["is_full"] is True
+        assert summary["needs_more_drivers"] is True
+
+
+@pytest.mark.asyncio
+class TestListEndpoints:
+    """List endpoints report counters without loading the roster"""
+
+    async def test_list_reports_counts(self, client: AsyncClient, test_outing, test_signup):
+        response = await client.get("/api/outings")
+
+        assert response.status_code == 200
+        outing = next(o for o in response.json()["outings"] if o["id"] == str(test_outing.id))
+        assert outing["signup_count"] == 2
+        assert outing["available_spots"] == test_outing.max_participants - 2
+        assert outing["adult_count"] == 1
+        assert outing["needs_two_deep_leadership"] is True
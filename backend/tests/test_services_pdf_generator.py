@@ -1,33 +1,36 @@
 """Tests for app/services/pdf_generator.py"""
 import pytest
-from unittest.mock import Mock, patch
+import statistics
+import time
+from unittest.mock import patch
 from datetime import datetime, timedelta
+from app.services import pdf_generator as pdf_generator_module
 from app.services.pdf_generator import PDFGenerator
+from app.utils.pdf_generator import generate_outing_roster_pdf
 
 @pytest.fixture
 def mock_outing():
-    outing = Mock()
-    outing.name = "Test Outing"
-    outing.description = "Test Description"
-    outing.outing_date = datetime.now()
-    outing.end_date = datetime.now() + timedelta(days=1)
-    outing.drop_off_time = datetime.now()
-    outing.pickup_time = datetime.now()
-    outing.location = "Test Location"
-    outing.outing_lead_name = "Leader Name"
-    outing.outing_lead_phone = "555-1234"
-    
-    # Relationships
-    outing.outing_requirements = []
-    outing.outing_merit_badges = []
-    outing.outing_place = None
-    outing.outing_address = "123 Test St"
-    outing.drop_off_location = "Test Location"
-    outing.dropoff_address = "123 Test St"
-    outing.pickup_location = "Test Location"
-    outing.pickup_address = "123 Test St"
-    
-    return outing
+    """handout_pdf_outing data"""
+    return {
+        "name": "Test Outing",
+        "description": "Test Description",
+        "outing_date": datetime.now(),
+        "end_date": datetime.now() + timedelta(days=1),
+        "drop_off_time": datetime.now(),
+        "pickup_time": datetime.now(),
+        "location": "Test Location",
+        "outing_lead_name": "Leader Name",
+        "outing_lead_phone": "555-1234",
+        "requirements": [],
+        "merit_badges": [],
+        "troop_numbers": [],
+        "outing_place": None,
+        "outing_address": "123 Test St",
+        "drop_off_location": "Test Location",
+        "dropoff_address": "123 Test St",
+        "pickup_location": "Test Location",
+        "pickup_address": "123 Test St",
+    }
 
 class TestPDFGenerator:
     """Test PDFGenerator class"""
@@ -57,30 +60,15 @@ class TestPDFGenerator:
 
     def test_generate_outing_handout_full(self, mock_outing):
         """Test generating handout with all fields"""
-        # Add requirements
-        req = Mock()
-        req.requirement.rank = "First Class"
-        req.requirement.requirement_number = "1a"
-        mock_outing.outing_requirements = [req]
-        
-        mb = Mock()
-        mb.merit_badge.name = "Camping"
-        mock_outing.outing_merit_badges = [mb]
-        
-        # Add place
-        place = Mock()
-        place.name = "Camp Site"
-        place.address = "456 Camp Rd"
-        place.google_maps_url = "http://maps.google.com"
-        mock_outing.outing_place = place
-        
-        # Add packing list
-        pl = Mock()
-        item = Mock()
-        item.name = "Tent"
-        item.quantity = 1
-        pl.items = [item]
-        packing_lists = [pl]
+        mock_outing["requirements"] = [{"rank": "First Class", "requirement_number": "1a"}]
+        mock_outing["merit_badges"] = ["Camping"]
+        mock_outing["troop_numbers"] = ["12", "7"]
+        mock_outing["outing_place"] = {
+            "name": "Camp Site",
+            "address": "456 Camp Rd",
+            "google_maps_url": "http://maps.google.com",
+        }
+        packing_lists = [{"items": [{"name": "Tent", "quantity": 1}, {"name": "Stakes", "quantity": 8}]}]
         
         generator = PDFGenerator()
         pdf_bytes = generator.generate_outing_handout(mock_outing, packing_lists)
@@ -91,9 +79,9 @@ class TestPDFGenerator:
 
     def test_generate_outing_handout_no_dates(self, mock_outing):
         """Test generating handout with missing dates"""
-        mock_outing.end_date = None
-        mock_outing.drop_off_time = None
-        mock_outing.pickup_time = None
+        mock_outing["end_date"] = None
+        mock_outing["drop_off_time"] = None
+        mock_outing["pickup_time"] = None
         
         generator = PDFGenerator()
         pdf_bytes = generator.generate_outing_handout(mock_outing, [])
@@ -103,13 +91,86 @@ class TestPDFGenerator:
 
     def test_generate_outing_handout_different_locations(self, mock_outing):
         """Test generating handout with different dropoff/pickup locations"""
-        mock_outing.drop_off_location = "Drop Point"
-        mock_outing.dropoff_address = "Drop St"
-        mock_outing.pickup_location = "Pick Point"
-        mock_outing.pickup_address = "Pick St"
+        mock_outing["drop_off_location"] = "Drop Point"
+        mock_outing["dropoff_address"] = "Drop St"
+        mock_outing["pickup_location"] = "Pick Point"
+        mock_outing["pickup_address"] = "Pick St"
         
         generator = PDFGenerator()
         pdf_bytes = generator.generate_outing_handout(mock_outing, [])
         
         assert pdf_bytes is not None
         assert len(pdf_bytes) > 0
+
+
+class TestWarmSetup:
+    """Fixed setup happens once per process, not per generator or render"""
+
+    def test_generators_share_styles(self):
+        pdf_generator_module.warm_up()
+
+        with patch("app.services.pdf_generator.getSampleStyleSheet") as sample:
+            first, second = PDFGenerator(), PDFGenerator()
+
+        sample.assert_not_called()
+        assert first.styles is second.styles
+
+    def test_qr_codes_are_memoized(self):
+        generator = PDFGenerator()
+        url = "https://www.google.com/maps/search/?api=1&query=1+Memo+Ln"
+        generator._generate_qr_code(url)
+        hits = pdf_generator_module._qr_png.cache_info().hits
+
+        buffer = generator._generate_qr_code(url)
+
+        assert pdf_generator_module._qr_png.cache_info().hits == hits + 1
+        # Each caller gets its own stream over the cached image
+        assert buffer.read(8) == b"\x89PNG\r\n\x1a\n"
+        assert generator._generate_qr_code(url).tell() == 0
+
+
+class TestRenderBenchmark:
+    """Per-render time with setup already done; recorded as a test property"""
+
+    RUNS = 5
+
+    def _median_seconds(self, render):
+        render()  # First render may still load font metrics
+        timings = []
+        for _ in range(self.RUNS):
+            started = time.perf_counter()
+            render()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
+
+    def test_handout_render_time(self, mock_outing, record_property):
+        pdf_generator_module.warm_up()
+        generator = PDFGenerator()
+
+        seconds = self._median_seconds(lambda: generator.generate_outing_handout(mock_outing, []))
+
+        record_property("handout_render_ms", round(seconds * 1000, 2))
+        assert seconds < 1.0
+
+    def test_roster_render_time(self, record_property):
+        outing_data = {
+            "name": "Benchmark Campout",
+            "outing_date": datetime(2026, 10, 17).isoformat(),
+            "end_date": None,
+            "location": "Camp",
+        }
+        signups = [
+            {
+                "family_contact_name": f"Family {i}",
+                "family_contact_phone": "555-0100",
+                "participants": [
+                    {"name": f"Scout {i}", "age": 12, "participant_type": "scout", "gender": "male"},
+                ],
+            }
+            for i in range(30)
+        ]
+
+        seconds = self._median_seconds(lambda: generate_outing_roster_pdf(outing_data, signups))
+
+        record_property("roster_render_ms", round(seconds * 1000, 2))
+        assert seconds < 1.0
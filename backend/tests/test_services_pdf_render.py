@@ -0,0 +1,109 @@
+"""Tests for services/pdf_render.py"""
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.services import pdf_render
+
+
+@pytest.fixture
+def small_pool(monkeypatch):
+    """One worker, one queued render, fresh executor"""
+    pdf_render.shutdown()
+    monkeypatch.setattr(settings, "PDF_RENDER_WORKERS", 1)
+    monkeypatch.setattr(settings, "PDF_RENDER_QUEUE_DEPTH", 1)
+    yield
+    pdf_render.shutdown()
+
+
+def _blocking_render(release: threading.Event, started: threading.Event = None):
+    def render():
+        if started is not None:
+            started.set()
+        release.wait(5)
+        return b"%PDF"
+    return render
+
+
+@pytest.mark.asyncio
+class TestRenderPdf:
+    async def test_renders_off_the_event_loop(self, small_pool):
+        release, started = threading.Event(), threading.Event()
+        task = asyncio.create_task(pdf_render.render_pdf(_blocking_render(release, started)))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+
+        # The loop keeps running while the render blocks its thread
+        ticks = 0
+        for _ in range(5):
+            await asyncio.sleep(0.01)
+            ticks += 1
+        release.set()
+
+        assert await task == b"%PDF"
+        assert ticks == 5
+        assert pdf_render.render_stats()["in_flight"] == 0
+
+    async def test_full_queue_is_rejected(self, small_pool):
+        release = threading.Event()
+        running = [asyncio.create_task(pdf_render.render_pdf(_blocking_render(release))) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        rejected_before = pdf_render.render_stats()["rejected"]
+
+        with pytest.raises(HTTPException) as exc:
+            await pdf_render.render_pdf(_blocking_render(release))
+        release.set()
+        await asyncio.gather(*running)
+
+        assert exc.value.status_code == 503
+        assert exc.value.headers["Retry-After"]
+        assert pdf_render.render_stats()["rejected"] == rejected_before + 1
+
+    async def test_timeout_keeps_slot_until_render_ends(self, small_pool):
+        release = threading.Event()
+
+        with pytest.raises(HTTPException) as exc:
+            await pdf_render.render_pdf(_blocking_render(release), timeout=0.05)
+
+        assert exc.value.status_code == 504
+        assert pdf_render.render_stats()["in_flight"] == 1
+        release.set()
+        for _ in range(100):
+            if pdf_render.render_stats()["in_flight"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        stats = pdf_render.render_stats()
+        assert stats["in_flight"] == 0
+        assert stats["timed_out"] >= 1
+
+    async def test_render_errors_propagate(self, small_pool):
+        failed_before = pdf_render.render_stats()["failed"]
+
+        def broken():
+            raise ValueError("bad template")
+
+        with pytest.raises(ValueError):
+            await pdf_render.render_pdf(broken)
+
+        stats = pdf_render.render_stats()
+        assert stats["failed"] == failed_before + 1
+        assert stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_render_stats_endpoint(client, auth_headers):
+    response = await client.get("/api/health/pdf-render", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert {"in_flight", "queued", "rejected", "timed_out"} <= set(response.json())
+    assert "directory" not in response.json()["handout_cache"]
+
+
+@pytest.mark.asyncio
+async def test_render_stats_require_admin(client, regular_user_headers):
+    response = await client.get("/api/health/pdf-render", headers=regular_user_headers)
+
+    assert response.status_code == 403
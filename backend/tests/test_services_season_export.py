@@ -0,0 +1,227 @@
+"""Tests for services/season_export.py"""
+import csv
+import io
+import threading
+import time
+import uuid
+import zipfile
+from datetime import date, timedelta
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.crud import checkin as crud_checkin
+from app.crud import outing as crud_outing
+from app.models.outing import Outing
+from app.models.participant import Participant
+from app.services import season_export
+from app.services.season_export import CHECKIN_CSV_HEADER, archive_folder, stream_outing_archive
+
+
+async def _make_outings(db_session, count, start=None):
+    start = start or date(2026, 3, 1)
+    outings = [
+        Outing(
+            id=uuid.uuid4(),
+            name=f"Spring Campout {i}",
+            outing_date=start + timedelta(days=7 * i),
+            location="Camp",
+            max_participants=20,
+            is_overnight=False,
+        )
+        for i in range(count)
+    ]
+    db_session.add_all(outings)
+    await db_session.commit()
+    return outings
+
+
+async def _archive(db_session, outings, **kwargs) -> tuple[zipfile.ZipFile, list[bytes]]:
+    chunks = [chunk async for chunk in stream_outing_archive(db_session, outings, **kwargs)]
+    return zipfile.ZipFile(io.BytesIO(b"".join(chunks))), chunks
+
+
+@pytest.mark.asyncio
+class TestStreamOutingArchive:
+    async def test_folder_per_outing_in_date_order(self, db_session, test_outing, test_signup):
+        participant = (await db_session.execute(
+            select(Participant.id).where(Participant.signup_id == test_signup.id).limit(1)
+        )).scalar_one()
+        await crud_checkin.create_checkins(db_session, test_outing.id, [participant], "Leader")
+        outings = await crud_outing.get_outings_for_export(db_session, start_date=date.today())
+
+        archive, _ = await _archive(db_session, outings)
+
+        folder = archive_folder(test_outing)
+        assert archive.namelist() == [f"{folder}/roster.pdf", f"{folder}/checkins.csv"]
+        assert archive.read(f"{folder}/roster.pdf").startswith(b"%PDF")
+        assert archive.getinfo(f"{folder}/roster.pdf").compress_type == zipfile.ZIP_STORED
+        rows = list(csv.reader(io.StringIO(archive.read(f"{folder}/checkins.csv").decode())))
+        assert rows[0] == CHECKIN_CSV_HEADER
+        assert len(rows) == 3
+        assert sorted(row[5] for row in rows[1:]) == ["No", "Yes"]
+        assert archive.testzip() is None
+
+    async def test_streams_an_outing_at_a_time(self, db_session):
+        outings = await _make_outings(db_session, 4)
+
+        archive, chunks = await _archive(db_session, outings, parallelism=1)
+
+        # One chunk per outing plus the central directory
+        assert len(chunks) == 5
+        assert all(chunks)
+        assert archive_folder(outings[0]).encode() in chunks[0]
+        assert archive_folder(outings[1]).encode() not in chunks[0]
+        assert [name.split("/")[0] for name in archive.namelist()[::2]] == [archive_folder(o) for o in outings]
+
+    async def test_renders_in_parallel_up_to_window(self, db_session, monkeypatch):
+        outings = await _make_outings(db_session, 5)
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+        render = season_export.generate_outing_roster_pdf
+
+        def slow_render(*args):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return render(*args)
+
+        monkeypatch.setattr(season_export, "generate_outing_roster_pdf", slow_render)
+
+        archive, _ = await _archive(db_session, outings, parallelism=2)
+
+        assert peak[0] == 2
+        assert len(archive.namelist()) == 10
+
+    async def test_failed_render_becomes_error_entry(self, db_session, monkeypatch):
+        outings = await _make_outings(db_session, 2)
+
+        async def timed_out(*args, **kwargs):
+            raise HTTPException(status_code=504, detail="PDF rendering timed out")
+
+        monkeypatch.setattr(season_export, "render_pdf", timed_out)
+
+        archive, _ = await _archive(db_session, outings)
+
+        folder = archive_folder(outings[0])
+        assert f"{folder}/roster_error.txt" in archive.namelist()
+        assert b"timed out" in archive.read(f"{folder}/roster_error.txt")
+        assert f"{folder}/checkins.csv" in archive.namelist()
+
+    async def test_render_crash_becomes_error_entry(self, db_session, monkeypatch):
+        outings = await _make_outings(db_session, 2)
+
+        def broken(*args):
+            raise ValueError("bad font")
+
+        monkeypatch.setattr(season_export, "generate_outing_roster_pdf", broken)
+
+        archive, _ = await _archive(db_session, outings)
+
+        for outing in outings:
+            folder = archive_folder(outing)
+            assert archive.read(f"{folder}/roster_error.txt").startswith(b"Roster could not be rendered")
+            assert f"{folder}/checkins.csv" in archive.namelist()
+
+    async def test_default_window_leaves_a_worker_free(self, db_session, monkeypatch):
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "PDF_RENDER_WORKERS", 3)
+        outings = await _make_outings(db_session, 4)
+        load = season_export._load_outing
+        loaded = []
+
+        async def counting_load(db, outing):
+            loaded.append(outing.id)
+            return await load(db, outing)
+
+        monkeypatch.setattr(season_export, "_load_outing", counting_load)
+        stream = stream_outing_archive(db_session, outings)
+
+        await stream.__anext__()
+        await stream.aclose()
+
+        # The first outing is written once two renders are queued, not three
+        assert loaded == [outings[0].id, outings[1].id]
+
+
+@pytest.mark.asyncio
+class TestOutingsForExport:
+    async def test_date_range(self, db_session):
+        outings = await _make_outings(db_session, 4)
+
+        found = await crud_outing.get_outings_for_export(
+            db_session, start_date=outings[1].outing_date, end_date=outings[2].outing_date
+        )
+
+        assert [o.id for o in found] == [outings[1].id, outings[2].id]
+
+    async def test_troop_by_allowed_troops_or_participants(
+        self, db_session, test_troop, test_outing, test_signup, test_family_member, test_day_outing
+    ):
+        other = (await _make_outings(db_session, 1))[0]
+        test_family_member.troop_id = test_troop.id
+        day_outing = await crud_outing.get_outing(db_session, test_day_outing.id)
+        day_outing.allowed_troops.append(test_troop)
+        await db_session.commit()
+
+        found = await crud_outing.get_outings_for_export(db_session, troop_id=test_troop.id)
+
+        assert {o.id for o in found} == {test_outing.id, test_day_outing.id}
+        assert other.id not in {o.id for o in found}
+
+
+@pytest.mark.asyncio
+class TestExportOutingsArchiveEndpoint:
+    async def test_downloads_zip(self, client: AsyncClient, auth_headers, test_outing, test_signup, test_day_outing):
+        response = await client.get(
+            "/api/signups/outings/export",
+            params={"start_date": date.today().isoformat()},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        assert "attachment;" in response.headers["content-disposition"]
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        assert len(archive.namelist()) == 4
+        assert archive.namelist()[0].startswith(archive_folder(test_day_outing))
+
+    async def test_requires_a_filter(self, client: AsyncClient, auth_headers):
+        response = await client.get("/api/signups/outings/export", headers=auth_headers)
+        assert response.status_code == 400
+
+    async def test_rejects_reversed_range(self, client: AsyncClient, auth_headers):
+        response = await client.get(
+            "/api/signups/outings/export",
+            params={"start_date": "2026-06-01", "end_date": "2026-05-01"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 400
+
+    async def test_too_many_outings(self, client: AsyncClient, auth_headers, db_session, monkeypatch):
+        from app.core.config import settings
+
+        await _make_outings(db_session, 3)
+        monkeypatch.setattr(settings, "SEASON_EXPORT_MAX_OUTINGS", 2)
+
+        response = await client.get(
+            "/api/signups/outings/export", params={"end_date": "2026-12-31"}, headers=auth_headers
+        )
+        assert response.status_code == 400
+
+    async def test_no_matches(self, client: AsyncClient, auth_headers):
+        response = await client.get(
+            "/api/signups/outings/export", params={"end_date": "2000-01-01"}, headers=auth_headers
+        )
+        assert response.status_code == 404
+
+    async def test_admin_only(self, client: AsyncClient, test_outing):
+        response = await client.get("/api/signups/outings/export", params={"start_date": "2026-01-01"})
+        assert response.status_code == 403
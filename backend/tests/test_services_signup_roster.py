@@ -0,0 +1,117 @@
+"""Tests for the roster read model in services/signup_roster.py"""
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+from app.crud import signup as crud_signup
+from app.models.family import FamilyMemberAllergy, FamilyMemberDietaryPreference
+from app.models.signup import Signup
+from app.services.signup_roster import (
+    build_signup_responses,
+    fetch_roster_rows,
+    roster_pdf_signups,
+    signup_rows,
+)
+
+
+def _statement_recorder():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    return statements, before_cursor_execute
+
+
+@pytest.fixture
+async def preferences(db_session, test_family_member):
+    db_session.add_all([
+        FamilyMemberDietaryPreference(family_member_id=test_family_member.id, preference="vegetarian"),
+        FamilyMemberDietaryPreference(family_member_id=test_family_member.id, preference="gluten-free"),
+        FamilyMemberAllergy(family_member_id=test_family_member.id, allergy="peanuts, tree nuts", severity="severe"),
+    ])
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+class TestFetchRosterRows:
+    async def test_single_statement_with_aggregated_lists(self, db_session, test_signup, test_family_member, preferences):
+        statements, listener = _statement_recorder()
+        engine = db_session.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            rows = await fetch_roster_rows(db_session, Signup.outing_id == test_signup.outing_id)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        assert len(statements) == 1
+        [signup] = build_signup_responses(rows)
+        assert signup.participant_count == 2
+        assert signup.adult_count == 1
+        assert signup.scout_count == 1
+        scout = next(p for p in signup.participants if p.name == test_family_member.name)
+        # Sorted in SQL, not in insertion order
+        assert scout.dietary_restrictions == ["gluten-free", "vegetarian"]
+        assert scout.allergies == ["peanuts, tree nuts"]
+        adult = next(p for p in signup.participants if p.is_adult)
+        assert adult.dietary_restrictions == []
+        assert adult.allergies == []
+
+    async def test_matches_orm_serialization(self, db_session, test_signup, preferences):
+        rows = await fetch_roster_rows(db_session, Signup.id == test_signup.id)
+        loaded = await crud_signup.get_signup(db_session, test_signup.id)
+
+        [from_rows] = build_signup_responses(rows)
+        [from_orm] = build_signup_responses(signup_rows(loaded))
+
+        def normalized(response):
+            data = response.model_dump()
+            data["participants"] = sorted(data["participants"], key=lambda p: str(p["id"]))
+            return data
+
+        assert normalized(from_rows) == normalized(from_orm)
+
+    async def test_signup_without_participants(self, db_session, test_outing):
+        empty = Signup(
+            id=uuid.uuid4(),
+            outing_id=test_outing.id,
+            family_contact_name="Empty Family",
+            family_contact_email="empty@test.com",
+            family_contact_phone="555-0000",
+        )
+        db_session.add(empty)
+        await db_session.commit()
+
+        [signup] = build_signup_responses(await fetch_roster_rows(db_session, Signup.id == empty.id))
+
+        assert signup.participants == []
+        assert signup.participant_count == 0
+
+    async def test_limit_pages_over_signups(self, db_session, test_signup, test_outing):
+        other = Signup(
+            id=uuid.uuid4(),
+            outing_id=test_outing.id,
+            family_contact_name="Other Family",
+            family_contact_email="other@test.com",
+            family_contact_phone="555-0001",
+        )
+        db_session.add(other)
+        await db_session.commit()
+
+        first_page = build_signup_responses(await fetch_roster_rows(db_session, limit=1))
+        second_page = build_signup_responses(await fetch_roster_rows(db_session, offset=1, limit=1))
+
+        # Newest first; the two-participant signup is not cut in half by the limit
+        assert [s.id for s in first_page] == [other.id]
+        assert [s.id for s in second_page] == [test_signup.id]
+        assert second_page[0].participant_count == 2
+
+    async def test_pdf_shape(self, db_session, test_signup, preferences):
+        signups = build_signup_responses(await fetch_roster_rows(db_session, Signup.id == test_signup.id))
+
+        [pdf_signup] = roster_pdf_signups(signups)
+
+        assert pdf_signup["family_contact_name"] == "Test Family"
+        assert {p["name"] for p in pdf_signup["participants"]} == {"Test Scout Member", "Test Adult"}
+        assert all("dietary_preferences" in p for p in pdf_signup["participants"])
@@ -0,0 +1,132 @@
+"""Tests for the verified-token cache in front of get_current_user"""
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.api import deps
+from app.crud import user as crud_user
+from app.models.user import User
+from app.services.token_cache import VerifiedTokenCache, verified_tokens
+
+
+def _mock_authentik(email: str, exp=None):
+    mock_client = AsyncMock()
+    claims = {"exp": exp} if exp is not None else {}
+    mock_client.verify_token.return_value = {
+        "user_id": "authentik_id",
+        "email": email,
+        "name": "Cached User",
+        "groups": [],
+        "claims": claims,
+    }
+    mock_client.get_role_from_groups = lambda groups: "participant"
+    return mock_client
+
+
+def _credentials(token: str) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+class TestVerifiedTokenCache:
+    """Unit behaviour of the LRU/TTL cache"""
+
+    def _user(self, email="a@test.com") -> User:
+        import uuid
+        return User(id=uuid.uuid4(), email=email, hashed_password="", full_name="A",
+                    role="participant", is_active=True, is_initial_admin=False)
+
+    def test_put_and_get(self):
+        cache = VerifiedTokenCache(max_entries=10, ttl_seconds=60)
+        user = self._user()
+        cache.put("tok", user)
+
+        assert cache.get("tok")["id"] == user.id
+        assert cache.get("other") is None
+
+    def test_respects_token_exp(self):
+        cache = VerifiedTokenCache(max_entries=10, ttl_seconds=60)
+        cache.put("expired", self._user(), exp=time.time() - 1)
+        cache.put("expiring", self._user(), exp=time.time() + 0.05)
+
+        assert cache.get("expired") is None
+        assert cache.get("expiring") is not None
+        time.sleep(0.06)
+        assert cache.get("expiring") is None
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self):
+        cache = VerifiedTokenCache(max_entries=2, ttl_seconds=60)
+        cache.put("t1", self._user())
+        cache.put("t2", self._user())
+        cache.get("t1")
+        cache.put("t3", self._user())
+
+        assert cache.get("t1") is not None
+        assert cache.get("t2") is None
+        assert cache.get("t3") is not None
+
+    def test_invalidate_user_drops_all_tokens(self):
+        cache = VerifiedTokenCache(max_entries=10, ttl_seconds=60)
+        user = self._user()
+        other = self._user("b@test.com")
+        cache.put("t1", user)
+        cache.put("t2", user)
+        cache.put("t3", other)
+
+        cache.invalidate_user(user.id)
+
+        assert cache.get("t1") is None
+        assert cache.get("t2") is None
+        assert cache.get("t3") is not None
+
+    def test_inactive_users_not_cached(self):
+        cache = VerifiedTokenCache(max_entries=10, ttl_seconds=60)
+        user = self._user()
+        user.is_active = False
+        cache.put("tok", user)
+
+        assert cache.get("tok") is None
+
+
+@pytest.mark.asyncio
+class TestGetCurrentUserCaching:
+    """get_current_user skips verification and lookup for cached tokens"""
+
+    async def test_second_request_skips_verification(self, db_session, test_regular_user):
+        mock_client = _mock_authentik(test_regular_user.email, exp=time.time() + 600)
+
+        with patch("app.api.deps.get_authentik_client", return_value=mock_client):
+            first = await deps.get_current_user(_credentials("token-1"), db_session)
+            second = await deps.get_current_user(_credentials("token-1"), db_session)
+
+        assert mock_client.verify_token.await_count == 1
+        assert first.id == second.id == test_regular_user.id
+        assert second.role == test_regular_user.role
+        assert second in db_session
+
+    async def test_role_change_invalidates(self, db_session, test_regular_user):
+        mock_client = _mock_authentik(test_regular_user.email)
+
+        with patch("app.api.deps.get_authentik_client", return_value=mock_client):
+            await deps.get_current_user(_credentials("token-2"), db_session)
+            await crud_user.update_user(db_session, test_regular_user.id, role="outing-admin")
+            user = await deps.get_current_user(_credentials("token-2"), db_session)
+
+        assert mock_client.verify_token.await_count == 2
+        assert user.role == "outing-admin"
+
+    async def test_deactivation_invalidates(self, db_session, test_regular_user):
+        mock_client = _mock_authentik(test_regular_user.email)
+
+        with patch("app.api.deps.get_authentik_client", return_value=mock_client):
+            await deps.get_current_user(_credentials("token-3"), db_session)
+            await crud_user.update_user(db_session, test_regular_user.id, is_active=False)
+
+            with pytest.raises(HTTPException) as exc_info:
+                await deps.get_current_user(_credentials("token-3"), db_session)
+
+        assert exc_info.value.status_code == 403
+        assert verified_tokens.get("token-3") is None
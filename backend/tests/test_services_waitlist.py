@@ -0,0 +1,155 @@
+"""Tests for the FIFO signup waitlist in services/waitlist.py"""
+import uuid
+from datetime import date, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.crud import outing as crud_outing
+from app.crud import signup as crud_signup
+from app.crud import waitlist as crud_waitlist
+from app.models.family import FamilyMember
+from app.models.outing import Outing
+from app.schemas.signup import SignupCreate
+from app.services.waitlist import enqueue_signup, process_waitlist
+
+
+async def _scouts(db_session, user, count, prefix="Scout"):
+    members = [
+        FamilyMember(
+            id=uuid.uuid4(),
+            user_id=user.id,
+            name=f"{prefix} {i}",
+            date_of_birth=date.today() - timedelta(days=365 * 13),
+            member_type="scout",
+            gender="male",
+        )
+        for i in range(count)
+    ]
+    db_session.add_all(members)
+    await db_session.commit()
+    return members
+
+
+def _request(outing, members):
+    return SignupCreate(
+        outing_id=outing.id,
+        family_contact={
+            "email": "family@test.com",
+            "phone": "555-0000",
+            "emergency_contact_name": "Emergency Contact",
+            "emergency_contact_phone": "555-1111",
+        },
+        family_member_ids=[m.id for m in members],
+    )
+
+
+@pytest.fixture
+async def small_outing(db_session):
+    outing = Outing(
+        id=uuid.uuid4(),
+        name="Small Outing",
+        outing_date=date.today() + timedelta(days=10),
+        location="Camp",
+        max_participants=3,
+        is_overnight=False,
+    )
+    db_session.add(outing)
+    await db_session.commit()
+    # Loaded the way the endpoints load it, with allowed troops
+    outing = await crud_outing.get_outing_for_update(db_session, outing.id)
+    await db_session.commit()
+    return outing
+
+
+@pytest.fixture
+async def full_outing(db_session, small_outing, test_user):
+    """small_outing filled by three single-scout signups"""
+    signups = []
+    for i in range(3):
+        members = await _scouts(db_session, test_user, 1, prefix=f"Roster {i}")
+        signups.append(await crud_signup.create_signup(db_session, _request(small_outing, members)))
+    return small_outing, signups
+
+
+@pytest.mark.asyncio
+class TestProcessWaitlist:
+    async def test_admits_when_space(self, db_session, small_outing, test_user):
+        members = await _scouts(db_session, test_user, 2)
+        entry = await enqueue_signup(db_session, small_outing, _request(small_outing, members), test_user)
+
+        admitted = await process_waitlist(db_session, small_outing.id)
+
+        assert [e.id for e in admitted] == [entry.id]
+        entry = await crud_waitlist.get_waitlist_entry(db_session, entry.id)
+        assert entry.status == crud_waitlist.ADMITTED
+        signup = await crud_signup.get_signup(db_session, entry.signup_id)
+        assert signup.participant_count == 2
+
+    async def test_head_of_line_blocks_smaller_requests(self, db_session, full_outing, test_user, test_regular_user):
+        outing, signups = full_outing
+        first = await enqueue_signup(db_session, outing, _request(outing, await _scouts(db_session, test_user, 2)), test_user)
+        second = await enqueue_signup(
+            db_session, outing, _request(outing, await _scouts(db_session, test_regular_user, 1)), test_regular_user
+        )
+        assert await process_waitlist(db_session, outing.id) == []
+        assert await crud_waitlist.get_waitlist_position(db_session, first) == 1
+        assert await crud_waitlist.get_waitlist_position(db_session, second) == 2
+
+        # One spot opens: the head needs two, so nobody moves
+        await crud_signup.delete_signup(db_session, signups[0].id)
+        assert await process_waitlist(db_session, outing.id) == []
+
+        # A second spot opens: the head is admitted, the next request moves up
+        await crud_signup.delete_signup(db_session, signups[1].id)
+        admitted = await process_waitlist(db_session, outing.id)
+
+        assert [e.id for e in admitted] == [first.id]
+        second = await crud_waitlist.get_waitlist_entry(db_session, second.id)
+        assert second.status == crud_waitlist.WAITING
+        assert await crud_waitlist.get_waitlist_position(db_session, second) == 1
+
+    async def test_invalid_head_is_rejected_and_queue_moves(self, db_session, full_outing, test_user, test_regular_user):
+        outing, signups = full_outing
+        doomed = await _scouts(db_session, test_user, 1)
+        first = await enqueue_signup(db_session, outing, _request(outing, doomed), test_user)
+        second = await enqueue_signup(
+            db_session, outing, _request(outing, await _scouts(db_session, test_regular_user, 1)), test_regular_user
+        )
+
+        # The first family removes the member they queued
+        await db_session.delete(doomed[0])
+        await db_session.commit()
+        await crud_signup.delete_signup(db_session, signups[0].id)
+        admitted = await process_waitlist(db_session, outing.id)
+
+        assert [e.id for e in admitted] == [second.id]
+        first = await crud_waitlist.get_waitlist_entry(db_session, first.id)
+        assert first.status == crud_waitlist.REJECTED
+        assert "not found" in first.status_reason
+
+    async def test_enqueue_validates_request(self, db_session, small_outing, test_user, test_regular_user):
+        others = await _scouts(db_session, test_regular_user, 1)
+
+        with pytest.raises(HTTPException) as exc:
+            await enqueue_signup(db_session, small_outing, _request(small_outing, others), test_user)
+
+        assert exc.value.status_code == 403
+        assert await crud_waitlist.get_outing_waitlist(db_session, small_outing.id) == []
+
+    async def test_one_waiting_request_per_user(self, db_session, full_outing, test_user):
+        outing, _ = full_outing
+        await enqueue_signup(db_session, outing, _request(outing, await _scouts(db_session, test_user, 1)), test_user)
+
+        with pytest.raises(HTTPException) as exc:
+            await enqueue_signup(db_session, outing, _request(outing, await _scouts(db_session, test_user, 1)), test_user)
+
+        assert exc.value.status_code == 400
+
+    async def test_drain_locks_are_released(self, db_session, small_outing):
+        from app.services import waitlist
+
+        await process_waitlist(db_session, small_outing.id)
+
+        assert small_outing.id not in waitlist._drain_locks
+        assert small_outing.id not in waitlist._drain_lock_users